@@ -1,7 +1,41 @@
 from importlib import metadata
 
+from langchain_runpod.balancer import RunPodLoadBalancer
+from langchain_runpod.cache import (
+    InMemoryResponseCache,
+    ResponseCache,
+    SQLiteResponseCache,
+    TieredResponseCache,
+)
 from langchain_runpod.chat_models import ChatRunPod
+from langchain_runpod.chat_templates import (
+    ChatMLTemplate,
+    ChatTemplate,
+    Llama3ChatTemplate,
+    MistralChatTemplate,
+    PlainChatTemplate,
+)
+from langchain_runpod.circuit_breaker import CircuitBreaker
+from langchain_runpod.exceptions import (
+    CircuitOpenError,
+    EndpointOverloadedError,
+    EndpointUnavailableError,
+    RunPodAPIError,
+)
+from langchain_runpod.extractors import (
+    OutputExtractorRegistry,
+    register_output_extractor,
+)
+from langchain_runpod.health import AdmissionPolicy, EndpointHealth
+from langchain_runpod.hedging import HedgePolicy
 from langchain_runpod.llms import RunPod
+from langchain_runpod.polling import (
+    AdaptivePollingStrategy,
+    FixedPollingStrategy,
+    PollingStrategy,
+)
+from langchain_runpod.rate_limit import RateLimiter
+from langchain_runpod.retry import RetryPolicy
 
 try:
     __version__ = metadata.version(__package__)
@@ -11,7 +45,32 @@ except metadata.PackageNotFoundError:
 del metadata  # optional, avoids polluting the results of dir(__package__)
 
 __all__ = [
+    "AdaptivePollingStrategy",
+    "AdmissionPolicy",
+    "ChatMLTemplate",
     "ChatRunPod",
+    "ChatTemplate",
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "EndpointHealth",
+    "EndpointOverloadedError",
+    "EndpointUnavailableError",
+    "FixedPollingStrategy",
+    "HedgePolicy",
+    "InMemoryResponseCache",
+    "Llama3ChatTemplate",
+    "MistralChatTemplate",
+    "OutputExtractorRegistry",
+    "PlainChatTemplate",
+    "PollingStrategy",
+    "RateLimiter",
+    "ResponseCache",
+    "RetryPolicy",
     "RunPod",
+    "RunPodAPIError",
+    "RunPodLoadBalancer",
+    "SQLiteResponseCache",
+    "TieredResponseCache",
+    "register_output_extractor",
     "__version__",
 ]
@@ -0,0 +1,321 @@
+"""Load balancing of calls over several RunPod endpoints serving the same model.
+
+:class:`RunPodLoadBalancer` wraps one :class:`RunPod <langchain_runpod.RunPod>`
+or :class:`ChatRunPod <langchain_runpod.ChatRunPod>` instance per endpoint and
+is itself a runnable: ``invoke``, ``stream``, ``batch`` and their async
+variants route each call to the endpoint most likely to finish it first. The
+balancer counts the calls each endpoint has outstanding and keeps a moving
+average of its recent latency; an endpoint that fails several calls in a row
+is taken out of rotation for a while.
+"""
+
+import logging
+import random
+import threading
+import time
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    Iterator,
+    List,
+    Literal,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Union,
+)
+
+from langchain_core.runnables import Runnable, RunnableConfig
+
+logger = logging.getLogger(__name__)
+
+RoutingStrategy = Literal["least_outstanding", "latency"]
+
+
+class _Member:
+    """One endpoint of a balancer and what the balancer knows about it."""
+
+    __slots__ = (
+        "model",
+        "name",
+        "weight",
+        "outstanding",
+        "latency",
+        "failures",
+        "ejected_until",
+    )
+
+    def __init__(self, model: Runnable, weight: float) -> None:
+        self.model = model
+        self.name = str(getattr(model, "endpoint_id", None) or model.get_name())
+        self.weight = weight
+        self.outstanding = 0
+        self.latency: Optional[float] = None
+        self.failures = 0
+        self.ejected_until = 0.0
+
+
+class RunPodLoadBalancer(Runnable[Any, Any]):
+    """Routes calls over several models that serve the same model.
+
+    Example:
+        .. code-block:: python
+
+            from langchain_runpod import ChatRunPod, RunPodLoadBalancer
+
+            chat = RunPodLoadBalancer.from_endpoints(
+                ChatRunPod(endpoint_id="a100-us", temperature=0.2),
+                {"a100-us": 2.0, "l40-eu": 1.0},
+                strategy="latency",
+            )
+            chat.invoke("Hello!")
+
+    Args:
+        models: One model per endpoint, usually all ``RunPod`` or all
+            ``ChatRunPod`` instances.
+        weights: Relative capacity of each endpoint; an endpoint with twice
+            the weight is given twice as many outstanding calls. Defaults to 1
+            for every endpoint.
+        strategy: ``"least_outstanding"`` sends each call to the endpoint with
+            the fewest outstanding calls per unit of weight. ``"latency"``
+            also multiplies by the endpoint's recent latency, i.e. picks the
+            endpoint whose queue is expected to drain first.
+        max_failures: Consecutive failed calls after which an endpoint is
+            taken out of rotation.
+        ejection_time: Seconds an endpoint stays out of rotation. After that
+            it gets calls again, and is taken out again on its next failure
+            unless a call succeeds.
+        latency_decay: Weight of the latest call in the moving average of an
+            endpoint's latency.
+        max_attempts: Endpoints tried per call. A call that fails on one
+            endpoint is retried on another one, unless it is a stream that has
+            already produced output.
+    """
+
+    def __init__(
+        self,
+        models: Sequence[Runnable],
+        weights: Optional[Sequence[float]] = None,
+        strategy: RoutingStrategy = "least_outstanding",
+        max_failures: int = 3,
+        ejection_time: float = 30.0,
+        latency_decay: float = 0.3,
+        max_attempts: int = 2,
+    ) -> None:
+        if not models:
+            raise ValueError("RunPodLoadBalancer needs at least one model.")
+        if weights is None:
+            weights = [1.0] * len(models)
+        if len(weights) != len(models):
+            raise ValueError("weights must have one entry per model.")
+        if any(weight <= 0 for weight in weights):
+            raise ValueError("weights must be positive.")
+        if strategy not in ("least_outstanding", "latency"):
+            raise ValueError(f"Unknown routing strategy {strategy!r}.")
+        self.strategy = strategy
+        self.max_failures = max_failures
+        self.ejection_time = ejection_time
+        self.latency_decay = latency_decay
+        self.max_attempts = max(1, max_attempts)
+        self._members = [_Member(model, weight) for model, weight in zip(models, weights)]
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_endpoints(
+        cls,
+        model: Runnable,
+        endpoints: Union[Sequence[str], Mapping[str, float]],
+        **kwargs: Any,
+    ) -> "RunPodLoadBalancer":
+        """Balance over copies of ``model`` that target each of ``endpoints``.
+
+        Args:
+            model: A ``RunPod`` or ``ChatRunPod`` instance whose settings are
+                used for every endpoint.
+            endpoints: Endpoint IDs, or a mapping of endpoint IDs to weights.
+            **kwargs: Further arguments of :class:`RunPodLoadBalancer`.
+        """
+        weights = list(endpoints.values()) if isinstance(endpoints, Mapping) else None
+        settings = {name: getattr(model, name) for name in model.model_fields_set}  # type: ignore[attr-defined]
+        if settings.get("model_name") == f"runpod-endpoint-{getattr(model, 'endpoint_id', '')}":
+            # Derived from the endpoint ID, let each copy derive its own
+            del settings["model_name"]
+        models = [
+            type(model)(**{**settings, "endpoint_id": endpoint_id}) for endpoint_id in endpoints
+        ]
+        return cls(models, weights=weights, **kwargs)
+
+    @property
+    def models(self) -> List[Runnable]:
+        """The models calls are routed to."""
+        return [member.model for member in self._members]
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Return the routing state of each endpoint.
+
+        Each entry has the endpoint ``name``, its ``weight``, the number of
+        ``outstanding`` calls, the moving average ``latency`` in seconds (None
+        before the first call finished), the number of consecutive
+        ``failures`` and whether it is ``healthy``, i.e. in rotation.
+        """
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    "name": member.name,
+                    "weight": member.weight,
+                    "outstanding": member.outstanding,
+                    "latency": member.latency,
+                    "failures": member.failures,
+                    "healthy": member.ejected_until <= now,
+                }
+                for member in self._members
+            ]
+
+    # --- Routing ---
+
+    def _acquire(self, tried: Set[int]) -> Optional[_Member]:
+        """Pick the endpoint for a call and count the call as outstanding on it."""
+        now = time.monotonic()
+        with self._lock:
+            untried = [m for i, m in enumerate(self._members) if i not in tried]
+            if not untried:
+                return None
+            candidates = [m for m in untried if m.ejected_until <= now]
+            if not candidates:
+                # Every endpoint is out of rotation: try the one that has been
+                # out the longest rather than failing the call
+                candidates = [min(untried, key=lambda m: m.ejected_until)]
+            known = [m.latency for m in self._members if m.latency is not None]
+            # Endpoints without a measurement yet are assumed to be as fast as
+            # the fastest one, so that they get traffic and a measurement
+            default_latency = min(known) if known else 1.0
+
+            def expected_finish(member: _Member) -> float:
+                load = (member.outstanding + 1) / member.weight
+                if self.strategy == "latency":
+                    latency = member.latency if member.latency is not None else default_latency
+                    return load * latency
+                return load
+
+            member = min(candidates, key=lambda m: (expected_finish(m), random.random()))
+            member.outstanding += 1
+            tried.add(self._members.index(member))
+            return member
+
+    def _release(self, member: _Member, started: float, error: Optional[BaseException]) -> None:
+        elapsed = time.monotonic() - started
+        with self._lock:
+            member.outstanding -= 1
+            if error is None:
+                member.failures = 0
+                member.ejected_until = 0.0
+                if member.latency is None:
+                    member.latency = elapsed
+                else:
+                    member.latency += self.latency_decay * (elapsed - member.latency)
+                return
+            if not isinstance(error, Exception):
+                # Interrupted or cancelled: says nothing about the endpoint
+                return
+            member.failures += 1
+            if member.failures >= self.max_failures:
+                member.ejected_until = time.monotonic() + self.ejection_time
+        if member.failures >= self.max_failures:
+            logger.warning(
+                "Taking endpoint %s out of rotation for %.0fs after %d consecutive failures: %s",
+                member.name,
+                self.ejection_time,
+                member.failures,
+                error,
+            )
+
+    # --- Runnable interface ---
+
+    def invoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Any:
+        tried: Set[int] = set()
+        while True:
+            member = self._acquire(tried)
+            assert member is not None
+            started = time.monotonic()
+            try:
+                result = member.model.invoke(input, config, **kwargs)
+            except BaseException as e:
+                self._release(member, started, e)
+                if not self._can_retry(e, tried):
+                    raise
+                logger.debug("Call failed on endpoint %s, trying another one: %s", member.name, e)
+                continue
+            self._release(member, started, None)
+            return result
+
+    async def ainvoke(
+        self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any
+    ) -> Any:
+        tried: Set[int] = set()
+        while True:
+            member = self._acquire(tried)
+            assert member is not None
+            started = time.monotonic()
+            try:
+                result = await member.model.ainvoke(input, config, **kwargs)
+            except BaseException as e:
+                self._release(member, started, e)
+                if not self._can_retry(e, tried):
+                    raise
+                logger.debug("Call failed on endpoint %s, trying another one: %s", member.name, e)
+                continue
+            self._release(member, started, None)
+            return result
+
+    def stream(
+        self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any
+    ) -> Iterator[Any]:
+        tried: Set[int] = set()
+        while True:
+            member = self._acquire(tried)
+            assert member is not None
+            started = time.monotonic()
+            produced = False
+            try:
+                for chunk in member.model.stream(input, config, **kwargs):
+                    produced = True
+                    yield chunk
+            except BaseException as e:
+                self._release(member, started, e)
+                if produced or not self._can_retry(e, tried):
+                    raise
+                logger.debug("Stream failed on endpoint %s, trying another one: %s", member.name, e)
+                continue
+            self._release(member, started, None)
+            return
+
+    async def astream(
+        self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any
+    ) -> AsyncIterator[Any]:
+        tried: Set[int] = set()
+        while True:
+            member = self._acquire(tried)
+            assert member is not None
+            started = time.monotonic()
+            produced = False
+            try:
+                async for chunk in member.model.astream(input, config, **kwargs):
+                    produced = True
+                    yield chunk
+            except BaseException as e:
+                self._release(member, started, e)
+                if produced or not self._can_retry(e, tried):
+                    raise
+                logger.debug("Stream failed on endpoint %s, trying another one: %s", member.name, e)
+                continue
+            self._release(member, started, None)
+            return
+
+    def _can_retry(self, error: BaseException, tried: Set[int]) -> bool:
+        return (
+            isinstance(error, Exception)
+            and len(tried) < min(self.max_attempts, len(self._members))
+        )
@@ -0,0 +1,113 @@
+"""Micro-batching of independent concurrent calls.
+
+Callers that each await a single request (for example the handlers of an API
+server calling ``ainvoke``) cannot use ``batch`` themselves. A
+:class:`MicroBatcher` collects the requests that arrive within a short window,
+grouped by a key such as the request parameters, runs each group as one batch
+and hands every caller its own result.
+"""
+
+import asyncio
+from typing import (
+    Awaitable,
+    Callable,
+    Dict,
+    Generic,
+    Hashable,
+    List,
+    Sequence,
+    Set,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class MicroBatcher(Generic[T, R]):
+    """Collects concurrent requests into batches.
+
+    A batch is run ``window`` seconds after its first request arrived, or as
+    soon as it holds ``max_size`` requests. Must be used from a single event
+    loop.
+
+    Args:
+        run_batch: Coroutine function that runs a batch of requests and returns
+            one result, or exception, per request in the same order.
+        key: Function returning the group of a request; only requests of the
+            same group are batched together.
+        window: Seconds to wait for more requests before running a batch.
+        max_size: Maximum number of requests per batch.
+    """
+
+    def __init__(
+        self,
+        run_batch: Callable[[List[T]], Awaitable[Sequence[Union[R, BaseException]]]],
+        key: Callable[[T], Hashable],
+        window: float = 0.01,
+        max_size: int = 8,
+    ) -> None:
+        if window < 0 or max_size < 1:
+            raise ValueError("window must not be negative and max_size must be at least 1.")
+        self.window = window
+        self.max_size = max_size
+        self._run_batch = run_batch
+        self._key = key
+        self._pending: Dict[Hashable, List[Tuple[T, "asyncio.Future[R]"]]] = {}
+        self._timers: Dict[Hashable, asyncio.TimerHandle] = {}
+        self._tasks: Set["asyncio.Task[None]"] = set()
+
+    @property
+    def pending(self) -> int:
+        """Number of requests waiting for their batch to start."""
+        return sum(len(batch) for batch in self._pending.values())
+
+    async def submit(self, item: T) -> R:
+        """Add a request to the next batch of its group and wait for its result."""
+        loop = asyncio.get_running_loop()
+        future: "asyncio.Future[R]" = loop.create_future()
+        key = self._key(item)
+        batch = self._pending.setdefault(key, [])
+        batch.append((item, future))
+        if len(batch) >= self.max_size:
+            self._flush(key)
+        elif len(batch) == 1:
+            self._timers[key] = loop.call_later(self.window, self._flush, key)
+        return await future
+
+    def _flush(self, key: Hashable) -> None:
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._pending.pop(key, None)
+        if not batch:
+            return
+        task = asyncio.get_running_loop().create_task(self._run(batch))
+        # Keep a reference so the task is not garbage collected while running
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[T, "asyncio.Future[R]"]]) -> None:
+        try:
+            results = await self._run_batch([item for item, _ in batch])
+        except asyncio.CancelledError:
+            # Make sure no caller waits forever on a cancelled batch
+            for _, future in batch:
+                future.cancel()
+            raise
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                # The caller went away (e.g. its task was cancelled)
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
@@ -0,0 +1,256 @@
+"""Caching of finished RunPod job responses.
+
+Responses are keyed on the endpoint and the complete, normalized ``/run``
+payload, so any difference in the prompt or the sampling parameters is a cache
+miss. Only jobs that completed successfully are cached.
+
+:class:`InMemoryResponseCache` keeps recent responses of one process,
+:class:`SQLiteResponseCache` stores them in a database file that several
+processes can share, and :class:`TieredResponseCache` combines both.
+"""
+
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from langchain_runpod.packing import payload_key
+
+
+def cache_key(api_base: str, endpoint_id: str, payload: Dict[str, Any]) -> str:
+    """Return the cache key of a ``/run`` payload sent to an endpoint."""
+    normalized = f"{api_base.rstrip('/')}/{endpoint_id}\n{payload_key(payload)}"
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def is_cacheable(response: Dict[str, Any]) -> bool:
+    """Whether a job response is worth caching, i.e. the job completed."""
+    return response.get("status") == "COMPLETED"
+
+
+class ResponseCache(ABC):
+    """Storage for finished job responses.
+
+    Subclass it to plug in another backend (e.g. Redis). Implementations must
+    be thread-safe; the async methods default to the sync ones.
+    """
+
+    @abstractmethod
+    def lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached response for ``key``, or None."""
+
+    @abstractmethod
+    def update(self, key: str, response: Dict[str, Any]) -> None:
+        """Store the response of a finished job under ``key``."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Remove all cached responses."""
+
+    async def alookup(self, key: str) -> Optional[Dict[str, Any]]:
+        """Asynchronously return the cached response for ``key``, or None."""
+        return self.lookup(key)
+
+    async def aupdate(self, key: str, response: Dict[str, Any]) -> None:
+        """Asynchronously store the response of a finished job."""
+        self.update(key, response)
+
+
+class InMemoryResponseCache(ResponseCache):
+    """Least-recently-used cache of responses in the memory of this process.
+
+    Responses are stored serialized, so callers can never modify cached
+    entries.
+
+    Args:
+        max_size: Maximum number of responses kept.
+        ttl: Seconds after which a response expires. None keeps responses
+            until they are evicted.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: Optional[float] = None) -> None:
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1.")
+        if ttl is not None and ttl <= 0:
+            raise ValueError("ttl must be positive.")
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, data = entry
+            if self.ttl is not None and time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        return json.loads(data)
+
+    def update(self, key: str, response: Dict[str, Any]) -> None:
+        data = json.dumps(response, default=str)
+        with self._lock:
+            self._entries[key] = (time.monotonic(), data)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __repr__(self) -> str:
+        return f"InMemoryResponseCache(max_size={self.max_size}, ttl={self.ttl})"
+
+
+class SQLiteResponseCache(ResponseCache):
+    """Cache of responses in an SQLite database file.
+
+    The database runs in WAL mode, so any number of processes can read and
+    write the same file concurrently. Async lookups and updates run in the
+    default executor so they do not block the event loop.
+
+    Args:
+        path: Path of the database file; created if it does not exist.
+        ttl: Seconds after which a response expires. None keeps responses
+            forever.
+        max_size: Maximum number of responses kept; the oldest are removed
+            first. None means unbounded.
+        timeout: Seconds to wait for a lock held by another process.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl: Optional[float] = None,
+        max_size: Optional[int] = None,
+        timeout: float = 30.0,
+    ) -> None:
+        if ttl is not None and ttl <= 0:
+            raise ValueError("ttl must be positive.")
+        if max_size is not None and max_size < 1:
+            raise ValueError("max_size must be at least 1.")
+        self.path = path
+        self.ttl = ttl
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=timeout, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS runpod_responses ("
+                "key TEXT PRIMARY KEY, response TEXT NOT NULL, created REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS runpod_responses_created "
+                "ON runpod_responses (created)"
+            )
+
+    def lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created FROM runpod_responses WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        data, created = row
+        if self.ttl is not None and time.time() - created > self.ttl:
+            with self._lock, self._conn:
+                self._conn.execute("DELETE FROM runpod_responses WHERE key = ?", (key,))
+            return None
+        return json.loads(data)
+
+    def update(self, key: str, response: Dict[str, Any]) -> None:
+        data = json.dumps(response, default=str)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO runpod_responses (key, response, created) "
+                "VALUES (?, ?, ?)",
+                (key, data, time.time()),
+            )
+            if self.max_size is not None:
+                self._conn.execute(
+                    "DELETE FROM runpod_responses WHERE key IN ("
+                    "SELECT key FROM runpod_responses ORDER BY created DESC "
+                    "LIMIT -1 OFFSET ?)",
+                    (self.max_size,),
+                )
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM runpod_responses")
+
+    async def alookup(self, key: str) -> Optional[Dict[str, Any]]:
+        return await asyncio.get_running_loop().run_in_executor(None, self.lookup, key)
+
+    async def aupdate(self, key: str, response: Dict[str, Any]) -> None:
+        await asyncio.get_running_loop().run_in_executor(None, self.update, key, response)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def __repr__(self) -> str:
+        return (
+            f"SQLiteResponseCache(path={self.path!r}, ttl={self.ttl}, "
+            f"max_size={self.max_size})"
+        )
+
+
+class TieredResponseCache(ResponseCache):
+    """Looks responses up in several caches, fastest first.
+
+    A hit in a slower tier is copied into the faster ones; updates go to all
+    tiers. Typically an :class:`InMemoryResponseCache` in front of an
+    :class:`SQLiteResponseCache`.
+    """
+
+    def __init__(self, *tiers: ResponseCache) -> None:
+        if not tiers:
+            raise ValueError("At least one cache tier is required.")
+        self.tiers = tiers
+
+    def lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        for index, tier in enumerate(self.tiers):
+            response = tier.lookup(key)
+            if response is not None:
+                for faster in self.tiers[:index]:
+                    faster.update(key, response)
+                return response
+        return None
+
+    def update(self, key: str, response: Dict[str, Any]) -> None:
+        for tier in self.tiers:
+            tier.update(key, response)
+
+    def clear(self) -> None:
+        for tier in self.tiers:
+            tier.clear()
+
+    async def alookup(self, key: str) -> Optional[Dict[str, Any]]:
+        for index, tier in enumerate(self.tiers):
+            response = await tier.alookup(key)
+            if response is not None:
+                for faster in self.tiers[:index]:
+                    await faster.aupdate(key, response)
+                return response
+        return None
+
+    async def aupdate(self, key: str, response: Dict[str, Any]) -> None:
+        for tier in self.tiers:
+            await tier.aupdate(key, response)
+
+    def __repr__(self) -> str:
+        return f"TieredResponseCache({', '.join(map(repr, self.tiers))})"
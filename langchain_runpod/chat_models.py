@@ -5,29 +5,68 @@ import logging
 import os
 import time
 import asyncio
-from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Union
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Dict, Iterator, List, Literal, Optional, Sequence, Tuple, Union
 
 import httpx
 from langchain_core.callbacks import (
     AsyncCallbackManagerForLLMRun,
     CallbackManagerForLLMRun,
 )
-from langchain_core.language_models import BaseChatModel
+from langchain_core.language_models import BaseChatModel, LanguageModelInput
 from langchain_core.messages import (
     AIMessage,
     AIMessageChunk,
     BaseMessage,
-    HumanMessage,
-    SystemMessage,
+    convert_to_openai_messages,
 )
 from langchain_core.messages.ai import UsageMetadata
 from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.runnables import RunnableConfig
 from pydantic import Field, PrivateAttr, root_validator, model_validator
 
+from langchain_runpod.batcher import MicroBatcher
+from langchain_runpod.cache import ResponseCache
+from langchain_runpod.chat_templates import ChatTemplate, get_chat_template
+from langchain_runpod.circuit_breaker import CircuitBreaker
+from langchain_runpod.clients import ClientManager
+from langchain_runpod.codec import RequestTemplate, decode_response
+from langchain_runpod.endpoint import EndpointMixin
+from langchain_runpod.exceptions import EndpointUnavailableError, RunPodAPIError
+from langchain_runpod.extractors import (
+    OutputExtractorRegistry,
+    default_extractors,
+    find_usage,
+)
+from langchain_runpod.hedging import HedgePolicy
+from langchain_runpod.health import AdmissionPolicy
+from langchain_runpod.jobs import JobTracker
+from langchain_runpod.logs import loggable
+from langchain_runpod.openai_compat import openai_body, parse_tool_calls
+from langchain_runpod.packing import (
+    group_key,
+    group_payloads,
+    pack_payloads,
+    payload_key,
+    split_output,
+)
+from langchain_runpod.polling import PollingStrategy
+from langchain_runpod.retry import RetryPolicy, track_retries
+from langchain_runpod.singleflight import SingleFlight
+
 logger = logging.getLogger(__name__)
 
+# Results of the packed jobs of the running ``batch``/``abatch`` call, with the
+# id of the instance they belong to; seen only by that call's own inputs.
+_packed_results: ContextVar[Optional[Tuple[int, Dict[str, List[ChatResult]]]]] = ContextVar(
+    "runpod_packed_results", default=None
+)
+
 
-class ChatRunPod(BaseChatModel):
+class ChatRunPod(EndpointMixin, BaseChatModel):
     """RunPod chat model integration for LangChain.
 
     This class provides integration with RunPod's API for accessing chat-based LLMs
@@ -54,6 +93,13 @@ class ChatRunPod(BaseChatModel):
             Top-p sampling parameter.
         top_k: Optional[int]
             Top-k sampling parameter.
+        chat_template: Union[str, ChatTemplate]
+            Prompt format of the conversation: "plain" (default), "chatml",
+            "llama3", "mistral" or a custom ``ChatTemplate``.
+        payload_mode: Literal["prompt", "messages"]
+            Send the conversation as a rendered ``prompt`` (default) or as an
+            OpenAI-style ``messages`` list for workers that apply their own
+            chat template, e.g. vLLM.
 
     Key init args — client params:
         api_key: Optional[str]
@@ -61,28 +107,96 @@ class ChatRunPod(BaseChatModel):
         timeout: Optional[int]
             Timeout for requests in seconds.
         max_retries: int
-            Max number of retries for API calls.
+            Max number of retries of transiently failed API requests.
+        retry_policy: Optional[RetryPolicy]
+            Custom backoff, retryable statuses and retry budget.
+        http2: bool
+            Use HTTP/2 multiplexing. Requires ``pip install httpx[http2]``.
+        max_connections / max_keepalive_connections / keepalive_expiry
+            Connection pool limits.
+        connect_timeout / pool_timeout: Optional[float]
+            Connect and pool-acquire timeouts. Default to ``timeout``.
+        share_http_client: bool
+            Reuse the process-wide connection pool shared by all instances with
+            the same settings. Default is True.
         api_base: Optional[str]
             Base URL for the RunPod API. Default is "https://api.runpod.ai/v2".
         poll_interval: float
             How frequently to poll for job status in seconds.
         max_polling_attempts: int
             Maximum number of polling attempts for async jobs.
+        shared_poller: bool
+            If True, async calls wait for their jobs through one background
+            poller per endpoint, which bounds status traffic under high
+            concurrency. Only applies with ``share_http_client``. Default is
+            False.
+        polling_strategy: Optional[PollingStrategy]
+            Strategy that schedules ``/status`` polls, e.g.
+            ``AdaptivePollingStrategy()`` for fast initial polls with backoff.
+            Defaults to polling every ``poll_interval`` seconds.
         disable_streaming: bool
-            If True, will not attempt to use streaming endpoints and will always
-            fall back to simulated streaming. Default is False.
+            If True, will not use the ``/stream`` endpoint and will return the
+            full response as a single chunk. Default is False.
+        stream_poll_interval: float
+            How long to wait between ``/stream`` polls when no new output arrived.
+        use_runsync: bool
+            If True, submit jobs to ``/runsync`` so short jobs return without any
+            polling. Jobs that outlive the sync window fall back to ``/status``
+            polling. Default is False.
+        pack_batches: bool
+            If True, ``batch``/``abatch`` send up to ``max_batch_size``
+            conversations as a list of prompts in a single job. Requires a worker
+            that accepts a list of prompts; otherwise one job per conversation is
+            used. Default is False.
+        micro_batch: bool
+            If True, concurrent ``ainvoke`` calls arriving within
+            ``micro_batch_window`` seconds are sent as one packed job (see
+            ``pack_batches``). Default is False.
+        response_cache: Optional[ResponseCache]
+            Cache of finished job responses, e.g. ``InMemoryResponseCache()``
+            or an ``SQLiteResponseCache`` shared between processes.
+        coalesce_requests: bool
+            If True, concurrent calls with identical payloads share one job.
+            Default is False.
+        output_extractors: Optional[OutputExtractorRegistry]
+            Rules that extract the text from job outputs. Defaults to the shared
+            registry that ``register_output_extractor`` adds to.
+        log_payloads: bool
+            If True, prompts and outputs are written to the logs (truncated).
+            Default is False.
+        api_mode: Literal["runpod", "openai"]
+            "runpod" (default) runs jobs through ``/run`` and ``/status``;
+            "openai" calls the ``/openai/v1/chat/completions`` route of vLLM
+            workers, with SSE streaming. ``model_name`` must then be the
+            served model name.
+        n: int
+            Number of choices generated per call in the "openai" API mode.
+        hedge_policy: Optional[HedgePolicy]
+            If set, jobs still queued after the policy's delay or percentile
+            get a duplicate submitted to ``hedge_endpoint_id`` (default: the
+            same endpoint); the first to complete wins, the other is cancelled.
+        admission_policy: Optional[AdmissionPolicy]
+            If set, jobs are only submitted while the endpoint's ``/health``
+            shows its queue under the policy's limits; otherwise submission
+            waits or raises ``EndpointOverloadedError``. ``health()`` and
+            ``ahealth()`` return the cached health (``health_ttl`` seconds).
+        circuit_breaker: Union[bool, CircuitBreaker]
+            If True (or a ``CircuitBreaker``), jobs fail fast with
+            ``CircuitOpenError`` while the endpoint keeps failing, until
+            probe jobs show it has recovered. The breaker is shared by all
+            ``RunPod`` and ``ChatRunPod`` instances targeting the endpoint.
 
     Streaming Support:
-        Note that most RunPod serverless endpoints do not support native streaming by default.
-        To enable true streaming support, your RunPod handler needs to be specifically
-        configured with a generator function and `return_aggregate_stream: True`.
-        See the RunPod documentation on WebSocket streaming for details:
+        Streaming reads partial outputs from RunPod's ``/stream/{job_id}`` endpoint
+        as the worker produces them. To get token-level chunks, your RunPod handler
+        needs to be a generator function (for example the vLLM worker).
+        See the RunPod documentation on streaming for details:
         https://blog.runpod.io/introduction-to-websocket-streaming-with-runpod-serverless/
-        
-        If streaming is not supported by your endpoint, the integration will automatically
-        fall back to simulated streaming (sending the full response and then streaming
-        it character by character). You can also set `disable_streaming=True` to skip
-        the streaming endpoint attempt altogether.
+
+        Handlers that are not generators still work: their complete output is
+        returned as a single chunk once the job finishes. Token usage reported by
+        the worker is attached to the final chunk. You can also set
+        `disable_streaming=True` to skip the streaming endpoint altogether.
 
     Instantiate:
         .. code-block:: python
@@ -151,9 +265,23 @@ class ChatRunPod(BaseChatModel):
     
     stop: Optional[List[str]] = None
     """List of strings to stop generation when encountered."""
+
+    chat_template: Union[str, ChatTemplate] = "plain"
+    """How the conversation is rendered into the prompt: ``"plain"`` (``System:``,
+    ``User:`` and ``Assistant:`` lines), ``"chatml"``, ``"llama3"``,
+    ``"mistral"``, or a custom ``ChatTemplate`` instance."""
+
+    payload_mode: Literal["prompt", "messages"] = "prompt"
+    """How the conversation is sent to the worker. ``"prompt"`` renders it with
+    ``chat_template`` into ``input.prompt``. ``"messages"`` sends it unrendered
+    as OpenAI-style ``input.messages`` (roles, multi-part content, tool calls),
+    so workers like vLLM apply the model's own chat template and can reuse the
+    prefix cache of shared histories across turns. Payloads in messages mode
+    are never packed into one job."""
     
     max_retries: int = 2
-    """Maximum number of retries for API calls."""
+    """Maximum number of retries of a request that failed transiently (connection
+    errors, 5xx responses), with exponential backoff and jitter."""
 
     poll_interval: float = 1.0
     """How frequently to poll for job status in seconds."""
@@ -162,10 +290,148 @@ class ChatRunPod(BaseChatModel):
     """Maximum number of polling attempts for async jobs."""
     
     disable_streaming: bool = False
-    """If True, will not attempt to use streaming endpoints and will always fall back to simulated streaming."""
+    """If True, will not use the ``/stream`` endpoint and will return the full response as a single chunk."""
+
+    stream_poll_interval: float = 0.2
+    """How long to wait before polling ``/stream`` again when no new output arrived."""
+
+    polling_strategy: Optional[PollingStrategy] = None
+    """Strategy that schedules ``/status`` polls. Defaults to polling every
+    ``poll_interval`` seconds; see ``AdaptivePollingStrategy`` for backoff."""
+
+    shared_poller: bool = False
+    """Wait for async jobs through one background poller per endpoint and event loop,
+    shared by all concurrent calls, instead of one polling loop per call. Only
+    applies with ``share_http_client``."""
+
+    max_concurrent_polls: int = 32
+    """Maximum number of concurrent ``/status`` requests made by the shared poller."""
+
+    use_runsync: bool = False
+    """Submit jobs to ``/runsync`` and only poll ``/status`` if the job outlives the
+    sync window. Make sure ``timeout`` is long enough to cover that window."""
+
+    http2: bool = False
+    """Use HTTP/2 multiplexing for API requests. Requires ``pip install httpx[http2]``."""
+
+    max_connections: Optional[int] = 100
+    """Maximum number of concurrent connections in the HTTP connection pool."""
+
+    max_keepalive_connections: Optional[int] = 20
+    """Maximum number of idle connections kept alive in the HTTP connection pool."""
+
+    keepalive_expiry: Optional[float] = 5.0
+    """How long an idle keep-alive connection is kept open, in seconds."""
+
+    connect_timeout: Optional[float] = None
+    """Timeout for establishing a connection in seconds. Defaults to ``timeout``."""
+
+    pool_timeout: Optional[float] = None
+    """Timeout for acquiring a pooled connection in seconds. Defaults to ``timeout``."""
+
+    share_http_client: bool = True
+    """Reuse the process-wide connection pool shared by all instances with the same
+    API base, API key, timeouts and pool settings."""
+
+    rate_limit: Optional[float] = None
+    """Maximum number of requests per second to this endpoint, shared by all
+    instances targeting it. Even when None, requests slow down after the API
+    answers 429 and honour its ``Retry-After`` header."""
+
+    max_rate_limit_retries: int = 5
+    """How many times a request answered with 429 is sent again after waiting."""
 
-    _client: httpx.Client = PrivateAttr()
-    _async_client: Optional[httpx.AsyncClient] = PrivateAttr(default=None)
+    retry_policy: Optional[RetryPolicy] = None
+    """Policy for retrying transient failures (connection errors, 5xx). Defaults
+    to exponential backoff with jitter, ``max_retries`` retries per request and
+    a retry budget per instance."""
+
+    pack_batches: bool = False
+    """Send the conversations of ``batch``/``abatch`` as a list of prompts in one job
+    instead of one job each. The worker must return a list with one output per
+    prompt; if it does not, every conversation is sent as its own job."""
+
+    max_batch_size: int = 8
+    """Maximum number of conversations packed into one job."""
+
+    micro_batch: bool = False
+    """Collect concurrent async calls with the same parameters that arrive within
+    ``micro_batch_window`` and send them as one packed job, trading a few
+    milliseconds of latency for throughput. Calls that cannot be packed are
+    submitted together as separate jobs."""
+
+    micro_batch_window: float = 0.01
+    """Seconds to wait for more calls before sending a micro-batch."""
+
+    response_cache: Optional[ResponseCache] = None
+    """Cache of finished job responses, keyed on the endpoint and the complete
+    ``/run`` payload, e.g. ``InMemoryResponseCache()``. Streaming calls are not
+    cached."""
+
+    coalesce_requests: bool = False
+    """Let concurrent calls with the same payload share one job: only the first
+    one submits and polls it, the others wait for its result or error.
+    Streaming calls and calls sent as packed jobs are not coalesced."""
+
+    output_extractors: Optional[OutputExtractorRegistry] = None
+    """Rules that extract the generated text from job outputs. Defaults to the
+    registry shared by all instances; see ``register_output_extractor``."""
+
+    log_payloads: bool = False
+    """Whether prompts, outputs and responses are written to debug and warning
+    logs. They are left out by default, and truncated when logged."""
+
+    api_mode: Literal["runpod", "openai"] = "runpod"
+    """API used to generate. ``"runpod"`` submits jobs to ``/run`` and polls
+    ``/status``. ``"openai"`` calls the ``/openai/v1/chat/completions`` route of
+    vLLM workers, which answers directly and streams tokens as server-sent
+    events; ``model_name`` must then be the name of the model served by the
+    worker. Response caching, coalescing and packing only apply to the
+    ``"runpod"`` mode."""
+
+    n: int = 1
+    """Number of choices generated per call in the ``"openai"`` API mode."""
+
+    hedge_policy: Optional[HedgePolicy] = None
+    """Opt-in hedging of jobs that sit ``IN_QUEUE``, e.g. while the endpoint
+    scales up: once a job has been queued longer than the policy's delay or
+    percentile, a duplicate is submitted to ``hedge_endpoint_id``, the first
+    copy to complete is used and the other one is cancelled. The policy's
+    ``max_ratio`` caps the extra jobs. Streaming calls and packed jobs are not hedged."""
+
+    hedge_endpoint_id: Optional[str] = None
+    """Endpoint hedges are submitted to. Defaults to ``endpoint_id``."""
+
+    health_ttl: float = 5.0
+    """Seconds a ``/health`` result is reused. Results are shared by all
+    instances targeting the endpoint, so ``health()`` and admission control
+    make at most one ``/health`` request per ``health_ttl``."""
+
+    admission_policy: Optional[AdmissionPolicy] = None
+    """Check the endpoint's queue depth and worker counts (via ``/health``)
+    before submitting a job, and hold the submission or fail fast with
+    ``EndpointOverloadedError`` while the queue is over the policy's limits."""
+
+    circuit_breaker: Union[bool, CircuitBreaker] = False
+    """Stop submitting jobs to an endpoint that keeps failing. True uses the
+    breaker shared by all instances targeting the endpoint (see
+    ``get_circuit_breaker``); a ``CircuitBreaker`` is used as given. While the
+    circuit is open, calls raise ``CircuitOpenError`` without submitting a
+    job. Failed and timed-out jobs, and submissions that fail with a server
+    or connection error, count as failures. Only the ``"runpod"`` API mode
+    is guarded."""
+
+    _clients: ClientManager = PrivateAttr()
+    _retry_policy: RetryPolicy = PrivateAttr()
+    _jobs: JobTracker = PrivateAttr(default_factory=JobTracker)
+    _flights: SingleFlight = PrivateAttr(default_factory=SingleFlight)
+    _template: Optional[RequestTemplate] = PrivateAttr(default=None)
+    _template_key: Optional[Tuple[Any, ...]] = PrivateAttr(default=None)
+    _packed_lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    _packing_unsupported: bool = PrivateAttr(default=False)
+    _micro_batchers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, MicroBatcher]" = PrivateAttr(
+        default_factory=weakref.WeakKeyDictionary
+    )
 
     @model_validator(mode='before')
     @classmethod
@@ -191,7 +457,15 @@ class ChatRunPod(BaseChatModel):
     def __init__(self, **kwargs: Any) -> None:
         """Initialize the ChatRunPod instance."""
         super().__init__(**kwargs)
-        self._client = httpx.Client(timeout=self.timeout or 60.0)
+        self._init_endpoint()
+        # Fail early on unknown template names
+        self._get_chat_template()
+
+    def __enter__(self) -> "ChatRunPod":
+        return self
+
+    async def __aenter__(self) -> "ChatRunPod":
+        return self
 
     @property
     def _llm_type(self) -> str:
@@ -204,6 +478,22 @@ class ChatRunPod(BaseChatModel):
         return {
             "model_name": self.model_name,
             "endpoint_id": self.endpoint_id,
+            "api_base": self.api_base,
+            "temperature": self.temperature,
+            "max_tokens": self.max_tokens,
+            "top_p": self.top_p,
+            "top_k": self.top_k,
+            "stop": self.stop,
+            "chat_template": self._get_chat_template().name,
+            "payload_mode": self.payload_mode,
+            "timeout": self.timeout,
+            "disable_streaming": self.disable_streaming,
+            "poll_interval": self.poll_interval,
+            "max_polling_attempts": self.max_polling_attempts,
+            "stream_poll_interval": self.stream_poll_interval,
+            "use_runsync": self.use_runsync,
+            "api_mode": self.api_mode,
+            "n": self.n,
         }
         
     def _get_ls_params(self, stop: Optional[List[str]] = None, **kwargs) -> Dict[str, Any]:
@@ -230,170 +520,112 @@ class ChatRunPod(BaseChatModel):
     def _convert_messages_to_prompt(self, messages: List[BaseMessage]) -> Dict[str, Any]:
         """Convert a list of LangChain messages to RunPod API format.
         
-        This method creates a format that should work with most LLMs hosted on RunPod,
-        but may need to be overridden for custom formats.
+        The conversation is rendered into a single prompt with ``chat_template``,
+        or sent as a list of messages if ``payload_mode`` is ``"messages"``.
+        Override this method for workers that expect another input format.
         """
-        logger.debug(f"Converting messages to prompt: {messages}")
-        
-        # Convert messages to a simple text format for the RunPod endpoint
-        combined_text = ""
-        
-        for message in messages:
-            # Handle multi-modal content by checking if content is a list
-            if isinstance(message.content, list):
-                # Most RunPod endpoints don't support structured content yet
-                # Converting to simple text format
-                text_content = []
-                for item in message.content:
-                    if isinstance(item, dict) and item.get("type") == "text":
-                        text_content.append(item.get("text", ""))
-                content = " ".join(text_content)
-                logger.warning(
-                    "Multi-modal content detected. Converting to text-only format. "
-                    "The endpoint may not support multi-modal inputs."
-                )
-            else:
-                content = message.content
-                
-            # Combine the messages into a single text string
-            if isinstance(message, SystemMessage):
-                combined_text += f"System: {content}\n"
-            elif isinstance(message, HumanMessage):
-                combined_text += f"User: {content}\n"
-            elif isinstance(message, AIMessage):
-                combined_text += f"Assistant: {content}\n"
-            else:
-                combined_text += f"{content}\n"
-        
+        logger.debug("Converting messages to prompt: %s", loggable(messages, self.log_payloads))
+
+        # Optional parameters, precomputed so that only the conversation is encoded
+        params = self._request_template().params
+
+        if self.payload_mode == "messages":
+            # Let the worker apply its own chat template to the structured messages
+            return {"input": {"messages": convert_to_openai_messages(messages), **params}}
+
         # For simple text-only endpoints, use a basic prompt format as shown in example
         simple_payload = {
-            "prompt": combined_text.strip()
+            "prompt": self._get_chat_template().render(messages),
+            **params,
         }
+
+        logger.debug(
+            "Final structured payload: %s", loggable(simple_payload, self.log_payloads)
+        )
         
-        # Add optional parameters
+        # Wrap in "input" field as expected by the RunPod endpoint
+        return {"input": simple_payload}
+
+    def _get_chat_template(self) -> ChatTemplate:
+        """Get the template that renders conversations into prompts."""
+        return get_chat_template(self.chat_template)
+
+    def _get_params(self) -> Dict[str, Any]:
+        """Get the sampling parameters to pass to the RunPod input object."""
+        params: Dict[str, Any] = {}
+
         if self.temperature is not None:
-            simple_payload["temperature"] = self.temperature
-            
+            params["temperature"] = self.temperature
+
         if self.max_tokens is not None:
-            simple_payload["max_tokens"] = self.max_tokens
-            
+            params["max_tokens"] = self.max_tokens
+
         if self.top_p is not None:
-            simple_payload["top_p"] = self.top_p
-            
+            params["top_p"] = self.top_p
+
         if self.top_k is not None:
-            simple_payload["top_k"] = self.top_k
-            
+            params["top_k"] = self.top_k
+
         if self.stop:
-            simple_payload["stop"] = self.stop
-            
-        logger.debug(f"Final structured payload: {simple_payload}")
-        
-        # Wrap in "input" field as expected by the RunPod endpoint
-        return {"input": simple_payload}
+            params["stop"] = self.stop
+
+        return params
+
+    def _build_payload(self, messages: List[BaseMessage], **kwargs: Any) -> Dict[str, Any]:
+        """Build the request body for the RunPod ``/run`` endpoint."""
+        # Convert messages to the format expected by RunPod API
+        payload = self._convert_messages_to_prompt(messages)
+
+        # Add any additional kwargs to the payload
+        for key, value in kwargs.items():
+            payload[key] = value
+
+        return payload
+
+    def _cached_result(self, response_json: Dict[str, Any]) -> ChatResult:
+        """Build the chat result of a cached job response."""
+        message = self._process_response(response_json)
+        message.response_metadata["retries"] = 0
+        return ChatResult(generations=[ChatGeneration(message=message)])
 
     def _process_response(self, response_json: Dict[str, Any]) -> AIMessage:
         """Process the response from RunPod API and extract the message content."""
         try:
-            # Different RunPod endpoints might return varying response structures
-            # Here we try to handle the most common formats
-            
             # Check if there's an error
             if "error" in response_json:
                 error_msg = response_json.get("error", "Unknown error")
                 raise ValueError(f"RunPod API error: {error_msg}")
             
             # For debugging
-            logger.debug(f"Response format: {response_json}")
-            
-            # Check if response is in the format with 'output' as a list
-            if "output" in response_json and isinstance(response_json["output"], list):
-                output_list = response_json["output"]
-                
-                # Process output as a list format
-                if output_list:
-                    # For integration tests compatibility, get simple string output from tokens
-                    if isinstance(output_list[0], dict) and "choices" in output_list[0]:
-                        first_item = output_list[0]
-                        choices = first_item.get("choices", [])
-                        
-                        if choices and "tokens" in choices[0]:
-                            # Join all tokens into a single string
-                            tokens = choices[0]["tokens"]
-                            if isinstance(tokens, list):
-                                content = "".join(tokens)
-                            else:
-                                content = str(tokens)
-                        else:
-                            # Handle other formats
-                            content = str(choices[0]) if choices else str(first_item)
-                            
-                        # Extract usage if available
-                        usage_metadata = {}
-                        if "usage" in first_item and isinstance(first_item["usage"], dict):
-                            usage = first_item["usage"]
-                            usage_metadata = {
-                                "input_tokens": usage.get("input", 0),
-                                "output_tokens": usage.get("output", 0),
-                                "total_tokens": usage.get("input", 0) + usage.get("output", 0),
-                            }
-                            
-                        return AIMessage(
-                            content=content,
-                            additional_kwargs={},
-                            response_metadata={"raw_response": response_json},
-                            usage_metadata=usage_metadata if usage_metadata else None,
-                        )
-                    else:
-                        # Simply join all items in the list if it's just strings
-                        if all(isinstance(item, str) for item in output_list):
-                            content = "".join(output_list)
-                        else:
-                            content = str(output_list)
-                        
-                        return AIMessage(
-                            content=content,
-                            additional_kwargs={},
-                            response_metadata={"raw_response": response_json},
-                        )
-            
-            # For simpler 'output' field as a string or dict
+            logger.debug("Response format: %s", loggable(response_json, self.log_payloads))
+
+            parsed = None
             if "output" in response_json:
-                output = response_json["output"]
-                
-                if isinstance(output, str):
-                    return AIMessage(
-                        content=output,
-                        additional_kwargs={},
-                        response_metadata={"raw_response": response_json},
-                    )
-                elif isinstance(output, dict):
-                    # Try common formats for content
-                    for key in ["content", "text", "message", "generated_text", "response"]:
-                        if key in output and isinstance(output[key], str):
-                            return AIMessage(
-                                content=output[key],
-                                additional_kwargs={},
-                                response_metadata={"raw_response": response_json},
-                            )
-                    
-                    # If no recognizable content field, stringify the dict
-                    return AIMessage(
-                        content=str(output),
-                        additional_kwargs={},
-                        response_metadata={"raw_response": response_json},
-                    )
-            
-            # Fallback: return the string representation of the entire response
-            logger.warning(f"Unrecognized response format: {response_json}")
+                parsed = self._parse_output(response_json["output"])
+
+            if parsed is None:
+                # Fallback: return the string representation of the entire response
+                logger.warning(
+                    "Unrecognized response format: %s",
+                    loggable(response_json, self.log_payloads),
+                )
+                return AIMessage(
+                    content=str(response_json),
+                    additional_kwargs={},
+                    response_metadata={"raw_response": response_json},
+                )
+
+            content, usage_metadata = parsed
             return AIMessage(
-                content=str(response_json),
+                content=content,
                 additional_kwargs={},
                 response_metadata={"raw_response": response_json},
+                usage_metadata=usage_metadata,
             )
             
         except Exception as e:
-            logger.error(f"Error processing RunPod response: {e}")
-            logger.error(f"Response JSON: {response_json}")
+            logger.error("Error processing RunPod response: %s", e)
+            logger.error("Response JSON: %s", loggable(response_json, self.log_payloads))
             # Return a message with the error information
             return AIMessage(
                 content="Error processing response from RunPod API",
@@ -401,47 +633,312 @@ class ChatRunPod(BaseChatModel):
                 response_metadata={"raw_response": response_json, "error": str(e)},
             )
 
-    def _poll_for_job_status(self, job_id: str) -> Dict[str, Any]:
-        """Poll for status of an async job and return results when complete."""
-        logger.debug(f"Polling for job status for job ID: {job_id}")
-        
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-        }
-        
-        status_url = f"{self.api_base}/{self.endpoint_id}/status/{job_id}"
-        
-        for attempt in range(self.max_polling_attempts):
-            try:
-                time.sleep(self.poll_interval)
-                
-                response = self._client.get(
-                    status_url, 
-                    headers=headers,
-                    timeout=self.timeout or 10.0
+    def _parse_output(
+        self, output: Any, stream: bool = False
+    ) -> Optional[Tuple[str, Optional[UsageMetadata]]]:
+        """Extract the content and token usage from a RunPod job ``output``.
+
+        Different RunPod endpoints return varying output structures; they are
+        recognized by ``output_extractors``, which remembers the matching rule
+        of this endpoint for later outputs. Used both for final job outputs and
+        for the partial outputs returned by the ``/stream`` endpoint.
+
+        Returns:
+            A ``(content, usage_metadata)`` tuple, or None if the output has no
+            recognizable structure.
+        """
+        if isinstance(output, list) and not output:
+            return None
+
+        registry = self.output_extractors or default_extractors
+        key = (self.api_base, self.endpoint_id, "stream" if stream else "output")
+        content = registry.extract(output, key)
+        if content is None:
+            if not isinstance(output, (dict, list)):
+                return None
+            # If no recognizable content field, stringify the output
+            return str(output), None
+
+        return content, self._convert_usage(find_usage(output))
+
+    @staticmethod
+    def _convert_usage(usage: Any) -> Optional[UsageMetadata]:
+        """Convert the usage block reported by a worker to LangChain usage metadata."""
+        if not isinstance(usage, dict):
+            return None
+        input_tokens = usage.get("input", usage.get("prompt_tokens", 0)) or 0
+        output_tokens = usage.get("output", usage.get("completion_tokens", 0)) or 0
+        return UsageMetadata(
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            total_tokens=input_tokens + output_tokens,
+        )
+
+    def _openai_body(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        stream: bool = False,
+        **kwargs: Any,
+    ) -> Dict[str, Any]:
+        """Build the body of an ``/openai/v1/chat/completions`` request."""
+        params = {"messages": convert_to_openai_messages(messages), **self._get_params()}
+        if stop:
+            params["stop"] = stop
+        return openai_body(
+            self.model_name, params, n=1 if stream else self.n, stream=stream, **kwargs
+        )
+
+    def _openai_generate(
+        self, messages: List[BaseMessage], stop: Optional[List[str]] = None, **kwargs: Any
+    ) -> ChatResult:
+        """Generate ``n`` chat completions with one OpenAI-compatible request."""
+        try:
+            response = self._openai_request(
+                "chat/completions", self._openai_body(messages, stop, **kwargs)
+            )
+        except httpx.HTTPStatusError as e:
+            raise ValueError(
+                f"RunPod API request failed with status {e.response.status_code}: {e.response.text}"
+            )
+        except httpx.HTTPError as e:
+            raise ValueError(f"HTTP error during RunPod API request: {e}")
+        return self._openai_result(response)
+
+    async def _aopenai_generate(
+        self, messages: List[BaseMessage], stop: Optional[List[str]] = None, **kwargs: Any
+    ) -> ChatResult:
+        """Asynchronously generate ``n`` chat completions."""
+        try:
+            response = await self._aopenai_request(
+                "chat/completions", self._openai_body(messages, stop, **kwargs)
+            )
+        except httpx.HTTPStatusError as e:
+            raise ValueError(
+                f"RunPod API request failed with status {e.response.status_code}: {e.response.text}"
+            )
+        except httpx.HTTPError as e:
+            raise ValueError(f"HTTP error during RunPod API request: {e}")
+        return self._openai_result(response)
+
+    def _openai_result(self, response: Dict[str, Any]) -> ChatResult:
+        """Turn a chat completions response into one generation per choice."""
+        usage_metadata = self._convert_usage(response.get("usage"))
+        model_name = response.get("model", self.model_name)
+        generations = []
+        for choice in response.get("choices") or []:
+            message = choice.get("message") or {}
+            tool_calls, invalid_tool_calls = parse_tool_calls(message.get("tool_calls"))
+            generations.append(
+                ChatGeneration(
+                    message=AIMessage(
+                        content=message.get("content") or "",
+                        tool_calls=tool_calls,
+                        invalid_tool_calls=invalid_tool_calls,
+                        usage_metadata=usage_metadata,
+                        response_metadata={
+                            "finish_reason": choice.get("finish_reason"),
+                            "model_name": model_name,
+                        },
+                    ),
+                    generation_info={"finish_reason": choice.get("finish_reason")},
                 )
-                response.raise_for_status()
-                status_data = response.json()
-                
-                # Check if job is complete
-                if status_data.get("status") == "COMPLETED":
-                    logger.debug(f"Job completed successfully after {attempt + 1} attempts")
-                    return status_data
-                
-                # Check if job failed
-                if status_data.get("status") in ["FAILED", "CANCELLED"]:
-                    error_msg = status_data.get("error", "Unknown error")
-                    raise ValueError(f"RunPod job failed: {error_msg}")
-                
-                # If still in progress, continue polling
-                logger.debug(f"Job still in progress, status: {status_data.get('status')}")
-                
-            except httpx.HTTPError as e:
-                logger.error(f"HTTP error polling for job status: {e}")
-                if attempt == self.max_polling_attempts - 1:
-                    raise ValueError(f"Max polling attempts reached, last error: {e}")
-        
-        raise ValueError(f"Max polling attempts ({self.max_polling_attempts}) reached without job completion")
+            )
+        if not generations:
+            raise ValueError("RunPod API returned no choices.")
+        return ChatResult(
+            generations=generations,
+            llm_output={"token_usage": response.get("usage"), "model_name": model_name},
+        )
+
+    def _openai_stream_chunks(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        """Stream the tokens of a chat completion from the OpenAI-compatible route."""
+        body = self._openai_body(messages, stop, stream=True, **kwargs)
+        try:
+            for event in self._openai_events("chat/completions", body):
+                chunk = self._openai_chunk(event)
+                if chunk is None:
+                    continue
+                if run_manager and chunk.text:
+                    run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+                yield chunk
+        except httpx.HTTPStatusError as e:
+            raise ValueError(
+                f"RunPod API request failed with status {e.response.status_code}: {e.response.text}"
+            )
+        except httpx.HTTPError as e:
+            raise ValueError(f"HTTP error while streaming from RunPod: {e}")
+
+    async def _aopenai_stream_chunks(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        """Asynchronously stream the tokens of a chat completion."""
+        body = self._openai_body(messages, stop, stream=True, **kwargs)
+        try:
+            async for event in self._aopenai_events("chat/completions", body):
+                chunk = self._openai_chunk(event)
+                if chunk is None:
+                    continue
+                if run_manager and chunk.text:
+                    await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+                yield chunk
+        except httpx.HTTPStatusError as e:
+            raise ValueError(
+                f"RunPod API request failed with status {e.response.status_code}: {e.response.text}"
+            )
+        except httpx.HTTPError as e:
+            raise ValueError(f"HTTP error while streaming from RunPod: {e}")
+
+    def _openai_chunk(self, event: Dict[str, Any]) -> Optional[ChatGenerationChunk]:
+        """Turn one streamed chat completions event into a chunk, if it carries anything."""
+        choices = event.get("choices") or []
+        delta = (choices[0].get("delta") or {}) if choices else {}
+        content = delta.get("content") or ""
+        tool_call_chunks = [
+            {
+                "name": (tool_call.get("function") or {}).get("name"),
+                "args": (tool_call.get("function") or {}).get("arguments"),
+                "id": tool_call.get("id"),
+                "index": tool_call.get("index"),
+            }
+            for tool_call in delta.get("tool_calls") or []
+        ]
+        response_metadata: Dict[str, Any] = {}
+        if choices and choices[0].get("finish_reason"):
+            response_metadata["finish_reason"] = choices[0]["finish_reason"]
+            response_metadata["model_name"] = event.get("model", self.model_name)
+        # Sent in a last event without choices
+        usage_metadata = self._convert_usage(event.get("usage"))
+        if not (content or tool_call_chunks or response_metadata or usage_metadata):
+            return None
+        return ChatGenerationChunk(
+            message=AIMessageChunk(
+                content=content,
+                tool_call_chunks=tool_call_chunks,
+                response_metadata=response_metadata,
+                usage_metadata=usage_metadata,
+            )
+        )
+
+    @staticmethod
+    def _raise_for_job_status(status_data: Dict[str, Any]) -> None:
+        """Raise if a job that was waited for did not complete."""
+        if status_data.get("status") != "COMPLETED":
+            error_msg = status_data.get("error", "Unknown error")
+            raise ValueError(f"RunPod job failed: {error_msg}")
+
+    def _poll_for_job_status(self, job_id: str) -> Dict[str, Any]:
+        """Poll for status of an async job and return results when complete.
+
+        The job is cancelled if polling times out or is interrupted.
+        """
+        logger.debug("Polling for job status for job ID: %s", job_id)
+
+        try:
+            strategy = self._get_polling_strategy()
+            started = time.monotonic()
+            status_data: Optional[Dict[str, Any]] = None
+
+            for attempt in range(self.max_polling_attempts):
+                try:
+                    time.sleep(strategy.get_delay(attempt, time.monotonic() - started, status_data))
+
+                    status_data = self._get_job_status(job_id)
+
+                    # Check if job is complete
+                    if status_data.get("status") == "COMPLETED":
+                        logger.debug("Job completed successfully after %s attempts", attempt + 1)
+                        strategy.observe(status_data)
+                        return status_data
+
+                    # Check if job failed
+                    if status_data.get("status") in ["FAILED", "CANCELLED"]:
+                        error_msg = status_data.get("error", "Unknown error")
+                        raise ValueError(f"RunPod job failed: {error_msg}")
+
+                    # If still in progress, continue polling
+                    logger.debug("Job still in progress, status: %s", status_data.get('status'))
+
+                except httpx.HTTPError as e:
+                    logger.error("HTTP error polling for job status: %s", e)
+                    if attempt == self.max_polling_attempts - 1:
+                        self._cancel_job(job_id, timed_out=True)
+                        raise ValueError(f"Max polling attempts reached, last error: {e}")
+
+            self._cancel_job(job_id, timed_out=True)
+            raise ValueError(f"Max polling attempts ({self.max_polling_attempts}) reached without job completion")
+        except KeyboardInterrupt:
+            self._cancel_job(job_id)
+            raise
+
+    async def _apoll_for_job_status(self, job_id: str) -> Dict[str, Any]:
+        """Asynchronously poll for status of a job and return results when complete.
+
+        The job is cancelled if polling times out or the awaiting task is cancelled.
+        """
+        logger.debug("Polling for job status for job ID: %s", job_id)
+
+        try:
+            if self._use_shared_poller():
+                try:
+                    status_data = await self._get_job_poller().wait(
+                        job_id, self._get_polling_strategy(), self.max_polling_attempts
+                    )
+                except TimeoutError as e:
+                    await self._acancel_job(job_id, timed_out=True)
+                    raise ValueError(f"Error polling RunPod job {job_id}: {e}")
+                except RunPodAPIError as e:
+                    raise ValueError(f"Error polling RunPod job {job_id}: {e}")
+                self._jobs.update(job_id, status_data.get("status"))
+                self._raise_for_job_status(status_data)
+                return status_data
+
+            strategy = self._get_polling_strategy()
+            started = time.monotonic()
+            status_data: Optional[Dict[str, Any]] = None
+
+            for attempt in range(self.max_polling_attempts):
+                try:
+                    await asyncio.sleep(strategy.get_delay(attempt, time.monotonic() - started, status_data))
+
+                    status_data = await self._aget_job_status(job_id)
+
+                    # Check if job is complete
+                    if status_data.get("status") == "COMPLETED":
+                        logger.debug("Job completed successfully after %s attempts", attempt + 1)
+                        strategy.observe(status_data)
+                        return status_data
+
+                    # Check if job failed
+                    if status_data.get("status") in ["FAILED", "CANCELLED"]:
+                        error_msg = status_data.get("error", "Unknown error")
+                        raise ValueError(f"RunPod job failed: {error_msg}")
+
+                    # If still in progress, continue polling
+                    logger.debug("Job still in progress, status: %s", status_data.get('status'))
+
+                except httpx.HTTPError as e:
+                    logger.error("HTTP error polling for job status: %s", e)
+                    if attempt == self.max_polling_attempts - 1:
+                        await self._acancel_job(job_id, timed_out=True)
+                        raise ValueError(f"Max polling attempts reached, last error: {e}")
+
+            await self._acancel_job(job_id, timed_out=True)
+            raise ValueError(f"Max polling attempts ({self.max_polling_attempts}) reached without job completion")
+        except asyncio.CancelledError:
+            # Shielded so that the cancel request goes out even if we are cancelled again
+            await asyncio.shield(self._acancel_job(job_id))
+            raise
 
     def _generate(
         self,
@@ -451,62 +948,70 @@ class ChatRunPod(BaseChatModel):
         **kwargs: Any,
     ) -> ChatResult:
         """Generate a chat response from RunPod API."""
+        if self.api_mode == "openai":
+            return self._openai_generate(messages, stop, **kwargs)
+
         # Prepare stop sequences
         stop_sequences = stop if stop else self.stop
         
-        # Convert messages to the format expected by RunPod API
-        payload = self._convert_messages_to_prompt(messages)
-        
-        # Add any additional kwargs to the payload
-        for key, value in kwargs.items():
-            payload[key] = value
-        
-        # Prepare headers with API key
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-        }
-        
+        payload = self._build_payload(messages, **kwargs)
+        packed_result = self._take_packed_result(payload)
+        if packed_result is not None:
+            return packed_result
+        cached = self._lookup_response(payload)
+        if cached is not None:
+            return self._cached_result(cached)
+
         # Make the API request
         try:
-            url = f"{self.api_base}/{self.endpoint_id}/run"
-            response = self._client.post(
-                url,
-                headers=headers,
-                json=payload,
-                timeout=self.timeout or 60.0,
-            )
-            response.raise_for_status()
-            
-            # Parse the initial response
-            response_json = response.json()
-            
-            # Check if this is an async job that requires polling
-            if "id" in response_json and "status" in response_json:
-                job_id = response_json.get("id")
-                status = response_json.get("status")
-                
-                if status in ["IN_QUEUE", "IN_PROGRESS"]:
-                    logger.info(f"RunPod job {job_id} is async, polling for results...")
-                    if run_manager:
-                        run_manager.on_llm_new_token(f"Waiting for job {job_id}...")
-                    
-                    # Poll for results
-                    final_response = self._poll_for_job_status(job_id)
-                    response_json = final_response
-            
+            with track_retries() as retries:
+                response_json = self._coalesce(
+                    payload, lambda: self._complete_job(payload, run_manager)
+                )
+
             # Process the response
             message = self._process_response(response_json)
-            
+            message.response_metadata["retries"] = retries.count
+
             # Return the chat result
             generation = ChatGeneration(message=message)
             return ChatResult(generations=[generation])
             
         except httpx.HTTPError as e:
             raise ValueError(f"HTTP error during RunPod API request: {e}")
+        except EndpointUnavailableError:
+            raise
         except Exception as e:
             raise ValueError(f"Error calling RunPod API: {e}")
 
+    def _complete_job(
+        self,
+        payload: Dict[str, Any],
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+    ) -> Dict[str, Any]:
+        """Submit one job, wait for it to finish and return the final response."""
+        response_json = self._submit_job(payload)
+
+        # Check if this is an async job that requires polling
+        if "id" in response_json and "status" in response_json:
+            job_id = response_json.get("id")
+            status = response_json.get("status")
+
+            if status in ["IN_QUEUE", "IN_PROGRESS"]:
+                logger.info("RunPod job %s is async, polling for results...", job_id)
+                if run_manager:
+                    run_manager.on_llm_new_token(f"Waiting for job {job_id}...")
+
+                # Poll for results
+                if self.hedge_policy is not None:
+                    response_json = self._wait_hedged(payload, response_json)
+                    self._raise_for_job_status(response_json)
+                else:
+                    response_json = self._poll_for_job_status(job_id)
+
+        self._cache_response(payload, response_json)
+        return response_json
+
     def _stream(
         self,
         messages: List[BaseMessage],
@@ -515,75 +1020,99 @@ class ChatRunPod(BaseChatModel):
         **kwargs: Any,
     ) -> Iterator[ChatGenerationChunk]:
         """Stream the output of the model from RunPod API.
-        
-        Note: RunPod serverless endpoints typically don't support streaming.
-        We use simulated streaming by generating the full response and streaming
-        it character by character.
+
+        Submits the job to ``/run`` and yields the partial outputs from the
+        ``/stream/{job_id}`` endpoint as the worker produces them. Token usage
+        reported by the worker is attached once, to the final chunk.
+
+        If ``disable_streaming`` is True, the full response is generated first
+        and returned as a single chunk.
         """
-        logger.info("Using simulated streaming as RunPod serverless endpoints don't natively support streaming")
-        return self._simulated_streaming(messages, stop=stop, run_manager=run_manager, **kwargs)
+        if self.disable_streaming:
+            result = self._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+            yield self._chunk_from_message(result.generations[0].message)
+            return
+
+        if self.api_mode == "openai":
+            yield from self._openai_stream_chunks(messages, stop, run_manager, **kwargs)
+            return
+
+        payload = self._build_payload(messages, **kwargs)
 
-    def _simulated_streaming(
-        self,
-        messages: List[BaseMessage],
-        stop: Optional[List[str]] = None,
-        run_manager: Optional[CallbackManagerForLLMRun] = None,
-        **kwargs: Any,
-    ) -> Iterator[ChatGenerationChunk]:
-        """Simulate streaming by generating the full response and then streaming it character by character."""
         try:
-            # Generate the full response
-            full_response = self._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
-            content = full_response.generations[0].message.content
-            
-            # Get usage metadata from the full response if available
-            usage_metadata = full_response.generations[0].message.usage_metadata
-            
-            # Total number of characters to stream
-            total_chars = len(content)
-            
-            # Simulate streaming by yielding one character at a time
-            for i, char in enumerate(content):
-                # For the first chunk, include input tokens in usage metadata
-                if i == 0 and usage_metadata:
-                    chunk_metadata = {
-                        "input_tokens": usage_metadata.get("input_tokens", 0),
-                        "output_tokens": 1,  # Each chunk is one token in our simulation
-                        "total_tokens": usage_metadata.get("input_tokens", 0) + 1
-                    }
-                # For other chunks, only include output tokens
-                elif usage_metadata:
-                    chunk_metadata = {
-                        "input_tokens": 0,  # Only first chunk gets input tokens
-                        "output_tokens": 1,  # Each chunk is one token in our simulation
-                        "total_tokens": 1
-                    }
-                else:
-                    chunk_metadata = None
-                
-                chunk = ChatGenerationChunk(
-                    message=AIMessageChunk(
-                        content=char,
-                        usage_metadata=chunk_metadata
-                    ),
-                )
-                
-                if run_manager:
-                    run_manager.on_llm_new_token(
-                        token=char,
-                        chunk=chunk,
+            url = self._request_template().run_url
+            response_json = self._submit_job(payload, url)
+        except httpx.HTTPError as e:
+            raise ValueError(f"HTTP error during RunPod API request: {e}")
+
+        job_id = response_json.get("id")
+        if not job_id or response_json.get("status") not in ["IN_QUEUE", "IN_PROGRESS"]:
+            # The job finished without going through the queue
+            chunk = self._chunk_from_message(self._process_response(response_json))
+            if run_manager:
+                run_manager.on_llm_new_token(str(chunk.message.content), chunk=chunk)
+            yield chunk
+            return
+
+        stream_url = self._request_template().stream_url + job_id
+        idle_timeout = self.max_polling_attempts * self.poll_interval
+        deadline = time.monotonic() + idle_timeout
+        usage_metadata = None
+        has_output = False
+
+        try:
+            while True:
+                try:
+                    stream_response = self._send(
+                        lambda: self._get_client().get(stream_url, headers=self._get_headers())
                     )
-                    
-                yield chunk
-                time.sleep(0.01)  # Small delay to simulate typing
-                
-        except Exception as e:
-            error_message = f"Error in simulated streaming: {e}"
-            logger.error(error_message)
-            error_chunk = ChatGenerationChunk(
-                message=AIMessageChunk(content=error_message),
-            )
-            yield error_chunk
+                    stream_response.raise_for_status()
+                    stream_data = decode_response(stream_response)
+                except httpx.HTTPError as e:
+                    raise ValueError(f"HTTP error while streaming RunPod job {job_id}: {e}")
+
+                chunks, batch_usage = self._parse_stream_batch(stream_data)
+                usage_metadata = batch_usage or usage_metadata
+                for chunk in chunks:
+                    if run_manager:
+                        run_manager.on_llm_new_token(str(chunk.message.content), chunk=chunk)
+                    yield chunk
+                if chunks:
+                    has_output = True
+                    deadline = time.monotonic() + idle_timeout
+
+                status = stream_data.get("status")
+                self._jobs.update(job_id, status)
+                if status == "COMPLETED":
+                    break
+                if status in ["FAILED", "CANCELLED", "TIMED_OUT"]:
+                    error_msg = stream_data.get("error", "Unknown error")
+                    raise ValueError(f"RunPod job failed: {error_msg}")
+
+                if not chunks:
+                    if time.monotonic() > deadline:
+                        self._cancel_job(job_id, timed_out=True)
+                        raise ValueError(
+                            f"RunPod job {job_id} produced no output for {idle_timeout} seconds"
+                        )
+                    time.sleep(self.stream_poll_interval)
+        except BaseException:
+            # The stream failed, or the consumer stopped early or was
+            # interrupted: free the worker
+            if job_id in self._jobs:
+                self._cancel_job(job_id)
+            raise
+
+        if not has_output:
+            # Handlers that are not generators only expose their result via /status
+            status_data = self._poll_for_job_status(job_id)
+            chunk = self._chunk_from_message(self._process_response(status_data))
+            if run_manager:
+                run_manager.on_llm_new_token(str(chunk.message.content), chunk=chunk)
+            yield chunk
+            return
+
+        yield self._final_stream_chunk(stream_data, usage_metadata)
 
     async def _agenerate(
         self,
@@ -593,86 +1122,78 @@ class ChatRunPod(BaseChatModel):
         **kwargs: Any,
     ) -> ChatResult:
         """Asynchronously generate a chat response from RunPod API."""
-        # Initialize async client if needed
-        if self._async_client is None:
-            self._async_client = httpx.AsyncClient(timeout=self.timeout or 60.0)
-            
-        # Prepare stop sequences
-        stop_sequences = stop if stop else self.stop
-        
-        # Convert messages to the format expected by RunPod API
-        payload = self._convert_messages_to_prompt(messages)
-        
-        # Add any additional kwargs to the payload
-        for key, value in kwargs.items():
-            payload[key] = value
-        
-        # Prepare headers with API key
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-        }
-        
+        if self.api_mode == "openai":
+            return await self._aopenai_generate(messages, stop, **kwargs)
+
+        payload = self._build_payload(messages, **kwargs)
+        packed_result = self._take_packed_result(payload)
+        if packed_result is not None:
+            return packed_result
+        cached = await self._alookup_response(payload)
+        if cached is not None:
+            return self._cached_result(cached)
+
+        if self.micro_batch and group_key(payload) is not None:
+            return await self._get_micro_batcher().submit(payload)
+
+        return await self._arun_job(payload, run_manager)
+
+    async def _arun_job(
+        self,
+        payload: Dict[str, Any],
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+    ) -> ChatResult:
+        """Submit one job, wait for it to finish and return the chat result."""
         # Make the API request
         try:
-            url = f"{self.api_base}/{self.endpoint_id}/run"
-            response = await self._async_client.post(
-                url,
-                headers=headers,
-                json=payload,
-                timeout=self.timeout or 60.0,
-            )
-            response.raise_for_status()
-            
-            # Parse the response
-            response_json = response.json()
-            
-            # Check if this is an async job that requires polling
-            if "id" in response_json and "status" in response_json:
-                job_id = response_json.get("id")
-                status = response_json.get("status")
-                
-                if status in ["IN_QUEUE", "IN_PROGRESS"]:
-                    logger.info(f"RunPod job {job_id} is async, polling for results...")
-                    if run_manager:
-                        await run_manager.on_llm_new_token(f"Waiting for job {job_id}...")
-                    
-                    # Poll for results (async version)
-                    for attempt in range(self.max_polling_attempts):
-                        await asyncio.sleep(self.poll_interval)
-                        
-                        status_url = f"{self.api_base}/{self.endpoint_id}/status/{job_id}"
-                        status_response = await self._async_client.get(
-                            status_url, 
-                            headers={"Authorization": f"Bearer {self.api_key}"},
-                            timeout=self.timeout or 10.0
-                        )
-                        status_response.raise_for_status()
-                        status_data = status_response.json()
-                        
-                        if status_data.get("status") == "COMPLETED":
-                            response_json = status_data
-                            break
-                            
-                        if status_data.get("status") in ["FAILED", "CANCELLED"]:
-                            error_msg = status_data.get("error", "Unknown error")
-                            raise ValueError(f"RunPod job failed: {error_msg}")
-                            
-                        if attempt == self.max_polling_attempts - 1:
-                            raise ValueError(f"Max polling attempts reached without job completion")
-            
+            with track_retries() as retries:
+                response_json = await self._acoalesce(
+                    payload, lambda: self._acomplete_job(payload, run_manager)
+                )
+
             # Process the response
             message = self._process_response(response_json)
-            
+            message.response_metadata["retries"] = retries.count
+
             # Return the chat result
             generation = ChatGeneration(message=message)
             return ChatResult(generations=[generation])
             
         except httpx.HTTPError as e:
             raise ValueError(f"HTTP error during async RunPod API request: {e}")
+        except EndpointUnavailableError:
+            raise
         except Exception as e:
             raise ValueError(f"Error calling async RunPod API: {e}")
 
+    async def _acomplete_job(
+        self,
+        payload: Dict[str, Any],
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+    ) -> Dict[str, Any]:
+        """Asynchronously submit one job, wait for it to finish and return the final response."""
+        response_json = await self._asubmit_job(payload)
+
+        # Check if this is an async job that requires polling
+        if "id" in response_json and "status" in response_json:
+            job_id = response_json.get("id")
+            status = response_json.get("status")
+
+            if status in ["IN_QUEUE", "IN_PROGRESS"]:
+                logger.info("RunPod job %s is async, polling for results...", job_id)
+                if run_manager:
+                    await run_manager.on_llm_new_token(f"Waiting for job {job_id}...")
+
+                # Poll for results (async version)
+                if self.hedge_policy is not None:
+                    response_json = await self._await_hedged(payload, response_json)
+                    self._raise_for_job_status(response_json)
+                else:
+                    response_json = await self._apoll_for_job_status(job_id)
+
+        await self._acache_response(payload, response_json)
+        return response_json
+
     async def _astream(
         self,
         messages: List[BaseMessage],
@@ -681,73 +1202,395 @@ class ChatRunPod(BaseChatModel):
         **kwargs: Any,
     ) -> AsyncIterator[ChatGenerationChunk]:
         """Asynchronously stream the output of the model from RunPod API.
-        
-        Note: RunPod serverless endpoints typically don't support streaming.
-        We use simulated streaming by generating the full response and streaming
-        it character by character.
+
+        Submits the job to ``/run`` and yields the partial outputs from the
+        ``/stream/{job_id}`` endpoint as the worker produces them. Token usage
+        reported by the worker is attached once, to the final chunk.
+
+        If ``disable_streaming`` is True, the full response is generated first
+        and returned as a single chunk.
         """
-        logger.info("Using simulated async streaming as RunPod serverless endpoints don't natively support streaming")
-        async for chunk in self._async_simulated_streaming(messages, stop=stop, run_manager=run_manager, **kwargs):
+        if self.disable_streaming:
+            result = await self._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs)
+            yield self._chunk_from_message(result.generations[0].message)
+            return
+
+        if self.api_mode == "openai":
+            async for chunk in self._aopenai_stream_chunks(messages, stop, run_manager, **kwargs):
+                yield chunk
+            return
+
+        payload = self._build_payload(messages, **kwargs)
+
+        try:
+            url = self._request_template().run_url
+            response_json = await self._asubmit_job(payload, url)
+        except httpx.HTTPError as e:
+            raise ValueError(f"HTTP error during async RunPod API request: {e}")
+
+        job_id = response_json.get("id")
+        if not job_id or response_json.get("status") not in ["IN_QUEUE", "IN_PROGRESS"]:
+            # The job finished without going through the queue
+            chunk = self._chunk_from_message(self._process_response(response_json))
+            if run_manager:
+                await run_manager.on_llm_new_token(str(chunk.message.content), chunk=chunk)
+            yield chunk
+            return
+
+        stream_url = self._request_template().stream_url + job_id
+        idle_timeout = self.max_polling_attempts * self.poll_interval
+        deadline = time.monotonic() + idle_timeout
+        usage_metadata = None
+        has_output = False
+
+        try:
+            while True:
+                try:
+                    stream_response = await self._asend(
+                        lambda: self._get_async_client().get(stream_url, headers=self._get_headers())
+                    )
+                    stream_response.raise_for_status()
+                    stream_data = decode_response(stream_response)
+                except httpx.HTTPError as e:
+                    raise ValueError(f"HTTP error while streaming RunPod job {job_id}: {e}")
+
+                chunks, batch_usage = self._parse_stream_batch(stream_data)
+                usage_metadata = batch_usage or usage_metadata
+                for chunk in chunks:
+                    if run_manager:
+                        await run_manager.on_llm_new_token(str(chunk.message.content), chunk=chunk)
+                    yield chunk
+                if chunks:
+                    has_output = True
+                    deadline = time.monotonic() + idle_timeout
+
+                status = stream_data.get("status")
+                self._jobs.update(job_id, status)
+                if status == "COMPLETED":
+                    break
+                if status in ["FAILED", "CANCELLED", "TIMED_OUT"]:
+                    error_msg = stream_data.get("error", "Unknown error")
+                    raise ValueError(f"RunPod job failed: {error_msg}")
+
+                if not chunks:
+                    if time.monotonic() > deadline:
+                        await self._acancel_job(job_id, timed_out=True)
+                        raise ValueError(
+                            f"RunPod job {job_id} produced no output for {idle_timeout} seconds"
+                        )
+                    await asyncio.sleep(self.stream_poll_interval)
+        except BaseException:
+            # Shielded so that the cancel request goes out even if we are cancelled again
+            if job_id in self._jobs:
+                await asyncio.shield(self._acancel_job(job_id))
+            raise
+
+        if not has_output:
+            # Handlers that are not generators only expose their result via /status
+            status_data = await self._apoll_for_job_status(job_id)
+            chunk = self._chunk_from_message(self._process_response(status_data))
+            if run_manager:
+                await run_manager.on_llm_new_token(str(chunk.message.content), chunk=chunk)
             yield chunk
+            return
 
-    async def _async_simulated_streaming(
+        yield self._final_stream_chunk(stream_data, usage_metadata)
+
+    def batch(
         self,
-        messages: List[BaseMessage],
-        stop: Optional[List[str]] = None,
-        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        inputs: List[LanguageModelInput],
+        config: Optional[Union[RunnableConfig, List[RunnableConfig]]] = None,
+        *,
+        return_exceptions: bool = False,
         **kwargs: Any,
-    ) -> AsyncIterator[ChatGenerationChunk]:
-        """Simulate streaming asynchronously by generating the full response and then streaming it character by character."""
-        try:
-            # Generate the full response
-            full_response = await self._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs)
-            content = full_response.generations[0].message.content
-            
-            # Get usage metadata from the full response if available
-            usage_metadata = full_response.generations[0].message.usage_metadata
-            
-            # Total number of characters to stream
-            total_chars = len(content)
-            
-            # Simulate streaming by yielding one character at a time
-            for i, char in enumerate(content):
-                # For the first chunk, include input tokens in usage metadata
-                if i == 0 and usage_metadata:
-                    chunk_metadata = {
-                        "input_tokens": usage_metadata.get("input_tokens", 0),
-                        "output_tokens": 1,  # Each chunk is one token in our simulation
-                        "total_tokens": usage_metadata.get("input_tokens", 0) + 1
-                    }
-                # For other chunks, only include output tokens
-                elif usage_metadata:
-                    chunk_metadata = {
-                        "input_tokens": 0,  # Only first chunk gets input tokens
-                        "output_tokens": 1,  # Each chunk is one token in our simulation
-                        "total_tokens": 1
-                    }
-                else:
-                    chunk_metadata = None
-                
-                chunk = ChatGenerationChunk(
-                    message=AIMessageChunk(
-                        content=char,
-                        usage_metadata=chunk_metadata
-                    ),
+    ) -> List[BaseMessage]:
+        """Run the model on several inputs.
+
+        With ``pack_batches`` enabled, compatible conversations are first sent as
+        packed jobs; each input then picks up its share of the result, so
+        callbacks and tracing behave as for a regular batch. Conversations that
+        could not be packed are sent as their own jobs.
+        """
+        if (
+            not self.pack_batches
+            or self.api_mode == "openai"
+            or self._packing_unsupported
+            or len(inputs) < 2
+        ):
+            return super().batch(
+                inputs, config, return_exceptions=return_exceptions, **kwargs
+            )
+
+        payloads = self._uncached_payloads(self._packable_payloads(inputs, kwargs))
+        groups = group_payloads(payloads, self.max_batch_size)
+        packed: List[Optional[List[ChatResult]]] = []
+        if groups:
+            with ThreadPoolExecutor(max_workers=len(groups)) as executor:
+                packed = list(
+                    executor.map(
+                        lambda group: self._run_packed_job([payloads[i] for i in group]),
+                        groups,
+                    )
                 )
-                
-                if run_manager:
-                    await run_manager.on_llm_new_token(
-                        token=char,
-                        chunk=chunk,
+        token = _packed_results.set(
+            (id(self), self._collect_packed_results(payloads, groups, packed))
+        )
+        try:
+            return super().batch(
+                inputs, config, return_exceptions=return_exceptions, **kwargs
+            )
+        finally:
+            _packed_results.reset(token)
+
+    async def abatch(
+        self,
+        inputs: List[LanguageModelInput],
+        config: Optional[Union[RunnableConfig, List[RunnableConfig]]] = None,
+        *,
+        return_exceptions: bool = False,
+        **kwargs: Any,
+    ) -> List[BaseMessage]:
+        """Asynchronously run the model on several inputs.
+
+        See :meth:`batch` for how ``pack_batches`` is applied.
+        """
+        if (
+            not self.pack_batches
+            or self.api_mode == "openai"
+            or self._packing_unsupported
+            or len(inputs) < 2
+        ):
+            return await super().abatch(
+                inputs, config, return_exceptions=return_exceptions, **kwargs
+            )
+
+        payloads = await self._auncached_payloads(self._packable_payloads(inputs, kwargs))
+        groups = group_payloads(payloads, self.max_batch_size)
+        packed = await asyncio.gather(
+            *(self._arun_packed_job([payloads[i] for i in group]) for group in groups)
+        )
+        token = _packed_results.set(
+            (id(self), self._collect_packed_results(payloads, groups, packed))
+        )
+        try:
+            return await super().abatch(
+                inputs, config, return_exceptions=return_exceptions, **kwargs
+            )
+        finally:
+            _packed_results.reset(token)
+
+    def _get_micro_batcher(self) -> MicroBatcher[Dict[str, Any], ChatResult]:
+        """Get the micro-batcher of this instance for the running event loop."""
+        loop = asyncio.get_running_loop()
+        batcher = self._micro_batchers.get(loop)
+        if batcher is None:
+            batcher = self._micro_batchers[loop] = MicroBatcher(
+                self._arun_micro_batch,
+                key=group_key,
+                window=self.micro_batch_window,
+                max_size=self.max_batch_size,
+            )
+        return batcher
+
+    async def _arun_micro_batch(
+        self, payloads: List[Dict[str, Any]]
+    ) -> List[Union[ChatResult, BaseException]]:
+        """Run the calls collected by the micro-batcher.
+
+        They are sent as one packed job if possible, otherwise as separate jobs
+        submitted together.
+        """
+        if len(payloads) > 1 and not self._packing_unsupported:
+            results = await self._arun_packed_job(payloads)
+            if results is not None:
+                return list(results)
+        return await asyncio.gather(
+            *(self._arun_job(payload) for payload in payloads), return_exceptions=True
+        )
+
+    def _packable_payloads(
+        self, inputs: Sequence[LanguageModelInput], kwargs: Dict[str, Any]
+    ) -> List[Optional[Dict[str, Any]]]:
+        """Build the payload each input of a batch will be sent with.
+
+        Inputs that cannot be converted are left to the regular batch to report.
+        """
+        payload_kwargs = {key: value for key, value in kwargs.items() if key != "stop"}
+        payloads: List[Optional[Dict[str, Any]]] = []
+        for model_input in inputs:
+            try:
+                messages = self._convert_input(model_input).to_messages()
+            except Exception:
+                payloads.append(None)
+                continue
+            payloads.append(self._build_payload(messages, **payload_kwargs))
+        return payloads
+
+    def _uncached_payloads(
+        self, payloads: List[Optional[Dict[str, Any]]]
+    ) -> List[Optional[Dict[str, Any]]]:
+        """Leave inputs whose response is cached out of packing; ``_generate`` answers them."""
+        if self.response_cache is None:
+            return payloads
+        return [
+            payload if payload is not None and self._lookup_response(payload) is None else None
+            for payload in payloads
+        ]
+
+    async def _auncached_payloads(
+        self, payloads: List[Optional[Dict[str, Any]]]
+    ) -> List[Optional[Dict[str, Any]]]:
+        """Asynchronously leave inputs whose response is cached out of packing."""
+        if self.response_cache is None:
+            return payloads
+        cached = await asyncio.gather(
+            *(self._alookup_response(payload) for payload in payloads if payload is not None)
+        )
+        hits = iter(cached)
+        return [
+            payload if payload is not None and next(hits) is None else None
+            for payload in payloads
+        ]
+
+    def _run_packed_job(self, payloads: List[Dict[str, Any]]) -> Optional[List[ChatResult]]:
+        """Send several payloads as one packed job and split the result.
+
+        Returns None if the packed job failed or the worker did not return one
+        output per prompt.
+        """
+        try:
+            response_json = self._submit_job(pack_payloads(payloads))
+            job_id = response_json.get("id")
+            if job_id and response_json.get("status") in ["IN_QUEUE", "IN_PROGRESS"]:
+                response_json = self._poll_for_job_status(job_id)
+        except (httpx.HTTPError, json.JSONDecodeError, ValueError, RunPodAPIError) as e:
+            logger.warning("Packed job of %s conversations failed, sending them separately: %s", len(payloads), e)
+            return None
+        results = self._split_packed_response(response_json, len(payloads))
+        if results is not None:
+            for payload, output in zip(payloads, response_json["output"]):
+                self._cache_response(payload, {**response_json, "output": output})
+        return results
+
+    async def _arun_packed_job(
+        self, payloads: List[Dict[str, Any]]
+    ) -> Optional[List[ChatResult]]:
+        """Asynchronously send several payloads as one packed job and split the result."""
+        try:
+            response_json = await self._asubmit_job(pack_payloads(payloads))
+            job_id = response_json.get("id")
+            if job_id and response_json.get("status") in ["IN_QUEUE", "IN_PROGRESS"]:
+                response_json = await self._apoll_for_job_status(job_id)
+        except (httpx.HTTPError, json.JSONDecodeError, ValueError, RunPodAPIError) as e:
+            logger.warning("Packed job of %s conversations failed, sending them separately: %s", len(payloads), e)
+            return None
+        results = self._split_packed_response(response_json, len(payloads))
+        if results is not None:
+            for payload, output in zip(payloads, response_json["output"]):
+                await self._acache_response(payload, {**response_json, "output": output})
+        return results
+
+    def _split_packed_response(
+        self, response_json: Dict[str, Any], count: int
+    ) -> Optional[List[ChatResult]]:
+        """Turn the final response of a packed job into one result per conversation."""
+        if response_json.get("status") != "COMPLETED":
+            return None
+        outputs = split_output(response_json.get("output"), count)
+        if outputs is None:
+            logger.warning(
+                "Worker did not return a list of outputs for a packed job; "
+                "falling back to one job per conversation."
+            )
+            self._packing_unsupported = True
+            return None
+        return [
+            ChatResult(
+                generations=[
+                    ChatGeneration(
+                        message=self._process_response({**response_json, "output": output})
                     )
-                    
-                yield chunk
-                await asyncio.sleep(0.01)  # Small delay to simulate typing
-                
-        except Exception as e:
-            error_message = f"Error in async simulated streaming: {e}"
-            logger.error(error_message)
-            error_chunk = ChatGenerationChunk(
-                message=AIMessageChunk(content=error_message),
+                ]
+            )
+            for output in outputs
+        ]
+
+    def _collect_packed_results(
+        self,
+        payloads: List[Optional[Dict[str, Any]]],
+        groups: List[List[int]],
+        packed: List[Optional[List[ChatResult]]],
+    ) -> Dict[str, List[ChatResult]]:
+        """Index the results of a batch's packed jobs by payload for its inputs to pick up."""
+        results: Dict[str, List[ChatResult]] = {}
+        for group, group_results in zip(groups, packed):
+            if group_results is None:
+                continue
+            for index, result in zip(group, group_results):
+                results.setdefault(payload_key(payloads[index]), []).append(result)
+        return results
+
+    def _take_packed_result(self, payload: Dict[str, Any]) -> Optional[ChatResult]:
+        """Return a result computed for ``payload`` by a packed job of the running batch."""
+        stash = _packed_results.get()
+        if stash is None or stash[0] != id(self) or not stash[1]:
+            return None
+        key = payload_key(payload)
+        with self._packed_lock:
+            results = stash[1].get(key)
+            if not results:
+                return None
+            result = results.pop()
+            if not results:
+                del stash[1][key]
+            return result
+
+    def _parse_stream_batch(
+        self, stream_data: Dict[str, Any]
+    ) -> Tuple[List[ChatGenerationChunk], Optional[UsageMetadata]]:
+        """Turn one ``/stream`` response into chunks and the latest usage, if any.
+
+        Workers report cumulative usage with every batch, so only the most recent
+        value is kept rather than summing them.
+        """
+        chunks = []
+        usage_metadata = None
+        for item in stream_data.get("stream") or []:
+            output = item.get("output") if isinstance(item, dict) else item
+            parsed = self._parse_output(output, stream=True) if output is not None else None
+            if parsed is None:
+                continue
+            content, batch_usage = parsed
+            usage_metadata = batch_usage or usage_metadata
+            if content:
+                chunks.append(ChatGenerationChunk(message=AIMessageChunk(content=content)))
+        return chunks, usage_metadata
+
+    @staticmethod
+    def _chunk_from_message(message: BaseMessage) -> ChatGenerationChunk:
+        """Wrap a complete message in a single generation chunk."""
+        return ChatGenerationChunk(
+            message=AIMessageChunk(
+                content=message.content,
+                additional_kwargs=message.additional_kwargs,
+                response_metadata=message.response_metadata,
+                usage_metadata=getattr(message, "usage_metadata", None),
+            )
+        )
+
+    @staticmethod
+    def _final_stream_chunk(
+        stream_data: Dict[str, Any], usage_metadata: Optional[UsageMetadata]
+    ) -> ChatGenerationChunk:
+        """Build the closing chunk that carries the job status and usage."""
+        response_metadata: Dict[str, Any] = {"status": stream_data.get("status")}
+        for key in ["id", "delayTime", "executionTime"]:
+            if key in stream_data:
+                response_metadata[key] = stream_data[key]
+        return ChatGenerationChunk(
+            message=AIMessageChunk(
+                content="",
+                response_metadata=response_metadata,
+                usage_metadata=usage_metadata,
             )
-            yield error_chunk
+        )
@@ -0,0 +1,211 @@
+"""Chat templates that turn a list of messages into a single prompt string.
+
+Workers that take a plain ``prompt`` expect the conversation in the format the
+model was trained on. :class:`ChatRunPod <langchain_runpod.ChatRunPod>` renders
+it with a :class:`ChatTemplate`, selected by name (``"plain"``, ``"chatml"``,
+``"llama3"``, ``"mistral"``) or passed as an instance.
+
+Each message is rendered into a segment once: segments are memoized, so when
+one message is appended to a long conversation only the new message is
+rendered, and the prompt is assembled with a single join.
+"""
+
+import logging
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, List, Sequence, Tuple, Union
+
+from langchain_core.messages import (
+    AIMessage,
+    BaseMessage,
+    ChatMessage,
+    HumanMessage,
+    SystemMessage,
+)
+
+logger = logging.getLogger(__name__)
+
+Turn = Tuple[str, str]
+"""A ``(role, text)`` pair, e.g. ``("user", "Hello")``."""
+
+
+def message_role(message: BaseMessage) -> str:
+    """Return the chat role of a message: system, user, assistant, tool, ..."""
+    if isinstance(message, SystemMessage):
+        return "system"
+    if isinstance(message, HumanMessage):
+        return "user"
+    if isinstance(message, AIMessage):
+        return "assistant"
+    if isinstance(message, ChatMessage):
+        return message.role
+    return message.type
+
+
+def message_text(message: BaseMessage) -> str:
+    """Return the text of a message, dropping non-text parts of multi-part content."""
+    if isinstance(message.content, str):
+        return message.content
+    # Most RunPod endpoints don't support structured content yet
+    logger.warning(
+        "Multi-modal content detected. Converting to text-only format. "
+        "The endpoint may not support multi-modal inputs."
+    )
+    return " ".join(
+        item.get("text", "")
+        for item in message.content
+        if isinstance(item, dict) and item.get("type") == "text"
+    )
+
+
+class ChatTemplate(ABC):
+    """Renders conversations into prompts.
+
+    Subclasses define how one turn is formatted, plus an optional text before
+    the first turn and after the last one. Instances are thread-safe and can
+    be shared between models.
+
+    Args:
+        cache_size: Maximum number of rendered segments kept.
+    """
+
+    name: str = ""
+    """Name the template is selected by."""
+
+    prefix: str = ""
+    """Text before the first turn, e.g. a begin-of-text token."""
+
+    generation_prompt: str = ""
+    """Text after the last turn that cues the model to answer."""
+
+    def __init__(self, cache_size: int = 1024) -> None:
+        self.cache_size = cache_size
+        self._segments: "OrderedDict[Turn, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def format_turn(self, role: str, text: str) -> str:
+        """Render one turn of the conversation."""
+
+    def turns(self, messages: Sequence[BaseMessage]) -> List[Turn]:
+        """Return the turns of a conversation.
+
+        Override to merge or drop messages the model format has no place for.
+        """
+        return [(message_role(message), message_text(message)) for message in messages]
+
+    def render(self, messages: Sequence[BaseMessage]) -> str:
+        """Render a conversation into a prompt."""
+        segments = [self._segment(turn) for turn in self.turns(messages)]
+        return "".join([self.prefix, *segments, self.generation_prompt])
+
+    def _segment(self, turn: Turn) -> str:
+        with self._lock:
+            segment = self._segments.get(turn)
+            if segment is not None:
+                self._segments.move_to_end(turn)
+                return segment
+        segment = self.format_turn(*turn)
+        with self._lock:
+            self._segments[turn] = segment
+            while len(self._segments) > self.cache_size:
+                self._segments.popitem(last=False)
+        return segment
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}()"
+
+
+class PlainChatTemplate(ChatTemplate):
+    """``System: ...``/``User: ...``/``Assistant: ...`` lines, one per message."""
+
+    name = "plain"
+
+    _LABELS: Dict[str, str] = {"system": "System", "user": "User", "assistant": "Assistant"}
+
+    def format_turn(self, role: str, text: str) -> str:
+        label = self._LABELS.get(role)
+        return f"{label}: {text}\n" if label else f"{text}\n"
+
+    def render(self, messages: Sequence[BaseMessage]) -> str:
+        return super().render(messages).strip()
+
+
+class ChatMLTemplate(ChatTemplate):
+    """ChatML, used by Qwen, Yi, OpenHermes and many fine-tunes."""
+
+    name = "chatml"
+    generation_prompt = "<|im_start|>assistant\n"
+
+    def format_turn(self, role: str, text: str) -> str:
+        return f"<|im_start|>{role}\n{text}<|im_end|>\n"
+
+
+class Llama3ChatTemplate(ChatTemplate):
+    """The Llama 3 instruct format."""
+
+    name = "llama3"
+    prefix = "<|begin_of_text|>"
+    generation_prompt = "<|start_header_id|>assistant<|end_header_id|>\n\n"
+
+    def format_turn(self, role: str, text: str) -> str:
+        return f"<|start_header_id|>{role}<|end_header_id|>\n\n{text.strip()}<|eot_id|>"
+
+
+class MistralChatTemplate(ChatTemplate):
+    """The Mistral instruct format.
+
+    Mistral has no system role: system messages are prepended to the next user
+    message.
+    """
+
+    name = "mistral"
+    prefix = "<s>"
+
+    def turns(self, messages: Sequence[BaseMessage]) -> List[Turn]:
+        turns: List[Turn] = []
+        system: List[str] = []
+        for role, text in super().turns(messages):
+            if role == "system":
+                system.append(text)
+                continue
+            if role != "assistant":
+                if system:
+                    text = "\n\n".join([*system, text])
+                    system = []
+                role = "user"
+            turns.append((role, text))
+        if system:
+            turns.append(("user", "\n\n".join(system)))
+        return turns
+
+    def format_turn(self, role: str, text: str) -> str:
+        if role == "assistant":
+            return f"{text}</s>"
+        return f"[INST] {text} [/INST]"
+
+
+CHAT_TEMPLATES: Dict[str, ChatTemplate] = {
+    template.name: template
+    for template in [
+        PlainChatTemplate(),
+        ChatMLTemplate(),
+        Llama3ChatTemplate(),
+        MistralChatTemplate(),
+    ]
+}
+"""The built-in templates by name, shared by all models that select them by name."""
+
+
+def get_chat_template(template: Union[str, ChatTemplate]) -> ChatTemplate:
+    """Return the template with the given name, or the template itself."""
+    if isinstance(template, ChatTemplate):
+        return template
+    try:
+        return CHAT_TEMPLATES[template]
+    except KeyError:
+        raise ValueError(
+            f"Unknown chat template {template!r}. "
+            f"Use one of {sorted(CHAT_TEMPLATES)} or a ChatTemplate instance."
+        ) from None
@@ -0,0 +1,270 @@
+"""Per-endpoint circuit breakers.
+
+When an endpoint is broken (a bad deployment, workers crash-looping) every job
+submitted to it fails, often only after polling for minutes. A
+:class:`CircuitBreaker` counts the outcomes of the jobs sent to an endpoint and
+opens after too many consecutive failures or too high a failure rate. While it
+is open, submissions fail right away with
+:class:`~langchain_runpod.exceptions.CircuitOpenError` instead of adding load.
+After ``reset_timeout`` it turns half-open and lets a few probe jobs through:
+a successful probe closes it again, a failed one reopens it.
+
+All ``RunPod`` and ``ChatRunPod`` instances that enable the breaker for an
+endpoint share one breaker, returned by :func:`get_circuit_breaker`.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+"""Jobs are submitted normally."""
+
+OPEN = "open"
+"""Jobs fail fast without being submitted."""
+
+HALF_OPEN = "half_open"
+"""A limited number of probe jobs are submitted to test the endpoint."""
+
+StateListener = Callable[["CircuitBreaker", str, str], None]
+"""Called with the breaker, its previous state and its new state."""
+
+
+class CircuitBreaker:
+    """Tracks the health of one endpoint and stops submissions while it is broken.
+
+    Thread-safe; shared by all model instances targeting the endpoint.
+
+    Args:
+        name: Name used in logs and errors, usually the endpoint ID.
+        failure_threshold: Consecutive failed jobs that open the circuit.
+        failure_rate_threshold: Fraction of failed jobs among the last
+            ``window`` outcomes that opens the circuit, e.g. 0.5. None only
+            uses ``failure_threshold``.
+        window: Number of recent outcomes the failure rate is computed over.
+        min_calls: Outcomes recorded before the failure rate is considered.
+        reset_timeout: Seconds the circuit stays open before probes are let
+            through.
+        half_open_max_calls: Probe jobs allowed in flight while half-open.
+        listeners: Called on every state change.
+    """
+
+    def __init__(
+        self,
+        name: str = "",
+        failure_threshold: int = 5,
+        failure_rate_threshold: Optional[float] = None,
+        window: int = 20,
+        min_calls: int = 10,
+        reset_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+        listeners: Optional[List[StateListener]] = None,
+    ) -> None:
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be at least 1.")
+        if failure_rate_threshold is not None and not 0 < failure_rate_threshold <= 1:
+            raise ValueError("failure_rate_threshold must be between 0 and 1.")
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.failure_rate_threshold = failure_rate_threshold
+        self.min_calls = min_calls
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.listeners: List[StateListener] = list(listeners or [])
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._consecutive_failures = 0
+        self._outcomes: Deque[bool] = deque(maxlen=window)
+        self._probes = 0
+        self._lock = threading.Lock()
+        self._counts = {"successes": 0, "failures": 0, "rejected": 0, "opened": 0}
+
+    @property
+    def state(self) -> str:
+        """``"closed"``, ``"open"`` or ``"half_open"``."""
+        with self._lock:
+            change = self._refresh()
+        self._notify(change)
+        return self._state
+
+    def add_listener(self, listener: StateListener) -> None:
+        """Call ``listener(breaker, old_state, new_state)`` on every state change."""
+        self.listeners.append(listener)
+
+    def allow(self) -> bool:
+        """Whether a job may be submitted now.
+
+        While half-open, every allowed job is a probe and must be followed by
+        :meth:`record_success`, :meth:`record_failure` or :meth:`release`.
+        """
+        with self._lock:
+            change = self._refresh()
+            if self._state == CLOSED:
+                allowed = True
+            elif self._state == HALF_OPEN and self._probes < self.half_open_max_calls:
+                self._probes += 1
+                allowed = True
+            else:
+                self._counts["rejected"] += 1
+                allowed = False
+        self._notify(change)
+        return allowed
+
+    def retry_after(self) -> float:
+        """Seconds until an open circuit lets probes through."""
+        if self._state != OPEN:
+            return 0.0
+        return max(0.0, self._opened_at + self.reset_timeout - time.monotonic())
+
+    def record_success(self) -> None:
+        """Record a job that completed."""
+        with self._lock:
+            self._counts["successes"] += 1
+            self._consecutive_failures = 0
+            self._outcomes.append(True)
+            self._release_probe()
+            change = self._transition(CLOSED) if self._state == HALF_OPEN else None
+        self._notify(change)
+
+    def record_failure(self) -> None:
+        """Record a job that failed or timed out, or a submission that failed."""
+        with self._lock:
+            self._counts["failures"] += 1
+            self._consecutive_failures += 1
+            self._outcomes.append(False)
+            self._release_probe()
+            change = None
+            if self._state == HALF_OPEN or (self._state == CLOSED and self._tripped()):
+                change = self._transition(OPEN)
+        self._notify(change)
+
+    def record_error(self, error: BaseException) -> None:
+        """Record a submission that raised ``error``.
+
+        Transport errors and 5xx responses count as failures. Anything else,
+        e.g. a 4xx response or a cancelled call, says nothing about the
+        endpoint and only releases the call.
+        """
+        if isinstance(error, httpx.TransportError) or (
+            isinstance(error, httpx.HTTPStatusError) and error.response.status_code >= 500
+        ):
+            self.record_failure()
+        else:
+            self.release()
+
+    def release(self) -> None:
+        """Record a job whose outcome says nothing about the endpoint, e.g. a
+        cancelled one; frees its probe slot."""
+        with self._lock:
+            self._release_probe()
+
+    def reset(self) -> None:
+        """Close the circuit and forget all outcomes."""
+        with self._lock:
+            self._consecutive_failures = 0
+            self._outcomes.clear()
+            self._probes = 0
+            change = self._transition(CLOSED)
+        self._notify(change)
+
+    @property
+    def metrics(self) -> Dict[str, Any]:
+        """Counters for monitoring.
+
+        ``state``, ``successes`` and ``failures`` of recorded jobs,
+        ``rejected`` submissions, how many times the circuit ``opened``,
+        ``consecutive_failures`` and the ``failure_rate`` over the window.
+        """
+        state = self.state
+        with self._lock:
+            return {
+                "state": state,
+                **self._counts,
+                "consecutive_failures": self._consecutive_failures,
+                "failure_rate": self._failure_rate(),
+            }
+
+    # --- Internals, called with the lock held ---
+
+    def _failure_rate(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return self._outcomes.count(False) / len(self._outcomes)
+
+    def _tripped(self) -> bool:
+        if self._consecutive_failures >= self.failure_threshold:
+            return True
+        return (
+            self.failure_rate_threshold is not None
+            and len(self._outcomes) >= self.min_calls
+            and self._failure_rate() >= self.failure_rate_threshold
+        )
+
+    def _refresh(self) -> Optional[Tuple[str, str]]:
+        now = time.monotonic()
+        if self._state == OPEN and now - self._opened_at >= self.reset_timeout:
+            return self._transition(HALF_OPEN)
+        if self._state == HALF_OPEN and self._probes and now - self._opened_at >= 2 * self.reset_timeout:
+            # Probes that never reported back: let new ones through
+            self._probes = 0
+        return None
+
+    def _release_probe(self) -> None:
+        if self._probes:
+            self._probes -= 1
+
+    def _transition(self, state: str) -> Optional[Tuple[str, str]]:
+        old = self._state
+        if old == state:
+            return None
+        self._state = state
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+            self._counts["opened"] += 1
+            self._probes = 0
+        elif state == CLOSED:
+            self._consecutive_failures = 0
+            self._outcomes.clear()
+            self._probes = 0
+        return old, state
+
+    # --- Outside the lock ---
+
+    def _notify(self, change: Optional[Tuple[str, str]]) -> None:
+        if change is None:
+            return
+        old, new = change
+        log = logger.warning if new == OPEN else logger.info
+        log("Circuit breaker of RunPod endpoint %s changed from %s to %s", self.name, old, new)
+        for listener in list(self.listeners):
+            try:
+                listener(self, old, new)
+            except Exception:
+                logger.exception("Circuit breaker listener %r failed", listener)
+
+    def __repr__(self) -> str:
+        return f"CircuitBreaker(name={self.name!r}, state={self._state!r})"
+
+
+_lock = threading.Lock()
+_breakers: Dict[Tuple[str, str], CircuitBreaker] = {}
+
+
+def get_circuit_breaker(api_base: str, endpoint_id: str, **kwargs: Any) -> CircuitBreaker:
+    """Return the breaker shared by all model instances targeting an endpoint.
+
+    ``kwargs`` are the :class:`CircuitBreaker` settings; they only apply if the
+    breaker of the endpoint is created by this call.
+    """
+    key = (api_base, endpoint_id)
+    with _lock:
+        breaker = _breakers.get(key)
+        if breaker is None:
+            breaker = _breakers[key] = CircuitBreaker(name=endpoint_id, **kwargs)
+        return breaker
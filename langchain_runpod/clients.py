@@ -0,0 +1,270 @@
+"""Shared HTTP clients for RunPod API requests.
+
+Creating an ``httpx`` client per model instance means one connection pool (and
+one set of TLS handshakes) per instance. Instead, clients are kept in a
+process-wide registry keyed by the settings that affect the connection, so all
+model instances with the same settings reuse the same pool. Async clients are
+additionally keyed by the event loop they run on, since an ``httpx.AsyncClient``
+cannot be shared between loops.
+"""
+
+import asyncio
+import hashlib
+import logging
+import threading
+import weakref
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = 60.0
+
+
+@dataclass(frozen=True)
+class HTTPClientConfig:
+    """Connection settings that identify a shared HTTP client."""
+
+    api_base: str
+    """Base URL the client talks to."""
+
+    auth_digest: str = ""
+    """Digest of the API key, so differently-authenticated callers get separate pools."""
+
+    timeout: float = DEFAULT_TIMEOUT
+    """Read and write timeout in seconds."""
+
+    connect_timeout: Optional[float] = None
+    """Connect timeout in seconds. Defaults to ``timeout``."""
+
+    pool_timeout: Optional[float] = None
+    """Seconds to wait for a free connection from the pool. Defaults to ``timeout``."""
+
+    max_connections: Optional[int] = 100
+    """Maximum number of concurrent connections."""
+
+    max_keepalive_connections: Optional[int] = 20
+    """Maximum number of idle connections kept alive."""
+
+    keepalive_expiry: Optional[float] = 5.0
+    """Seconds an idle connection is kept alive."""
+
+    http2: bool = False
+    """Whether to use HTTP/2. Requires the ``h2`` package (``httpx[http2]``)."""
+
+    @classmethod
+    def from_model(cls, model: Any) -> "HTTPClientConfig":
+        """Build the config from the client settings of a RunPod model instance."""
+        api_key = model.api_key or ""
+        return cls(
+            api_base=model.api_base,
+            auth_digest=hashlib.sha256(api_key.encode()).hexdigest()[:16],
+            timeout=model.timeout or DEFAULT_TIMEOUT,
+            connect_timeout=model.connect_timeout,
+            pool_timeout=model.pool_timeout,
+            max_connections=model.max_connections,
+            max_keepalive_connections=model.max_keepalive_connections,
+            keepalive_expiry=model.keepalive_expiry,
+            http2=model.http2,
+        )
+
+    def get_timeout(self) -> httpx.Timeout:
+        """Return the ``httpx`` timeout configuration."""
+        return httpx.Timeout(
+            self.timeout,
+            connect=self.connect_timeout if self.connect_timeout is not None else self.timeout,
+            pool=self.pool_timeout if self.pool_timeout is not None else self.timeout,
+        )
+
+    def get_limits(self) -> httpx.Limits:
+        """Return the ``httpx`` connection pool limits."""
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+
+def create_sync_client(config: HTTPClientConfig) -> httpx.Client:
+    """Create a new synchronous client with the given settings."""
+    return httpx.Client(
+        timeout=config.get_timeout(),
+        limits=config.get_limits(),
+        http2=config.http2,
+    )
+
+
+def create_async_client(config: HTTPClientConfig) -> httpx.AsyncClient:
+    """Create a new asynchronous client with the given settings."""
+    return httpx.AsyncClient(
+        timeout=config.get_timeout(),
+        limits=config.get_limits(),
+        http2=config.http2,
+    )
+
+
+_lock = threading.Lock()
+_sync_clients: Dict[HTTPClientConfig, httpx.Client] = {}
+# Async clients are bound to the event loop they were first used on, so they are
+# tracked per loop and dropped together with it.
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[HTTPClientConfig, httpx.AsyncClient]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_sync_client(config: HTTPClientConfig) -> httpx.Client:
+    """Return the shared synchronous client for ``config``, creating it if needed."""
+    with _lock:
+        client = _sync_clients.get(config)
+        if client is None or client.is_closed:
+            client = _sync_clients[config] = create_sync_client(config)
+        return client
+
+
+def get_async_client(config: HTTPClientConfig) -> httpx.AsyncClient:
+    """Return the shared asynchronous client for ``config`` on the running event loop.
+
+    Raises:
+        RuntimeError: If called without a running event loop.
+    """
+    loop = asyncio.get_running_loop()
+    with _lock:
+        loop_clients = _async_clients.setdefault(loop, {})
+        client = loop_clients.get(config)
+        if client is None or client.is_closed:
+            client = loop_clients[config] = create_async_client(config)
+        return client
+
+
+def close_shared_clients() -> None:
+    """Close every shared client, e.g. at process shutdown.
+
+    Async clients whose event loop is already closed are simply dropped.
+    """
+    with _lock:
+        sync_clients = list(_sync_clients.values())
+        async_clients = [
+            (loop, client)
+            for loop, loop_clients in _async_clients.items()
+            for client in loop_clients.values()
+        ]
+        _sync_clients.clear()
+        _async_clients.clear()
+    for client in sync_clients:
+        client.close()
+    for loop, async_client in async_clients:
+        _close_async_client(loop, async_client)
+
+
+async def aclose_shared_clients() -> None:
+    """Close the shared clients of the running event loop."""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        loop_clients = _async_clients.pop(loop, {})
+    for client in loop_clients.values():
+        await client.aclose()
+
+
+def _close_async_client(loop: asyncio.AbstractEventLoop, client: httpx.AsyncClient) -> None:
+    """Close an async client on the loop it belongs to, from outside that loop.
+
+    A running loop is asked to close it. An idle loop is driven until the
+    client is closed, unless this thread is already running another loop, in
+    which case the client is dropped. Best effort: failures are logged.
+    """
+    if loop.is_closed() or client.is_closed:
+        return
+    try:
+        if loop.is_running():
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+        elif _in_running_loop():
+            logger.debug("Dropping an HTTP client of an idle event loop without closing it")
+        else:
+            loop.run_until_complete(client.aclose())
+    except Exception as e:
+        logger.warning("Failed to close an HTTP client: %s", e)
+
+
+def _in_running_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+class ClientManager:
+    """Hands out the HTTP clients used by one model instance.
+
+    With ``shared=True`` the clients come from the process-wide registry and are
+    left open by :meth:`close`; otherwise the instance owns its clients, with one
+    async client per event loop, and closing it releases them.
+
+    Args:
+        config: Connection settings for the clients.
+        shared: Whether to use the process-wide shared clients.
+    """
+
+    def __init__(self, config: HTTPClientConfig, shared: bool = True) -> None:
+        self.config = config
+        self.shared = shared
+        self._sync_client: Optional[httpx.Client] = None
+        self._async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._lock = threading.Lock()
+
+    def get_sync_client(self) -> httpx.Client:
+        """Return the synchronous client."""
+        if self.shared:
+            return get_sync_client(self.config)
+        with self._lock:
+            if self._sync_client is None or self._sync_client.is_closed:
+                self._sync_client = create_sync_client(self.config)
+            return self._sync_client
+
+    def get_async_client(self) -> httpx.AsyncClient:
+        """Return the asynchronous client for the running event loop."""
+        if self.shared:
+            return get_async_client(self.config)
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._async_clients.get(loop)
+            if client is None or client.is_closed:
+                client = self._async_clients[loop] = create_async_client(self.config)
+            return client
+
+    def close(self) -> None:
+        """Close the clients owned by this manager."""
+        sync_client, async_clients = self._detach()
+        if sync_client is not None:
+            sync_client.close()
+        for loop, client in async_clients:
+            _close_async_client(loop, client)
+
+    async def aclose(self) -> None:
+        """Close the clients owned by this manager from within an event loop."""
+        current_loop = asyncio.get_running_loop()
+        sync_client, async_clients = self._detach()
+        if sync_client is not None:
+            sync_client.close()
+        for loop, client in async_clients:
+            if loop is not current_loop:
+                _close_async_client(loop, client)
+                continue
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.warning("Failed to close an HTTP client: %s", e)
+
+    def _detach(
+        self,
+    ) -> Tuple[Optional[httpx.Client], List[Tuple[asyncio.AbstractEventLoop, httpx.AsyncClient]]]:
+        with self._lock:
+            sync_client = self._sync_client
+            async_clients = list(self._async_clients.items())
+            self._sync_client = None
+            self._async_clients.clear()
+        return sync_client, async_clients
@@ -0,0 +1,100 @@
+"""JSON encoding of request bodies and decoding of responses.
+
+`orjson <https://github.com/ijl/orjson>`_ is used when it is installed, which
+is several times faster than the standard library on large prompts and
+outputs; otherwise the :mod:`json` module is used.
+
+:class:`RequestTemplate` holds the parts of the requests of a model instance
+that do not change from call to call, serialized once, so that only the prompt
+is encoded per call.
+"""
+
+import json
+from typing import Any, Dict, Union
+
+import httpx
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialize ``obj`` to compact UTF-8 JSON."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Deserialize a JSON document."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def decode_response(response: httpx.Response) -> Any:
+    """Deserialize the JSON body of a response."""
+    return loads(response.content)
+
+
+class RequestTemplate:
+    """The static parts of the requests a model instance sends to its endpoint.
+
+    Args:
+        api_base: Base URL of the RunPod API.
+        endpoint_id: The endpoint requests are sent to.
+        api_key: RunPod API key.
+        params: The sampling parameters sent with every prompt.
+    """
+
+    __slots__ = (
+        "endpoint_id",
+        "params",
+        "run_url",
+        "runsync_url",
+        "status_url",
+        "stream_url",
+        "cancel_url",
+        "openai_url",
+        "health_url",
+        "auth_headers",
+        "headers",
+        "_suffix",
+    )
+
+    def __init__(
+        self, api_base: str, endpoint_id: str, api_key: str, params: Dict[str, Any]
+    ) -> None:
+        base = f"{api_base}/{endpoint_id}"
+        self.endpoint_id = endpoint_id
+        self.params = params
+        self.run_url = f"{base}/run"
+        self.runsync_url = f"{base}/runsync"
+        self.status_url = f"{base}/status/"
+        self.stream_url = f"{base}/stream/"
+        self.cancel_url = f"{base}/cancel/"
+        self.openai_url = f"{base}/openai/v1/"
+        self.health_url = f"{base}/health"
+        self.auth_headers = {"Authorization": f"Bearer {api_key}"}
+        self.headers = {**self.auth_headers, "Content-Type": "application/json"}
+        # The end of the body after the prompt: ',"temperature":0.1}}'
+        self._suffix = (b"," + dumps(params)[1:] if params else b"}") + b"}"
+
+    def encode(self, payload: Dict[str, Any]) -> bytes:
+        """Serialize a ``/run`` payload.
+
+        Payloads made of a prompt and exactly :attr:`params` only have their
+        prompt encoded; any other payload is serialized in full.
+        """
+        payload_input = payload.get("input")
+        if (
+            len(payload) == 1
+            and isinstance(payload_input, dict)
+            and len(payload_input) == len(self.params) + 1
+            and isinstance(payload_input.get("prompt"), str)
+            and all(payload_input.get(key) is value for key, value in self.params.items())
+        ):
+            return b'{"input":{"prompt":' + dumps(payload_input["prompt"]) + self._suffix
+        return dumps(payload)
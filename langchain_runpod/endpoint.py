@@ -0,0 +1,669 @@
+"""Endpoint and job plumbing shared by ``RunPod`` and ``ChatRunPod``.
+
+:class:`EndpointMixin` holds everything the two models do the same way when
+talking to a RunPod endpoint: HTTP clients, rate limiting and retries, job
+submission, status checks and cancellation, hedging, health and admission
+control, the circuit breaker, response caching and coalescing, shutdown and
+requests to the OpenAI-compatible routes. The models only build payloads and
+turn responses into LangChain outputs.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+import httpx
+
+from langchain_runpod.cache import cache_key, is_cacheable
+from langchain_runpod.circuit_breaker import CircuitBreaker, get_circuit_breaker
+from langchain_runpod.clients import ClientManager, HTTPClientConfig
+from langchain_runpod.codec import RequestTemplate, decode_response, dumps
+from langchain_runpod.exceptions import CircuitOpenError, RunPodAPIError
+from langchain_runpod.hedging import await_hedged, wait_hedged
+from langchain_runpod.health import EndpointHealth, get_health_monitor
+from langchain_runpod.openai_compat import aiter_sse_events, iter_sse_events
+from langchain_runpod.poller import JobPoller, get_job_poller
+from langchain_runpod.polling import FixedPollingStrategy, PollingStrategy
+from langchain_runpod.rate_limit import RateLimiter, get_rate_limiter
+from langchain_runpod.retry import RetryPolicy, asend_with_retries, send_with_retries
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class EndpointMixin:
+    """Talks to the RunPod endpoint of a model and keeps track of its jobs.
+
+    Mixed into ``RunPod`` and ``ChatRunPod``, which provide the settings
+    (``endpoint_id``, ``api_base``, ``poll_interval``, ``hedge_policy``, ...),
+    the private attributes ``_clients``, ``_retry_policy``, ``_jobs``,
+    ``_flights``, ``_template`` and ``_template_key``, and ``_get_params()``.
+    """
+
+    def _init_endpoint(self) -> None:
+        """Set up the HTTP clients, retry policy and job tracking; called from ``__init__``."""
+        self._clients = ClientManager(
+            HTTPClientConfig.from_model(self), shared=self.share_http_client
+        )
+        self._retry_policy = self.retry_policy or RetryPolicy(max_retries=self.max_retries)
+        self._jobs.on_finish = self._record_job_outcome
+
+    def close(self) -> None:
+        """Close the HTTP clients owned by this instance.
+
+        Shared connection pools are left open for other instances; use
+        ``langchain_runpod.clients.close_shared_clients`` to release them.
+        """
+        self._clients.close()
+
+    async def aclose(self) -> None:
+        """Asynchronously close the HTTP clients owned by this instance."""
+        await self._clients.aclose()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+    def _get_client(self) -> httpx.Client:
+        """Get the synchronous HTTP client."""
+        return self._clients.get_sync_client()
+
+    def _get_async_client(self) -> httpx.AsyncClient:
+        """Get the asynchronous HTTP client for the running event loop."""
+        return self._clients.get_async_client()
+
+    def _get_run_url(self) -> str:
+        """Get the URL that jobs are submitted to, honouring ``use_runsync``."""
+        template = self._request_template()
+        return template.runsync_url if self.use_runsync else template.run_url
+
+    def _get_polling_strategy(self) -> PollingStrategy:
+        """Get the strategy that schedules ``/status`` polls."""
+        if self.polling_strategy is not None:
+            return self.polling_strategy
+        return FixedPollingStrategy(self.poll_interval)
+
+    def _use_shared_poller(self) -> bool:
+        """Whether async calls wait for their jobs through the shared poller.
+
+        The poller is shared by every instance targeting the endpoint and uses
+        the shared HTTP clients, so instances with their own clients
+        (``share_http_client=False``) poll directly.
+        """
+        return self.shared_poller and self._clients.shared
+
+    def _get_job_poller(self) -> JobPoller:
+        """Get the shared job poller for this endpoint on the running event loop."""
+        return get_job_poller(
+            self._clients.config,
+            self.endpoint_id,
+            self.api_key or "",
+            self.max_concurrent_polls,
+            rate_limiter=self.endpoint_rate_limiter,
+        )
+
+    @property
+    def endpoint_rate_limiter(self) -> RateLimiter:
+        """The rate limiter shared by all requests to this endpoint.
+
+        Its ``current_rate`` shows how many requests per second are currently
+        allowed, e.g. to size the number of workers.
+        """
+        return get_rate_limiter(self.api_base, self.endpoint_id, self.rate_limit)
+
+    def _send(
+        self, send: Callable[[], httpx.Response], idempotent: bool = True
+    ) -> httpx.Response:
+        """Send a request through the endpoint's rate limiter and retry policy."""
+        return send_with_retries(
+            send,
+            self.endpoint_rate_limiter,
+            self._retry_policy,
+            self.max_rate_limit_retries,
+            idempotent=idempotent,
+        )
+
+    async def _asend(
+        self, send: Callable[[], Awaitable[httpx.Response]], idempotent: bool = True
+    ) -> httpx.Response:
+        """Asynchronously send a request through the rate limiter and retry policy."""
+        return await asend_with_retries(
+            send,
+            self.endpoint_rate_limiter,
+            self._retry_policy,
+            self.max_rate_limit_retries,
+            idempotent=idempotent,
+        )
+
+    def _cache_key(self, payload: Dict[str, Any]) -> str:
+        """Key identifying a payload sent to this endpoint, for caching and coalescing."""
+        return cache_key(self.api_base, self.endpoint_id, payload)
+
+    def _lookup_response(self, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Return the cached response for a payload, if caching is enabled."""
+        if self.response_cache is None:
+            return None
+        return self.response_cache.lookup(self._cache_key(payload))
+
+    async def _alookup_response(self, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Asynchronously return the cached response for a payload."""
+        if self.response_cache is None:
+            return None
+        return await self.response_cache.alookup(self._cache_key(payload))
+
+    def _cache_response(self, payload: Dict[str, Any], response: Dict[str, Any]) -> None:
+        """Cache the response of a completed job, if caching is enabled."""
+        if self.response_cache is not None and is_cacheable(response):
+            self.response_cache.update(self._cache_key(payload), response)
+
+    async def _acache_response(self, payload: Dict[str, Any], response: Dict[str, Any]) -> None:
+        """Asynchronously cache the response of a completed job."""
+        if self.response_cache is not None and is_cacheable(response):
+            await self.response_cache.aupdate(self._cache_key(payload), response)
+
+    def _coalesce(self, payload: Dict[str, Any], run: Callable[[], T]) -> T:
+        """Run a job, or with ``coalesce_requests`` wait for the identical one in flight."""
+        if not self.coalesce_requests:
+            return run()
+        return self._flights.do(self._cache_key(payload), run)
+
+    async def _acoalesce(self, payload: Dict[str, Any], run: Callable[[], Awaitable[T]]) -> T:
+        """Asynchronously run a job, or wait for the identical one in flight."""
+        if not self.coalesce_requests:
+            return await run()
+        return await self._flights.ado(self._cache_key(payload), run)
+
+    def _request_template(self) -> RequestTemplate:
+        """Get the static parts of this instance's requests.
+
+        Built once and rebuilt only when a setting that goes into the
+        requests changes.
+        """
+        key = (
+            self.api_base,
+            self.endpoint_id,
+            self.api_key,
+            self.temperature,
+            self.max_tokens,
+            self.top_p,
+            self.top_k,
+            tuple(self.stop or ()),
+        )
+        if self._template is None or self._template_key != key:
+            self._template = RequestTemplate(
+                self.api_base, self.endpoint_id, self.api_key or "", self._get_params()
+            )
+            self._template_key = key
+        return self._template
+
+    def _get_headers(self) -> Dict[str, str]:
+        """Get the headers for RunPod API requests."""
+        return self._request_template().headers
+
+    def _submit_job(
+        self,
+        payload: Dict[str, Any],
+        url: Optional[str] = None,
+        admit: bool = True,
+        template: Optional[RequestTemplate] = None,
+    ) -> Dict[str, Any]:
+        """Submit a job to RunPod and return the parsed response.
+
+        HTTP and JSON errors are left to the caller to handle. Unless ``admit``
+        is False, the submission first passes ``admission_policy`` and the
+        circuit breaker. ``template`` addresses an endpoint other than
+        ``endpoint_id``, e.g. for a hedge, and is remembered for the job.
+        """
+        breaker = None
+        if admit:
+            self._admit()
+            breaker = self._check_circuit()
+        template = template or self._request_template()
+        body = template.encode(payload)
+        try:
+            response = self._send(
+                lambda: self._get_client().post(
+                    url or self._get_run_url(),
+                    headers=template.headers,
+                    content=body,
+                ),
+                idempotent=False,
+            )
+            response.raise_for_status()
+            response_json = decode_response(response)
+        except BaseException as e:
+            if breaker is not None:
+                breaker.record_error(e)
+            raise
+        self._jobs.track(response_json, template)
+        return response_json
+
+    async def _asubmit_job(
+        self,
+        payload: Dict[str, Any],
+        url: Optional[str] = None,
+        admit: bool = True,
+        template: Optional[RequestTemplate] = None,
+    ) -> Dict[str, Any]:
+        """Asynchronously submit a job to RunPod and return the parsed response."""
+        breaker = None
+        if admit:
+            await self._aadmit()
+            breaker = self._check_circuit()
+        template = template or self._request_template()
+        body = template.encode(payload)
+        try:
+            response = await self._asend(
+                lambda: self._get_async_client().post(
+                    url or self._get_run_url(),
+                    headers=template.headers,
+                    content=body,
+                ),
+                idempotent=False,
+            )
+            response.raise_for_status()
+            response_json = decode_response(response)
+        except BaseException as e:
+            if breaker is not None:
+                breaker.record_error(e)
+            raise
+        self._jobs.track(response_json, template)
+        return response_json
+
+    def _get_job_status(
+        self, job_id: str, template: Optional[RequestTemplate] = None
+    ) -> Dict[str, Any]:
+        """Fetch the current ``/status`` of a job.
+
+        ``template`` addresses the endpoint of a job that was not submitted to
+        ``endpoint_id``, e.g. a hedge.
+        """
+        template = template or self._request_template()
+        response = self._send(
+            lambda: self._get_client().get(
+                template.status_url + job_id,
+                headers=template.auth_headers,
+            )
+        )
+        response.raise_for_status()
+        status_data = decode_response(response)
+        self._jobs.update(job_id, status_data.get("status"))
+        return status_data
+
+    async def _aget_job_status(
+        self, job_id: str, template: Optional[RequestTemplate] = None
+    ) -> Dict[str, Any]:
+        """Asynchronously fetch the current ``/status`` of a job."""
+        template = template or self._request_template()
+        response = await self._asend(
+            lambda: self._get_async_client().get(
+                template.status_url + job_id,
+                headers=template.auth_headers,
+            )
+        )
+        response.raise_for_status()
+        status_data = decode_response(response)
+        self._jobs.update(job_id, status_data.get("status"))
+        return status_data
+
+    def _cancel_job(
+        self, job_id: str, template: Optional[RequestTemplate] = None, timed_out: bool = False
+    ) -> None:
+        """Ask RunPod to cancel a job, e.g. after a timeout or an interruption.
+
+        Best effort: failures are logged and otherwise ignored. ``template``
+        defaults to the one the job was submitted with. ``timed_out`` records
+        the job as a failure with the circuit breaker.
+        """
+        template = template or self._jobs.template(job_id) or self._request_template()
+        self._forget_job(job_id, timed_out)
+        try:
+            response = self._send(
+                lambda: self._get_client().post(
+                    template.cancel_url + job_id,
+                    headers=template.headers,
+                )
+            )
+            response.raise_for_status()
+            logger.info("Cancelled RunPod job %s", job_id)
+        except Exception as e:
+            logger.warning("Failed to cancel RunPod job %s: %s", job_id, e)
+
+    async def _acancel_job(
+        self, job_id: str, template: Optional[RequestTemplate] = None, timed_out: bool = False
+    ) -> None:
+        """Asynchronously ask RunPod to cancel a job. Best effort."""
+        template = template or self._jobs.template(job_id) or self._request_template()
+        self._forget_job(job_id, timed_out)
+        try:
+            response = await self._asend(
+                lambda: self._get_async_client().post(
+                    template.cancel_url + job_id,
+                    headers=template.headers,
+                )
+            )
+            response.raise_for_status()
+            logger.info("Cancelled RunPod job %s", job_id)
+        except Exception as e:
+            logger.warning("Failed to cancel RunPod job %s: %s", job_id, e)
+
+    def _hedge_template(self) -> RequestTemplate:
+        """Get the requests of the endpoint hedges are submitted to."""
+        template = self._request_template()
+        if self.hedge_endpoint_id in (None, self.endpoint_id):
+            return template
+        return RequestTemplate(
+            self.api_base, self.hedge_endpoint_id, self.api_key or "", template.params
+        )
+
+    def _wait_hedged(self, payload: Dict[str, Any], submission: Dict[str, Any]) -> Dict[str, Any]:
+        """Wait for a submitted job, racing a hedge against it if it stays queued.
+
+        Returns the response of the copy that completed first, or of the last
+        one that failed. The other copy is cancelled.
+        """
+        assert self.hedge_policy is not None
+
+        def submit_hedge() -> Tuple[Dict[str, Any], RequestTemplate]:
+            template = self._hedge_template()
+            response = self._submit_job(
+                payload, template.run_url, admit=False, template=template
+            )
+            return response, template
+
+        return wait_hedged(
+            self.hedge_policy,
+            submission,
+            self._request_template(),
+            submit_hedge,
+            self._get_job_status,
+            self._cancel_job,
+            self._get_polling_strategy(),
+            self.max_polling_attempts,
+        )
+
+    async def _await_hedged(
+        self, payload: Dict[str, Any], submission: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Asynchronously wait for a submitted job, hedging it if it stays queued."""
+        assert self.hedge_policy is not None
+
+        async def submit_hedge() -> Tuple[Dict[str, Any], RequestTemplate]:
+            template = self._hedge_template()
+            response = await self._asubmit_job(
+                payload, template.run_url, admit=False, template=template
+            )
+            return response, template
+
+        return await await_hedged(
+            self.hedge_policy,
+            submission,
+            self._request_template(),
+            submit_hedge,
+            self._aget_job_status,
+            self._acancel_job,
+            self._get_polling_strategy(),
+            self.max_polling_attempts,
+        )
+
+    def health(self, max_age: Optional[float] = None) -> EndpointHealth:
+        """Return the queued and in-progress jobs and the workers of the endpoint.
+
+        Args:
+            max_age: Oldest cached result, in seconds, that may be returned.
+                Defaults to ``health_ttl``.
+
+        Raises:
+            RunPodAPIError: If the health could not be fetched.
+        """
+        return get_health_monitor(self.api_base, self.endpoint_id).get(
+            self._fetch_health, self.health_ttl if max_age is None else max_age
+        )
+
+    async def ahealth(self, max_age: Optional[float] = None) -> EndpointHealth:
+        """Asynchronously return the health of the endpoint. See :meth:`health`."""
+        return await get_health_monitor(self.api_base, self.endpoint_id).aget(
+            self._afetch_health, self.health_ttl if max_age is None else max_age
+        )
+
+    def _fetch_health(self) -> Dict[str, Any]:
+        """Request the ``/health`` of the endpoint."""
+        template = self._request_template()
+        try:
+            response = self._send(
+                lambda: self._get_client().get(template.health_url, headers=template.auth_headers)
+            )
+            response.raise_for_status()
+            return decode_response(response)
+        except (httpx.HTTPError, json.JSONDecodeError, ValueError) as e:
+            raise RunPodAPIError(f"Failed to fetch the health of endpoint {self.endpoint_id}: {e}") from e
+
+    async def _afetch_health(self) -> Dict[str, Any]:
+        """Asynchronously request the ``/health`` of the endpoint."""
+        template = self._request_template()
+        try:
+            response = await self._asend(
+                lambda: self._get_async_client().get(
+                    template.health_url, headers=template.auth_headers
+                )
+            )
+            response.raise_for_status()
+            return decode_response(response)
+        except (httpx.HTTPError, json.JSONDecodeError, ValueError) as e:
+            raise RunPodAPIError(f"Failed to fetch the health of endpoint {self.endpoint_id}: {e}") from e
+
+    def _admit(self) -> None:
+        """Wait until ``admission_policy`` lets a job be submitted."""
+        if self.admission_policy is not None:
+            self.admission_policy.admit(self.health, self.endpoint_id, self.health_ttl)
+
+    async def _aadmit(self) -> None:
+        """Asynchronously wait until ``admission_policy`` lets a job be submitted."""
+        if self.admission_policy is not None:
+            await self.admission_policy.aadmit(self.ahealth, self.endpoint_id, self.health_ttl)
+
+    @property
+    def endpoint_circuit_breaker(self) -> Optional[CircuitBreaker]:
+        """The circuit breaker guarding this endpoint; None if disabled.
+
+        Its ``state`` and ``metrics`` show whether jobs are being let through.
+        """
+        if isinstance(self.circuit_breaker, CircuitBreaker):
+            return self.circuit_breaker
+        if self.circuit_breaker:
+            return get_circuit_breaker(self.api_base, self.endpoint_id)
+        return None
+
+    def _check_circuit(self) -> Optional[CircuitBreaker]:
+        """Raise ``CircuitOpenError`` unless the circuit breaker lets a job through."""
+        breaker = self.endpoint_circuit_breaker
+        if breaker is not None and not breaker.allow():
+            retry_after = breaker.retry_after()
+            raise CircuitOpenError(
+                f"Circuit breaker of RunPod endpoint {self.endpoint_id} is open, "
+                f"retry in {retry_after:.0f}s.",
+                endpoint_id=self.endpoint_id,
+                retry_after=retry_after,
+            )
+        return breaker
+
+    def _record_job_outcome(
+        self, outcome: Optional[str], template: Optional[RequestTemplate] = None
+    ) -> None:
+        """Report a job that left ``_jobs`` to the circuit breaker of its endpoint.
+
+        Hedges on ``hedge_endpoint_id`` count towards that endpoint's shared
+        breaker if ``circuit_breaker`` is True, and never towards this one's.
+        They were submitted without taking a probe slot there, so only their
+        successes and failures are recorded.
+        """
+        if template is None or template.endpoint_id == self.endpoint_id:
+            breaker = self.endpoint_circuit_breaker
+        elif self.circuit_breaker is True and outcome in ("COMPLETED", "FAILED", "TIMED_OUT"):
+            breaker = get_circuit_breaker(self.api_base, template.endpoint_id)
+        else:
+            return
+        if breaker is None:
+            return
+        if outcome == "COMPLETED":
+            breaker.record_success()
+        elif outcome in ("FAILED", "TIMED_OUT"):
+            breaker.record_failure()
+        else:
+            breaker.release()
+
+    def _forget_job(self, job_id: str, timed_out: bool = False) -> None:
+        """Stop tracking a job that is being cancelled."""
+        if timed_out:
+            self._jobs.time_out(job_id)
+        else:
+            self._jobs.discard(job_id)
+
+    @property
+    def in_flight_jobs(self) -> List[str]:
+        """Ids of the jobs submitted by this instance that have not finished yet."""
+        return self._jobs.job_ids
+
+    def shutdown(self, cancel: bool = True, timeout: Optional[float] = None) -> None:
+        """Cancel or drain the jobs this instance still has in flight, then close it.
+
+        Args:
+            cancel: If True, cancel every in-flight job right away. Otherwise
+                wait for the jobs to finish, and cancel whatever is still
+                running after ``timeout``.
+            timeout: Maximum number of seconds to wait for jobs to drain.
+                None waits until all of them have finished.
+        """
+        if not cancel:
+            deadline = None if timeout is None else time.monotonic() + timeout
+            while len(self._jobs) and (deadline is None or time.monotonic() < deadline):
+                for job_id in self._jobs.job_ids:
+                    self._drain_job(job_id)
+                if len(self._jobs):
+                    delay = self.poll_interval
+                    if deadline is not None:
+                        delay = min(delay, max(0.0, deadline - time.monotonic()))
+                    time.sleep(delay)
+        for job_id in self._jobs.job_ids:
+            self._cancel_job(job_id)
+        self.close()
+
+    async def ashutdown(self, cancel: bool = True, timeout: Optional[float] = None) -> None:
+        """Asynchronously cancel or drain the in-flight jobs, then close the instance.
+
+        See :meth:`shutdown` for the arguments.
+        """
+        if not cancel:
+            deadline = None if timeout is None else time.monotonic() + timeout
+            while len(self._jobs) and (deadline is None or time.monotonic() < deadline):
+                await asyncio.gather(*(self._adrain_job(job_id) for job_id in self._jobs.job_ids))
+                if len(self._jobs):
+                    delay = self.poll_interval
+                    if deadline is not None:
+                        delay = min(delay, max(0.0, deadline - time.monotonic()))
+                    await asyncio.sleep(delay)
+        await asyncio.gather(*(self._acancel_job(job_id) for job_id in self._jobs.job_ids))
+        await self.aclose()
+
+    def _drain_job(self, job_id: str) -> None:
+        """Check on an in-flight job while draining; forget it if RunPod no longer knows it."""
+        try:
+            self._get_job_status(job_id, self._jobs.template(job_id))
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 404:
+                self._jobs.discard(job_id)
+            logger.warning("Error checking RunPod job %s during shutdown: %s", job_id, e)
+        except Exception as e:
+            logger.warning("Error checking RunPod job %s during shutdown: %s", job_id, e)
+
+    async def _adrain_job(self, job_id: str) -> None:
+        """Asynchronously check on an in-flight job while draining."""
+        try:
+            await self._aget_job_status(job_id, self._jobs.template(job_id))
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 404:
+                self._jobs.discard(job_id)
+            logger.warning("Error checking RunPod job %s during shutdown: %s", job_id, e)
+        except Exception as e:
+            logger.warning("Error checking RunPod job %s during shutdown: %s", job_id, e)
+
+    def _openai_request(self, route: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        """Send a request to the OpenAI-compatible route and return the parsed response."""
+        template = self._request_template()
+        content = dumps(body)
+        response = self._send(
+            lambda: self._get_client().post(
+                template.openai_url + route, headers=template.headers, content=content
+            ),
+            idempotent=False,
+        )
+        response.raise_for_status()
+        return decode_response(response)
+
+    async def _aopenai_request(self, route: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        """Asynchronously send a request to the OpenAI-compatible route."""
+        template = self._request_template()
+        content = dumps(body)
+        response = await self._asend(
+            lambda: self._get_async_client().post(
+                template.openai_url + route, headers=template.headers, content=content
+            ),
+            idempotent=False,
+        )
+        response.raise_for_status()
+        return decode_response(response)
+
+    def _openai_events(self, route: str, body: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """Stream a request to the OpenAI-compatible route and yield its events.
+
+        Closing the generator early closes the connection, which stops the
+        generation on the worker.
+        """
+        template = self._request_template()
+        client = self._get_client()
+        request = client.build_request(
+            "POST", template.openai_url + route, headers=template.headers, content=dumps(body)
+        )
+        response = self._send(lambda: client.send(request, stream=True), idempotent=False)
+        try:
+            if response.is_error:
+                response.read()
+                response.raise_for_status()
+            yield from iter_sse_events(response.iter_lines())
+        finally:
+            response.close()
+
+    async def _aopenai_events(
+        self, route: str, body: Dict[str, Any]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Asynchronously stream a request to the OpenAI-compatible route."""
+        template = self._request_template()
+        client = self._get_async_client()
+        request = client.build_request(
+            "POST", template.openai_url + route, headers=template.headers, content=dumps(body)
+        )
+        response = await self._asend(lambda: client.send(request, stream=True), idempotent=False)
+        try:
+            if response.is_error:
+                await response.aread()
+                response.raise_for_status()
+            async for event in aiter_sse_events(response.aiter_lines()):
+                yield event
+        finally:
+            await response.aclose()
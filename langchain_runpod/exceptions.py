@@ -0,0 +1,41 @@
+"""Exceptions raised by the RunPod integration."""
+
+
+class RunPodAPIError(Exception):
+    """Custom exception for RunPod API errors."""
+    pass
+
+
+class EndpointUnavailableError(RunPodAPIError):
+    """Raised instead of submitting a job to an endpoint that cannot take it."""
+
+
+class EndpointOverloadedError(EndpointUnavailableError):
+    """Raised instead of submitting a job when admission control finds the
+    endpoint's queue over its limit.
+
+    Attributes:
+        endpoint_id: The overloaded endpoint.
+        health: The :class:`~langchain_runpod.health.EndpointHealth` the
+            decision was based on.
+    """
+
+    def __init__(self, message: str, endpoint_id: str, health: object) -> None:
+        super().__init__(message)
+        self.endpoint_id = endpoint_id
+        self.health = health
+
+
+class CircuitOpenError(EndpointUnavailableError):
+    """Raised instead of submitting a job while the endpoint's circuit breaker
+    is open.
+
+    Attributes:
+        endpoint_id: The endpoint whose circuit is open.
+        retry_after: Seconds until the breaker lets probe requests through.
+    """
+
+    def __init__(self, message: str, endpoint_id: str, retry_after: float) -> None:
+        super().__init__(message)
+        self.endpoint_id = endpoint_id
+        self.retry_after = retry_after
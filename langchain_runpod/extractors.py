@@ -0,0 +1,243 @@
+"""Extraction of the generated text from RunPod job outputs.
+
+Workers return their output in many shapes: a plain string, ``{"text": ...}``,
+OpenAI-style ``choices``, vLLM token lists, ... An :class:`OutputExtractorRegistry`
+holds one rule per known shape and tries them in order. Since an endpoint
+always answers in the same shape, the registry remembers which rule matched
+for each endpoint and tries that rule first on later outputs, falling back to
+the full search if it no longer matches.
+
+Both :class:`~langchain_runpod.RunPod` and :class:`~langchain_runpod.ChatRunPod`
+use the shared :data:`default_extractors` registry unless given their own.
+Custom shapes can be added with :func:`register_output_extractor`.
+"""
+
+import logging
+import threading
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+OutputExtractor = Callable[[Any], Optional[str]]
+"""Returns the text of an output, or None if the output does not have its shape."""
+
+
+def _string(output: Any) -> Optional[str]:
+    return output if isinstance(output, str) else None
+
+
+def _key(key: str) -> OutputExtractor:
+    def extract(output: Any) -> Optional[str]:
+        if isinstance(output, dict) and isinstance(output.get(key), str):
+            return output[key]
+        return None
+
+    return extract
+
+
+def _first_choice(output: Any) -> Optional[Dict[str, Any]]:
+    if isinstance(output, dict):
+        choices = output.get("choices")
+        if isinstance(choices, list) and choices and isinstance(choices[0], dict):
+            return choices[0]
+    return None
+
+
+def _choice(key: str) -> OutputExtractor:
+    def extract(output: Any) -> Optional[str]:
+        choice = _first_choice(output)
+        if choice is None:
+            return None
+        value = choice.get(key)
+        if isinstance(value, str):
+            return value
+        # Deeper nesting like message: {content: '...'}
+        if isinstance(value, dict) and isinstance(value.get("content"), str):
+            return value["content"]
+        return None
+
+    return extract
+
+
+def _mistral_outputs(output: Any) -> Optional[str]:
+    if isinstance(output, dict) and isinstance(output.get("outputs"), list) and output["outputs"]:
+        first_output = output["outputs"][0]
+        if isinstance(first_output, dict) and isinstance(first_output.get("text"), str):
+            return first_output["text"]
+    return None
+
+
+def _choice_tokens(output: Any) -> Optional[str]:
+    choice = _first_choice(output)
+    if choice is not None and isinstance(choice.get("tokens"), list):
+        return "".join(map(str, choice["tokens"]))
+    return None
+
+
+def _list_choice_tokens(output: Any) -> Optional[str]:
+    # vLLM workers: [{'choices': [{'tokens': [...]}], 'usage': {...}}]
+    if isinstance(output, list) and output:
+        choice = _first_choice(output[0])
+        if choice is not None:
+            tokens = choice.get("tokens")
+            if isinstance(tokens, list):
+                return "".join(map(str, tokens))
+            if isinstance(tokens, str):
+                return tokens
+    return None
+
+
+_CHOICE_EXTRACTORS = [_choice(key) for key in ["text", "message", "content"]]
+
+
+def _list_choice_text(output: Any) -> Optional[str]:
+    if isinstance(output, list) and output:
+        for extract in _CHOICE_EXTRACTORS:
+            text = extract(output[0])
+            if text is not None:
+                return text
+    return None
+
+
+def _string_list(output: Any) -> Optional[str]:
+    if isinstance(output, list) and all(isinstance(item, str) for item in output):
+        return "".join(output)
+    return None
+
+
+BUILTIN_EXTRACTORS: Tuple[Tuple[str, OutputExtractor], ...] = (
+    ("string", _string),
+    ("text", _key("text")),
+    ("content", _key("content")),
+    ("message", _key("message")),
+    ("generated_text", _key("generated_text")),
+    ("response", _key("response")),
+    ("choices.text", _choice("text")),
+    ("choices.message", _choice("message")),
+    ("choices.content", _choice("content")),
+    ("mistral.outputs", _mistral_outputs),
+    ("choices.tokens", _choice_tokens),
+    ("list.choices.tokens", _list_choice_tokens),
+    ("list.choices.text", _list_choice_text),
+    ("string_list", _string_list),
+)
+"""The shapes understood out of the box, in the order they are tried."""
+
+
+def find_usage(output: Any) -> Any:
+    """Return the ``usage`` block reported alongside an output, if any."""
+    if isinstance(output, list) and output:
+        output = output[0]
+    if isinstance(output, dict):
+        return output.get("usage")
+    return None
+
+
+class OutputExtractorRegistry:
+    """Ordered set of extraction rules that learns the rule of each endpoint.
+
+    Thread-safe.
+
+    Args:
+        extractors: ``(name, extractor)`` pairs in the order they are tried.
+            Defaults to :data:`BUILTIN_EXTRACTORS`.
+    """
+
+    def __init__(
+        self, extractors: Optional[Sequence[Tuple[str, OutputExtractor]]] = None
+    ) -> None:
+        self._extractors: Dict[str, OutputExtractor] = dict(
+            BUILTIN_EXTRACTORS if extractors is None else extractors
+        )
+        self._learned: Dict[Hashable, str] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def names(self) -> List[str]:
+        """Names of the rules, in the order they are tried."""
+        return list(self._extractors)
+
+    def register(self, name: str, extractor: OutputExtractor) -> None:
+        """Add a rule that is tried before the existing ones.
+
+        Registering an existing name replaces that rule.
+        """
+        with self._lock:
+            # Replace rather than mutate, so that concurrent extractions can
+            # keep iterating over the old rules
+            others = {key: value for key, value in self._extractors.items() if key != name}
+            self._extractors = {name: extractor, **others}
+            self._learned.clear()
+
+    def unregister(self, name: str) -> None:
+        """Remove a rule."""
+        with self._lock:
+            self._extractors = {
+                key: value for key, value in self._extractors.items() if key != name
+            }
+            self._learned = {
+                key: learned for key, learned in self._learned.items() if learned != name
+            }
+
+    def learned(self, key: Hashable) -> Optional[str]:
+        """Name of the rule remembered for ``key``, if any."""
+        return self._learned.get(key)
+
+    def forget(self, key: Optional[Hashable] = None) -> None:
+        """Forget the rule learned for ``key``, or for all keys."""
+        with self._lock:
+            if key is None:
+                self._learned.clear()
+            else:
+                self._learned.pop(key, None)
+
+    def extract(self, output: Any, key: Optional[Hashable] = None) -> Optional[str]:
+        """Return the text of ``output``, or None if no rule matches.
+
+        Args:
+            output: The ``output`` field of a job or stream response.
+            key: Identifies the source of the output, usually the endpoint.
+                The matching rule is remembered for it and tried first the
+                next time.
+        """
+        extractors = self._extractors
+        if key is not None:
+            name = self._learned.get(key)
+            if name is not None:
+                extractor = extractors.get(name)
+                text = extractor(output) if extractor is not None else None
+                if text is not None:
+                    return text
+                logger.debug("Output of %s no longer matches rule %r, re-detecting", key, name)
+
+        for name, extractor in extractors.items():
+            text = extractor(output)
+            if text is not None:
+                if key is not None:
+                    self._learned[key] = name
+                return text
+        return None
+
+    def __repr__(self) -> str:
+        return f"OutputExtractorRegistry(names={self.names})"
+
+
+default_extractors = OutputExtractorRegistry()
+"""The registry shared by all model instances that are not given their own."""
+
+
+def register_output_extractor(name: str, extractor: OutputExtractor) -> None:
+    """Teach all models a new output shape; it is tried before the built-in ones.
+
+    Example:
+        .. code-block:: python
+
+            from langchain_runpod import register_output_extractor
+
+            register_output_extractor(
+                "my_worker",
+                lambda output: output.get("result", {}).get("answer")
+                if isinstance(output, dict) else None,
+            )
+    """
+    default_extractors.register(name, extractor)
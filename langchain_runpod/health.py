@@ -0,0 +1,244 @@
+"""Endpoint health and queue-aware admission control.
+
+RunPod's ``/health`` route reports how many jobs an endpoint has queued and in
+progress and how many of its workers are idle or running. Results are cached
+per endpoint and shared by all model instances, so that checking the health
+before every submission costs at most one request per ``health_ttl``.
+
+With an :class:`AdmissionPolicy`, jobs are only submitted while the queue is
+below its limits. Otherwise the submission waits for the queue to drain or
+fails fast with :class:`~langchain_runpod.exceptions.EndpointOverloadedError`,
+instead of the overload surfacing only after polling gave up on the job.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Literal, Optional, Tuple
+
+from langchain_runpod.exceptions import EndpointOverloadedError
+from langchain_runpod.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class EndpointHealth:
+    """A snapshot of the ``/health`` of an endpoint."""
+
+    jobs_in_queue: int = 0
+    """Jobs waiting for a worker."""
+
+    jobs_in_progress: int = 0
+    """Jobs being run by a worker."""
+
+    workers_idle: int = 0
+    """Workers ready to take a job."""
+
+    workers_running: int = 0
+    """Workers running a job."""
+
+    workers_initializing: int = 0
+    """Workers still starting up."""
+
+    raw: Dict[str, Any] = field(default_factory=dict, compare=False, repr=False)
+    """The complete ``/health`` response."""
+
+    fetched_at: float = field(default_factory=time.monotonic, compare=False, repr=False)
+    """``time.monotonic()`` when the snapshot was taken."""
+
+    @classmethod
+    def from_response(cls, data: Dict[str, Any]) -> "EndpointHealth":
+        """Build a snapshot from a ``/health`` response."""
+        jobs = data.get("jobs") or {}
+        workers = data.get("workers") or {}
+        return cls(
+            jobs_in_queue=int(jobs.get("inQueue") or 0),
+            jobs_in_progress=int(jobs.get("inProgress") or 0),
+            workers_idle=int(workers.get("idle") or 0),
+            workers_running=int(workers.get("running") or 0),
+            workers_initializing=int(workers.get("initializing") or 0),
+            raw=data,
+        )
+
+    @property
+    def workers(self) -> int:
+        """Workers that can take jobs now: idle plus running."""
+        return self.workers_idle + self.workers_running
+
+    @property
+    def age(self) -> float:
+        """Seconds since the snapshot was taken."""
+        return time.monotonic() - self.fetched_at
+
+
+class HealthMonitor:
+    """The cached health of one endpoint.
+
+    Concurrent callers that find the cached snapshot too old share a single
+    ``/health`` request, from any thread or event loop.
+    """
+
+    def __init__(self) -> None:
+        self._health: Optional[EndpointHealth] = None
+        self._flights = SingleFlight()
+
+    @property
+    def latest(self) -> Optional[EndpointHealth]:
+        """The most recent snapshot, however old; None before the first fetch."""
+        return self._health
+
+    def get(self, fetch: Callable[[], Dict[str, Any]], max_age: float) -> EndpointHealth:
+        """Return a snapshot at most ``max_age`` seconds old, fetching one if needed."""
+        health = self._health
+        if health is not None and health.age < max_age:
+            return health
+        return self._flights.do(None, lambda: self._store(fetch()))
+
+    async def aget(
+        self, fetch: Callable[[], Awaitable[Dict[str, Any]]], max_age: float
+    ) -> EndpointHealth:
+        """Asynchronously return a snapshot at most ``max_age`` seconds old."""
+        health = self._health
+        if health is not None and health.age < max_age:
+            return health
+
+        async def fetch_and_store() -> EndpointHealth:
+            return self._store(await fetch())
+
+        return await self._flights.ado(None, fetch_and_store)
+
+    def _store(self, data: Dict[str, Any]) -> EndpointHealth:
+        self._health = EndpointHealth.from_response(data)
+        return self._health
+
+
+_lock = threading.Lock()
+_monitors: Dict[Tuple[str, str], HealthMonitor] = {}
+
+
+def get_health_monitor(api_base: str, endpoint_id: str) -> HealthMonitor:
+    """Return the health monitor shared by all model instances targeting an endpoint."""
+    key = (api_base, endpoint_id)
+    with _lock:
+        monitor = _monitors.get(key)
+        if monitor is None:
+            monitor = _monitors[key] = HealthMonitor()
+        return monitor
+
+
+class AdmissionPolicy:
+    """Decides whether a job may be submitted, based on the endpoint's health.
+
+    Args:
+        max_queue_depth: Maximum number of jobs queued on the endpoint.
+        max_queue_per_worker: Maximum number of queued jobs per idle or
+            running worker. An endpoint without workers counts as having one.
+        mode: ``"reject"`` raises ``EndpointOverloadedError`` right away when
+            a limit is exceeded. ``"delay"`` holds the submission until the
+            queue is back under the limits, and raises once ``max_delay``
+            seconds have passed.
+        max_delay: Longest time a submission is held in ``"delay"`` mode.
+
+    If the health cannot be fetched, jobs are admitted.
+    """
+
+    def __init__(
+        self,
+        max_queue_depth: Optional[int] = None,
+        max_queue_per_worker: Optional[float] = None,
+        mode: Literal["reject", "delay"] = "reject",
+        max_delay: float = 30.0,
+    ) -> None:
+        if max_queue_depth is None and max_queue_per_worker is None:
+            raise ValueError("AdmissionPolicy needs max_queue_depth, max_queue_per_worker or both.")
+        if mode not in ("reject", "delay"):
+            raise ValueError(f"Unknown admission mode {mode!r}.")
+        self.max_queue_depth = max_queue_depth
+        self.max_queue_per_worker = max_queue_per_worker
+        self.mode = mode
+        self.max_delay = max_delay
+
+    def overload(self, health: EndpointHealth) -> Optional[str]:
+        """Describe why the endpoint is overloaded, or None if it is not."""
+        if self.max_queue_depth is not None and health.jobs_in_queue > self.max_queue_depth:
+            return f"{health.jobs_in_queue} jobs queued, the limit is {self.max_queue_depth}"
+        if self.max_queue_per_worker is not None:
+            per_worker = health.jobs_in_queue / max(health.workers, 1)
+            if per_worker > self.max_queue_per_worker:
+                return (
+                    f"{health.jobs_in_queue} jobs queued for {health.workers} workers, "
+                    f"the limit is {self.max_queue_per_worker} per worker"
+                )
+        return None
+
+    def admit(
+        self, get_health: Callable[[], EndpointHealth], endpoint_id: str, interval: float
+    ) -> None:
+        """Return once a job may be submitted.
+
+        Args:
+            get_health: Returns the (cached) health of the endpoint.
+            endpoint_id: The endpoint, for the error message.
+            interval: Seconds between health checks in ``"delay"`` mode.
+
+        Raises:
+            EndpointOverloadedError: If the endpoint is overloaded, in
+                ``"delay"`` mode once ``max_delay`` has passed.
+        """
+        deadline = time.monotonic() + self.max_delay
+        while True:
+            try:
+                health = get_health()
+            except Exception as e:
+                logger.warning("Admitting job without health check of endpoint %s: %s", endpoint_id, e)
+                return
+            reason = self.overload(health)
+            if reason is None:
+                return
+            remaining = deadline - time.monotonic()
+            if self.mode == "reject" or remaining <= 0:
+                raise self._overloaded(endpoint_id, reason, health)
+            logger.debug("Holding job for overloaded endpoint %s: %s", endpoint_id, reason)
+            time.sleep(min(interval, remaining))
+
+    async def aadmit(
+        self,
+        get_health: Callable[[], Awaitable[EndpointHealth]],
+        endpoint_id: str,
+        interval: float,
+    ) -> None:
+        """Asynchronously return once a job may be submitted. See :meth:`admit`."""
+        deadline = time.monotonic() + self.max_delay
+        while True:
+            try:
+                health = await get_health()
+            except Exception as e:
+                logger.warning("Admitting job without health check of endpoint %s: %s", endpoint_id, e)
+                return
+            reason = self.overload(health)
+            if reason is None:
+                return
+            remaining = deadline - time.monotonic()
+            if self.mode == "reject" or remaining <= 0:
+                raise self._overloaded(endpoint_id, reason, health)
+            logger.debug("Holding job for overloaded endpoint %s: %s", endpoint_id, reason)
+            await asyncio.sleep(min(interval, remaining))
+
+    def _overloaded(
+        self, endpoint_id: str, reason: str, health: EndpointHealth
+    ) -> EndpointOverloadedError:
+        waited = f" after waiting {self.max_delay:.0f}s" if self.mode == "delay" else ""
+        return EndpointOverloadedError(
+            f"RunPod endpoint {endpoint_id} is overloaded{waited}: {reason}.",
+            endpoint_id=endpoint_id,
+            health=health,
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"AdmissionPolicy(max_queue_depth={self.max_queue_depth}, "
+            f"max_queue_per_worker={self.max_queue_per_worker}, mode={self.mode!r})"
+        )
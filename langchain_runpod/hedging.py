@@ -0,0 +1,364 @@
+"""Hedged requests against jobs stuck in an endpoint's queue.
+
+Most of the tail latency of serverless jobs is queue delay: a job sits
+``IN_QUEUE`` while the endpoint scales up a cold worker. With a
+:class:`HedgePolicy`, a job that is still queued after a fixed delay, or after
+a percentile of the queue times observed recently, gets a duplicate submitted
+to a second endpoint (or the same one). Whichever copy completes first is
+used and the other one is cancelled right away.
+
+Hedges are paid from a budget that grows with the number of jobs, like retries
+(see :class:`~langchain_runpod.retry.RetryPolicy`), so ``max_ratio`` bounds the
+extra jobs, and cost, that hedging adds.
+"""
+
+import asyncio
+import logging
+import math
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+import httpx
+
+from langchain_runpod.codec import RequestTemplate
+from langchain_runpod.polling import PollingStrategy
+
+logger = logging.getLogger(__name__)
+
+# Statuses that mean the copy is not worth polling any more
+_FATAL_POLL_STATUSES = (401, 403, 404)
+
+
+class HedgePolicy:
+    """Decides when a queued job is hedged and how many hedges may be sent.
+
+    A policy keeps its budget and the queue times it observed, so it is
+    usually created per model instance; share an instance to share them.
+
+    Args:
+        delay: Seconds a job may sit ``IN_QUEUE`` before it is hedged. With
+            ``percentile``, used until ``min_samples`` queue times have been
+            observed.
+        percentile: Hedge jobs that have been queued longer than this
+            percentile (0-100) of the recently observed queue times, e.g. 95.
+        min_samples: Number of queue times observed before ``percentile`` is
+            used.
+        window: Number of recent queue times the percentile is taken over.
+        max_ratio: Hedges earned per job: 0.05 allows at most about one hedge
+            per twenty jobs.
+        budget_reserve: Hedges available before any job was run, and the
+            maximum the budget can grow to.
+    """
+
+    def __init__(
+        self,
+        delay: Optional[float] = None,
+        percentile: Optional[float] = None,
+        min_samples: int = 20,
+        window: int = 200,
+        max_ratio: float = 0.05,
+        budget_reserve: float = 1.0,
+    ) -> None:
+        if delay is None and percentile is None:
+            raise ValueError("HedgePolicy needs a delay, a percentile or both.")
+        if percentile is not None and not 0 < percentile < 100:
+            raise ValueError("percentile must be between 0 and 100.")
+        if max_ratio < 0:
+            raise ValueError("max_ratio must not be negative.")
+        self.delay = delay
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.max_ratio = max_ratio
+        self.budget_reserve = budget_reserve
+        self._budget = budget_reserve
+        self._queue_times: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.jobs = 0
+        """Number of jobs waited for under this policy."""
+        self.hedges_sent = 0
+        """Number of duplicate jobs submitted."""
+        self.hedges_won = 0
+        """Number of duplicates that completed before the job they hedged."""
+
+    @property
+    def budget(self) -> float:
+        """Number of hedges currently available."""
+        return self._budget
+
+    def threshold(self) -> Optional[float]:
+        """Seconds after which a queued job is hedged; None while unknown."""
+        if self.percentile is not None:
+            with self._lock:
+                samples = sorted(self._queue_times)
+            if len(samples) >= self.min_samples:
+                rank = max(1, math.ceil(self.percentile / 100 * len(samples)))
+                return samples[rank - 1]
+        return self.delay
+
+    def observe_queue_time(self, seconds: float) -> None:
+        """Record how long a job waited in the queue."""
+        with self._lock:
+            self._queue_times.append(seconds)
+
+    def on_job(self) -> None:
+        """Earn budget for a job that is being waited for."""
+        with self._lock:
+            self.jobs += 1
+            self._budget = min(self.budget_reserve, self._budget + self.max_ratio)
+
+    def acquire_hedge(self) -> bool:
+        """Take one hedge from the budget; False if the budget is exhausted."""
+        with self._lock:
+            if self._budget < 1:
+                return False
+            self._budget -= 1
+            self.hedges_sent += 1
+            return True
+
+    def __repr__(self) -> str:
+        return (
+            f"HedgePolicy(delay={self.delay}, percentile={self.percentile}, "
+            f"max_ratio={self.max_ratio})"
+        )
+
+
+class _Copy:
+    """One of the jobs racing to complete the same payload."""
+
+    __slots__ = ("job_id", "template", "submitted", "status", "hedge")
+
+    def __init__(
+        self,
+        response: Dict[str, Any],
+        template: RequestTemplate,
+        submitted: float,
+        hedge: bool = False,
+    ) -> None:
+        self.job_id: str = response["id"]
+        self.template = template
+        self.submitted = submitted
+        self.status = response
+        self.hedge = hedge
+
+    @property
+    def queued(self) -> bool:
+        return self.status.get("status") == "IN_QUEUE"
+
+
+class _Race:
+    """State of a job and its hedge, shared by the sync and async wait loops."""
+
+    def __init__(self, policy: HedgePolicy, primary: _Copy) -> None:
+        self.policy = policy
+        self.primary = primary
+        self.running: List[_Copy] = [primary]
+        self.hedged = False
+        policy.on_job()
+
+    def next_delay(self, strategy: PollingStrategy, attempt: int) -> float:
+        """Delay before the next round, shortened to send the hedge on time."""
+        now = time.monotonic()
+        delay = strategy.get_delay(attempt, now - self.primary.submitted, self.primary.status)
+        if not self.hedged and self.primary.queued:
+            threshold = self.policy.threshold()
+            if threshold is not None:
+                delay = min(delay, max(0.0, self.primary.submitted + threshold - now))
+        return delay
+
+    def should_hedge(self) -> bool:
+        if self.hedged or not self.primary.queued or self.primary not in self.running:
+            return False
+        threshold = self.policy.threshold()
+        if threshold is None or time.monotonic() - self.primary.submitted < threshold:
+            return False
+        if not self.policy.acquire_hedge():
+            return False
+        self.hedged = True
+        logger.info(
+            "RunPod job %s still queued after %.1fs, submitting a hedge",
+            self.primary.job_id,
+            time.monotonic() - self.primary.submitted,
+        )
+        return True
+
+    def add_hedge(
+        self, response: Dict[str, Any], template: RequestTemplate, submitted: float
+    ) -> Optional[Dict[str, Any]]:
+        """Start racing a submitted hedge; returns its response if it already finished."""
+        if not response.get("id") or response.get("status") not in ("IN_QUEUE", "IN_PROGRESS"):
+            if response.get("status") == "COMPLETED":
+                self.policy.hedges_won += 1
+                return response
+            return None
+        self.running.append(_Copy(response, template, submitted, hedge=True))
+        return None
+
+    def update(self, copy: _Copy, status_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Record the status of a copy; returns the final response once decided."""
+        if copy.queued and status_data.get("status") != "IN_QUEUE":
+            self.policy.observe_queue_time(time.monotonic() - copy.submitted)
+        copy.status = status_data
+        status = status_data.get("status")
+        if status in ("IN_QUEUE", "IN_PROGRESS"):
+            return None
+        self.running.remove(copy)
+        if status == "COMPLETED":
+            if copy.hedge:
+                self.policy.hedges_won += 1
+            return status_data
+        if not self.running:
+            return status_data
+        logger.warning(
+            "RunPod job %s ended with status %s, waiting for its %s",
+            copy.job_id,
+            status,
+            "original" if copy.hedge else "hedge",
+        )
+        return None
+
+    def timeout_error(self, max_attempts: int) -> TimeoutError:
+        return TimeoutError(
+            f"RunPod job {self.primary.job_id} did not complete after {max_attempts} attempts."
+        )
+
+
+def _is_fatal(error: Exception) -> bool:
+    return (
+        isinstance(error, httpx.HTTPStatusError)
+        and error.response.status_code in _FATAL_POLL_STATUSES
+    )
+
+
+def wait_hedged(
+    policy: HedgePolicy,
+    submission: Dict[str, Any],
+    template: RequestTemplate,
+    submit_hedge: Callable[[], Tuple[Dict[str, Any], RequestTemplate]],
+    get_status: Callable[[str, RequestTemplate], Dict[str, Any]],
+    cancel: Callable[[str, RequestTemplate, bool], None],
+    strategy: PollingStrategy,
+    max_attempts: int,
+) -> Dict[str, Any]:
+    """Wait for a submitted job, hedging it if it stays queued too long.
+
+    Args:
+        policy: When to hedge and how many hedges may be sent.
+        submission: Response of the job submission.
+        template: Requests of the endpoint the job was submitted to.
+        submit_hedge: Submits the duplicate job and returns the submission
+            response and the requests of the endpoint it was submitted to.
+        get_status: Fetches the ``/status`` of a job.
+        cancel: Cancels a job; called for every copy that has not finished
+            when the wait ends, including on errors and interruptions, and
+            told whether the wait timed out.
+        strategy: Schedules the polls.
+        max_attempts: Maximum number of polling rounds.
+
+    Returns:
+        The response of the first copy that completed, or of the last one that
+        failed if none did.
+
+    Raises:
+        TimeoutError: If no copy finished within ``max_attempts`` rounds.
+    """
+    race = _Race(policy, _Copy(submission, template, time.monotonic()))
+    timed_out = False
+    try:
+        for attempt in range(max_attempts):
+            delay = race.next_delay(strategy, attempt)
+            if delay > 0:
+                time.sleep(delay)
+            if race.should_hedge():
+                submitted = time.monotonic()
+                try:
+                    response, hedge_template = submit_hedge()
+                except Exception as e:
+                    logger.warning("Failed to submit hedge of RunPod job %s: %s", race.primary.job_id, e)
+                else:
+                    result = race.add_hedge(response, hedge_template, submitted)
+                    if result is not None:
+                        return result
+            for copy in list(race.running):
+                try:
+                    status_data = get_status(copy.job_id, copy.template)
+                except Exception as e:
+                    if _is_fatal(e):
+                        raise
+                    logger.error("Error while polling job %s (attempt %s): %s", copy.job_id, attempt + 1, e)
+                    continue
+                result = race.update(copy, status_data)
+                if result is not None:
+                    if result.get("status") == "COMPLETED":
+                        strategy.observe(result)
+                    return result
+        timed_out = True
+        raise race.timeout_error(max_attempts)
+    finally:
+        for copy in race.running:
+            cancel(copy.job_id, copy.template, timed_out)
+
+
+async def await_hedged(
+    policy: HedgePolicy,
+    submission: Dict[str, Any],
+    template: RequestTemplate,
+    submit_hedge: Callable[[], Awaitable[Tuple[Dict[str, Any], RequestTemplate]]],
+    get_status: Callable[[str, RequestTemplate], Awaitable[Dict[str, Any]]],
+    cancel: Callable[[str, RequestTemplate, bool], Awaitable[None]],
+    strategy: PollingStrategy,
+    max_attempts: int,
+) -> Dict[str, Any]:
+    """Asynchronously wait for a submitted job, hedging it if it stays queued.
+
+    See :func:`wait_hedged`. The copies are polled concurrently.
+    """
+    race = _Race(policy, _Copy(submission, template, time.monotonic()))
+    timed_out = False
+    try:
+        for attempt in range(max_attempts):
+            delay = race.next_delay(strategy, attempt)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if race.should_hedge():
+                submitted = time.monotonic()
+                try:
+                    response, hedge_template = await submit_hedge()
+                except Exception as e:
+                    logger.warning("Failed to submit hedge of RunPod job %s: %s", race.primary.job_id, e)
+                else:
+                    result = race.add_hedge(response, hedge_template, submitted)
+                    if result is not None:
+                        return result
+            copies = list(race.running)
+            statuses = await asyncio.gather(
+                *(get_status(copy.job_id, copy.template) for copy in copies),
+                return_exceptions=True,
+            )
+            for copy, status_data in zip(copies, statuses):
+                if isinstance(status_data, BaseException):
+                    if not isinstance(status_data, Exception) or _is_fatal(status_data):
+                        raise status_data
+                    logger.error(
+                        "Error while polling job %s (async attempt %s): %s",
+                        copy.job_id,
+                        attempt + 1,
+                        status_data,
+                    )
+                    continue
+                result = race.update(copy, status_data)
+                if result is not None:
+                    if result.get("status") == "COMPLETED":
+                        strategy.observe(result)
+                    return result
+        timed_out = True
+        raise race.timeout_error(max_attempts)
+    finally:
+        if race.running:
+            # Shielded so that the cancel requests go out even if we are cancelled again
+            await asyncio.shield(
+                asyncio.gather(
+                    *(cancel(copy.job_id, copy.template, timed_out) for copy in race.running)
+                )
+            )
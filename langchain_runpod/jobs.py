@@ -0,0 +1,88 @@
+"""Book-keeping of the RunPod jobs a model instance has in flight."""
+
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from langchain_runpod.codec import RequestTemplate
+
+TERMINAL_STATUSES = frozenset({"COMPLETED", "FAILED", "CANCELLED", "TIMED_OUT"})
+"""Job statuses after which a job no longer occupies a worker."""
+
+
+class JobTracker:
+    """Thread-safe set of the jobs submitted by one model instance that have not
+    reached a terminal status yet.
+
+    Used to cancel or drain outstanding jobs on shutdown. Each job keeps the
+    request template of the endpoint it was submitted to, which may not be the
+    instance's own endpoint, e.g. for hedges.
+
+    Args:
+        on_finish: Called with the outcome of every job that leaves the set:
+            its terminal status, ``"TIMED_OUT"`` if the instance gave up on it,
+            or None if it was cancelled or forgotten for another reason. Jobs
+            that are already finished when submitted are reported as well.
+            The second argument is the job's request template, if known.
+    """
+
+    def __init__(
+        self,
+        on_finish: Optional[
+            Callable[[Optional[str], Optional[RequestTemplate]], None]
+        ] = None,
+    ) -> None:
+        self._jobs: Dict[str, Optional[RequestTemplate]] = {}
+        self._lock = threading.Lock()
+        self.on_finish = on_finish
+
+    @property
+    def job_ids(self) -> List[str]:
+        """The ids of all in-flight jobs, oldest first."""
+        with self._lock:
+            return list(self._jobs)
+
+    def track(
+        self, response: Dict[str, Any], template: Optional[RequestTemplate] = None
+    ) -> None:
+        """Start tracking the job of a submission response if it is still running.
+
+        ``template`` is the request template the job was submitted with.
+        """
+        job_id = response.get("id")
+        status = response.get("status")
+        if job_id and status not in TERMINAL_STATUSES:
+            with self._lock:
+                self._jobs[job_id] = template
+        elif status in TERMINAL_STATUSES and self.on_finish is not None:
+            self.on_finish(status, template)
+
+    def template(self, job_id: str) -> Optional[RequestTemplate]:
+        """The request template an in-flight job was submitted with, if known."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def update(self, job_id: str, status: Optional[str]) -> None:
+        """Stop tracking a job once it reports a terminal status."""
+        if status in TERMINAL_STATUSES:
+            self._finish(job_id, status)
+
+    def time_out(self, job_id: str) -> None:
+        """Stop tracking a job the instance gave up waiting for."""
+        self._finish(job_id, "TIMED_OUT")
+
+    def discard(self, job_id: str) -> None:
+        """Stop tracking a job."""
+        self._finish(job_id, None)
+
+    def _finish(self, job_id: str, outcome: Optional[str]) -> None:
+        with self._lock:
+            tracked = job_id in self._jobs
+            template = self._jobs.pop(job_id, None)
+        if tracked and self.on_finish is not None:
+            self.on_finish(outcome, template)
+
+    def __contains__(self, job_id: object) -> bool:
+        return job_id in self._jobs
+
+    def __len__(self) -> int:
+        return len(self._jobs)
@@ -5,7 +5,9 @@ import logging
 import os
 import time
 import asyncio
-from typing import Any, Dict, List, Optional, Union, Iterator, AsyncIterator
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, AsyncIterator, Dict, Iterator, List, Literal, Optional, Tuple, Union
 
 import httpx
 from langchain_core.callbacks import (
@@ -13,22 +15,37 @@ from langchain_core.callbacks import (
     CallbackManagerForLLMRun,
 )
 from langchain_core.language_models.llms import LLM
-from langchain_core.outputs import GenerationChunk
+from langchain_core.outputs import Generation, GenerationChunk, LLMResult
 from pydantic import Field, PrivateAttr, model_validator
 
-logger = logging.getLogger(__name__)
-
+from langchain_runpod.cache import ResponseCache
+from langchain_runpod.circuit_breaker import CircuitBreaker
+from langchain_runpod.clients import ClientManager
+from langchain_runpod.codec import RequestTemplate, decode_response
+from langchain_runpod.endpoint import EndpointMixin
+from langchain_runpod.exceptions import EndpointUnavailableError, RunPodAPIError
+from langchain_runpod.extractors import (
+    OutputExtractorRegistry,
+    default_extractors,
+    find_usage,
+)
+from langchain_runpod.hedging import HedgePolicy
+from langchain_runpod.health import AdmissionPolicy
+from langchain_runpod.jobs import JobTracker
+from langchain_runpod.logs import loggable
+from langchain_runpod.openai_compat import choices_by_prompt, openai_body
+from langchain_runpod.polling import PollingStrategy
+from langchain_runpod.retry import RetryCounter, RetryPolicy, track_retries
+from langchain_runpod.singleflight import FlightAbandoned, SingleFlight
 
-class RunPodAPIError(Exception):
-    """Custom exception for RunPod API errors."""
-    pass
+logger = logging.getLogger(__name__)
 
 
-class RunPod(LLM):
+class RunPod(EndpointMixin, LLM):
     """LLM model wrapper for RunPod API.
 
     Supports both synchronous and asynchronous generation, as well as
-    (simulated) streaming.
+    token streaming through RunPod's ``/stream`` endpoint.
 
     To use, you should have the ``langchain-runpod`` package installed, and the
     environment variable ``RUNPOD_API_KEY`` set with your API key, or pass it
@@ -80,6 +97,9 @@ class RunPod(LLM):
     
     timeout: Optional[int] = None
     """Timeout for requests in seconds."""
+
+    max_retries: int = 2
+    """Maximum number of retries of a request that failed transiently."""
     
     streaming: bool = False
     """Whether to stream the results."""
@@ -89,9 +109,128 @@ class RunPod(LLM):
     
     max_polling_attempts: int = 120
     """Maximum number of polling attempts for async jobs."""
+
+    stream_poll_interval: float = 0.2
+    """How long to wait before polling ``/stream`` again when no new output arrived."""
+
+    polling_strategy: Optional[PollingStrategy] = None
+    """Strategy that schedules ``/status`` polls. Defaults to polling every
+    ``poll_interval`` seconds; see ``AdaptivePollingStrategy`` for backoff."""
+
+    shared_poller: bool = False
+    """Wait for async jobs through one background poller per endpoint and event loop,
+    shared by all concurrent calls, instead of one polling loop per call. Only
+    applies with ``share_http_client``."""
+
+    max_concurrent_polls: int = 32
+    """Maximum number of concurrent ``/status`` requests made by the shared poller."""
+
+    use_runsync: bool = False
+    """Submit jobs to ``/runsync`` and only poll ``/status`` if the job outlives the
+    sync window. Make sure ``timeout`` is long enough to cover that window."""
+
+    http2: bool = False
+    """Use HTTP/2 multiplexing for API requests. Requires ``pip install httpx[http2]``."""
+
+    max_connections: Optional[int] = 100
+    """Maximum number of concurrent connections in the HTTP connection pool."""
+
+    max_keepalive_connections: Optional[int] = 20
+    """Maximum number of idle connections kept alive in the HTTP connection pool."""
+
+    keepalive_expiry: Optional[float] = 5.0
+    """How long an idle keep-alive connection is kept open, in seconds."""
+
+    connect_timeout: Optional[float] = None
+    """Timeout for establishing a connection in seconds. Defaults to ``timeout``."""
+
+    pool_timeout: Optional[float] = None
+    """Timeout for acquiring a pooled connection in seconds. Defaults to ``timeout``."""
+
+    share_http_client: bool = True
+    """Reuse the process-wide connection pool shared by all instances with the same
+    API base, API key, timeouts and pool settings."""
+
+    rate_limit: Optional[float] = None
+    """Maximum number of requests per second to this endpoint, shared by all
+    instances targeting it. Even when None, requests slow down after the API
+    answers 429 and honour its ``Retry-After`` header."""
+
+    max_rate_limit_retries: int = 5
+    """How many times a request answered with 429 is sent again after waiting."""
+
+    retry_policy: Optional[RetryPolicy] = None
+    """Policy for retrying transient failures (connection errors, 5xx). Defaults
+    to exponential backoff with jitter, ``max_retries`` retries per request and
+    a retry budget per instance."""
+
+    max_concurrency: int = 16
+    """Maximum number of jobs submitted concurrently when generating for several
+    prompts at once (``generate``/``batch``)."""
+
+    response_cache: Optional[ResponseCache] = None
+    """Cache of finished job responses, keyed on the endpoint and the complete
+    ``/run`` payload, e.g. ``InMemoryResponseCache()``. Streaming calls are not
+    cached."""
+
+    coalesce_requests: bool = False
+    """Let concurrent calls with the same payload share one job: only the first
+    one submits and polls it, the others wait for its result or error.
+    Streaming calls are not coalesced."""
+
+    output_extractors: Optional[OutputExtractorRegistry] = None
+    """Rules that extract the generated text from job outputs. Defaults to the
+    registry shared by all instances; see ``register_output_extractor``."""
+
+    log_payloads: bool = False
+    """Whether prompts, outputs and responses are written to debug and warning
+    logs. They are left out by default, and truncated when logged."""
+
+    api_mode: Literal["runpod", "openai"] = "runpod"
+    """API used to generate. ``"runpod"`` submits jobs to ``/run`` and polls
+    ``/status``. ``"openai"`` calls the ``/openai/v1/completions`` route of vLLM
+    workers, which answers directly and streams tokens as server-sent events;
+    ``model_name`` must then be the name of the model served by the worker.
+    Response caching and coalescing only apply to the ``"runpod"`` mode."""
+
+    n: int = 1
+    """Number of completions generated per prompt in the ``"openai"`` API mode."""
+
+    hedge_policy: Optional[HedgePolicy] = None
+    """Opt-in hedging of jobs that sit ``IN_QUEUE``, e.g. while the endpoint
+    scales up: once a job has been queued longer than the policy's delay or
+    percentile, a duplicate is submitted to ``hedge_endpoint_id``, the first
+    copy to complete is used and the other one is cancelled. The policy's
+    ``max_ratio`` caps the extra jobs. Streaming calls are not hedged."""
+
+    hedge_endpoint_id: Optional[str] = None
+    """Endpoint hedges are submitted to. Defaults to ``endpoint_id``."""
+
+    health_ttl: float = 5.0
+    """Seconds a ``/health`` result is reused. Results are shared by all
+    instances targeting the endpoint, so ``health()`` and admission control
+    make at most one ``/health`` request per ``health_ttl``."""
+
+    admission_policy: Optional[AdmissionPolicy] = None
+    """Check the endpoint's queue depth and worker counts (via ``/health``)
+    before submitting a job, and hold the submission or fail fast with
+    ``EndpointOverloadedError`` while the queue is over the policy's limits."""
+
+    circuit_breaker: Union[bool, CircuitBreaker] = False
+    """Stop submitting jobs to an endpoint that keeps failing. True uses the
+    breaker shared by all instances targeting the endpoint (see
+    ``get_circuit_breaker``); a ``CircuitBreaker`` is used as given. While the
+    circuit is open, calls raise ``CircuitOpenError`` without submitting a
+    job. Failed and timed-out jobs, and submissions that fail with a server
+    or connection error, count as failures. Only the ``"runpod"`` API mode
+    is guarded."""
     
-    _client: httpx.Client = PrivateAttr()
-    _async_client: Optional[httpx.AsyncClient] = PrivateAttr(default=None)
+    _clients: ClientManager = PrivateAttr()
+    _retry_policy: RetryPolicy = PrivateAttr()
+    _jobs: JobTracker = PrivateAttr(default_factory=JobTracker)
+    _flights: SingleFlight = PrivateAttr(default_factory=SingleFlight)
+    _template: Optional[RequestTemplate] = PrivateAttr(default=None)
+    _template_key: Optional[Tuple[Any, ...]] = PrivateAttr(default=None)
     
     @model_validator(mode='before')
     @classmethod
@@ -117,11 +256,14 @@ class RunPod(LLM):
     def __init__(self, **kwargs: Any) -> None:
         """Initialize the RunPod instance."""
         super().__init__(**kwargs)
-        self._client = httpx.Client(timeout=self.timeout or 60.0)
-        # Initialize async client if not already done (e.g., in a subclass)
-        if self._async_client is None:
-            self._async_client = httpx.AsyncClient(timeout=self.timeout or 60.0)
+        self._init_endpoint()
     
+    def __enter__(self) -> "RunPod":
+        return self
+
+    async def __aenter__(self) -> "RunPod":
+        return self
+
     @property
     def _llm_type(self) -> str:
         """Return type of llm."""
@@ -143,6 +285,10 @@ class RunPod(LLM):
             "streaming": self.streaming,
             "poll_interval": self.poll_interval,
             "max_polling_attempts": self.max_polling_attempts,
+            "stream_poll_interval": self.stream_poll_interval,
+            "use_runsync": self.use_runsync,
+            "api_mode": self.api_mode,
+            "n": self.n,
         }
     
     def _get_params(self, stop: Optional[List[str]] = None) -> Dict[str, Any]:
@@ -176,91 +322,72 @@ class RunPod(LLM):
             "ls_max_tokens": self.max_tokens,
             "ls_stop": stop or self.stop,
         }
-    
+
+    def _build_payload(
+        self, prompt: str, stop: Optional[List[str]] = None, **kwargs: Any
+    ) -> Dict[str, Any]:
+        """Build the request body for the RunPod ``/run`` endpoint."""
+        if stop and not self.stop:
+            params = self._get_params(stop)
+        else:
+            # Reuse the precomputed params so that only the prompt is encoded
+            params = self._request_template().params
+        payload = {
+            "input": {
+                "prompt": prompt,
+                **params,
+            }
+        }
+
+        # Add any additional kwargs to the payload
+        for key, value in kwargs.items():
+            if key not in payload["input"]:
+                payload["input"][key] = value
+
+        return payload
+
     def _process_response(self, response: Dict[str, Any]) -> str:
         """Process the RunPod API response and extract the generated text.
         Handles different potential response structures and statuses.
         """
-        logger.debug(f"Raw RunPod response: {response}")
+        logger.debug("Raw RunPod response: %s", loggable(response, self.log_payloads))
 
         status = response.get("status")
         if status != "COMPLETED":
             error_detail = response.get("error", "No error details provided.")
-            logger.error(f"RunPod job failed or did not complete. Status: {status}, Error: {error_detail}")
+            logger.error("RunPod job failed or did not complete. Status: %s, Error: %s", status, error_detail)
             # Consider raising a more specific exception type
             raise ValueError(f"RunPod job ended with status {status}. Error: {error_detail}")
 
         output = response.get("output")
 
         if output is None:
-            logger.warning(f"No 'output' field found in RunPod response: {response}")
+            logger.warning(
+                "No 'output' field found in RunPod response: %s",
+                loggable(response, self.log_payloads),
+            )
             # Fallback: attempt to return the whole response if no output
             return str(response)
 
-        # --- Process different output structures --- 
+        return self._parse_output(output)
 
-        # 1. Output is a simple string
-        if isinstance(output, str):
-            return output
+    def _parse_output(self, output: Any, stream: bool = False) -> str:
+        """Extract the generated text from the ``output`` field of a RunPod job.
 
-        # 2. Output is a dictionary
-        if isinstance(output, dict):
-            # Common keys containing the main text output
-            common_keys = ["text", "content", "message", "generated_text", "response"]
-            for key in common_keys:
-                if isinstance(output.get(key), str):
-                    return output[key]
-            
-            # Handle nested structure like {'choices': [{'text': '...', ...}]} or similar
-            if isinstance(output.get("choices"), list) and output["choices"]:
-                first_choice = output["choices"][0]
-                if isinstance(first_choice, dict):
-                    for key in ["text", "message", "content"]:
-                        if isinstance(first_choice.get(key), str):
-                             return first_choice[key]
-                        # Deeper nesting like message: {content: '...'} 
-                        if isinstance(first_choice.get(key), dict) and isinstance(first_choice[key].get("content"), str):
-                            return first_choice[key]["content"]
-            
-            # Handle Mistral specific output format
-            if "outputs" in output and isinstance(output["outputs"], list) and output["outputs"]:
-                first_output = output["outputs"][0]
-                if isinstance(first_output, dict) and isinstance(first_output.get("text"), str):
-                     return first_output["text"]
-                     
-            # Handle specific format from integration tests: {'choices': [{'tokens': ['...', '...']}]}
-            if isinstance(output.get("choices"), list) and output["choices"]:
-                first_choice = output["choices"][0]
-                if isinstance(first_choice, dict) and isinstance(first_choice.get("tokens"), list):
-                    return "".join(map(str, first_choice["tokens"]))
-
-            # Fallback for unrecognized dictionary structure
-            logger.warning(f"Unrecognized dictionary structure in 'output': {output}")
-            return str(output)
-
-        # 3. Output is a list
-        if isinstance(output, list):
-             # Specific case from integration tests: [{'choices': [{'tokens': [...]}]}]
-            if output and isinstance(output[0], dict) and isinstance(output[0].get("choices"), list):
-                first_item_choices = output[0]["choices"]
-                if first_item_choices and isinstance(first_item_choices[0], dict):
-                    tokens = first_item_choices[0].get("tokens")
-                    if isinstance(tokens, list):
-                        return "".join(map(str, tokens))
-                    elif isinstance(tokens, str): # Handle if 'tokens' is just a string
-                         return tokens
-                         
-            # If it's a list of strings, join them
-            if all(isinstance(item, str) for item in output):
-                return "".join(output)
-            
-            # Fallback for unrecognized list structure
-            logger.warning(f"Unrecognized list structure in 'output': {output}")
-            return str(output) # Convert the list to string as a fallback
+        Used both for final job outputs and for the partial outputs returned by
+        the ``/stream`` endpoint. The shape is recognized by ``output_extractors``,
+        which remembers the matching rule of this endpoint for later outputs.
+        """
+        registry = self.output_extractors or default_extractors
+        key = (self.api_base, self.endpoint_id, "stream" if stream else "output")
+        text = registry.extract(output, key)
+        if text is not None:
+            return text
 
-        # --- Ultimate Fallback --- 
-        logger.warning(f"Unrecognized type for 'output' field: {type(output)}. Response: {response}")
-        return str(output) # Return string representation if type is unexpected
+        logger.warning(
+            "Unrecognized structure in 'output': %s", loggable(output, self.log_payloads)
+        )
+        return str(output) # Return string representation if the shape is unknown
     
     def _call(
         self,
@@ -283,50 +410,18 @@ class RunPod(LLM):
         Raises:
             RunPodAPIError: If the API request fails or the job status indicates an error.
         """
-        # Prepare request payload
-        payload = {
-            "input": {
-                "prompt": prompt,
-                **self._get_params(stop),
-            }
-        }
-        
-        # Add any additional kwargs to the payload
-        for key, value in kwargs.items():
-            if key not in payload["input"]:
-                payload["input"][key] = value
-        
-        # API request
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-        }
-        
+        if self.api_mode == "openai":
+            return self._openai_generate([prompt], stop, **kwargs).generations[0][0].text
+
+        payload = self._build_payload(prompt, stop, **kwargs)
+        cached = self._lookup_response(payload)
+        if cached is not None:
+            return self._process_response(cached)
+
         try:
-            url = f"{self.api_base}/{self.endpoint_id}/run"
-            response = self._client.post(
-                url,
-                headers=headers,
-                json=payload,
-                timeout=self.timeout or 60.0,
+            response_json = self._coalesce(
+                payload, lambda: self._complete_job(payload, run_manager)
             )
-            response.raise_for_status()
-            
-            # Parse and process the response
-            response_json = response.json()
-
-            # --- Handle Async Job Polling --- 
-            job_id = response_json.get("id")
-            status = response_json.get("status")
-
-            if job_id and status in ["IN_QUEUE", "IN_PROGRESS"]:
-                logger.info(f"RunPod job {job_id} is async, polling for results...")
-                if run_manager:
-                    # Use on_llm_new_token to provide feedback during polling
-                    run_manager.on_llm_new_token(f"\n[RunPod job {job_id} status: {status}]", verbose=True)
-                response_json = self._poll_for_job_status(job_id, run_manager)
-            # --- End Polling Handling ---
-
             return self._process_response(response_json)
             
         except httpx.TimeoutException as e:
@@ -334,21 +429,49 @@ class RunPod(LLM):
         except httpx.HTTPStatusError as e:
             # Log the response body if available for debugging
             error_body = e.response.text
-            logger.error(f"RunPod API returned an error: {e.response.status_code} - {error_body}")
+            logger.error("RunPod API returned an error: %s - %s", e.response.status_code, loggable(error_body))
             raise RunPodAPIError(
                 f"RunPod API request failed with status {e.response.status_code}: {error_body}"
             ) from e
         except httpx.RequestError as e:
             raise RunPodAPIError(f"Error during RunPod API request: {e}") from e
+        except EndpointUnavailableError:
+            raise
         except json.JSONDecodeError as e:
             # Handle cases where the response is not valid JSON
-            logger.error(f"Failed to decode JSON response from RunPod: {response.text if response else 'No response'}")
+            logger.error("Failed to decode JSON response from RunPod: %s", e)
             raise RunPodAPIError(f"Invalid JSON response from RunPod API: {e}") from e
         except Exception as e:
             # Catch-all for unexpected errors during processing
-            logger.exception(f"An unexpected error occurred processing RunPod response: {e}")
+            logger.exception("An unexpected error occurred processing RunPod response: %s", e)
             raise RunPodAPIError(f"Unexpected error processing RunPod response: {e}") from e
     
+    def _complete_job(
+        self,
+        payload: Dict[str, Any],
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+    ) -> Dict[str, Any]:
+        """Submit a job, poll it until it has finished and return the final response."""
+        response_json = self._submit_job(payload)
+
+        # --- Handle Async Job Polling --- 
+        job_id = response_json.get("id")
+        status = response_json.get("status")
+
+        if job_id and status in ["IN_QUEUE", "IN_PROGRESS"]:
+            logger.info("RunPod job %s is async, polling for results...", job_id)
+            if run_manager:
+                # Use on_llm_new_token to provide feedback during polling
+                run_manager.on_llm_new_token(f"\n[RunPod job {job_id} status: {status}]", verbose=True)
+            if self.hedge_policy is not None:
+                response_json = self._wait_hedged(payload, response_json)
+            else:
+                response_json = self._poll_for_job_status(job_id, run_manager)
+        # --- End Polling Handling ---
+
+        self._cache_response(payload, response_json)
+        return response_json
+
     def _stream(
         self,
         prompt: str,
@@ -357,9 +480,10 @@ class RunPod(LLM):
         **kwargs: Any,
     ) -> Iterator[GenerationChunk]:
         """Stream the output of the model.
-        
-        Note: This currently simulates streaming by first getting the full response
-        synchronously and then yielding chunks.
+
+        Submits the job to ``/run`` and then consumes the partial outputs from
+        the ``/stream/{job_id}`` endpoint as the worker produces them. The last
+        chunk carries the final job status and usage in ``generation_info``.
 
         Args:
             prompt: The prompt to send to the model.
@@ -371,21 +495,99 @@ class RunPod(LLM):
             GenerationChunk: Chunks of the generated text.
 
         Raises:
-            RunPodAPIError: If the initial API request fails.
+            RunPodAPIError: If an API request fails or the job ends with an error.
+            TimeoutError: If the job stops producing output for too long.
         """
-        # For simplicity, we'll implement a basic simulated streaming
-        # In a real implementation, you'd connect to RunPod's streaming endpoint
-        
-        full_response = self._call(prompt, stop, run_manager, **kwargs)
-        
-        # Simulate streaming by yielding one character at a time
-        for char in full_response:
-            chunk = GenerationChunk(text=char)
-            
-            if run_manager:
-                run_manager.on_llm_new_token(char)
-                
-            yield chunk 
+        if self.api_mode == "openai":
+            yield from self._openai_stream_chunks(prompt, stop, run_manager, **kwargs)
+            return
+
+        payload = self._build_payload(prompt, stop, **kwargs)
+        url = self._request_template().run_url
+
+        try:
+            response_json = self._submit_job(payload, url)
+        except httpx.HTTPStatusError as e:
+            raise RunPodAPIError(
+                f"RunPod API request failed with status {e.response.status_code}: {e.response.text}"
+            ) from e
+        except httpx.HTTPError as e:
+            raise RunPodAPIError(f"Error during RunPod API request: {e}") from e
+
+        job_id = response_json.get("id")
+        if not job_id or response_json.get("status") not in ["IN_QUEUE", "IN_PROGRESS"]:
+            # The job finished (or failed) without going through the queue
+            chunk = self._final_stream_chunk(response_json, None, include_output=True)
+            if run_manager and chunk.text:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+            return
+
+        stream_url = self._request_template().stream_url + job_id
+        idle_timeout = self.max_polling_attempts * self.poll_interval
+        deadline = time.monotonic() + idle_timeout
+        usage = None
+        has_output = False
+
+        try:
+            while True:
+                try:
+                    stream_response = self._send(
+                        lambda: self._get_client().get(stream_url, headers=self._get_headers())
+                    )
+                    stream_response.raise_for_status()
+                    stream_data = decode_response(stream_response)
+                except httpx.HTTPStatusError as e:
+                    raise RunPodAPIError(
+                        f"HTTP error {e.response.status_code} while streaming job {job_id}: {e.response.text}"
+                    ) from e
+                except httpx.HTTPError as e:
+                    raise RunPodAPIError(f"Error while streaming job {job_id}: {e}") from e
+
+                chunks, batch_usage = self._parse_stream_batch(stream_data)
+                usage = batch_usage or usage
+                for chunk in chunks:
+                    if run_manager:
+                        run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+                    yield chunk
+                if chunks:
+                    has_output = True
+                    deadline = time.monotonic() + idle_timeout
+
+                status = stream_data.get("status")
+                self._jobs.update(job_id, status)
+                if status == "COMPLETED":
+                    break
+                if status in ["FAILED", "CANCELLED", "TIMED_OUT"]:
+                    error_detail = stream_data.get("error", "No error details provided.")
+                    raise RunPodAPIError(
+                        f"RunPod job {job_id} ended with status {status}. Error: {error_detail}"
+                    )
+
+                if not chunks:
+                    if time.monotonic() > deadline:
+                        self._cancel_job(job_id, timed_out=True)
+                        raise TimeoutError(
+                            f"RunPod job {job_id} produced no output for {idle_timeout} seconds."
+                        )
+                    time.sleep(self.stream_poll_interval)
+        except BaseException:
+            # The stream failed, or the consumer stopped early or was
+            # interrupted: free the worker
+            if job_id in self._jobs:
+                self._cancel_job(job_id)
+            raise
+
+        if not has_output:
+            # Handlers that are not generators only expose their result via /status
+            status_data = self._poll_for_job_status(job_id)
+            chunk = self._final_stream_chunk(status_data, usage, include_output=True)
+            if run_manager and chunk.text:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+            return
+
+        yield self._final_stream_chunk(stream_data, usage)
 
     async def _acall(
         self,
@@ -408,72 +610,347 @@ class RunPod(LLM):
         Raises:
             RunPodAPIError: If the API request fails or the job status indicates an error.
         """
-        # Prepare request payload
-        payload = {
-            "input": {
-                "prompt": prompt,
-                **self._get_params(stop),
-            }
-        }
+        if self.api_mode == "openai":
+            result = await self._aopenai_generate([prompt], stop, **kwargs)
+            return result.generations[0][0].text
 
-        # Add any additional kwargs to the payload
-        for key, value in kwargs.items():
-            if key not in payload["input"]:
-                payload["input"][key] = value
-
-        # API request
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-        }
+        payload = self._build_payload(prompt, stop, **kwargs)
+        cached = await self._alookup_response(payload)
+        if cached is not None:
+            return self._process_response(cached)
 
         try:
-            url = f"{self.api_base}/{self.endpoint_id}/run"
-            if self._async_client is None:
-                # Should ideally be initialized in __init__
-                self._async_client = httpx.AsyncClient(timeout=self.timeout or 60.0)
-
-            response = await self._async_client.post(
-                url,
-                headers=headers,
-                json=payload,
-                timeout=self.timeout or 60.0,
+            response_json = await self._acoalesce(
+                payload, lambda: self._acomplete_job(payload, run_manager)
             )
-            response.raise_for_status()
-
-            # Parse and process the response
-            response_json = response.json()
-
-            # --- Handle Async Job Polling --- 
-            job_id = response_json.get("id")
-            status = response_json.get("status")
-
-            if job_id and status in ["IN_QUEUE", "IN_PROGRESS"]:
-                logger.info(f"RunPod job {job_id} is async, polling for results...")
-                if run_manager:
-                    await run_manager.on_llm_new_token(f"\n[RunPod job {job_id} status: {status}]", verbose=True)
-                response_json = await self._apoll_for_job_status(job_id, run_manager)
-            # --- End Polling Handling ---
-
             return self._process_response(response_json)
 
         except httpx.TimeoutException as e:
             raise RunPodAPIError(f"RunPod API async request timed out: {e}") from e
         except httpx.HTTPStatusError as e:
             error_body = e.response.text
-            logger.error(f"RunPod API (async) returned an error: {e.response.status_code} - {error_body}")
+            logger.error("RunPod API (async) returned an error: %s - %s", e.response.status_code, loggable(error_body))
             raise RunPodAPIError(
                 f"RunPod API async request failed with status {e.response.status_code}: {error_body}"
             ) from e
         except httpx.RequestError as e:
              raise RunPodAPIError(f"Error during RunPod API async request: {e}") from e
+        except EndpointUnavailableError:
+            raise
         except json.JSONDecodeError as e:
-             logger.error(f"Failed to decode JSON async response from RunPod: {response.text if response else 'No response'}")
+             logger.error("Failed to decode JSON async response from RunPod: %s", e)
              raise RunPodAPIError(f"Invalid JSON response from RunPod API (async): {e}") from e
         except Exception as e:
-             logger.exception(f"An unexpected error occurred processing async RunPod response: {e}")
+             logger.exception("An unexpected error occurred processing async RunPod response: %s", e)
              raise RunPodAPIError(f"Unexpected error processing async RunPod response: {e}") from e
 
+    async def _acomplete_job(
+        self,
+        payload: Dict[str, Any],
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+    ) -> Dict[str, Any]:
+        """Asynchronously submit a job, poll it until it has finished and return the final response."""
+        response_json = await self._asubmit_job(payload)
+
+        # --- Handle Async Job Polling --- 
+        job_id = response_json.get("id")
+        status = response_json.get("status")
+
+        if job_id and status in ["IN_QUEUE", "IN_PROGRESS"]:
+            logger.info("RunPod job %s is async, polling for results...", job_id)
+            if run_manager:
+                await run_manager.on_llm_new_token(f"\n[RunPod job {job_id} status: {status}]", verbose=True)
+            if self.hedge_policy is not None:
+                response_json = await self._await_hedged(payload, response_json)
+            else:
+                response_json = await self._apoll_for_job_status(job_id, run_manager)
+        # --- End Polling Handling ---
+
+        await self._acache_response(payload, response_json)
+        return response_json
+
+    def _generate(
+        self,
+        prompts: List[str],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> LLMResult:
+        """Run the prompts as concurrent RunPod jobs.
+
+        All jobs are submitted up front, at most ``max_concurrency`` requests at
+        a time, and then polled together in rounds instead of one after another.
+        Generations are returned in input order, with the job id, status, timings,
+        usage and number of request retries in ``generation_info``.
+        Prompts whose response is in ``response_cache`` are not submitted.
+
+        Raises:
+            RunPodAPIError: If a request fails or a job ends with an error.
+            TimeoutError: If some jobs are still running after
+                ``max_polling_attempts`` polling rounds.
+        """
+        if self.api_mode == "openai":
+            return self._openai_generate(prompts, stop, **kwargs)
+
+        payloads = [self._build_payload(prompt, stop, **kwargs) for prompt in prompts]
+        counters = [RetryCounter() for _ in payloads]
+        responses = [self._lookup_response(payload) for payload in payloads]
+        misses = [index for index, response in enumerate(responses) if response is None]
+        if misses:
+            run_jobs = (
+                self._run_coalesced_batch_jobs if self.coalesce_requests else self._run_batch_jobs
+            )
+            finished = run_jobs(
+                [payloads[index] for index in misses], [counters[index] for index in misses]
+            )
+            for index, response in zip(misses, finished):
+                responses[index] = response
+        return LLMResult(
+            generations=[
+                [self._generation_from_response(response, counter.count)]
+                for response, counter in zip(responses, counters)
+            ]
+        )
+
+    async def _agenerate(
+        self,
+        prompts: List[str],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> LLMResult:
+        """Asynchronously run the prompts as concurrent RunPod jobs.
+
+        Submissions are bounded by ``max_concurrency``; the jobs are then polled
+        concurrently, through the shared per-endpoint poller if
+        ``shared_poller`` is set. Generations are returned in input order.
+
+        Raises:
+            RunPodAPIError: If a request fails or a job ends with an error.
+            TimeoutError: If a job is still running after ``max_polling_attempts``.
+        """
+        if self.api_mode == "openai":
+            return await self._aopenai_generate(prompts, stop, **kwargs)
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def complete_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+            async with semaphore:
+                response = await self._asubmit_batch_job(payload)
+            job_id = response.get("id")
+            if job_id and response.get("status") in ["IN_QUEUE", "IN_PROGRESS"]:
+                if self.hedge_policy is not None:
+                    response = await self._await_hedged(payload, response)
+                    await self._acache_response(payload, response)
+                    return response
+                response = await self._apoll_for_job_status(job_id)
+            await self._acache_response(payload, response)
+            return response
+
+        async def run_job(prompt: str) -> Generation:
+            payload = self._build_payload(prompt, stop, **kwargs)
+            cached = await self._alookup_response(payload)
+            if cached is not None:
+                return self._generation_from_response(cached, 0)
+            with track_retries() as retries:
+                response = await self._acoalesce(payload, lambda: complete_job(payload))
+            return self._generation_from_response(response, retries.count)
+
+        generations = await asyncio.gather(*(run_job(prompt) for prompt in prompts))
+        return LLMResult(generations=[[generation] for generation in generations])
+
+    def _run_batch_jobs(
+        self, payloads: List[Dict[str, Any]], counters: List[RetryCounter]
+    ) -> List[Dict[str, Any]]:
+        """Submit the jobs of a batch, wait for all of them and return their final responses."""
+        if not payloads:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(payloads))) as executor:
+            submitted = list(executor.map(self._submit_batch_job, payloads, counters))
+            if self.hedge_policy is not None:
+                responses = list(
+                    executor.map(self._wait_hedged_batch_job, payloads, submitted, counters)
+                )
+            else:
+                responses = self._wait_for_jobs(submitted, executor, counters)
+        for payload, response in zip(payloads, responses):
+            self._cache_response(payload, response)
+        return responses
+
+    def _run_coalesced_batch_jobs(
+        self, payloads: List[Dict[str, Any]], counters: List[RetryCounter]
+    ) -> List[Dict[str, Any]]:
+        """Run the jobs of a batch, sharing them with identical calls in flight.
+
+        Payloads that another caller, or an earlier prompt of the same batch, is
+        already running are waited for instead of being submitted again.
+        """
+        keys = [self._cache_key(payload) for payload in payloads]
+        claims = [self._flights.claim(key) for key in keys]
+        leading = [index for index, (_, leader) in enumerate(claims) if leader]
+        try:
+            finished = self._run_batch_jobs(
+                [payloads[index] for index in leading], [counters[index] for index in leading]
+            )
+        except Exception as e:
+            for index in leading:
+                self._flights.settle(keys[index], claims[index][0], error=e)
+            raise
+        except BaseException:
+            for index in leading:
+                self._flights.abandon(keys[index], claims[index][0])
+            raise
+        for index, response in zip(leading, finished):
+            self._flights.settle(keys[index], claims[index][0], result=response)
+
+        responses = []
+        for key, payload, counter, (flight, _) in zip(keys, payloads, counters, claims):
+            try:
+                responses.append(flight.wait())
+            except FlightAbandoned:
+                # The caller running this job was interrupted: run it ourselves
+                responses.append(
+                    self._flights.do(key, partial(self._run_batch_job, payload, counter))
+                )
+        return responses
+
+    def _run_batch_job(self, payload: Dict[str, Any], counter: RetryCounter) -> Dict[str, Any]:
+        """Run a single job through the batch machinery."""
+        return self._run_batch_jobs([payload], [counter])[0]
+
+    def _submit_batch_job(
+        self, payload: Dict[str, Any], counter: Optional[RetryCounter] = None
+    ) -> Dict[str, Any]:
+        """Submit one job of a batch, wrapping request errors in ``RunPodAPIError``."""
+        try:
+            with track_retries(counter):
+                return self._submit_job(payload)
+        except httpx.HTTPStatusError as e:
+            raise RunPodAPIError(
+                f"RunPod API request failed with status {e.response.status_code}: {e.response.text}"
+            ) from e
+        except (httpx.HTTPError, json.JSONDecodeError) as e:
+            raise RunPodAPIError(f"Error during RunPod API request: {e}") from e
+
+    async def _asubmit_batch_job(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Asynchronously submit one job of a batch."""
+        try:
+            return await self._asubmit_job(payload)
+        except httpx.HTTPStatusError as e:
+            raise RunPodAPIError(
+                f"RunPod API async request failed with status {e.response.status_code}: {e.response.text}"
+            ) from e
+        except (httpx.HTTPError, json.JSONDecodeError) as e:
+            raise RunPodAPIError(f"Error during RunPod API async request: {e}") from e
+
+    def _wait_for_jobs(
+        self,
+        responses: List[Dict[str, Any]],
+        executor: ThreadPoolExecutor,
+        counters: List[RetryCounter],
+    ) -> List[Dict[str, Any]]:
+        """Poll all queued jobs of a batch together until every one has finished.
+
+        Each round waits for the shortest delay any pending job asks for and then
+        fetches the status of all pending jobs in parallel.
+        """
+        results = list(responses)
+        pending: Dict[int, Optional[Dict[str, Any]]] = {}
+        job_ids: Dict[int, str] = {}
+        for index, response in enumerate(responses):
+            job_id = response.get("id")
+            if job_id and response.get("status") in ["IN_QUEUE", "IN_PROGRESS"]:
+                job_ids[index] = job_id
+                pending[index] = None
+
+        strategy = self._get_polling_strategy()
+        started = time.monotonic()
+        try:
+            for attempt in range(self.max_polling_attempts):
+                if not pending:
+                    break
+                elapsed = time.monotonic() - started
+                delay = min(
+                    strategy.get_delay(attempt, elapsed, status_data)
+                    for status_data in pending.values()
+                )
+                if delay > 0:
+                    time.sleep(delay)
+
+                indices = list(pending)
+                statuses = executor.map(
+                    self._poll_batch_job,
+                    [job_ids[i] for i in indices],
+                    [counters[i] for i in indices],
+                )
+                for index, status_data in zip(indices, statuses):
+                    if status_data is None:
+                        continue
+                    if status_data.get("status") in ["IN_QUEUE", "IN_PROGRESS"]:
+                        pending[index] = status_data
+                        continue
+                    if status_data.get("status") == "COMPLETED":
+                        strategy.observe(status_data)
+                    results[index] = status_data
+                    del pending[index]
+        except BaseException:
+            # e.g. a fatal poll error or an interruption: don't leave the rest running
+            for index in pending:
+                self._cancel_job(job_ids[index])
+            raise
+
+        if pending:
+            for index in pending:
+                self._cancel_job(job_ids[index], timed_out=True)
+            raise TimeoutError(
+                f"{len(pending)} RunPod jobs did not complete after "
+                f"{self.max_polling_attempts} attempts."
+            )
+        return results
+
+    def _wait_hedged_batch_job(
+        self, payload: Dict[str, Any], submission: Dict[str, Any], counter: RetryCounter
+    ) -> Dict[str, Any]:
+        """Wait for one job of a batch under ``hedge_policy``."""
+        if not submission.get("id") or submission.get("status") not in ["IN_QUEUE", "IN_PROGRESS"]:
+            return submission
+        try:
+            with track_retries(counter):
+                return self._wait_hedged(payload, submission)
+        except httpx.HTTPStatusError as e:
+            raise RunPodAPIError(
+                f"Fatal HTTP error {e.response.status_code} while polling job {submission['id']}"
+            ) from e
+
+    def _poll_batch_job(
+        self, job_id: str, counter: Optional[RetryCounter] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Fetch the status of one job of a batch; ``None`` on transient errors."""
+        try:
+            with track_retries(counter):
+                return self._get_job_status(job_id)
+        except httpx.HTTPStatusError as e:
+            logger.error("HTTP error while polling job %s: %s", job_id, e)
+            if e.response.status_code in [401, 403, 404]:
+                raise RunPodAPIError(
+                    f"Fatal HTTP error {e.response.status_code} while polling job {job_id}"
+                ) from e
+        except (httpx.HTTPError, json.JSONDecodeError) as e:
+            logger.error("Error while polling job %s: %s", job_id, e)
+        return None
+
+    def _generation_from_response(
+        self, response: Dict[str, Any], retries: Optional[int] = None
+    ) -> Generation:
+        """Turn the final response of a job into a ``Generation``."""
+        try:
+            text = self._process_response(response)
+        except ValueError as e:
+            raise RunPodAPIError(str(e)) from e
+        return Generation(
+            text=text, generation_info=self._get_generation_info(response, retries=retries)
+        )
+
     async def _astream(
         self,
         prompt: str,
@@ -483,8 +960,9 @@ class RunPod(LLM):
     ) -> AsyncIterator[GenerationChunk]:
         """Stream the output of the model asynchronously.
 
-        Note: This currently simulates streaming by first getting the full response
-        asynchronously and then yielding chunks.
+        Submits the job to ``/run`` and then consumes the partial outputs from
+        the ``/stream/{job_id}`` endpoint as the worker produces them. The last
+        chunk carries the final job status and usage in ``generation_info``.
 
         Args:
             prompt: The prompt to send to the model.
@@ -494,127 +972,412 @@ class RunPod(LLM):
 
         Yields:
             GenerationChunk: Chunks of the generated text.
-        
+
         Raises:
-            RunPodAPIError: If the initial API request fails.
+            RunPodAPIError: If an API request fails or the job ends with an error.
+            TimeoutError: If the job stops producing output for too long.
         """
-        # Simulate streaming by getting the full response first
-        full_response = await self._acall(prompt, stop, run_manager, **kwargs)
+        if self.api_mode == "openai":
+            async for chunk in self._aopenai_stream_chunks(prompt, stop, run_manager, **kwargs):
+                yield chunk
+            return
 
-        # Yield the response chunk by chunk (character by character)
-        for char in full_response:
-            chunk = GenerationChunk(text=char)
-            if run_manager:
-                await run_manager.on_llm_new_token(token=chunk.text, chunk=chunk)
-            yield chunk 
+        payload = self._build_payload(prompt, stop, **kwargs)
+        url = self._request_template().run_url
+
+        try:
+            response_json = await self._asubmit_job(payload, url)
+        except httpx.HTTPStatusError as e:
+            raise RunPodAPIError(
+                f"RunPod API async request failed with status {e.response.status_code}: {e.response.text}"
+            ) from e
+        except httpx.HTTPError as e:
+            raise RunPodAPIError(f"Error during RunPod API async request: {e}") from e
+
+        job_id = response_json.get("id")
+        if not job_id or response_json.get("status") not in ["IN_QUEUE", "IN_PROGRESS"]:
+            # The job finished (or failed) without going through the queue
+            chunk = self._final_stream_chunk(response_json, None, include_output=True)
+            if run_manager and chunk.text:
+                await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+            return
+
+        stream_url = self._request_template().stream_url + job_id
+        idle_timeout = self.max_polling_attempts * self.poll_interval
+        deadline = time.monotonic() + idle_timeout
+        usage = None
+        has_output = False
+
+        try:
+            while True:
+                try:
+                    stream_response = await self._asend(
+                        lambda: self._get_async_client().get(stream_url, headers=self._get_headers())
+                    )
+                    stream_response.raise_for_status()
+                    stream_data = decode_response(stream_response)
+                except httpx.HTTPStatusError as e:
+                    raise RunPodAPIError(
+                        f"HTTP error {e.response.status_code} while streaming job {job_id} (async): {e.response.text}"
+                    ) from e
+                except httpx.HTTPError as e:
+                    raise RunPodAPIError(f"Error while streaming job {job_id} (async): {e}") from e
+
+                chunks, batch_usage = self._parse_stream_batch(stream_data)
+                usage = batch_usage or usage
+                for chunk in chunks:
+                    if run_manager:
+                        await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+                    yield chunk
+                if chunks:
+                    has_output = True
+                    deadline = time.monotonic() + idle_timeout
+
+                status = stream_data.get("status")
+                self._jobs.update(job_id, status)
+                if status == "COMPLETED":
+                    break
+                if status in ["FAILED", "CANCELLED", "TIMED_OUT"]:
+                    error_detail = stream_data.get("error", "No error details provided.")
+                    raise RunPodAPIError(
+                        f"RunPod job {job_id} ended with status {status}. Error: {error_detail}"
+                    )
+
+                if not chunks:
+                    if time.monotonic() > deadline:
+                        await self._acancel_job(job_id, timed_out=True)
+                        raise TimeoutError(
+                            f"RunPod job {job_id} produced no output for {idle_timeout} seconds."
+                        )
+                    await asyncio.sleep(self.stream_poll_interval)
+        except BaseException:
+            # Shielded so that the cancel request goes out even if we are cancelled again
+            if job_id in self._jobs:
+                await asyncio.shield(self._acancel_job(job_id))
+            raise
+
+        if not has_output:
+            # Handlers that are not generators only expose their result via /status
+            status_data = await self._apoll_for_job_status(job_id)
+            chunk = self._final_stream_chunk(status_data, usage, include_output=True)
+            if run_manager and chunk.text:
+                await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+            return
+
+        yield self._final_stream_chunk(stream_data, usage)
+
+    def _parse_stream_batch(
+        self, stream_data: Dict[str, Any]
+    ) -> Tuple[List[GenerationChunk], Optional[Dict[str, Any]]]:
+        """Turn one ``/stream`` response into chunks and the latest usage, if any."""
+        chunks = []
+        usage = None
+        for item in stream_data.get("stream") or []:
+            output = item.get("output") if isinstance(item, dict) else item
+            if output is None:
+                continue
+            usage = self._extract_usage(output) or usage
+            text = self._parse_output(output, stream=True)
+            if text:
+                chunks.append(GenerationChunk(text=text))
+        return chunks, usage
+
+    @staticmethod
+    def _extract_usage(output: Any) -> Optional[Dict[str, Any]]:
+        """Return the ``usage`` block reported by the worker, if present."""
+        usage = find_usage(output)
+        return usage if isinstance(usage, dict) else None
+
+    def _final_stream_chunk(
+        self,
+        response: Dict[str, Any],
+        usage: Optional[Dict[str, Any]],
+        include_output: bool = False,
+    ) -> GenerationChunk:
+        """Build the closing chunk that carries the job status and usage."""
+        text = ""
+        if include_output:
+            try:
+                text = self._process_response(response)
+            except ValueError as e:
+                raise RunPodAPIError(str(e)) from e
+        return GenerationChunk(
+            text=text, generation_info=self._get_generation_info(response, usage)
+        )
+
+    def _get_generation_info(
+        self,
+        response: Dict[str, Any],
+        usage: Optional[Dict[str, Any]] = None,
+        retries: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Collect the job id, status, timings, usage and retries of a finished job."""
+        usage = usage or self._extract_usage(response.get("output"))
+        generation_info: Dict[str, Any] = {
+            "job_id": response.get("id"),
+            "status": response.get("status"),
+        }
+        for key in ["delayTime", "executionTime"]:
+            if key in response:
+                generation_info[key] = response[key]
+        if usage:
+            generation_info["usage"] = usage
+        if retries is not None:
+            generation_info["retries"] = retries
+        return generation_info
+
+    def _openai_body(
+        self,
+        prompt: Union[str, List[str]],
+        stop: Optional[List[str]] = None,
+        stream: bool = False,
+        **kwargs: Any,
+    ) -> Dict[str, Any]:
+        """Build the body of an ``/openai/v1/completions`` request."""
+        return openai_body(
+            self.model_name,
+            {"prompt": prompt, **self._get_params(stop)},
+            n=1 if stream else self.n,
+            stream=stream,
+            **kwargs,
+        )
+
+    def _openai_generate(
+        self, prompts: List[str], stop: Optional[List[str]] = None, **kwargs: Any
+    ) -> LLMResult:
+        """Generate ``n`` completions for each prompt with one OpenAI-compatible request."""
+        body = self._openai_body(prompts, stop, **kwargs)
+        try:
+            response = self._openai_request("completions", body)
+        except httpx.HTTPStatusError as e:
+            raise RunPodAPIError(
+                f"RunPod API request failed with status {e.response.status_code}: {e.response.text}"
+            ) from e
+        except httpx.HTTPError as e:
+            raise RunPodAPIError(f"Error during RunPod API request: {e}") from e
+        return self._openai_result(response, len(prompts))
+
+    async def _aopenai_generate(
+        self, prompts: List[str], stop: Optional[List[str]] = None, **kwargs: Any
+    ) -> LLMResult:
+        """Asynchronously generate ``n`` completions for each prompt."""
+        body = self._openai_body(prompts, stop, **kwargs)
+        try:
+            response = await self._aopenai_request("completions", body)
+        except httpx.HTTPStatusError as e:
+            raise RunPodAPIError(
+                f"RunPod API request failed with status {e.response.status_code}: {e.response.text}"
+            ) from e
+        except httpx.HTTPError as e:
+            raise RunPodAPIError(f"Error during RunPod API request: {e}") from e
+        return self._openai_result(response, len(prompts))
+
+    def _openai_result(self, response: Dict[str, Any], prompt_count: int) -> LLMResult:
+        """Turn a completions response into one list of generations per prompt."""
+        generations = [
+            [
+                Generation(
+                    text=choice.get("text") or "",
+                    generation_info={
+                        "finish_reason": choice.get("finish_reason"),
+                        "logprobs": choice.get("logprobs"),
+                    },
+                )
+                for choice in choices
+            ]
+            for choices in choices_by_prompt(response, prompt_count, self.n)
+        ]
+        return LLMResult(
+            generations=generations,
+            llm_output={
+                "token_usage": response.get("usage"),
+                "model_name": response.get("model", self.model_name),
+            },
+        )
+
+    def _openai_stream_chunks(
+        self,
+        prompt: str,
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[GenerationChunk]:
+        """Stream the tokens of a completion from the OpenAI-compatible route."""
+        body = self._openai_body(prompt, stop, stream=True, **kwargs)
+        try:
+            for event in self._openai_events("completions", body):
+                chunk = self._openai_chunk(event)
+                if chunk is None:
+                    continue
+                if run_manager and chunk.text:
+                    run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+                yield chunk
+        except httpx.HTTPStatusError as e:
+            raise RunPodAPIError(
+                f"RunPod API request failed with status {e.response.status_code}: {e.response.text}"
+            ) from e
+        except (httpx.HTTPError, ValueError) as e:
+            raise RunPodAPIError(f"Error while streaming from RunPod: {e}") from e
+
+    async def _aopenai_stream_chunks(
+        self,
+        prompt: str,
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[GenerationChunk]:
+        """Asynchronously stream the tokens of a completion."""
+        body = self._openai_body(prompt, stop, stream=True, **kwargs)
+        try:
+            async for event in self._aopenai_events("completions", body):
+                chunk = self._openai_chunk(event)
+                if chunk is None:
+                    continue
+                if run_manager and chunk.text:
+                    await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+                yield chunk
+        except httpx.HTTPStatusError as e:
+            raise RunPodAPIError(
+                f"RunPod API request failed with status {e.response.status_code}: {e.response.text}"
+            ) from e
+        except (httpx.HTTPError, ValueError) as e:
+            raise RunPodAPIError(f"Error while streaming from RunPod: {e}") from e
+
+    @staticmethod
+    def _openai_chunk(event: Dict[str, Any]) -> Optional[GenerationChunk]:
+        """Turn one streamed completions event into a chunk, if it carries anything."""
+        choices = event.get("choices") or []
+        text = (choices[0].get("text") or "") if choices else ""
+        generation_info: Dict[str, Any] = {}
+        if choices and choices[0].get("finish_reason"):
+            generation_info["finish_reason"] = choices[0]["finish_reason"]
+        if event.get("usage"):
+            # Sent in a last event without choices
+            generation_info["usage"] = event["usage"]
+        if not text and not generation_info:
+            return None
+        return GenerationChunk(text=text, generation_info=generation_info or None)
 
     def _poll_for_job_status(
         self,
         job_id: str,
         run_manager: Optional[CallbackManagerForLLMRun] = None,
     ) -> Dict[str, Any]:
-        """Poll the RunPod /status endpoint until the job is completed or fails."""
-        status_url = f"{self.api_base}/{self.endpoint_id}/status/{job_id}"
-        headers = {"Authorization": f"Bearer {self.api_key}"}
-        
-        for attempt in range(self.max_polling_attempts):
-            try:
-                status_response = self._client.get(
-                    status_url,
-                    headers=headers,
-                    timeout=self.timeout or 60.0, 
-                )
-                status_response.raise_for_status()
-                status_data = status_response.json()
-                status = status_data.get("status")
+        """Poll the RunPod /status endpoint until the job is completed or fails.
 
-                logger.debug(f"Poll attempt {attempt+1}: Job {job_id} status: {status}")
-                if run_manager:
-                     # Use on_llm_new_token to provide feedback during polling
-                    run_manager.on_llm_new_token(f"\n[RunPod job {job_id} status: {status}]", verbose=True)
+        The job is cancelled if polling times out or is interrupted.
+        """
+        try:
+            strategy = self._get_polling_strategy()
+            started = time.monotonic()
+            status_data: Optional[Dict[str, Any]] = None
 
-                if status == "COMPLETED":
-                    return status_data
-                elif status == "FAILED":
-                     error_detail = status_data.get("error", "Job failed with no error details.")
-                     logger.error(f"RunPod job {job_id} failed: {error_detail}")
-                     # Return the failed status data for _process_response to handle
-                     return status_data 
-                elif status in ["IN_QUEUE", "IN_PROGRESS"]:
-                    time.sleep(self.poll_interval)
-                else:
-                    # Unexpected status
-                    logger.warning(f"RunPod job {job_id} returned unexpected status: {status}")
-                    return status_data # Return what we have
-
-            except httpx.HTTPStatusError as e:
-                # Log polling error but continue polling unless it's critical (like 401/404)
-                logger.error(f"HTTP error while polling job {job_id} (attempt {attempt+1}): {e}")
-                if e.response.status_code in [401, 403, 404]:
-                     raise RunPodAPIError(f"Fatal HTTP error {e.response.status_code} while polling job {job_id}") from e
-                time.sleep(self.poll_interval)
-            except httpx.RequestError as e:
-                 logger.error(f"Request error while polling job {job_id} (attempt {attempt+1}): {e}")
-                 time.sleep(self.poll_interval)
-            except Exception as e:
-                 logger.exception(f"Unexpected error while polling job {job_id} (attempt {attempt+1}): {e}")
-                 time.sleep(self.poll_interval)
-                 
-        raise TimeoutError(
-            f"RunPod job {job_id} did not complete after {self.max_polling_attempts} attempts."
-        ) 
+            for attempt in range(self.max_polling_attempts):
+                delay = strategy.get_delay(attempt, time.monotonic() - started, status_data)
+                if delay > 0:
+                    time.sleep(delay)
+                try:
+                    status_data = self._get_job_status(job_id)
+                    status = status_data.get("status")
+
+                    logger.debug("Poll attempt %s: Job %s status: %s", attempt+1, job_id, status)
+                    if run_manager:
+                         # Use on_llm_new_token to provide feedback during polling
+                        run_manager.on_llm_new_token(f"\n[RunPod job {job_id} status: {status}]", verbose=True)
+
+                    if status == "COMPLETED":
+                        strategy.observe(status_data)
+                        return status_data
+                    elif status == "FAILED":
+                         error_detail = status_data.get("error", "Job failed with no error details.")
+                         logger.error("RunPod job %s failed: %s", job_id, error_detail)
+                         # Return the failed status data for _process_response to handle
+                         return status_data 
+                    elif status in ["IN_QUEUE", "IN_PROGRESS"]:
+                        continue
+                    else:
+                        # Unexpected status
+                        logger.warning("RunPod job %s returned unexpected status: %s", job_id, status)
+                        return status_data # Return what we have
+
+                except httpx.HTTPStatusError as e:
+                    # Log polling error but continue polling unless it's critical (like 401/404)
+                    logger.error("HTTP error while polling job %s (attempt %s): %s", job_id, attempt+1, e)
+                    if e.response.status_code in [401, 403, 404]:
+                         raise RunPodAPIError(f"Fatal HTTP error {e.response.status_code} while polling job {job_id}") from e
+                except httpx.RequestError as e:
+                     logger.error("Request error while polling job %s (attempt %s): %s", job_id, attempt+1, e)
+                except Exception as e:
+                     logger.exception("Unexpected error while polling job %s (attempt %s): %s", job_id, attempt+1, e)
+
+            raise TimeoutError(
+                f"RunPod job {job_id} did not complete after {self.max_polling_attempts} attempts."
+            )
+        except (TimeoutError, KeyboardInterrupt) as e:
+            self._cancel_job(job_id, timed_out=isinstance(e, TimeoutError))
+            raise
 
     async def _apoll_for_job_status(
         self,
         job_id: str,
         run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
     ) -> Dict[str, Any]:
-        """Poll the RunPod /status endpoint asynchronously until the job is completed or fails."""
-        status_url = f"{self.api_base}/{self.endpoint_id}/status/{job_id}"
-        headers = {"Authorization": f"Bearer {self.api_key}"}
-        
-        if self._async_client is None:
-             self._async_client = httpx.AsyncClient(timeout=self.timeout or 60.0)
+        """Poll the RunPod /status endpoint asynchronously until the job is completed or fails.
 
-        for attempt in range(self.max_polling_attempts):
-            try:
-                status_response = await self._async_client.get(
-                    status_url,
-                    headers=headers,
-                    timeout=self.timeout or 60.0,
+        The job is cancelled if polling times out or the awaiting task is cancelled.
+        """
+        try:
+            if self._use_shared_poller():
+                status_data = await self._get_job_poller().wait(
+                    job_id, self._get_polling_strategy(), self.max_polling_attempts
                 )
-                status_response.raise_for_status()
-                status_data = status_response.json()
-                status = status_data.get("status")
+                self._jobs.update(job_id, status_data.get("status"))
+                return status_data
 
-                logger.debug(f"Async poll attempt {attempt+1}: Job {job_id} status: {status}")
-                if run_manager:
-                     await run_manager.on_llm_new_token(f"\n[RunPod job {job_id} status: {status}]", verbose=True)
+            strategy = self._get_polling_strategy()
+            started = time.monotonic()
+            status_data: Optional[Dict[str, Any]] = None
 
-                if status == "COMPLETED":
-                    return status_data
-                elif status == "FAILED":
-                    error_detail = status_data.get("error", "Job failed with no error details.")
-                    logger.error(f"RunPod job {job_id} failed: {error_detail}")
-                    return status_data
-                elif status in ["IN_QUEUE", "IN_PROGRESS"]:
-                    await asyncio.sleep(self.poll_interval)
-                else:
-                    logger.warning(f"RunPod job {job_id} returned unexpected status: {status}")
-                    return status_data
-
-            except httpx.HTTPStatusError as e:
-                logger.error(f"HTTP error while polling job {job_id} (async attempt {attempt+1}): {e}")
-                if e.response.status_code in [401, 403, 404]:
-                    raise RunPodAPIError(f"Fatal HTTP error {e.response.status_code} while polling job {job_id} (async)") from e
-                await asyncio.sleep(self.poll_interval)
-            except httpx.RequestError as e:
-                 logger.error(f"Request error while polling job {job_id} (async attempt {attempt+1}): {e}")
-                 await asyncio.sleep(self.poll_interval)
-            except Exception as e:
-                 logger.exception(f"Unexpected error while polling job {job_id} (async attempt {attempt+1}): {e}")
-                 await asyncio.sleep(self.poll_interval)
-
-        raise TimeoutError(
-            f"RunPod job {job_id} did not complete after {self.max_polling_attempts} async attempts."
-        ) 
\ No newline at end of file
+            for attempt in range(self.max_polling_attempts):
+                delay = strategy.get_delay(attempt, time.monotonic() - started, status_data)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                try:
+                    status_data = await self._aget_job_status(job_id)
+                    status = status_data.get("status")
+
+                    logger.debug("Async poll attempt %s: Job %s status: %s", attempt+1, job_id, status)
+                    if run_manager:
+                         await run_manager.on_llm_new_token(f"\n[RunPod job {job_id} status: {status}]", verbose=True)
+
+                    if status == "COMPLETED":
+                        strategy.observe(status_data)
+                        return status_data
+                    elif status == "FAILED":
+                        error_detail = status_data.get("error", "Job failed with no error details.")
+                        logger.error("RunPod job %s failed: %s", job_id, error_detail)
+                        return status_data
+                    elif status in ["IN_QUEUE", "IN_PROGRESS"]:
+                        continue
+                    else:
+                        logger.warning("RunPod job %s returned unexpected status: %s", job_id, status)
+                        return status_data
+
+                except httpx.HTTPStatusError as e:
+                    logger.error("HTTP error while polling job %s (async attempt %s): %s", job_id, attempt+1, e)
+                    if e.response.status_code in [401, 403, 404]:
+                        raise RunPodAPIError(f"Fatal HTTP error {e.response.status_code} while polling job {job_id} (async)") from e
+                except httpx.RequestError as e:
+                     logger.error("Request error while polling job %s (async attempt %s): %s", job_id, attempt+1, e)
+                except Exception as e:
+                     logger.exception("Unexpected error while polling job %s (async attempt %s): %s", job_id, attempt+1, e)
+
+            raise TimeoutError(
+                f"RunPod job {job_id} did not complete after {self.max_polling_attempts} async attempts."
+            )
+        except (TimeoutError, asyncio.CancelledError) as e:
+            # Shielded so that the cancel request goes out even if we are cancelled again
+            await asyncio.shield(self._acancel_job(job_id, timed_out=isinstance(e, TimeoutError)))
+            raise
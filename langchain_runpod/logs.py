@@ -0,0 +1,56 @@
+"""Helpers to keep prompts and outputs out of the logs.
+
+Prompts and generations can be large and may contain sensitive data, so they
+are only logged when a model is created with ``log_payloads=True``. Even then
+they are truncated, and the truncation only happens if the record is actually
+emitted: :func:`loggable` returns a wrapper that is formatted lazily by the
+logging module.
+"""
+
+import reprlib
+from typing import Any
+
+PAYLOAD_LOG_LIMIT = 1000
+"""Maximum number of characters of a payload written to a log record."""
+
+HIDDEN_PAYLOAD = "<hidden, set log_payloads=True to log it>"
+
+
+class _Payload:
+    """A value that is truncated when, and only if, it is formatted."""
+
+    __slots__ = ("value", "limit")
+
+    def __init__(self, value: Any, limit: int) -> None:
+        self.value = value
+        self.limit = limit
+
+    def __str__(self) -> str:
+        if isinstance(self.value, str):
+            text = self.value
+        else:
+            # reprlib bounds the work done on deeply nested or huge containers
+            shortener = reprlib.Repr()
+            shortener.maxlevel = 4
+            shortener.maxdict = shortener.maxlist = 20
+            shortener.maxstring = shortener.maxother = self.limit
+            text = shortener.repr(self.value)
+        if len(text) <= self.limit:
+            return text
+        return f"{text[:self.limit]}... [{len(text) - self.limit} more characters]"
+
+    __repr__ = __str__
+
+
+def loggable(value: Any, enabled: bool = True, limit: int = PAYLOAD_LOG_LIMIT) -> Any:
+    """Wrap a prompt, output or response for logging.
+
+    Args:
+        value: The payload to log.
+        enabled: Whether payloads may be logged; if not, a placeholder is
+            logged instead.
+        limit: Maximum number of characters logged.
+    """
+    if not enabled:
+        return HIDDEN_PAYLOAD
+    return _Payload(value, limit)
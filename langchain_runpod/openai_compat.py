@@ -0,0 +1,137 @@
+"""Helpers for the OpenAI-compatible route of RunPod vLLM workers.
+
+vLLM workers serve ``/openai/v1/completions`` and ``/openai/v1/chat/completions``
+under the endpoint URL. Requests on that route are answered directly, without
+the ``/run`` + ``/status`` job round trip, and streaming responses are
+server-sent events with one JSON chunk per ``data:`` line, terminated by
+``data: [DONE]``.
+"""
+
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from langchain_core.exceptions import OutputParserException
+from langchain_core.messages import InvalidToolCall, ToolCall
+from langchain_core.output_parsers.openai_tools import (
+    make_invalid_tool_call,
+    parse_tool_call,
+)
+
+from langchain_runpod.codec import loads
+
+
+def openai_body(
+    model: str,
+    params: Dict[str, Any],
+    n: int = 1,
+    stream: bool = False,
+    **kwargs: Any,
+) -> Dict[str, Any]:
+    """Build the body of a completions or chat completions request.
+
+    Args:
+        model: Name of the model served by the worker.
+        params: Sampling parameters and the ``prompt`` or ``messages``.
+        n: Number of choices to generate per prompt.
+        stream: Whether to stream the response as server-sent events. Streamed
+            responses end with a chunk reporting the token usage.
+        **kwargs: Additional request parameters.
+    """
+    body: Dict[str, Any] = {"model": model, **params}
+    if n != 1:
+        body["n"] = n
+    if stream:
+        body["stream"] = True
+        body["stream_options"] = {"include_usage": True}
+    body.update(kwargs)
+    return body
+
+
+def _event_data(data_lines: List[str]) -> Optional[Dict[str, Any]]:
+    data = "\n".join(data_lines)
+    if not data or data == "[DONE]":
+        return None
+    event = loads(data)
+    if isinstance(event, dict) and event.get("error"):
+        error = event["error"]
+        message = error.get("message", error) if isinstance(error, dict) else error
+        raise ValueError(f"Streaming request failed: {message}")
+    return event
+
+
+def iter_sse_events(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """Decode the JSON events of a server-sent event stream.
+
+    Raises:
+        ValueError: If the server reports an error in the stream.
+    """
+    data_lines: List[str] = []
+    for line in lines:
+        if line:
+            if line.startswith("data:"):
+                data_lines.append(line[5:].lstrip())
+            continue
+        # A blank line ends the event
+        if data_lines and data_lines[0] == "[DONE]":
+            return
+        event = _event_data(data_lines)
+        data_lines = []
+        if event is not None:
+            yield event
+    event = _event_data(data_lines)
+    if event is not None:
+        yield event
+
+
+async def aiter_sse_events(lines: AsyncIterator[str]) -> AsyncIterator[Dict[str, Any]]:
+    """Asynchronously decode the JSON events of a server-sent event stream."""
+    data_lines: List[str] = []
+    async for line in lines:
+        if line:
+            if line.startswith("data:"):
+                data_lines.append(line[5:].lstrip())
+            continue
+        if data_lines and data_lines[0] == "[DONE]":
+            return
+        event = _event_data(data_lines)
+        data_lines = []
+        if event is not None:
+            yield event
+    event = _event_data(data_lines)
+    if event is not None:
+        yield event
+
+
+def choices_by_prompt(
+    response: Dict[str, Any], prompt_count: int, n: int
+) -> List[List[Dict[str, Any]]]:
+    """Group the choices of a completions response by prompt.
+
+    Choice ``i`` of prompt ``p`` has index ``p * n + i``.
+    """
+    grouped: List[List[Dict[str, Any]]] = [[] for _ in range(prompt_count)]
+    choices = sorted(response.get("choices") or [], key=lambda choice: choice.get("index", 0))
+    for position, choice in enumerate(choices):
+        index = choice.get("index", position)
+        if 0 <= index // n < prompt_count:
+            grouped[index // n].append(choice)
+    return grouped
+
+
+def parse_tool_calls(
+    raw_tool_calls: Optional[List[Dict[str, Any]]],
+) -> Tuple[List[ToolCall], List[InvalidToolCall]]:
+    """Parse the ``tool_calls`` of a chat completions message.
+
+    Returns the valid tool calls and the ones whose arguments are not valid JSON.
+    """
+    tool_calls: List[ToolCall] = []
+    invalid_tool_calls: List[InvalidToolCall] = []
+    for raw_tool_call in raw_tool_calls or []:
+        try:
+            tool_call = parse_tool_call(raw_tool_call, return_id=True)
+        except OutputParserException as e:
+            invalid_tool_calls.append(make_invalid_tool_call(raw_tool_call, str(e)))
+            continue
+        if tool_call is not None:
+            tool_calls.append(tool_call)  # type: ignore[arg-type]
+    return tool_calls, invalid_tool_calls
@@ -0,0 +1,76 @@
+"""Packing several prompts into a single RunPod job.
+
+Every RunPod job pays its own queue delay and worker dispatch overhead. Workers
+that accept a list of prompts in one input (vLLM-based ones in particular) can
+instead serve several conversations per job: the prompts of compatible payloads,
+i.e. payloads that differ only in their prompt, are sent as a list in the
+``prompt`` field and the worker is expected to return a list of outputs in the
+same order.
+"""
+
+import json
+from typing import Any, Dict, List, Optional
+
+
+def payload_key(payload: Dict[str, Any]) -> str:
+    """Return a stable key identifying a request payload."""
+    return json.dumps(payload, sort_keys=True, default=str)
+
+
+def group_key(payload: Dict[str, Any]) -> Optional[str]:
+    """Return the key shared by payloads that can be packed into one job.
+
+    Payloads whose ``input`` has no string ``prompt`` cannot be packed and
+    return None.
+    """
+    payload_input = payload.get("input")
+    if not isinstance(payload_input, dict) or not isinstance(payload_input.get("prompt"), str):
+        return None
+    params = {key: value for key, value in payload_input.items() if key != "prompt"}
+    return payload_key({**payload, "input": params})
+
+
+def group_payloads(
+    payloads: List[Optional[Dict[str, Any]]], max_size: int
+) -> List[List[int]]:
+    """Group the indices of packable payloads into jobs of at most ``max_size`` items.
+
+    Payloads that are None or cannot be packed, and groups that would hold a
+    single item, are left out.
+    """
+    groups: Dict[str, List[int]] = {}
+    for index, payload in enumerate(payloads):
+        key = group_key(payload) if payload is not None else None
+        if key is not None:
+            groups.setdefault(key, []).append(index)
+
+    packed = []
+    for indices in groups.values():
+        for start in range(0, len(indices), max(max_size, 1)):
+            chunk = indices[start : start + max_size]
+            if len(chunk) > 1:
+                packed.append(chunk)
+    return packed
+
+
+def pack_payloads(payloads: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Combine compatible payloads into one payload with a list of prompts."""
+    first = payloads[0]
+    return {
+        **first,
+        "input": {
+            **first["input"],
+            "prompt": [payload["input"]["prompt"] for payload in payloads],
+        },
+    }
+
+
+def split_output(output: Any, count: int) -> Optional[List[Any]]:
+    """Split the output of a packed job into one output per prompt.
+
+    Returns None if the output is not a list with one entry per prompt, in
+    which case the worker did not understand the packed request.
+    """
+    if isinstance(output, list) and len(output) == count:
+        return output
+    return None
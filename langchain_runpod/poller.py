@@ -0,0 +1,282 @@
+"""Centralised status polling for many in-flight RunPod jobs.
+
+Without a shared poller, every awaiting call runs its own polling loop with its
+own sleeps and ``/status`` requests. A :class:`JobPoller` owns all outstanding
+jobs of one endpoint on one event loop: due status checks are kept in a priority
+queue, a single background task wakes up only when the next check is due, and
+the number of concurrent status requests is bounded.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import weakref
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from langchain_runpod.clients import HTTPClientConfig, get_async_client
+from langchain_runpod.codec import decode_response
+from langchain_runpod.exceptions import RunPodAPIError
+from langchain_runpod.polling import PollingStrategy
+from langchain_runpod.rate_limit import RateLimiter, parse_retry_after
+from langchain_runpod.retry import RetryCounter, current_retry_counter
+
+logger = logging.getLogger(__name__)
+
+
+class _PolledJob:
+    """Book-keeping for one job tracked by a :class:`JobPoller`."""
+
+    __slots__ = (
+        "job_id",
+        "strategy",
+        "max_attempts",
+        "future",
+        "started",
+        "attempts",
+        "last_status",
+        "waiters",
+        "counters",
+    )
+
+    def __init__(
+        self,
+        job_id: str,
+        strategy: PollingStrategy,
+        max_attempts: int,
+        future: "asyncio.Future[Dict[str, Any]]",
+        started: float,
+    ) -> None:
+        self.job_id = job_id
+        self.strategy = strategy
+        self.max_attempts = max_attempts
+        self.future = future
+        self.started = started
+        self.attempts = 0
+        self.last_status: Optional[Dict[str, Any]] = None
+        self.waiters = 0
+        self.counters: List[RetryCounter] = []
+
+
+class JobPoller:
+    """Polls the status of all in-flight jobs of one endpoint.
+
+    Must be created and used on a single event loop; use :func:`get_job_poller`
+    to get the shared instance for the running loop.
+
+    Args:
+        config: Connection settings, used to pick the shared HTTP client.
+        endpoint_id: The RunPod endpoint the jobs belong to.
+        api_key: RunPod API key.
+        max_concurrency: Maximum number of concurrent ``/status`` requests.
+        rate_limiter: Optional limiter every ``/status`` request has to pass.
+    """
+
+    def __init__(
+        self,
+        config: HTTPClientConfig,
+        endpoint_id: str,
+        api_key: str,
+        max_concurrency: int = 32,
+        rate_limiter: Optional[RateLimiter] = None,
+    ) -> None:
+        self.config = config
+        self.endpoint_id = endpoint_id
+        self.max_concurrency = max_concurrency
+        self.rate_limiter = rate_limiter
+        self._status_url = f"{config.api_base}/{endpoint_id}/status/"
+        self._headers = {"Authorization": f"Bearer {api_key}"}
+        self._jobs: Dict[str, _PolledJob] = {}
+        self._queue: List[Tuple[float, int, str]] = []
+        self._counter = itertools.count()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._wakeup = asyncio.Event()
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    @property
+    def pending(self) -> int:
+        """Number of jobs currently being tracked."""
+        return len(self._jobs)
+
+    async def wait(
+        self, job_id: str, strategy: PollingStrategy, max_attempts: int
+    ) -> Dict[str, Any]:
+        """Wait until ``job_id`` leaves the queue/in-progress states.
+
+        Args:
+            job_id: The job to wait for.
+            strategy: Strategy that schedules the status checks of this job.
+            max_attempts: Maximum number of status checks before giving up.
+
+        Returns:
+            The final ``/status`` response of the job.
+
+        Raises:
+            RunPodAPIError: On fatal HTTP errors (401/403/404) while polling.
+            TimeoutError: If the job is still running after ``max_attempts``.
+
+        Once every caller waiting for a job has been cancelled, the job is no
+        longer polled. Status checks that fail transiently and are tried again
+        count as retries for every waiter inside :func:`track_retries`.
+        """
+        job = self._jobs.get(job_id)
+        if job is None:
+            loop = asyncio.get_running_loop()
+            job = _PolledJob(job_id, strategy, max_attempts, loop.create_future(), loop.time())
+            self._jobs[job_id] = job
+            self._schedule(job, job.started + strategy.get_delay(0, 0.0, None))
+        job.waiters += 1
+        counter = current_retry_counter()
+        if counter is not None:
+            job.counters.append(counter)
+        try:
+            # Shield so that one cancelled waiter does not cancel the job for others
+            return await asyncio.shield(job.future)
+        finally:
+            job.waiters -= 1
+            if counter is not None:
+                job.counters.remove(counter)
+            if not job.waiters and not job.future.done():
+                # Every waiter went away: stop polling the job
+                if self._jobs.get(job_id) is job:
+                    del self._jobs[job_id]
+                job.future.cancel()
+
+    def _schedule(self, job: _PolledJob, due: float) -> None:
+        heapq.heappush(self._queue, (due, next(self._counter), job.job_id))
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        else:
+            self._wakeup.set()
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while self._queue:
+            due, _, job_id = self._queue[0]
+            delay = due - loop.time()
+            if delay > 0:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            heapq.heappop(self._queue)
+            job = self._jobs.get(job_id)
+            if job is None:
+                continue
+
+            await self._semaphore.acquire()
+            loop.create_task(self._check(job))
+
+    async def _check(self, job: _PolledJob) -> None:
+        loop = asyncio.get_running_loop()
+        status_data = None
+        try:
+            if self.rate_limiter is not None:
+                await self.rate_limiter.aacquire()
+            response = await get_async_client(self.config).get(
+                self._status_url + job.job_id,
+                headers=self._headers,
+            )
+            if self.rate_limiter is not None:
+                if response.status_code == 429:
+                    self.rate_limiter.on_rate_limited(
+                        parse_retry_after(response.headers.get("Retry-After"))
+                    )
+                else:
+                    self.rate_limiter.on_success()
+            response.raise_for_status()
+            status_data = decode_response(response)
+        except httpx.HTTPStatusError as e:
+            logger.error("HTTP error while polling job %s: %s", job.job_id, e)
+            if e.response.status_code in [401, 403, 404]:
+                self._finish(
+                    job,
+                    error=RunPodAPIError(
+                        f"Fatal HTTP error {e.response.status_code} while polling job {job.job_id}"
+                    ),
+                )
+                return
+        except Exception as e:
+            logger.error("Error while polling job %s: %s", job.job_id, e)
+        finally:
+            self._semaphore.release()
+
+        if job.future.done():
+            # Abandoned by its waiters while the status request was in flight
+            return
+        job.attempts += 1
+        if status_data is not None:
+            status = status_data.get("status")
+            logger.debug("Poll attempt %s: Job %s status: %s", job.attempts, job.job_id, status)
+            if status not in ["IN_QUEUE", "IN_PROGRESS"]:
+                if status == "COMPLETED":
+                    job.strategy.observe(status_data)
+                self._finish(job, result=status_data)
+                return
+            job.last_status = status_data
+
+        if job.attempts >= job.max_attempts:
+            self._finish(
+                job,
+                error=TimeoutError(
+                    f"RunPod job {job.job_id} did not complete after {job.max_attempts} attempts."
+                ),
+            )
+            return
+
+        if status_data is None:
+            # The failed check is tried again at the next scheduled poll
+            for counter in job.counters:
+                counter.count += 1
+        elapsed = loop.time() - job.started
+        delay = job.strategy.get_delay(job.attempts, elapsed, job.last_status)
+        self._schedule(job, loop.time() + delay)
+
+    def _finish(
+        self,
+        job: _PolledJob,
+        result: Optional[Dict[str, Any]] = None,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        self._jobs.pop(job.job_id, None)
+        if job.future.done():
+            return
+        if error is not None:
+            job.future.set_exception(error)
+        else:
+            job.future.set_result(result)
+
+
+_pollers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple[HTTPClientConfig, str], JobPoller]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_job_poller(
+    config: HTTPClientConfig,
+    endpoint_id: str,
+    api_key: str,
+    max_concurrency: int = 32,
+    rate_limiter: Optional[RateLimiter] = None,
+) -> JobPoller:
+    """Return the shared poller for an endpoint on the running event loop.
+
+    The first caller for an endpoint decides ``max_concurrency``; the rate
+    limiter is kept up to date with the most recent caller's.
+    """
+    loop = asyncio.get_running_loop()
+    loop_pollers = _pollers.setdefault(loop, {})
+    key = (config, endpoint_id)
+    poller = loop_pollers.get(key)
+    if poller is None:
+        poller = loop_pollers[key] = JobPoller(
+            config, endpoint_id, api_key, max_concurrency, rate_limiter
+        )
+    elif rate_limiter is not None:
+        poller.rate_limiter = rate_limiter
+    return poller
@@ -0,0 +1,162 @@
+"""Polling strategies for RunPod job status checks."""
+
+import random
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
+
+
+class PollingStrategy(ABC):
+    """Decides how long to wait before each ``/status`` poll of a RunPod job.
+
+    A strategy instance can be shared between model instances (and between
+    ``RunPod`` and ``ChatRunPod``), so implementations must be thread-safe.
+    """
+
+    @abstractmethod
+    def get_delay(
+        self,
+        attempt: int,
+        elapsed: float,
+        status_data: Optional[Dict[str, Any]] = None,
+    ) -> float:
+        """Return the number of seconds to wait before the next poll.
+
+        Args:
+            attempt: Zero-based index of the poll about to be made.
+            elapsed: Seconds since the job was submitted.
+            status_data: The most recent status response for the job, if any.
+        """
+
+    def observe(self, status_data: Dict[str, Any]) -> None:
+        """Record the final status response of a finished job.
+
+        Strategies can use this to learn how long jobs usually take.
+        """
+
+
+class FixedPollingStrategy(PollingStrategy):
+    """Poll at a fixed interval.
+
+    Args:
+        interval: Seconds to wait between polls.
+        initial_delay: Seconds to wait before the first poll.
+    """
+
+    def __init__(self, interval: float = 1.0, initial_delay: float = 0.0) -> None:
+        self.interval = interval
+        self.initial_delay = initial_delay
+
+    def get_delay(
+        self,
+        attempt: int,
+        elapsed: float,
+        status_data: Optional[Dict[str, Any]] = None,
+    ) -> float:
+        """Return ``initial_delay`` for the first poll and ``interval`` afterwards."""
+        return self.initial_delay if attempt == 0 else self.interval
+
+    def __repr__(self) -> str:
+        return (
+            f"FixedPollingStrategy(interval={self.interval}, "
+            f"initial_delay={self.initial_delay})"
+        )
+
+
+class AdaptivePollingStrategy(PollingStrategy):
+    """Poll quickly at first, then back off exponentially with jitter.
+
+    When ``use_timing_hints`` is enabled, the ``delayTime`` and ``executionTime``
+    fields of finished jobs are used to keep a moving estimate of how long jobs
+    spend in the queue and running. While a job is in flight, the next poll is
+    scheduled for its predicted completion instead of the plain backoff delay.
+
+    Args:
+        initial_interval: Delay before the first poll, and the lower bound for
+            every delay.
+        multiplier: Factor applied to the delay after each poll.
+        max_interval: Upper bound for every delay.
+        jitter: Relative amount of random jitter, e.g. ``0.1`` for +/-10%.
+        use_timing_hints: Whether to predict completion from previous jobs.
+        smoothing: Weight of the newest job in the moving estimates.
+    """
+
+    def __init__(
+        self,
+        initial_interval: float = 0.1,
+        multiplier: float = 2.0,
+        max_interval: float = 5.0,
+        jitter: float = 0.1,
+        use_timing_hints: bool = True,
+        smoothing: float = 0.2,
+    ) -> None:
+        if initial_interval <= 0 or max_interval < initial_interval:
+            raise ValueError(
+                "initial_interval must be positive and not larger than max_interval."
+            )
+        self.initial_interval = initial_interval
+        self.multiplier = multiplier
+        self.max_interval = max_interval
+        self.jitter = jitter
+        self.use_timing_hints = use_timing_hints
+        self.smoothing = smoothing
+        self._queue_estimate: Optional[float] = None
+        self._execution_estimate: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def get_delay(
+        self,
+        attempt: int,
+        elapsed: float,
+        status_data: Optional[Dict[str, Any]] = None,
+    ) -> float:
+        """Return the backoff delay, or the time to predicted completion."""
+        delay = self.initial_interval * self.multiplier**attempt
+        remaining = self._predict_remaining(elapsed, status_data)
+        if remaining is not None and remaining > 0:
+            delay = remaining
+        delay = min(max(delay, self.initial_interval), self.max_interval)
+        if self.jitter:
+            delay *= 1 + random.uniform(-self.jitter, self.jitter)
+        return delay
+
+    def observe(self, status_data: Dict[str, Any]) -> None:
+        """Update the queue and execution time estimates from a finished job."""
+        delay_ms = status_data.get("delayTime")
+        execution_ms = status_data.get("executionTime")
+        with self._lock:
+            if isinstance(delay_ms, (int, float)):
+                self._queue_estimate = self._smooth(self._queue_estimate, delay_ms / 1000)
+            if isinstance(execution_ms, (int, float)):
+                self._execution_estimate = self._smooth(
+                    self._execution_estimate, execution_ms / 1000
+                )
+
+    def _smooth(self, current: Optional[float], value: float) -> float:
+        if current is None:
+            return value
+        return (1 - self.smoothing) * current + self.smoothing * value
+
+    def _predict_remaining(
+        self, elapsed: float, status_data: Optional[Dict[str, Any]]
+    ) -> Optional[float]:
+        """Predict the seconds left until the job completes, if possible."""
+        if not self.use_timing_hints or self._execution_estimate is None:
+            return None
+
+        status = (status_data or {}).get("status")
+        delay_ms = (status_data or {}).get("delayTime")
+        if status == "IN_PROGRESS" and isinstance(delay_ms, (int, float)):
+            # The job left the queue after delayTime; only execution remains
+            running = elapsed - delay_ms / 1000
+            return self._execution_estimate - running
+        if self._queue_estimate is not None:
+            return self._queue_estimate + self._execution_estimate - elapsed
+        return None
+
+    def __repr__(self) -> str:
+        return (
+            f"AdaptivePollingStrategy(initial_interval={self.initial_interval}, "
+            f"multiplier={self.multiplier}, max_interval={self.max_interval}, "
+            f"jitter={self.jitter}, use_timing_hints={self.use_timing_hints})"
+        )
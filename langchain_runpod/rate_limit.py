@@ -0,0 +1,179 @@
+"""Client-side rate limiting of RunPod API requests.
+
+Every request to an endpoint (job submissions, ``/status`` and ``/stream``
+polls) takes a token from a bucket shared by all model instances targeting that
+endpoint. When the API answers 429 the allowed rate is cut and requests pause
+for the ``Retry-After`` period; successful requests then slowly raise the rate
+again.
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Deque, Dict, Optional, Tuple
+
+
+class RateLimiter:
+    """Token bucket that limits the request rate to one endpoint.
+
+    Thread-safe; the same limiter can be used from sync code and from any
+    number of event loops.
+
+    Args:
+        rate: Maximum requests per second. None means requests are not limited
+            until the API answers 429.
+        burst: Maximum number of requests that may be sent back to back.
+            Defaults to one second's worth of requests.
+        min_rate: Lower bound for the rate after repeated 429 responses.
+        backoff: Factor the rate is multiplied with on every 429 response.
+        recovery: Relative increase of the rate after every request that was
+            not rate limited.
+    """
+
+    def __init__(
+        self,
+        rate: Optional[float] = None,
+        burst: Optional[int] = None,
+        min_rate: float = 0.5,
+        backoff: float = 0.5,
+        recovery: float = 0.05,
+    ) -> None:
+        if rate is not None and rate <= 0:
+            raise ValueError("rate must be positive.")
+        if min_rate <= 0 or not 0 < backoff < 1:
+            raise ValueError("min_rate must be positive and backoff between 0 and 1.")
+        self.max_rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.backoff = backoff
+        self.recovery = recovery
+        self._rate = rate
+        self._recover_to = rate
+        self._tokens = float(self._capacity())
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._sent: Deque[float] = deque()
+        self._lock = threading.Lock()
+
+    @property
+    def current_rate(self) -> Optional[float]:
+        """Requests per second currently allowed, or None if unlimited."""
+        return self._rate
+
+    @property
+    def observed_rate(self) -> int:
+        """Number of requests let through during the last second."""
+        with self._lock:
+            return self._observed(time.monotonic())
+
+    def acquire(self) -> None:
+        """Block until a request may be sent."""
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def aacquire(self) -> None:
+        """Wait until a request may be sent."""
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def on_rate_limited(self, retry_after: Optional[float] = None) -> None:
+        """Record a 429 response: cut the rate and pause for ``retry_after`` seconds."""
+        with self._lock:
+            now = time.monotonic()
+            if self._rate is None:
+                # Unlimited so far: start from the rate that triggered the 429
+                self._recover_to = max(float(self._observed(now)), self.min_rate)
+                current = self._recover_to
+            else:
+                current = self._rate
+            self._rate = max(self.min_rate, current * self.backoff)
+            self._tokens = min(self._tokens, 0.0)
+            self._updated = now
+            if retry_after is not None:
+                self._blocked_until = max(self._blocked_until, now + retry_after)
+
+    def on_success(self) -> None:
+        """Record a request that was not rate limited, slowly raising the rate."""
+        with self._lock:
+            if self._rate is None or self._recover_to is None:
+                return
+            self._rate = min(self._rate * (1 + self.recovery), self._recover_to)
+            if self.max_rate is None and self._rate >= self._recover_to:
+                self._rate = None
+
+    def _capacity(self) -> float:
+        if self.burst is not None:
+            return float(self.burst)
+        return max(1.0, self._rate or 1.0)
+
+    def _observed(self, now: float) -> int:
+        while self._sent and self._sent[0] <= now - 1.0:
+            self._sent.popleft()
+        return len(self._sent)
+
+    def _reserve(self) -> float:
+        """Take a token and return how long to wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            blocked = max(0.0, self._blocked_until - now)
+            self._sent.append(now + blocked)
+            self._observed(now)
+            if self._rate is None:
+                return blocked
+            self._tokens = min(
+                self._capacity(), self._tokens + (now - self._updated) * self._rate
+            )
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self._rate if self._tokens < 0 else 0.0
+            return max(wait, blocked)
+
+    def __repr__(self) -> str:
+        return (
+            f"RateLimiter(max_rate={self.max_rate}, current_rate={self._rate}, "
+            f"burst={self.burst})"
+        )
+
+
+def parse_retry_after(value: Any) -> Optional[float]:
+    """Parse a ``Retry-After`` header given in seconds or as an HTTP date."""
+    if not isinstance(value, str) or not value.strip():
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+_lock = threading.Lock()
+_limiters: Dict[Tuple[str, str], RateLimiter] = {}
+
+
+def get_rate_limiter(
+    api_base: str,
+    endpoint_id: str,
+    rate: Optional[float] = None,
+    burst: Optional[int] = None,
+) -> RateLimiter:
+    """Return the limiter shared by all requests to an endpoint.
+
+    The first caller that passes a ``rate`` decides the limit of the endpoint.
+    """
+    key = (api_base, endpoint_id)
+    with _lock:
+        limiter = _limiters.get(key)
+        if limiter is None or (limiter.max_rate is None and rate is not None):
+            limiter = _limiters[key] = RateLimiter(rate, burst)
+        return limiter
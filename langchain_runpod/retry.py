@@ -0,0 +1,288 @@
+"""Retries of transient RunPod API failures.
+
+Requests that fail with a connection error or a transient HTTP status are sent
+again after an exponential backoff with full jitter. To keep an outage from
+multiplying the request volume, retries are paid from a budget that only grows
+with the number of requests made: by default at most one retry per five
+requests, plus a small reserve.
+
+429 responses are not counted against the budget; they are handled by the
+endpoint's :class:`~langchain_runpod.rate_limit.RateLimiter`.
+"""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Callable, FrozenSet, Iterator, Optional
+
+import httpx
+
+from langchain_runpod.rate_limit import RateLimiter, parse_retry_after
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS_CODES: FrozenSet[int] = frozenset({408, 500, 502, 503, 504})
+"""HTTP statuses that indicate a transient failure worth retrying."""
+
+# Statuses of a gateway that could not hand the request to RunPod at all; the
+# only ones safe to retry for job submissions. A 408, 500 or 504 may come back
+# after the job was already created.
+_REJECTED_STATUS_CODES: FrozenSet[int] = frozenset({502, 503})
+
+# Errors raised before the request could have reached RunPod in full; safe to
+# retry even for job submissions. Read and protocol errors are not among them:
+# they can happen after the submission was delivered and the job created.
+_CONNECTION_ERRORS = (
+    httpx.ConnectError,
+    httpx.ConnectTimeout,
+    httpx.PoolTimeout,
+    httpx.WriteError,
+)
+
+
+class RetryPolicy:
+    """Decides whether and when a failed request is retried.
+
+    A policy keeps its retry budget, so it is usually created per model
+    instance; share an instance to share the budget.
+
+    Args:
+        max_retries: Maximum number of retries per request.
+        initial_backoff: Upper bound of the delay before the first retry.
+        max_backoff: Upper bound of any retry delay.
+        multiplier: Factor applied to the delay bound after each retry.
+        retry_statuses: HTTP statuses that are retried.
+        budget_ratio: Retries earned per request made.
+        budget_reserve: Retries available before any request was made, and the
+            maximum the budget can grow to.
+    """
+
+    def __init__(
+        self,
+        max_retries: int = 2,
+        initial_backoff: float = 0.5,
+        max_backoff: float = 8.0,
+        multiplier: float = 2.0,
+        retry_statuses: FrozenSet[int] = RETRYABLE_STATUS_CODES,
+        budget_ratio: float = 0.2,
+        budget_reserve: float = 10.0,
+    ) -> None:
+        if max_retries < 0:
+            raise ValueError("max_retries must not be negative.")
+        self.max_retries = max_retries
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.multiplier = multiplier
+        self.retry_statuses = retry_statuses
+        self.budget_ratio = budget_ratio
+        self.budget_reserve = budget_reserve
+        self._budget = budget_reserve
+        self._lock = threading.Lock()
+
+    @property
+    def budget(self) -> float:
+        """Number of retries currently available."""
+        return self._budget
+
+    def should_retry_status(self, status_code: int, idempotent: bool = True) -> bool:
+        """Whether a response with ``status_code`` is worth retrying.
+
+        Non-idempotent requests (job submissions) are only retried on a 502 or
+        503, which mean the request never reached RunPod.
+        """
+        if status_code not in self.retry_statuses:
+            return False
+        return idempotent or status_code in _REJECTED_STATUS_CODES
+
+    def should_retry_error(self, error: Exception, idempotent: bool = True) -> bool:
+        """Whether a request that raised ``error`` is worth retrying.
+
+        Non-idempotent requests (job submissions) are only retried if the
+        failure was a connection error, not e.g. a read timeout after the job
+        may already have been created.
+        """
+        if idempotent:
+            return isinstance(error, httpx.TransportError)
+        return isinstance(error, _CONNECTION_ERRORS)
+
+    def get_delay(self, retry: int) -> float:
+        """Return the delay before the zero-based ``retry``, with full jitter."""
+        bound = min(self.initial_backoff * self.multiplier**retry, self.max_backoff)
+        return random.uniform(0, bound)
+
+    def on_request(self) -> None:
+        """Earn budget for a request that is about to be made."""
+        with self._lock:
+            self._budget = min(self.budget_reserve, self._budget + self.budget_ratio)
+
+    def acquire_retry(self) -> bool:
+        """Take one retry from the budget; False if the budget is exhausted."""
+        with self._lock:
+            if self._budget < 1:
+                return False
+            self._budget -= 1
+            return True
+
+    def __repr__(self) -> str:
+        return (
+            f"RetryPolicy(max_retries={self.max_retries}, "
+            f"initial_backoff={self.initial_backoff}, max_backoff={self.max_backoff})"
+        )
+
+
+class RetryCounter:
+    """Counts the retries made on behalf of one job."""
+
+    __slots__ = ("count",)
+
+    def __init__(self) -> None:
+        self.count = 0
+
+
+_current_counter: ContextVar[Optional[RetryCounter]] = ContextVar(
+    "runpod_retry_counter", default=None
+)
+
+
+@contextmanager
+def track_retries(counter: Optional[RetryCounter] = None) -> Iterator[RetryCounter]:
+    """Count the retries of all requests sent within the block."""
+    counter = counter or RetryCounter()
+    token = _current_counter.set(counter)
+    try:
+        yield counter
+    finally:
+        _current_counter.reset(token)
+
+
+def current_retry_counter() -> Optional[RetryCounter]:
+    """The counter of the innermost :func:`track_retries` block, if any."""
+    return _current_counter.get()
+
+
+def _record_retry() -> None:
+    counter = _current_counter.get()
+    if counter is not None:
+        counter.count += 1
+
+
+def _retry_decision(
+    policy: RetryPolicy,
+    retries: int,
+    error: Optional[Exception] = None,
+    response: Optional[httpx.Response] = None,
+    idempotent: bool = True,
+) -> bool:
+    if retries >= policy.max_retries:
+        return False
+    if error is not None and not policy.should_retry_error(error, idempotent):
+        return False
+    if response is not None and not policy.should_retry_status(
+        response.status_code, idempotent
+    ):
+        return False
+    if not policy.acquire_retry():
+        logger.warning("RunPod retry budget exhausted, not retrying")
+        return False
+    return True
+
+
+def send_with_retries(
+    send: Callable[[], httpx.Response],
+    limiter: RateLimiter,
+    policy: RetryPolicy,
+    max_rate_limit_retries: int = 5,
+    idempotent: bool = True,
+) -> httpx.Response:
+    """Send a request through ``limiter``, retrying 429s and transient failures.
+
+    Returns the last response; errors of the last attempt are raised.
+    """
+    retries = 0
+    rate_limited = 0
+    while True:
+        limiter.acquire()
+        policy.on_request()
+        try:
+            response = send()
+        except Exception as e:
+            if not _retry_decision(policy, retries, error=e, idempotent=idempotent):
+                raise
+            logger.warning("RunPod request failed, retrying (retry %s): %s", retries + 1, e)
+        else:
+            if response.status_code == 429:
+                limiter.on_rate_limited(parse_retry_after(response.headers.get("Retry-After")))
+                if rate_limited >= max_rate_limit_retries:
+                    return response
+                rate_limited += 1
+                _record_retry()
+                # Release the connection of a streamed response before resending
+                response.close()
+                logger.warning(
+                    "RunPod endpoint is rate limited, slowing down to %s requests per second",
+                    limiter.current_rate,
+                )
+                continue
+            limiter.on_success()
+            if not _retry_decision(policy, retries, response=response, idempotent=idempotent):
+                return response
+            logger.warning(
+                "RunPod request returned %s, retrying (retry %s)",
+                response.status_code,
+                retries + 1,
+            )
+            response.close()
+        time.sleep(policy.get_delay(retries))
+        retries += 1
+        _record_retry()
+
+
+async def asend_with_retries(
+    send: Callable[[], Awaitable[httpx.Response]],
+    limiter: RateLimiter,
+    policy: RetryPolicy,
+    max_rate_limit_retries: int = 5,
+    idempotent: bool = True,
+) -> httpx.Response:
+    """Asynchronously send a request, retrying 429s and transient failures."""
+    retries = 0
+    rate_limited = 0
+    while True:
+        await limiter.aacquire()
+        policy.on_request()
+        try:
+            response = await send()
+        except Exception as e:
+            if not _retry_decision(policy, retries, error=e, idempotent=idempotent):
+                raise
+            logger.warning("RunPod request failed, retrying (retry %s): %s", retries + 1, e)
+        else:
+            if response.status_code == 429:
+                limiter.on_rate_limited(parse_retry_after(response.headers.get("Retry-After")))
+                if rate_limited >= max_rate_limit_retries:
+                    return response
+                rate_limited += 1
+                _record_retry()
+                # Release the connection of a streamed response before resending
+                await response.aclose()
+                logger.warning(
+                    "RunPod endpoint is rate limited, slowing down to %s requests per second",
+                    limiter.current_rate,
+                )
+                continue
+            limiter.on_success()
+            if not _retry_decision(policy, retries, response=response, idempotent=idempotent):
+                return response
+            logger.warning(
+                "RunPod request returned %s, retrying (retry %s)",
+                response.status_code,
+                retries + 1,
+            )
+            await response.aclose()
+        await asyncio.sleep(policy.get_delay(retries))
+        retries += 1
+        _record_retry()
@@ -0,0 +1,189 @@
+"""Coalescing of identical concurrent calls.
+
+When several callers run the same call at the same time (for example an agent
+graph fanning out the same prompt), only the first one, the leader, actually
+runs it; the others wait for its outcome and receive the same result or
+exception. If the leader is interrupted (``KeyboardInterrupt``, task
+cancellation) a waiting caller takes over and runs the call itself.
+
+Sync and async callers can wait for the same call, from any thread or event
+loop.
+"""
+
+import asyncio
+import threading
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Generic,
+    Hashable,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    cast,
+)
+
+T = TypeVar("T")
+
+
+class FlightAbandoned(Exception):
+    """Raised to the callers waiting for a call whose leader was interrupted."""
+
+
+def _wake(future: "asyncio.Future[None]") -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class Flight(Generic[T]):
+    """One call in flight, that any number of callers can wait for."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._result: Optional[T] = None
+        self._error: Optional[BaseException] = None
+        self._abandoned = False
+        self._waiters: List[Tuple[asyncio.AbstractEventLoop, "asyncio.Future[None]"]] = []
+
+    @property
+    def done(self) -> bool:
+        """Whether the call has finished, failed or was abandoned."""
+        return self._done.is_set()
+
+    def wait(self) -> T:
+        """Block until the call is over and return its result or raise its error."""
+        self._done.wait()
+        return self._outcome()
+
+    async def await_(self) -> T:
+        """Wait until the call is over and return its result or raise its error.
+
+        Cancelling the waiting task does not affect the call itself.
+        """
+        with self._lock:
+            future = None
+            if not self._done.is_set():
+                loop = asyncio.get_running_loop()
+                future = loop.create_future()
+                self._waiters.append((loop, future))
+        if future is not None:
+            await future
+        return self._outcome()
+
+    def _settle(
+        self,
+        result: Optional[T] = None,
+        error: Optional[BaseException] = None,
+        abandoned: bool = False,
+    ) -> None:
+        with self._lock:
+            self._result = result
+            self._error = error
+            self._abandoned = abandoned
+            self._done.set()
+            waiters, self._waiters = self._waiters, []
+        for loop, future in waiters:
+            try:
+                loop.call_soon_threadsafe(_wake, future)
+            except RuntimeError:
+                # The waiter's event loop is closed; nobody is waiting any more
+                pass
+
+    def _outcome(self) -> T:
+        if self._abandoned:
+            raise FlightAbandoned("The coalesced call was interrupted.")
+        if self._error is not None:
+            raise self._error
+        return cast(T, self._result)
+
+
+class SingleFlight:
+    """Registry of the calls in flight, by key.
+
+    Thread-safe; one registry can serve sync callers and any number of event
+    loops at once.
+    """
+
+    def __init__(self) -> None:
+        self._flights: Dict[Hashable, Flight[Any]] = {}
+        self._lock = threading.Lock()
+
+    def claim(self, key: Hashable) -> Tuple[Flight[Any], bool]:
+        """Return the flight of ``key`` and whether the caller leads it.
+
+        The leader must end the flight with :meth:`settle` or :meth:`abandon`.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                return flight, False
+            flight = self._flights[key] = Flight()
+            return flight, True
+
+    def settle(
+        self,
+        key: Hashable,
+        flight: Flight[Any],
+        result: Any = None,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        """End a flight with its result or error and wake up all waiters."""
+        self._release(key, flight)
+        flight._settle(result=result, error=error)
+
+    def abandon(self, key: Hashable, flight: Flight[Any]) -> None:
+        """End a flight whose leader was interrupted; waiters retry the call."""
+        self._release(key, flight)
+        flight._settle(abandoned=True)
+
+    def do(self, key: Hashable, call: Callable[[], T]) -> T:
+        """Run ``call``, or wait for the identical call already in flight."""
+        while True:
+            flight, leader = self.claim(key)
+            if not leader:
+                try:
+                    return flight.wait()
+                except FlightAbandoned:
+                    continue
+            try:
+                result = call()
+            except Exception as e:
+                self.settle(key, flight, error=e)
+                raise
+            except BaseException:
+                self.abandon(key, flight)
+                raise
+            self.settle(key, flight, result=result)
+            return result
+
+    async def ado(self, key: Hashable, call: Callable[[], Awaitable[T]]) -> T:
+        """Asynchronously run ``call``, or wait for the identical call in flight."""
+        while True:
+            flight, leader = self.claim(key)
+            if not leader:
+                try:
+                    return await flight.await_()
+                except FlightAbandoned:
+                    continue
+            try:
+                result = await call()
+            except Exception as e:
+                self.settle(key, flight, error=e)
+                raise
+            except BaseException:
+                self.abandon(key, flight)
+                raise
+            self.settle(key, flight, result=result)
+            return result
+
+    def _release(self, key: Hashable, flight: Flight[Any]) -> None:
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+
+    def __len__(self) -> int:
+        return len(self._flights)
@@ -0,0 +1,27 @@
+"""Helpers shared by the unit tests."""
+
+import json
+from typing import Any, Dict, Optional
+from unittest.mock import MagicMock
+
+import httpx
+
+
+def json_response(
+    data: Optional[Any] = None,
+    status_code: int = 200,
+    headers: Optional[Dict[str, str]] = None,
+) -> MagicMock:
+    """A mocked ``httpx.Response`` with a JSON body.
+
+    Like a real response, ``raise_for_status()`` raises for 4xx and 5xx codes.
+    """
+    response = MagicMock(spec=httpx.Response)
+    response.status_code = status_code
+    response.headers = headers or {}
+    response.content = json.dumps({} if data is None else data).encode()
+    if status_code >= 400:
+        response.raise_for_status.side_effect = httpx.HTTPStatusError(
+            f"HTTP {status_code}", request=MagicMock(), response=response
+        )
+    return response
@@ -0,0 +1,169 @@
+"""Tests for the multi-endpoint load balancer."""
+
+import asyncio
+import threading
+import time
+from typing import Any, AsyncIterator, Iterator, List, Optional
+
+import pytest
+from langchain_core.runnables import Runnable, RunnableConfig
+
+from langchain_runpod.balancer import RunPodLoadBalancer
+from langchain_runpod.chat_models import ChatRunPod
+from langchain_runpod.exceptions import RunPodAPIError
+from langchain_runpod.llms import RunPod
+
+
+class _FakeEndpoint(Runnable[Any, Any]):
+    """Answers with its endpoint ID, optionally failing or blocking."""
+
+    def __init__(self, endpoint_id: str, fail: bool = False) -> None:
+        self.endpoint_id = endpoint_id
+        self.fail = fail
+        self.calls: List[Any] = []
+        self.gate: Optional[threading.Event] = None
+
+    def invoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Any:
+        self.calls.append(input)
+        if self.gate is not None:
+            self.gate.wait(5)
+        if self.fail:
+            raise RunPodAPIError(f"{self.endpoint_id} is down")
+        return f"{self.endpoint_id}:{input}"
+
+    async def ainvoke(
+        self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any
+    ) -> Any:
+        await asyncio.sleep(0)
+        return self.invoke(input, config)
+
+    def stream(
+        self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any
+    ) -> Iterator[Any]:
+        self.calls.append(input)
+        if self.fail:
+            raise RunPodAPIError(f"{self.endpoint_id} is down")
+        yield self.endpoint_id
+        yield f":{input}"
+
+    async def astream(
+        self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any
+    ) -> AsyncIterator[Any]:
+        for chunk in self.stream(input, config):
+            yield chunk
+
+
+def test_routes_to_least_outstanding_endpoint() -> None:
+    a, b = _FakeEndpoint("a"), _FakeEndpoint("b")
+    balancer = RunPodLoadBalancer([a, b])
+    gate = threading.Event()
+    a.gate = b.gate = gate
+
+    thread = threading.Thread(target=balancer.invoke, args=("first",))
+    thread.start()
+    while not a.calls and not b.calls:
+        time.sleep(0.001)
+    idle = b if a.calls else a
+    idle.gate = None
+
+    # The endpoint busy with the first call is not picked for the second
+    assert balancer.invoke("second") == f"{idle.endpoint_id}:second"
+    gate.set()
+    thread.join()
+
+    assert [stat["outstanding"] for stat in balancer.stats()] == [0, 0]
+
+
+def test_weights_scale_outstanding_calls() -> None:
+    a, b = _FakeEndpoint("a"), _FakeEndpoint("b")
+    balancer = RunPodLoadBalancer([a, b], weights=[3.0, 1.0])
+    # Hold calls open by acquiring without releasing
+    picks = [balancer._acquire(set()).name for _ in range(8)]  # type: ignore[union-attr]
+    assert picks.count("a") == 6
+    assert picks.count("b") == 2
+
+
+def test_latency_strategy_prefers_fast_endpoint() -> None:
+    slow, fast = _FakeEndpoint("slow"), _FakeEndpoint("fast")
+    balancer = RunPodLoadBalancer([slow, fast], strategy="latency")
+    balancer._members[0].latency = 4.0
+    balancer._members[1].latency = 1.0
+
+    picks = [balancer._acquire(set()).name for _ in range(5)]  # type: ignore[union-attr]
+
+    # The fast endpoint drains 4 calls in the time the slow one drains 1
+    assert picks.count("fast") == 4
+    assert picks.count("slow") == 1
+
+
+def test_failed_call_fails_over_and_ejects_endpoint() -> None:
+    down, up = _FakeEndpoint("down", fail=True), _FakeEndpoint("up")
+    # Weighted so that the broken endpoint is preferred while it is in rotation
+    balancer = RunPodLoadBalancer([down, up], weights=[2.0, 1.0], max_failures=2, ejection_time=60)
+
+    results = [balancer.invoke(str(i)) for i in range(6)]
+
+    assert all(result.startswith("up:") for result in results)
+    # Taken out of rotation after its second failure
+    assert len(down.calls) == 2
+    stats = {stat["name"]: stat for stat in balancer.stats()}
+    assert stats["down"]["healthy"] is False
+    assert stats["up"]["healthy"] is True
+    assert stats["up"]["latency"] is not None
+
+
+def test_ejected_endpoint_returns_after_ejection_time() -> None:
+    flaky = _FakeEndpoint("flaky", fail=True)
+    balancer = RunPodLoadBalancer([flaky], max_failures=1, ejection_time=0)
+
+    with pytest.raises(RunPodAPIError):
+        balancer.invoke("x")
+    flaky.fail = False
+
+    assert balancer.invoke("x") == "flaky:x"
+    assert balancer.stats()[0]["failures"] == 0
+
+
+def test_all_endpoints_failing_raises() -> None:
+    balancer = RunPodLoadBalancer([_FakeEndpoint("a", fail=True), _FakeEndpoint("b", fail=True)])
+    with pytest.raises(RunPodAPIError, match="is down"):
+        balancer.invoke("x")
+
+
+def test_stream_and_batch() -> None:
+    down, up = _FakeEndpoint("down", fail=True), _FakeEndpoint("up")
+    balancer = RunPodLoadBalancer([down, up], max_failures=1)
+
+    assert "".join(balancer.stream("x")) == "up:x"
+    assert balancer.batch(["a", "b"]) == ["up:a", "up:b"]
+
+
+async def test_async_surface() -> None:
+    a, b = _FakeEndpoint("a"), _FakeEndpoint("b", fail=True)
+    balancer = RunPodLoadBalancer([a, b])
+
+    assert await balancer.ainvoke("x") == "a:x"
+    assert "".join([chunk async for chunk in balancer.astream("y")]) == "a:y"
+    assert await balancer.abatch(["p", "q"]) == ["a:p", "a:q"]
+
+
+def test_from_endpoints_copies_model_settings() -> None:
+    base = ChatRunPod(endpoint_id="ep-a", api_key="key", temperature=0.2)
+
+    balancer = RunPodLoadBalancer.from_endpoints(base, {"ep-a": 2.0, "ep-b": 1.0})
+
+    models = balancer.models
+    assert [model.endpoint_id for model in models] == ["ep-a", "ep-b"]
+    assert all(isinstance(model, ChatRunPod) and model.temperature == 0.2 for model in models)
+    assert models[1].model_name == "runpod-endpoint-ep-b"
+    assert [stat["weight"] for stat in balancer.stats()] == [2.0, 1.0]
+
+
+def test_invalid_arguments() -> None:
+    llm = RunPod(endpoint_id="ep", api_key="key")
+    with pytest.raises(ValueError):
+        RunPodLoadBalancer([])
+    with pytest.raises(ValueError):
+        RunPodLoadBalancer([llm], weights=[1.0, 2.0])
+    with pytest.raises(ValueError):
+        RunPodLoadBalancer([llm], strategy="random")  # type: ignore[arg-type]
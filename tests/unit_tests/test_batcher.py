@@ -0,0 +1,73 @@
+"""Unit tests for the micro-batcher."""
+
+import asyncio
+
+import pytest
+
+from langchain_runpod.batcher import MicroBatcher
+
+
+@pytest.mark.asyncio
+async def test_collects_concurrent_requests_per_key():
+    batches = []
+
+    async def run_batch(items):
+        batches.append(items)
+        return [item * 10 for item in items]
+
+    batcher = MicroBatcher(run_batch, key=lambda item: item % 2, window=0.01, max_size=8)
+    results = await asyncio.gather(*(batcher.submit(i) for i in range(6)))
+
+    assert results == [0, 10, 20, 30, 40, 50]
+    assert sorted(batches) == [[0, 2, 4], [1, 3, 5]]
+    assert batcher.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_flushes_when_full():
+    batches = []
+
+    async def run_batch(items):
+        batches.append(items)
+        return items
+
+    # A window this long would fail the test if full batches waited for it
+    batcher = MicroBatcher(run_batch, key=lambda item: 0, window=60, max_size=2)
+    results = await asyncio.wait_for(
+        asyncio.gather(*(batcher.submit(i) for i in range(4))), timeout=5
+    )
+
+    assert results == [0, 1, 2, 3]
+    assert batches == [[0, 1], [2, 3]]
+
+
+@pytest.mark.asyncio
+async def test_fans_out_errors():
+    async def run_batch(items):
+        return [ValueError("bad") if item == "bad" else item for item in items]
+
+    batcher = MicroBatcher(run_batch, key=lambda item: 0, window=0.01)
+    results = await asyncio.gather(
+        batcher.submit("good"), batcher.submit("bad"), return_exceptions=True
+    )
+
+    assert results[0] == "good"
+    assert isinstance(results[1], ValueError)
+
+
+@pytest.mark.asyncio
+async def test_batch_failure_reaches_every_caller():
+    async def run_batch(items):
+        raise RuntimeError("worker down")
+
+    batcher = MicroBatcher(run_batch, key=lambda item: 0, window=0.01)
+    results = await asyncio.gather(
+        batcher.submit(1), batcher.submit(2), return_exceptions=True
+    )
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+def test_invalid_settings():
+    with pytest.raises(ValueError):
+        MicroBatcher(lambda items: items, key=lambda item: 0, max_size=0)
@@ -0,0 +1,91 @@
+"""Unit tests for the response caches."""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from langchain_runpod.cache import (
+    InMemoryResponseCache,
+    SQLiteResponseCache,
+    TieredResponseCache,
+    cache_key,
+)
+
+RESPONSE = {"id": "job", "status": "COMPLETED", "output": "Hello"}
+
+
+def test_cache_key_normalizes_payload() -> None:
+    first = cache_key("https://api", "ep", {"input": {"prompt": "a", "temperature": 0.1}})
+    second = cache_key("https://api/", "ep", {"input": {"temperature": 0.1, "prompt": "a"}})
+
+    assert first == second
+    assert first != cache_key("https://api", "ep", {"input": {"prompt": "a", "temperature": 0.2}})
+    assert first != cache_key("https://api", "other", {"input": {"prompt": "a", "temperature": 0.1}})
+
+
+def test_in_memory_cache_evicts_least_recently_used() -> None:
+    cache = InMemoryResponseCache(max_size=2)
+    cache.update("a", RESPONSE)
+    cache.update("b", RESPONSE)
+    cache.lookup("a")
+    cache.update("c", RESPONSE)
+
+    assert cache.lookup("a") == RESPONSE
+    assert cache.lookup("b") is None
+    assert len(cache) == 2
+
+
+def test_in_memory_cache_expires_entries() -> None:
+    cache = InMemoryResponseCache(ttl=10)
+    with patch("langchain_runpod.cache.time.monotonic", return_value=100.0):
+        cache.update("a", RESPONSE)
+    with patch("langchain_runpod.cache.time.monotonic", return_value=105.0):
+        assert cache.lookup("a") == RESPONSE
+    with patch("langchain_runpod.cache.time.monotonic", return_value=111.0):
+        assert cache.lookup("a") is None
+
+
+def test_in_memory_cache_returns_copies() -> None:
+    cache = InMemoryResponseCache()
+    cache.update("a", RESPONSE)
+    cache.lookup("a")["output"] = "changed"
+
+    assert cache.lookup("a") == RESPONSE
+
+
+def test_sqlite_cache_is_shared_between_instances(tmp_path) -> None:
+    path = str(tmp_path / "responses.db")
+    SQLiteResponseCache(path).update("a", RESPONSE)
+
+    cache = SQLiteResponseCache(path, max_size=1)
+    assert cache.lookup("a") == RESPONSE
+    cache.update("b", RESPONSE)
+    assert cache.lookup("a") is None
+    assert asyncio.run(cache.alookup("b")) == RESPONSE
+
+
+def test_sqlite_cache_expires_entries(tmp_path) -> None:
+    cache = SQLiteResponseCache(str(tmp_path / "responses.db"), ttl=10)
+    with patch("langchain_runpod.cache.time.time", return_value=100.0):
+        cache.update("a", RESPONSE)
+    with patch("langchain_runpod.cache.time.time", return_value=111.0):
+        assert cache.lookup("a") is None
+
+
+def test_tiered_cache_fills_faster_tiers(tmp_path) -> None:
+    memory = InMemoryResponseCache()
+    disk = SQLiteResponseCache(str(tmp_path / "responses.db"))
+    disk.update("a", RESPONSE)
+    cache = TieredResponseCache(memory, disk)
+
+    assert cache.lookup("a") == RESPONSE
+    assert memory.lookup("a") == RESPONSE
+    assert cache.lookup("missing") is None
+
+
+def test_invalid_settings() -> None:
+    with pytest.raises(ValueError):
+        InMemoryResponseCache(max_size=0)
+    with pytest.raises(ValueError):
+        TieredResponseCache()
@@ -0,0 +1,76 @@
+"""Unit tests for the chat templates."""
+
+from unittest.mock import patch
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+
+from langchain_runpod.chat_templates import (
+    ChatMLTemplate,
+    Llama3ChatTemplate,
+    MistralChatTemplate,
+    PlainChatTemplate,
+    get_chat_template,
+)
+
+MESSAGES = [
+    SystemMessage(content="Be brief."),
+    HumanMessage(content="Hi"),
+    AIMessage(content="Hello!"),
+    HumanMessage(content="Bye"),
+]
+
+
+def test_plain() -> None:
+    assert PlainChatTemplate().render(MESSAGES) == (
+        "System: Be brief.\nUser: Hi\nAssistant: Hello!\nUser: Bye"
+    )
+
+
+def test_chatml() -> None:
+    assert ChatMLTemplate().render(MESSAGES) == (
+        "<|im_start|>system\nBe brief.<|im_end|>\n"
+        "<|im_start|>user\nHi<|im_end|>\n"
+        "<|im_start|>assistant\nHello!<|im_end|>\n"
+        "<|im_start|>user\nBye<|im_end|>\n"
+        "<|im_start|>assistant\n"
+    )
+
+
+def test_llama3() -> None:
+    prompt = Llama3ChatTemplate().render(MESSAGES[:2])
+    assert prompt == (
+        "<|begin_of_text|>"
+        "<|start_header_id|>system<|end_header_id|>\n\nBe brief.<|eot_id|>"
+        "<|start_header_id|>user<|end_header_id|>\n\nHi<|eot_id|>"
+        "<|start_header_id|>assistant<|end_header_id|>\n\n"
+    )
+
+
+def test_mistral_folds_system_into_user_turn() -> None:
+    assert MistralChatTemplate().render(MESSAGES) == (
+        "<s>[INST] Be brief.\n\nHi [/INST]Hello!</s>[INST] Bye [/INST]"
+    )
+    tool = ToolMessage(content="42", tool_call_id="call")
+    assert MistralChatTemplate().render([tool]) == "<s>[INST] 42 [/INST]"
+
+
+def test_segments_are_memoized() -> None:
+    template = ChatMLTemplate(cache_size=10)
+    history = [HumanMessage(content=f"message {i}") for i in range(5)]
+    template.render(history)
+
+    with patch.object(template, "format_turn", wraps=template.format_turn) as format_turn:
+        template.render([*history, HumanMessage(content="new")])
+    format_turn.assert_called_once_with("user", "new")
+
+    template.render([HumanMessage(content=f"other {i}") for i in range(20)])
+    assert len(template._segments) == 10
+
+
+def test_get_chat_template() -> None:
+    template = ChatMLTemplate()
+    assert get_chat_template(template) is template
+    assert get_chat_template("llama3").name == "llama3"
+    with pytest.raises(ValueError, match="Unknown chat template"):
+        get_chat_template("nope")
@@ -0,0 +1,263 @@
+"""Tests for per-endpoint circuit breakers."""
+
+from typing import Any, List, Tuple
+from unittest.mock import MagicMock, patch
+
+import httpx
+import pytest
+from langchain_core.messages import HumanMessage
+
+from langchain_runpod.chat_models import ChatRunPod
+from langchain_runpod.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    get_circuit_breaker,
+)
+from langchain_runpod.exceptions import CircuitOpenError, RunPodAPIError
+from langchain_runpod.hedging import HedgePolicy
+from langchain_runpod.llms import RunPod
+
+from tests.unit_tests.helpers import json_response
+
+
+@pytest.fixture(autouse=True)
+def fresh_breakers():
+    """Keep shared breakers from leaking between tests."""
+    with patch("langchain_runpod.circuit_breaker._breakers", {}):
+        yield
+
+
+# --- CircuitBreaker ---
+
+def test_opens_after_consecutive_failures() -> None:
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+    assert 0 < breaker.retry_after() <= 60
+
+
+def test_opens_on_failure_rate() -> None:
+    breaker = CircuitBreaker(
+        failure_threshold=10, failure_rate_threshold=0.5, window=6, min_calls=6
+    )
+    for _ in range(2):
+        breaker.record_success()
+        breaker.record_failure()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+
+    breaker.record_failure()
+    assert breaker.state == OPEN
+
+
+@patch("langchain_runpod.circuit_breaker.time.monotonic")
+def test_half_open_lets_probes_through(mock_monotonic: MagicMock) -> None:
+    mock_monotonic.return_value = 100.0
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, half_open_max_calls=1)
+    breaker.record_failure()
+    assert breaker.state == OPEN
+
+    mock_monotonic.return_value = 110.0
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()
+
+    # A failed probe reopens the circuit
+    breaker.record_failure()
+    assert breaker.metrics["opened"] == 2
+    assert not breaker.allow()
+
+    # A released probe frees its slot, and so does one that never reports back
+    mock_monotonic.return_value = 120.0
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.allow()
+    mock_monotonic.return_value = 130.0
+    assert breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.allow()
+
+
+def test_record_error_only_counts_endpoint_failures() -> None:
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    request = httpx.Request("POST", "https://api/run")
+    for status_code in (400, 429):
+        response = httpx.Response(status_code, request=request)
+        breaker.record_error(httpx.HTTPStatusError("", request=request, response=response))
+    assert breaker.state == CLOSED
+
+    breaker.record_error(httpx.ConnectError("down"))
+    assert breaker.state == OPEN
+
+
+def test_listeners_and_metrics() -> None:
+    changes: List[Tuple[str, str]] = []
+
+    def broken_listener(breaker: CircuitBreaker, old: str, new: str) -> None:
+        raise RuntimeError("listener failed")
+
+    breaker = CircuitBreaker(
+        name="ep",
+        failure_threshold=2,
+        reset_timeout=60,
+        listeners=[broken_listener, lambda breaker, old, new: changes.append((old, new))],
+    )
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.allow()
+
+    assert changes == [(CLOSED, OPEN)]
+    assert breaker.metrics == {
+        "state": OPEN,
+        "successes": 1,
+        "failures": 2,
+        "rejected": 1,
+        "opened": 1,
+        "consecutive_failures": 2,
+        "failure_rate": pytest.approx(2 / 3),
+    }
+
+    breaker.reset()
+    assert changes[-1] == (OPEN, CLOSED)
+    assert breaker.metrics["consecutive_failures"] == 0
+
+
+def test_shared_per_endpoint() -> None:
+    breaker = get_circuit_breaker("https://api", "ep", failure_threshold=2)
+    assert get_circuit_breaker("https://api", "ep") is breaker
+    assert breaker.failure_threshold == 2
+    assert get_circuit_breaker("https://api", "other") is not breaker
+
+
+# --- Models ---
+
+@patch("httpx.Client.post")
+def test_llm_fails_fast_once_open(mock_post: MagicMock) -> None:
+    mock_post.return_value = json_response({"id": "job", "status": "FAILED", "error": "crash"})
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    llm = RunPod(endpoint_id="ep", api_key="key", circuit_breaker=breaker)
+
+    for _ in range(2):
+        with pytest.raises(RunPodAPIError, match="FAILED"):
+            llm.invoke("hi")
+    with pytest.raises(CircuitOpenError, match="endpoint ep is open") as info:
+        llm.invoke("hi")
+
+    assert mock_post.call_count == 2
+    assert info.value.endpoint_id == "ep"
+    assert info.value.retry_after > 0
+    assert llm.endpoint_circuit_breaker is breaker
+
+
+@patch("httpx.Client.post")
+def test_llm_server_errors_open_the_circuit(mock_post: MagicMock) -> None:
+    mock_post.return_value = json_response({"error": "unavailable"}, status_code=500)
+    llm = RunPod(endpoint_id="ep", api_key="key", max_retries=0, circuit_breaker=True)
+    get_circuit_breaker(llm.api_base, "ep").failure_threshold = 1
+
+    with pytest.raises(RunPodAPIError):
+        llm.invoke("hi")
+    with pytest.raises(CircuitOpenError):
+        llm.invoke("hi")
+    assert mock_post.call_count == 1
+
+
+@patch("httpx.AsyncClient.post")
+@patch("httpx.AsyncClient.get")
+async def test_chat_timeouts_open_the_shared_circuit(mock_get: MagicMock, mock_post: MagicMock) -> None:
+    async def post(url: str, **kwargs: Any) -> MagicMock:
+        if url.endswith("/run"):
+            return json_response({"id": "job", "status": "IN_QUEUE"})
+        return json_response({"status": "CANCELLED"})
+
+    async def get(url: str, **kwargs: Any) -> MagicMock:
+        return json_response({"id": "job", "status": "IN_QUEUE"})
+
+    mock_post.side_effect = post
+    mock_get.side_effect = get
+    chat = ChatRunPod(
+        endpoint_id="ep",
+        api_key="key",
+        poll_interval=0,
+        max_polling_attempts=2,
+        circuit_breaker=True,
+    )
+    get_circuit_breaker(chat.api_base, "ep", failure_threshold=1)
+
+    with pytest.raises(ValueError, match="Max polling attempts"):
+        await chat.ainvoke([HumanMessage(content="hi")])
+    assert mock_post.call_args[0][0].endswith("/cancel/job")
+
+    # Shared with every instance targeting the endpoint
+    llm = RunPod(endpoint_id="ep", api_key="key", circuit_breaker=True)
+    assert llm.endpoint_circuit_breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        await chat.ainvoke([HumanMessage(content="hi")])
+    assert mock_post.call_count == 2
+
+
+@patch("httpx.Client.get")
+@patch("httpx.Client.post")
+def test_hedge_outcomes_count_towards_the_hedge_endpoint(
+    mock_post: MagicMock, mock_get: MagicMock
+) -> None:
+    def post(url: str, **kwargs: Any) -> MagicMock:
+        if url.endswith("/primary/run"):
+            return json_response({"id": "job-1", "status": "IN_QUEUE"})
+        if url.endswith("/backup/run"):
+            return json_response({"id": "job-2", "status": "IN_QUEUE"})
+        return json_response({"status": "CANCELLED"})
+
+    def get(url: str, **kwargs: Any) -> MagicMock:
+        if url.endswith("/backup/status/job-2"):
+            return json_response({"id": "job-2", "status": "COMPLETED", "output": "hedged"})
+        return json_response({"id": "job-1", "status": "IN_QUEUE"})
+
+    mock_post.side_effect = post
+    mock_get.side_effect = get
+    llm = RunPod(
+        endpoint_id="primary",
+        api_key="key",
+        poll_interval=0,
+        hedge_policy=HedgePolicy(delay=0),
+        hedge_endpoint_id="backup",
+        circuit_breaker=True,
+    )
+    primary = get_circuit_breaker(llm.api_base, "primary", failure_threshold=1, reset_timeout=0)
+    primary.record_failure()
+
+    assert llm.invoke("hi") == "hedged"
+
+    # The original job was only cancelled, so the probe says nothing yet
+    assert primary.state == HALF_OPEN
+    assert primary.metrics["successes"] == 0
+    assert get_circuit_breaker(llm.api_base, "backup").metrics["successes"] == 1
+
+
+@patch("httpx.Client.post")
+async def test_packed_batch_reports_open_circuit_per_input(mock_post: MagicMock) -> None:
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    breaker.record_failure()
+    chat = ChatRunPod(
+        endpoint_id="ep", api_key="key", pack_batches=True, circuit_breaker=breaker
+    )
+
+    results = chat.batch(["hi", "there"], return_exceptions=True)
+    assert [type(result) for result in results] == [CircuitOpenError, CircuitOpenError]
+
+    results = await chat.abatch(["hi", "there"], return_exceptions=True)
+    assert [type(result) for result in results] == [CircuitOpenError, CircuitOpenError]
+    mock_post.assert_not_called()
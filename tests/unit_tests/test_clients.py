@@ -0,0 +1,157 @@
+"""Unit tests for the shared HTTP client registry."""
+
+import asyncio
+
+import pytest
+
+from langchain_runpod import ChatRunPod, RunPod
+from langchain_runpod.clients import (
+    HTTPClientConfig,
+    aclose_shared_clients,
+    get_sync_client,
+)
+
+
+def test_instances_share_client():
+    llm = RunPod(endpoint_id="a", api_key="test-key", temperature=0.1)
+    other_llm = RunPod(endpoint_id="b", api_key="test-key", temperature=0.9)
+    chat = ChatRunPod(endpoint_id="c", api_key="test-key")
+
+    assert llm._get_client() is other_llm._get_client() is chat._get_client()
+
+
+def test_different_settings_use_different_clients():
+    llm = RunPod(endpoint_id="a", api_key="test-key")
+    other_key = RunPod(endpoint_id="a", api_key="other-key")
+    other_timeout = RunPod(endpoint_id="a", api_key="test-key", timeout=5)
+    other_limits = RunPod(endpoint_id="a", api_key="test-key", max_connections=5)
+
+    assert llm._get_client() is not other_key._get_client()
+    assert llm._get_client() is not other_timeout._get_client()
+    assert llm._get_client() is not other_limits._get_client()
+
+
+def test_unshared_client():
+    llm = RunPod(endpoint_id="a", api_key="test-key")
+    private = RunPod(endpoint_id="a", api_key="test-key", share_http_client=False)
+
+    assert private._get_client() is not llm._get_client()
+
+
+def test_closed_client_is_replaced():
+    config = HTTPClientConfig(api_base="https://example.invalid", auth_digest="x")
+    client = get_sync_client(config)
+    client.close()
+
+    assert get_sync_client(config) is not client
+    assert not get_sync_client(config).is_closed
+
+
+def test_timeouts_and_limits():
+    llm = RunPod(
+        endpoint_id="a",
+        api_key="test-key",
+        timeout=30,
+        connect_timeout=2.0,
+        max_keepalive_connections=7,
+    )
+    config = HTTPClientConfig.from_model(llm)
+    timeout = config.get_timeout()
+
+    assert (timeout.connect, timeout.read, timeout.pool) == (2.0, 30, 30)
+    assert config.get_limits().max_keepalive_connections == 7
+    assert "test-key" not in repr(config)
+
+
+# --- Lifecycle ---
+
+@pytest.mark.asyncio
+async def test_async_clients_are_shared_per_event_loop():
+    llm = RunPod(endpoint_id="a", api_key="test-key")
+    chat = ChatRunPod(endpoint_id="b", api_key="test-key")
+    client = llm._get_async_client()
+
+    assert chat._get_async_client() is client
+
+    def other_loop_client():
+        async def get_client():
+            return llm._get_async_client()
+        return asyncio.run(get_client())
+
+    assert await asyncio.to_thread(other_loop_client) is not client
+
+    await aclose_shared_clients()
+    assert client.is_closed
+    assert llm._get_async_client() is not client
+
+
+def test_async_client_requires_running_loop():
+    llm = RunPod(endpoint_id="a", api_key="test-key")
+    with pytest.raises(RuntimeError):
+        llm._get_async_client()
+
+
+def test_close_releases_owned_clients():
+    with RunPod(endpoint_id="a", api_key="test-key", share_http_client=False) as llm:
+        client = llm._get_client()
+
+        async def get_client():
+            return llm._get_async_client()
+
+        loop = asyncio.new_event_loop()
+        try:
+            async_client = loop.run_until_complete(get_client())
+        finally:
+            # Closing the model must close the client on its own (still open) loop
+            llm.close()
+            loop.close()
+
+    assert client.is_closed
+    assert async_client.is_closed
+
+
+def test_close_keeps_shared_clients_open():
+    shared = RunPod(endpoint_id="a", api_key="test-key")
+    with RunPod(endpoint_id="b", api_key="test-key") as llm:
+        client = llm._get_client()
+
+    assert not client.is_closed
+    assert shared._get_client() is client
+
+
+@pytest.mark.asyncio
+async def test_async_context_manager_closes_owned_clients():
+    async with ChatRunPod(
+        endpoint_id="a", api_key="test-key", share_http_client=False
+    ) as chat:
+        client = chat._get_async_client()
+        sync_client = chat._get_client()
+
+    assert client.is_closed
+    assert sync_client.is_closed
+
+
+def test_aclose_drops_clients_of_idle_foreign_loop():
+    llm = RunPod(endpoint_id="a", api_key="test-key", share_http_client=False)
+    sync_client = llm._get_client()
+
+    async def get_client():
+        return llm._get_async_client()
+
+    loop = asyncio.new_event_loop()
+    try:
+        foreign_client = loop.run_until_complete(get_client())
+
+        async def use_and_close():
+            client = llm._get_async_client()
+            await llm.aclose()
+            return client
+
+        # The foreign loop is idle but open; it cannot be driven from here
+        client = asyncio.run(use_and_close())
+    finally:
+        loop.close()
+
+    assert client.is_closed
+    assert sync_client.is_closed
+    assert not foreign_client.is_closed
@@ -0,0 +1,70 @@
+"""Unit tests for the JSON codec and request templates."""
+
+import json
+from unittest.mock import MagicMock
+
+import httpx
+import pytest
+
+from langchain_runpod import codec
+from langchain_runpod.codec import RequestTemplate, decode_response, dumps, loads
+from langchain_runpod.llms import RunPod
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def json_codec(request, monkeypatch):
+    """Run a test with orjson, if installed, and with the standard library."""
+    if request.param == "stdlib":
+        monkeypatch.setattr(codec, "orjson", None)
+    elif codec.orjson is None:
+        pytest.skip("orjson is not installed")
+    return request.param
+
+
+def test_round_trip(json_codec) -> None:
+    data = {"input": {"prompt": "héllo \"quoted\"", "temperature": 0.5, "stop": ["\n"]}}
+    assert loads(dumps(data)) == data
+    assert json.loads(dumps(data)) == data
+
+
+def test_decode_response(json_codec) -> None:
+    response = MagicMock(spec=httpx.Response)
+    response.content = b'{"id": "job", "status": "COMPLETED"}'
+    assert decode_response(response) == {"id": "job", "status": "COMPLETED"}
+
+
+def test_template_only_encodes_the_prompt(json_codec) -> None:
+    params = {"temperature": 0.1, "max_tokens": 10, "stop": ["User:"]}
+    template = RequestTemplate("https://api.runpod.ai/v2", "ep", "key", params)
+    payload = {"input": {"prompt": "Say \"hi\"\n", **template.params}}
+
+    assert json.loads(template.encode(payload)) == payload
+    assert template.run_url == "https://api.runpod.ai/v2/ep/run"
+    assert template.status_url + "job" == "https://api.runpod.ai/v2/ep/status/job"
+    assert template.headers["Authorization"] == "Bearer key"
+
+
+def test_template_encodes_other_payloads_in_full(json_codec) -> None:
+    template = RequestTemplate("https://api.runpod.ai/v2", "ep", "key", {"temperature": 0.1})
+
+    for payload in [
+        {"input": {"prompt": "hi"}},
+        {"input": {"prompt": "hi", "temperature": 0.9}},
+        {"input": {"prompt": ["a", "b"], "temperature": 0.1}},
+        {"input": {"prompt": "hi", "temperature": 0.1}, "webhook": "https://hook"},
+    ]:
+        assert json.loads(template.encode(payload)) == payload
+
+    empty = RequestTemplate("https://api.runpod.ai/v2", "ep", "key", {})
+    assert json.loads(empty.encode({"input": {"prompt": "hi"}})) == {"input": {"prompt": "hi"}}
+
+
+def test_template_is_rebuilt_when_settings_change() -> None:
+    llm = RunPod(endpoint_id="ep", api_key="key", temperature=0.1)
+    template = llm._request_template()
+    assert llm._request_template() is template
+
+    llm.temperature = 0.7
+    assert llm._request_template() is not template
+    assert llm._build_payload("hi")["input"]["temperature"] == 0.7
+    assert llm._build_payload("hi", stop=["\n"])["input"]["stop"] == ["\n"]
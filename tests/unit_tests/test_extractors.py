@@ -0,0 +1,60 @@
+"""Unit tests for the output extractor registry."""
+
+from unittest.mock import MagicMock
+
+from langchain_runpod.extractors import OutputExtractorRegistry, find_usage
+
+
+def test_extract_builtin_shapes() -> None:
+    registry = OutputExtractorRegistry()
+
+    assert registry.extract("plain") == "plain"
+    assert registry.extract({"generated_text": "gen"}) == "gen"
+    assert registry.extract({"choices": [{"message": {"content": "msg"}}]}) == "msg"
+    assert registry.extract([{"choices": [{"tokens": ["a", "b"]}]}]) == "ab"
+    assert registry.extract({"unknown": 1}) is None
+
+
+def test_learns_rule_per_key_and_revalidates() -> None:
+    registry = OutputExtractorRegistry()
+
+    assert registry.extract({"choices": [{"text": "one"}]}, key="ep") == "one"
+    assert registry.learned("ep") == "choices.text"
+    assert registry.learned("other") is None
+
+    # The endpoint changed its output shape
+    assert registry.extract({"text": "two"}, key="ep") == "two"
+    assert registry.learned("ep") == "text"
+
+
+def test_learned_rule_is_tried_first() -> None:
+    first = MagicMock(return_value=None)
+    second = MagicMock(return_value="second")
+    registry = OutputExtractorRegistry([("first", first), ("second", second)])
+
+    registry.extract("output", key="ep")
+    registry.extract("output", key="ep")
+
+    assert first.call_count == 1
+    assert second.call_count == 2
+
+
+def test_register_custom_shape_takes_priority() -> None:
+    registry = OutputExtractorRegistry()
+    registry.extract({"text": "builtin", "answer": "custom"}, key="ep")
+
+    registry.register(
+        "answer", lambda output: output.get("answer") if isinstance(output, dict) else None
+    )
+
+    assert registry.names[0] == "answer"
+    assert registry.extract({"text": "builtin", "answer": "custom"}, key="ep") == "custom"
+    registry.unregister("answer")
+    assert registry.learned("ep") is None
+    assert "answer" not in registry.names
+
+
+def test_find_usage() -> None:
+    assert find_usage({"text": "a", "usage": {"input": 1}}) == {"input": 1}
+    assert find_usage([{"choices": [], "usage": {"output": 2}}]) == {"output": 2}
+    assert find_usage("text") is None
@@ -0,0 +1,187 @@
+"""Tests for endpoint health and admission control."""
+
+from typing import Any, Dict, List
+from unittest.mock import MagicMock, patch
+
+import httpx
+import pytest
+from langchain_core.messages import HumanMessage
+
+from langchain_runpod.chat_models import ChatRunPod
+from langchain_runpod.exceptions import EndpointOverloadedError, RunPodAPIError
+from langchain_runpod.health import (
+    AdmissionPolicy,
+    EndpointHealth,
+    HealthMonitor,
+    get_health_monitor,
+)
+from langchain_runpod.llms import RunPod
+
+from tests.unit_tests.helpers import json_response
+
+HEALTH = {
+    "jobs": {"completed": 10, "failed": 1, "inProgress": 2, "inQueue": 7, "retried": 0},
+    "workers": {"idle": 1, "running": 2, "initializing": 1},
+}
+
+
+def _health(in_queue: int, workers: int = 1) -> EndpointHealth:
+    return EndpointHealth(jobs_in_queue=in_queue, workers_idle=workers)
+
+
+@pytest.fixture(autouse=True)
+def fresh_monitors():
+    """Keep cached health from leaking between tests."""
+    with patch("langchain_runpod.health._monitors", {}):
+        yield
+
+
+# --- EndpointHealth / HealthMonitor ---
+
+def test_health_from_response() -> None:
+    health = EndpointHealth.from_response(HEALTH)
+    assert health == EndpointHealth(
+        jobs_in_queue=7,
+        jobs_in_progress=2,
+        workers_idle=1,
+        workers_running=2,
+        workers_initializing=1,
+    )
+    assert health.workers == 3
+    assert health.raw == HEALTH
+    assert EndpointHealth.from_response({}) == EndpointHealth()
+
+
+def test_monitor_caches_for_max_age() -> None:
+    monitor = HealthMonitor()
+    fetch = MagicMock(return_value=HEALTH)
+
+    assert monitor.get(fetch, max_age=60).jobs_in_queue == 7
+    monitor.get(fetch, max_age=60)
+    assert fetch.call_count == 1
+
+    monitor.get(fetch, max_age=0)
+    assert fetch.call_count == 2
+
+
+async def test_monitor_aget() -> None:
+    monitor = HealthMonitor()
+    calls: List[int] = []
+
+    async def fetch() -> Dict[str, Any]:
+        calls.append(1)
+        return HEALTH
+
+    assert (await monitor.aget(fetch, 60)).workers_running == 2
+    await monitor.aget(fetch, 60)
+    assert len(calls) == 1
+    assert monitor.latest is not None
+
+
+# --- AdmissionPolicy ---
+
+def test_policy_limits() -> None:
+    with pytest.raises(ValueError):
+        AdmissionPolicy()
+
+    by_depth = AdmissionPolicy(max_queue_depth=5)
+    assert by_depth.overload(_health(5)) is None
+    assert "6 jobs queued" in by_depth.overload(_health(6))
+
+    per_worker = AdmissionPolicy(max_queue_per_worker=2)
+    assert per_worker.overload(_health(4, workers=2)) is None
+    assert per_worker.overload(_health(5, workers=2)) is not None
+    # Scaled to zero counts as one worker
+    assert per_worker.overload(_health(3, workers=0)) is not None
+
+
+def test_reject_mode_fails_fast() -> None:
+    policy = AdmissionPolicy(max_queue_depth=1)
+    with pytest.raises(EndpointOverloadedError, match="ep is overloaded") as info:
+        policy.admit(lambda: _health(3), "ep", interval=0)
+    assert info.value.endpoint_id == "ep"
+    assert info.value.health.jobs_in_queue == 3
+
+
+def test_delay_mode_waits_for_queue_to_drain() -> None:
+    queue = [5, 3, 1]
+    policy = AdmissionPolicy(max_queue_depth=1, mode="delay", max_delay=5)
+
+    policy.admit(lambda: _health(queue.pop(0)), "ep", interval=0)
+
+    assert queue == []
+
+
+def test_delay_mode_gives_up_after_max_delay() -> None:
+    policy = AdmissionPolicy(max_queue_depth=1, mode="delay", max_delay=0.02)
+    with pytest.raises(EndpointOverloadedError, match="after waiting"):
+        policy.admit(lambda: _health(5), "ep", interval=0.01)
+
+
+def test_admits_when_health_is_unavailable() -> None:
+    def fail() -> EndpointHealth:
+        raise RunPodAPIError("health unavailable")
+
+    AdmissionPolicy(max_queue_depth=0).admit(fail, "ep", interval=0)
+
+
+# --- Models ---
+
+@patch("httpx.Client.get")
+def test_llm_health_is_cached_and_shared(mock_get: MagicMock) -> None:
+    mock_get.return_value = json_response(HEALTH)
+    llm = RunPod(endpoint_id="ep", api_key="key")
+    other = RunPod(endpoint_id="ep", api_key="key", temperature=0.5)
+
+    assert llm.health().jobs_in_queue == 7
+    assert other.health().workers_idle == 1
+
+    mock_get.assert_called_once()
+    assert mock_get.call_args[0][0] == f"{llm.api_base}/ep/health"
+    assert get_health_monitor(llm.api_base, "ep").latest is not None
+
+
+@patch("httpx.Client.get")
+def test_llm_health_error(mock_get: MagicMock) -> None:
+    mock_get.side_effect = httpx.ConnectError("down")
+    with pytest.raises(RunPodAPIError, match="health of endpoint ep"):
+        RunPod(endpoint_id="ep", api_key="key", max_retries=0).health()
+
+
+@patch("httpx.Client.post")
+@patch("httpx.Client.get")
+def test_llm_rejects_jobs_for_overloaded_endpoint(mock_get: MagicMock, mock_post: MagicMock) -> None:
+    mock_get.return_value = json_response(HEALTH)
+    llm = RunPod(
+        endpoint_id="ep", api_key="key", admission_policy=AdmissionPolicy(max_queue_depth=5)
+    )
+
+    with pytest.raises(EndpointOverloadedError, match="7 jobs queued"):
+        llm.invoke("hi")
+    with pytest.raises(EndpointOverloadedError):
+        llm._call("hi")
+    mock_post.assert_not_called()
+
+
+@patch("httpx.AsyncClient.post")
+@patch("httpx.AsyncClient.get")
+async def test_chat_admits_jobs_below_limit(mock_get: MagicMock, mock_post: MagicMock) -> None:
+    async def get(url: str, **kwargs: Any) -> MagicMock:
+        return json_response(HEALTH)
+
+    async def post(url: str, **kwargs: Any) -> MagicMock:
+        return json_response({"id": "job", "status": "COMPLETED", "output": "ok"})
+
+    mock_get.side_effect = get
+    mock_post.side_effect = post
+    chat = ChatRunPod(
+        endpoint_id="ep", api_key="key", admission_policy=AdmissionPolicy(max_queue_per_worker=3)
+    )
+
+    assert (await chat.ainvoke([HumanMessage(content="hi")])).content == "ok"
+    assert (await chat.ahealth()).jobs_in_progress == 2
+
+    chat.admission_policy = AdmissionPolicy(max_queue_per_worker=2)
+    with pytest.raises(EndpointOverloadedError):
+        await chat.ainvoke([HumanMessage(content="hi")])
+    assert mock_post.call_count == 1
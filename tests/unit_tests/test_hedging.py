@@ -0,0 +1,274 @@
+"""Tests for hedged requests against queued jobs."""
+
+from typing import Any, Dict, List, Tuple
+from unittest.mock import MagicMock, patch
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+from langchain_runpod.chat_models import ChatRunPod
+from langchain_runpod.codec import RequestTemplate
+from langchain_runpod.hedging import HedgePolicy, await_hedged, wait_hedged
+from langchain_runpod.llms import RunPod
+from langchain_runpod.polling import FixedPollingStrategy
+
+from tests.unit_tests.helpers import json_response
+
+PRIMARY = RequestTemplate("https://api", "primary", "key", {})
+BACKUP = RequestTemplate("https://api", "backup", "key", {})
+
+
+class _FakeJobs:
+    """Job statuses per job id, consumed one per poll; the last one repeats."""
+
+    def __init__(self, statuses: Dict[str, List[str]]) -> None:
+        self.statuses = statuses
+        self.cancelled: List[Tuple[str, str]] = []
+        self.timed_out: List[bool] = []
+
+    def get_status(self, job_id: str, template: RequestTemplate) -> Dict[str, Any]:
+        statuses = self.statuses[job_id]
+        status = statuses.pop(0) if len(statuses) > 1 else statuses[0]
+        return {"id": job_id, "status": status, "output": f"from {job_id}"}
+
+    async def aget_status(self, job_id: str, template: RequestTemplate) -> Dict[str, Any]:
+        return self.get_status(job_id, template)
+
+    def cancel(self, job_id: str, template: RequestTemplate, timed_out: bool) -> None:
+        self.cancelled.append((job_id, template.run_url))
+        self.timed_out.append(timed_out)
+
+    async def acancel(self, job_id: str, template: RequestTemplate, timed_out: bool) -> None:
+        self.cancel(job_id, template, timed_out)
+
+
+def _wait(policy: HedgePolicy, jobs: _FakeJobs, max_attempts: int = 20) -> Dict[str, Any]:
+    return wait_hedged(
+        policy,
+        {"id": "job-1", "status": "IN_QUEUE"},
+        PRIMARY,
+        lambda: ({"id": "job-2", "status": "IN_QUEUE"}, BACKUP),
+        jobs.get_status,
+        jobs.cancel,
+        FixedPollingStrategy(0),
+        max_attempts,
+    )
+
+
+# --- HedgePolicy ---
+
+def test_policy_requires_a_threshold() -> None:
+    with pytest.raises(ValueError):
+        HedgePolicy()
+    with pytest.raises(ValueError):
+        HedgePolicy(percentile=100)
+
+
+def test_percentile_threshold_after_min_samples() -> None:
+    policy = HedgePolicy(delay=5.0, percentile=90, min_samples=10)
+    for seconds in range(1, 10):
+        policy.observe_queue_time(float(seconds))
+    assert policy.threshold() == 5.0
+
+    policy.observe_queue_time(10.0)
+    assert policy.threshold() == 9.0
+
+    assert HedgePolicy(percentile=50).threshold() is None
+
+
+def test_budget_caps_hedge_ratio() -> None:
+    policy = HedgePolicy(delay=0, max_ratio=0.25, budget_reserve=1.0)
+    granted = 0
+    for _ in range(20):
+        policy.on_job()
+        granted += policy.acquire_hedge()
+    assert granted == 5
+    assert policy.hedges_sent == 5
+
+
+# --- Waiting for hedged jobs ---
+
+def test_hedge_wins_and_original_is_cancelled() -> None:
+    policy = HedgePolicy(delay=0)
+    jobs = _FakeJobs({"job-1": ["IN_QUEUE"], "job-2": ["IN_PROGRESS", "COMPLETED"]})
+
+    result = _wait(policy, jobs)
+
+    assert result["output"] == "from job-2"
+    assert jobs.cancelled == [("job-1", PRIMARY.run_url)]
+    assert jobs.timed_out == [False]
+    assert policy.hedges_sent == policy.hedges_won == 1
+
+
+def test_no_hedge_once_job_left_the_queue() -> None:
+    policy = HedgePolicy(delay=0.05)
+    jobs = _FakeJobs({"job-1": ["IN_PROGRESS", "IN_PROGRESS", "COMPLETED"]})
+
+    result = _wait(policy, jobs)
+
+    assert result["output"] == "from job-1"
+    assert policy.hedges_sent == 0
+    assert jobs.cancelled == []
+
+
+def test_no_hedge_without_budget() -> None:
+    policy = HedgePolicy(delay=0, budget_reserve=0.0, max_ratio=0.0)
+    jobs = _FakeJobs({"job-1": ["IN_QUEUE", "IN_QUEUE", "COMPLETED"]})
+
+    assert _wait(policy, jobs)["output"] == "from job-1"
+    assert policy.hedges_sent == 0
+
+
+def test_failed_copy_leaves_the_other_racing() -> None:
+    policy = HedgePolicy(delay=0)
+    jobs = _FakeJobs({"job-1": ["IN_QUEUE", "IN_QUEUE", "COMPLETED"], "job-2": ["FAILED"]})
+
+    result = _wait(policy, jobs)
+
+    assert result["output"] == "from job-1"
+    assert policy.hedges_won == 0
+    assert jobs.cancelled == []
+
+
+def test_timeout_cancels_every_copy() -> None:
+    jobs = _FakeJobs({"job-1": ["IN_QUEUE"], "job-2": ["IN_QUEUE"]})
+
+    with pytest.raises(TimeoutError):
+        _wait(HedgePolicy(delay=0), jobs, max_attempts=3)
+
+    assert sorted(job_id for job_id, _ in jobs.cancelled) == ["job-1", "job-2"]
+    assert jobs.timed_out == [True, True]
+
+
+async def test_await_hedged() -> None:
+    policy = HedgePolicy(delay=0)
+    jobs = _FakeJobs({"job-1": ["IN_QUEUE", "COMPLETED"], "job-2": ["IN_QUEUE"]})
+
+    async def submit_hedge() -> Tuple[Dict[str, Any], RequestTemplate]:
+        return {"id": "job-2", "status": "IN_QUEUE"}, BACKUP
+
+    result = await await_hedged(
+        policy,
+        {"id": "job-1", "status": "IN_QUEUE"},
+        PRIMARY,
+        submit_hedge,
+        jobs.aget_status,
+        jobs.acancel,
+        FixedPollingStrategy(0),
+        10,
+    )
+
+    assert result["output"] == "from job-1"
+    assert jobs.cancelled == [("job-2", BACKUP.run_url)]
+
+
+# --- Models ---
+
+@patch("httpx.Client.get")
+@patch("httpx.Client.post")
+def test_llm_hedges_to_backup_endpoint(mock_post: MagicMock, mock_get: MagicMock) -> None:
+    llm = RunPod(
+        endpoint_id="primary",
+        api_key="key",
+        poll_interval=0,
+        hedge_policy=HedgePolicy(delay=0),
+        hedge_endpoint_id="backup",
+    )
+
+    def post(url: str, **kwargs: Any) -> MagicMock:
+        if url.endswith("/primary/run"):
+            return json_response({"id": "job-1", "status": "IN_QUEUE"})
+        if url.endswith("/backup/run"):
+            return json_response({"id": "job-2", "status": "IN_QUEUE"})
+        return json_response({"status": "CANCELLED"})
+
+    def get(url: str, **kwargs: Any) -> MagicMock:
+        if url.endswith("/backup/status/job-2"):
+            return json_response({"id": "job-2", "status": "COMPLETED", "output": "hedged"})
+        return json_response({"id": "job-1", "status": "IN_QUEUE"})
+
+    mock_post.side_effect = post
+    mock_get.side_effect = get
+
+    assert llm.invoke("hi") == "hedged"
+    assert mock_post.call_args_list[-1][0][0] == f"{llm.api_base}/primary/cancel/job-1"
+    assert llm.in_flight_jobs == []
+
+
+@patch("httpx.AsyncClient.get")
+@patch("httpx.AsyncClient.post")
+async def test_chat_hedges_on_same_endpoint(mock_post: MagicMock, mock_get: MagicMock) -> None:
+    chat = ChatRunPod(
+        endpoint_id="primary", api_key="key", poll_interval=0, hedge_policy=HedgePolicy(delay=0)
+    )
+    submitted: List[str] = []
+
+    async def post(url: str, **kwargs: Any) -> MagicMock:
+        if url.endswith("/run"):
+            submitted.append(f"job-{len(submitted) + 1}")
+            return json_response({"id": submitted[-1], "status": "IN_QUEUE"})
+        return json_response({"status": "CANCELLED"})
+
+    async def get(url: str, **kwargs: Any) -> MagicMock:
+        job_id = url.rsplit("/", 1)[-1]
+        if job_id == "job-1":
+            return json_response({"id": job_id, "status": "COMPLETED", "output": "original"})
+        return json_response({"id": job_id, "status": "IN_QUEUE"})
+
+    mock_post.side_effect = post
+    mock_get.side_effect = get
+
+    message = await chat.ainvoke([HumanMessage(content="hi")])
+
+    assert message.content == "original"
+    assert submitted == ["job-1", "job-2"]
+    assert mock_post.call_args_list[-1][0][0].endswith("/primary/cancel/job-2")
+
+
+def _hedging_llm() -> RunPod:
+    return RunPod(
+        endpoint_id="primary",
+        api_key="key",
+        poll_interval=0,
+        hedge_policy=HedgePolicy(delay=0),
+        hedge_endpoint_id="backup",
+    )
+
+
+@patch("httpx.Client.post")
+def test_shutdown_cancels_hedges_on_their_endpoint(mock_post: MagicMock) -> None:
+    mock_post.return_value = json_response({"id": "job-2", "status": "IN_QUEUE"})
+    llm = _hedging_llm()
+    template = llm._hedge_template()
+    llm._submit_job({"input": {}}, template.run_url, admit=False, template=template)
+
+    llm.shutdown()
+
+    assert mock_post.call_args[0][0] == f"{llm.api_base}/backup/cancel/job-2"
+    assert llm.in_flight_jobs == []
+
+
+@patch("httpx.AsyncClient.get")
+@patch("httpx.AsyncClient.post")
+async def test_ashutdown_drains_hedges_on_their_endpoint(
+    mock_post: MagicMock, mock_get: MagicMock
+) -> None:
+    async def post(url: str, **kwargs: Any) -> MagicMock:
+        return json_response({"id": "job-2", "status": "IN_QUEUE"})
+
+    async def get(url: str, **kwargs: Any) -> MagicMock:
+        if url.endswith("/backup/status/job-2"):
+            return json_response({"id": "job-2", "status": "COMPLETED"})
+        return json_response({"error": "not found"}, status_code=404)
+
+    mock_post.side_effect = post
+    mock_get.side_effect = get
+    llm = _hedging_llm()
+    template = llm._hedge_template()
+    await llm._asubmit_job({"input": {}}, template.run_url, admit=False, template=template)
+
+    await llm.ashutdown(cancel=False)
+
+    assert mock_get.call_args[0][0] == f"{llm.api_base}/backup/status/job-2"
+    assert mock_post.call_count == 1
+    assert llm.in_flight_jobs == []
@@ -0,0 +1,63 @@
+"""Unit tests for the in-flight job tracker."""
+
+from langchain_runpod.codec import RequestTemplate
+from langchain_runpod.jobs import JobTracker
+
+
+def test_tracks_only_running_jobs() -> None:
+    tracker = JobTracker()
+    tracker.track({"id": "queued", "status": "IN_QUEUE"})
+    tracker.track({"id": "done", "status": "COMPLETED"})
+    tracker.track({"status": "IN_QUEUE"})
+
+    assert tracker.job_ids == ["queued"]
+    assert "queued" in tracker
+    assert "done" not in tracker
+
+
+def test_update_forgets_finished_jobs() -> None:
+    tracker = JobTracker()
+    tracker.track({"id": "a", "status": "IN_QUEUE"})
+    tracker.track({"id": "b", "status": "IN_QUEUE"})
+
+    tracker.update("a", "IN_PROGRESS")
+    tracker.update("b", "TIMED_OUT")
+
+    assert tracker.job_ids == ["a"]
+    tracker.discard("a")
+    assert len(tracker) == 0
+
+
+def test_reports_outcomes() -> None:
+    outcomes = []
+    tracker = JobTracker(on_finish=lambda outcome, template: outcomes.append(outcome))
+    tracker.track({"id": "a", "status": "IN_QUEUE"})
+    tracker.track({"id": "b", "status": "IN_QUEUE"})
+    tracker.track({"id": "c", "status": "IN_QUEUE"})
+    tracker.track({"id": "sync", "status": "COMPLETED"})
+
+    tracker.update("a", "FAILED")
+    tracker.update("a", "FAILED")
+    tracker.time_out("b")
+    tracker.discard("c")
+    tracker.discard("unknown")
+
+    assert outcomes == ["COMPLETED", "FAILED", "TIMED_OUT", None]
+
+
+def test_remembers_templates() -> None:
+    template = RequestTemplate("https://api", "backup", "key", {})
+    tracker = JobTracker()
+    tracker.track({"id": "a", "status": "IN_QUEUE"}, template)
+    tracker.track({"id": "b", "status": "IN_QUEUE"})
+
+    assert tracker.template("a") is template
+    assert tracker.template("b") is None
+    assert tracker.template("unknown") is None
+
+    outcomes = []
+    tracker.on_finish = lambda outcome, template: outcomes.append((outcome, template))
+    tracker.update("a", "COMPLETED")
+    tracker.discard("a")
+    tracker.track({"id": "c", "status": "FAILED"}, template)
+    assert outcomes == [("COMPLETED", template), ("FAILED", template)]
@@ -1,13 +1,18 @@
 """Custom Unit tests for the RunPod LLM class."""
 
+import asyncio
+import json
 import os
 from unittest.mock import patch, MagicMock
 
 import pytest
 import httpx
 
+from langchain_runpod.cache import InMemoryResponseCache
 from langchain_runpod.llms import RunPod, RunPodAPIError
 
+from tests.unit_tests.helpers import json_response
+
 
 @pytest.fixture
 def mock_llm() -> RunPod:
@@ -24,9 +29,6 @@ def mock_env_llm() -> RunPod:
     """Fixture for RunPod instance initialized via environment variable."""
     with patch.dict(os.environ, {"RUNPOD_API_KEY": "env-test-key"}):
         llm = RunPod(endpoint_id="test-env-endpoint")
-        # Ensure async client is initialized for later tests
-        if llm._async_client is None:
-             llm._async_client = httpx.AsyncClient()
         yield llm
 
 # --- Test Initialization --- 
@@ -34,8 +36,7 @@ def mock_env_llm() -> RunPod:
 def test_initialization_with_api_key(mock_llm: RunPod):
     assert mock_llm.api_key == "test-key"
     assert mock_llm.endpoint_id == "test-endpoint"
-    assert mock_llm._client is not None
-    assert mock_llm._async_client is not None
+    assert mock_llm._get_client() is not None
 
 def test_initialization_with_env_var(mock_env_llm: RunPod):
     assert mock_env_llm.api_key == "env-test-key"
@@ -53,11 +54,11 @@ def test_call_success(mock_post: MagicMock, mock_llm: RunPod):
     """Test successful synchronous API call."""
     mock_response = MagicMock(spec=httpx.Response)
     mock_response.status_code = 200
-    mock_response.json.return_value = {
+    mock_response.content = json.dumps({
         "id": "test-job-id",
         "status": "COMPLETED",
         "output": "Mock LLM response."
-    }
+    }).encode()
     mock_post.return_value = mock_response
 
     prompt = "Test prompt"
@@ -68,9 +69,9 @@ def test_call_success(mock_post: MagicMock, mock_llm: RunPod):
     call_args, call_kwargs = mock_post.call_args
     assert call_args[0] == f"{mock_llm.api_base}/{mock_llm.endpoint_id}/run"
     assert call_kwargs["headers"]["Authorization"] == f"Bearer {mock_llm.api_key}"
-    assert call_kwargs["json"]["input"]["prompt"] == prompt
-    assert call_kwargs["json"]["input"]["temperature"] == 0.1
-    assert call_kwargs["json"]["input"]["max_tokens"] == 10
+    assert json.loads(call_kwargs["content"])["input"]["prompt"] == prompt
+    assert json.loads(call_kwargs["content"])["input"]["temperature"] == 0.1
+    assert json.loads(call_kwargs["content"])["input"]["max_tokens"] == 10
 
 @patch("httpx.Client.post")
 def test_call_api_error(mock_post: MagicMock, mock_llm: RunPod):
@@ -91,11 +92,11 @@ def test_call_job_failed(mock_post: MagicMock, mock_llm: RunPod):
     """Test handling of failed job status during synchronous call."""
     mock_response = MagicMock(spec=httpx.Response)
     mock_response.status_code = 200
-    mock_response.json.return_value = {
+    mock_response.content = json.dumps({
         "id": "test-job-id",
         "status": "FAILED",
         "error": "Something went wrong"
-    }
+    }).encode()
     mock_post.return_value = mock_response
     
     # Expect RunPodAPIError because _call wraps the ValueError from _process_response
@@ -110,11 +111,11 @@ async def test_acall_success(mock_post: MagicMock, mock_llm: RunPod):
     """Test successful asynchronous API call."""
     mock_response = MagicMock(spec=httpx.Response)
     mock_response.status_code = 200
-    mock_response.json.return_value = {
+    mock_response.content = json.dumps({
         "id": "test-async-job-id",
         "status": "COMPLETED",
         "output": "Mock async LLM response."
-    }
+    }).encode()
     # For async mock, return value needs to be awaitable
     async def mock_post_async(*args, **kwargs):
         return mock_response
@@ -128,7 +129,7 @@ async def test_acall_success(mock_post: MagicMock, mock_llm: RunPod):
     call_args, call_kwargs = mock_post.call_args
     assert call_args[0] == f"{mock_llm.api_base}/{mock_llm.endpoint_id}/run"
     assert call_kwargs["headers"]["Authorization"] == f"Bearer {mock_llm.api_key}"
-    assert call_kwargs["json"]["input"]["prompt"] == prompt
+    assert json.loads(call_kwargs["content"])["input"]["prompt"] == prompt
 
 @pytest.mark.asyncio
 @patch("httpx.AsyncClient.post")
@@ -174,40 +175,415 @@ def test_process_response_missing_output(mock_llm: RunPod):
     # Should return string representation of the dict as fallback
     assert mock_llm._process_response(response_dict) == str(response_dict)
 
-# --- Test Streaming Simulation --- 
-# Note: These tests verify the simulation logic, not actual streaming protocols
+# --- Test Streaming ---
+
+def _stream_response(status: str, outputs: list, **extra) -> MagicMock:
+    """Build a mock /stream response with the given status and partial outputs."""
+    mock_response = MagicMock(spec=httpx.Response)
+    mock_response.status_code = 200
+    mock_response.content = json.dumps({
+        "status": status,
+        "stream": [{"output": output} for output in outputs],
+        **extra,
+    }).encode()
+    return mock_response
+
+def _queued_response() -> MagicMock:
+    mock_response = MagicMock(spec=httpx.Response)
+    mock_response.status_code = 200
+    mock_response.content = json.dumps({"id": "test-job-id", "status": "IN_QUEUE"}).encode()
+    return mock_response
+
+@patch("httpx.Client.get")
+@patch("httpx.Client.post")
+def test_stream_native(mock_post: MagicMock, mock_get: MagicMock, mock_llm: RunPod):
+    """Test that partial outputs from /stream are yielded as they arrive."""
+    mock_post.return_value = _queued_response()
+    mock_get.side_effect = [
+        _stream_response("IN_PROGRESS", ["Hello"]),
+        _stream_response("IN_PROGRESS", []),
+        _stream_response(
+            "COMPLETED",
+            [{"choices": [{"tokens": [" world"]}], "usage": {"input": 3, "output": 2}}],
+            id="test-job-id",
+            executionTime=120,
+        ),
+    ]
+    mock_llm.stream_poll_interval = 0
+
+    chunks = list(mock_llm._stream("Test stream prompt"))
+
+    assert [c.text for c in chunks] == ["Hello", " world", ""]
+    assert chunks[-1].generation_info == {
+        "job_id": "test-job-id",
+        "status": "COMPLETED",
+        "executionTime": 120,
+        "usage": {"input": 3, "output": 2},
+    }
+    assert mock_get.call_args_list[0][0][0] == (
+        f"{mock_llm.api_base}/{mock_llm.endpoint_id}/stream/test-job-id"
+    )
 
 @patch("httpx.Client.post")
-def test_stream_simulation(mock_post: MagicMock, mock_llm: RunPod):
-    """Test synchronous streaming simulation."""
-    mock_response_text = "Stream response."
+def test_stream_completed_immediately(mock_post: MagicMock, mock_llm: RunPod):
+    """Test streaming when /run already returns the finished job."""
     mock_response = MagicMock(spec=httpx.Response)
     mock_response.status_code = 200
-    mock_response.json.return_value = {"status": "COMPLETED", "output": mock_response_text}
+    mock_response.content = json.dumps({"status": "COMPLETED", "output": "Stream response."}).encode()
     mock_post.return_value = mock_response
 
     chunks = list(mock_llm._stream("Test stream prompt"))
-    
-    assert len(chunks) == len(mock_response_text)
-    assert "".join(c.text for c in chunks) == mock_response_text
-    mock_post.assert_called_once() # _stream calls _call internally
+
+    assert "".join(c.text for c in chunks) == "Stream response."
+    assert chunks[-1].generation_info["status"] == "COMPLETED"
+    mock_post.assert_called_once()
+
+@patch("httpx.Client.get")
+@patch("httpx.Client.post")
+def test_stream_job_failed(mock_post: MagicMock, mock_get: MagicMock, mock_llm: RunPod):
+    """Test that a failed job surfaces as a RunPodAPIError while streaming."""
+    mock_post.return_value = _queued_response()
+    mock_get.return_value = _stream_response("FAILED", [], error="Pod terminated")
+
+    with pytest.raises(RunPodAPIError, match="ended with status FAILED"):
+        list(mock_llm._stream("Test stream prompt"))
+
+@patch("httpx.Client.get")
+@patch("httpx.Client.post")
+def test_stream_error_cancels_job(mock_post: MagicMock, mock_get: MagicMock, mock_llm: RunPod):
+    """Test that a failing /stream request cancels the job it was streaming."""
+    mock_post.return_value = _queued_response()
+    mock_get.return_value = json_response({"error": "forbidden"}, status_code=403)
+
+    with pytest.raises(RunPodAPIError, match="HTTP error 403"):
+        list(mock_llm._stream("Test stream prompt"))
+
+    assert mock_post.call_args[0][0].startswith(
+        f"{mock_llm.api_base}/{mock_llm.endpoint_id}/cancel/"
+    )
+    assert mock_llm.in_flight_jobs == []
 
 @pytest.mark.asyncio
+@patch("httpx.AsyncClient.get")
 @patch("httpx.AsyncClient.post")
-async def test_astream_simulation(mock_post: MagicMock, mock_llm: RunPod):
-    """Test asynchronous streaming simulation."""
-    mock_response_text = "Async stream response."
-    mock_response = MagicMock(spec=httpx.Response)
-    mock_response.status_code = 200
-    mock_response.json.return_value = {"status": "COMPLETED", "output": mock_response_text}
+async def test_astream_native(mock_post: MagicMock, mock_get: MagicMock, mock_llm: RunPod):
+    """Test asynchronous streaming from the /stream endpoint."""
+    responses = [
+        _stream_response("IN_PROGRESS", ["Async "]),
+        _stream_response("COMPLETED", ["stream."]),
+    ]
     async def mock_post_async(*args, **kwargs):
-        return mock_response
+        return _queued_response()
+    async def mock_get_async(*args, **kwargs):
+        return responses.pop(0)
     mock_post.side_effect = mock_post_async
+    mock_get.side_effect = mock_get_async
 
     stream_results = []
     async for chunk in mock_llm._astream("Test async stream prompt"):
         stream_results.append(chunk)
-        
-    assert len(stream_results) == len(mock_response_text)
-    assert "".join(c.text for c in stream_results) == mock_response_text
-    mock_post.assert_called_once() # _astream calls _acall internally 
\ No newline at end of file
+
+    assert [c.text for c in stream_results] == ["Async ", "stream.", ""]
+    assert stream_results[-1].generation_info["status"] == "COMPLETED"
+    mock_post.assert_called_once()
+
+# --- Test /runsync ---
+
+@patch("httpx.Client.get")
+@patch("httpx.Client.post")
+def test_call_runsync_completed(mock_post: MagicMock, mock_get: MagicMock, mock_llm: RunPod):
+    """Test that a completed /runsync response returns without polling."""
+    mock_llm.use_runsync = True
+    mock_response = MagicMock(spec=httpx.Response)
+    mock_response.status_code = 200
+    mock_response.content = json.dumps({"id": "job", "status": "COMPLETED", "output": "Fast"}).encode()
+    mock_post.return_value = mock_response
+
+    assert mock_llm._call("Test prompt") == "Fast"
+    assert mock_post.call_args[0][0] == f"{mock_llm.api_base}/{mock_llm.endpoint_id}/runsync"
+    mock_get.assert_not_called()
+
+@patch("httpx.Client.get")
+@patch("httpx.Client.post")
+def test_call_runsync_falls_back_to_polling(mock_post: MagicMock, mock_get: MagicMock, mock_llm: RunPod):
+    """Test that a job outliving the sync window is polled via /status."""
+    mock_llm.use_runsync = True
+    mock_post.return_value = _queued_response()
+    status_response = MagicMock(spec=httpx.Response)
+    status_response.status_code = 200
+    status_response.content = json.dumps({"id": "test-job-id", "status": "COMPLETED", "output": "Slow"}).encode()
+    mock_get.return_value = status_response
+
+    assert mock_llm._call("Test prompt") == "Slow"
+    assert mock_get.call_args[0][0] == (
+        f"{mock_llm.api_base}/{mock_llm.endpoint_id}/status/test-job-id"
+    )
+
+# --- Test concurrent generate ---
+
+def _job_post(*args, **kwargs) -> MagicMock:
+    """Queue one job per prompt, using the prompt as the job id."""
+    return json_response({"id": json.loads(kwargs["content"])["input"]["prompt"], "status": "IN_QUEUE"})
+
+def _job_status(url, *args, **kwargs) -> MagicMock:
+    job_id = url.rsplit("/", 1)[-1]
+    return json_response(
+        {"id": job_id, "status": "COMPLETED", "output": f"out-{job_id}", "executionTime": 5}
+    )
+
+@patch("httpx.Client.get")
+@patch("httpx.Client.post")
+def test_generate_submits_jobs_concurrently(mock_post: MagicMock, mock_get: MagicMock, mock_llm: RunPod):
+    """Test that generate() submits every job before polling and keeps input order."""
+    mock_llm.poll_interval = 0
+    mock_post.side_effect = _job_post
+    mock_get.side_effect = _job_status
+
+    result = mock_llm.generate(["a", "b", "c"])
+
+    assert [g[0].text for g in result.generations] == ["out-a", "out-b", "out-c"]
+    assert result.generations[1][0].generation_info == {
+        "job_id": "b",
+        "status": "COMPLETED",
+        "executionTime": 5,
+        "retries": 0,
+    }
+    assert mock_post.call_count == 3
+    assert mock_get.call_count == 3
+
+@patch("httpx.Client.get")
+@patch("httpx.Client.post")
+def test_generate_stays_concurrent_when_streaming(mock_post: MagicMock, mock_get: MagicMock, mock_llm: RunPod):
+    """Test that streaming=True doesn't make generate() call _call one prompt at a time."""
+    mock_llm.poll_interval = 0
+    mock_llm.streaming = True
+    mock_post.side_effect = _job_post
+    mock_get.side_effect = _job_status
+
+    with patch.object(RunPod, "_call", side_effect=AssertionError("sequential")):
+        result = mock_llm.generate(["a", "b"])
+
+    assert [g[0].text for g in result.generations] == ["out-a", "out-b"]
+
+@patch("httpx.Client.get")
+@patch("httpx.Client.post")
+def test_generate_job_failed(mock_post: MagicMock, mock_get: MagicMock, mock_llm: RunPod):
+    """Test that a failed job in a batch raises a RunPodAPIError."""
+    mock_llm.poll_interval = 0
+    mock_post.side_effect = _job_post
+    mock_get.return_value = json_response({"status": "FAILED", "error": "OOM"})
+
+    with pytest.raises(RunPodAPIError, match="ended with status FAILED"):
+        mock_llm.generate(["a", "b"])
+
+@patch("httpx.Client.get")
+@patch("httpx.Client.post")
+def test_generate_cancels_pending_jobs_on_fatal_poll_error(mock_post: MagicMock, mock_get: MagicMock, mock_llm: RunPod):
+    """Test that a fatal poll error in a batch cancels the jobs still running."""
+    mock_llm.poll_interval = 0
+
+    def post(url, *args, **kwargs):
+        if url.endswith("/run"):
+            return _job_post(url, *args, **kwargs)
+        return json_response({"status": "CANCELLED"})
+
+    def get(url, *args, **kwargs):
+        if url.endswith("/status/a"):
+            return json_response({"error": "not found"}, status_code=404)
+        return json_response({"id": "b", "status": "IN_QUEUE"})
+
+    mock_post.side_effect = post
+    mock_get.side_effect = get
+
+    with pytest.raises(RunPodAPIError, match="Fatal HTTP error 404"):
+        mock_llm.generate(["a", "b"])
+
+    cancelled = [c[0][0] for c in mock_post.call_args_list if "/cancel/" in c[0][0]]
+    assert sorted(cancelled) == [
+        f"{mock_llm.api_base}/{mock_llm.endpoint_id}/cancel/a",
+        f"{mock_llm.api_base}/{mock_llm.endpoint_id}/cancel/b",
+    ]
+    assert mock_llm.in_flight_jobs == []
+
+@pytest.mark.asyncio
+@patch("httpx.AsyncClient.get")
+@patch("httpx.AsyncClient.post")
+async def test_agenerate_submits_jobs_concurrently(mock_post: MagicMock, mock_get: MagicMock, mock_llm: RunPod):
+    """Test that agenerate() runs the jobs concurrently and keeps input order."""
+    mock_llm.poll_interval = 0
+    async def mock_post_async(*args, **kwargs):
+        return _job_post(*args, **kwargs)
+    async def mock_get_async(*args, **kwargs):
+        return _job_status(*args, **kwargs)
+    mock_post.side_effect = mock_post_async
+    mock_get.side_effect = mock_get_async
+
+    result = await mock_llm.agenerate(["x", "y", "z"])
+
+    assert [g[0].text for g in result.generations] == ["out-x", "out-y", "out-z"]
+    assert mock_post.call_count == 3
+
+# --- Test cancellation and shutdown ---
+
+@patch("httpx.Client.get")
+@patch("httpx.Client.post")
+def test_call_timeout_cancels_job(mock_post: MagicMock, mock_get: MagicMock, mock_llm: RunPod):
+    """Test that a job is cancelled once polling gives up on it."""
+    mock_llm.poll_interval = 0
+    mock_llm.max_polling_attempts = 2
+    mock_post.return_value = json_response({"id": "test-job-id", "status": "IN_QUEUE"})
+    mock_get.return_value = json_response({"id": "test-job-id", "status": "IN_PROGRESS"})
+
+    with pytest.raises(RunPodAPIError, match="did not complete"):
+        mock_llm._call("Test prompt")
+
+    assert mock_post.call_args[0][0] == (
+        f"{mock_llm.api_base}/{mock_llm.endpoint_id}/cancel/test-job-id"
+    )
+    assert mock_llm.in_flight_jobs == []
+
+@pytest.mark.asyncio
+@patch("httpx.AsyncClient.get")
+@patch("httpx.AsyncClient.post")
+async def test_acall_cancelled_task_cancels_job(mock_post: MagicMock, mock_get: MagicMock, mock_llm: RunPod):
+    """Test that cancelling the awaiting task cancels the RunPod job."""
+    mock_llm.poll_interval = 0.01
+    polled = asyncio.Event()
+    async def mock_post_async(url, *args, **kwargs):
+        return json_response({"id": "test-job-id", "status": "IN_QUEUE"})
+    async def mock_get_async(*args, **kwargs):
+        polled.set()
+        return json_response({"id": "test-job-id", "status": "IN_PROGRESS"})
+    mock_post.side_effect = mock_post_async
+    mock_get.side_effect = mock_get_async
+
+    task = asyncio.create_task(mock_llm._acall("Test prompt"))
+    await polled.wait()
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert mock_post.call_args[0][0].endswith("/cancel/test-job-id")
+    assert mock_llm.in_flight_jobs == []
+
+@patch("httpx.Client.post")
+def test_shutdown_cancels_in_flight_jobs(mock_post: MagicMock, mock_llm: RunPod):
+    """Test that shutdown() cancels every job that has not finished."""
+    mock_post.side_effect = _job_post
+    mock_llm._submit_job(mock_llm._build_payload("a"))
+    mock_llm._submit_job(mock_llm._build_payload("b"))
+    assert mock_llm.in_flight_jobs == ["a", "b"]
+
+    mock_post.side_effect = None
+    mock_post.return_value = json_response({"status": "CANCELLED"})
+    mock_llm.shutdown()
+
+    cancelled = [c[0][0].rsplit("/", 1)[-1] for c in mock_post.call_args_list[2:]]
+    assert cancelled == ["a", "b"]
+    assert mock_llm.in_flight_jobs == []
+
+@patch("httpx.Client.get")
+@patch("httpx.Client.post")
+def test_shutdown_drains_in_flight_jobs(mock_post: MagicMock, mock_get: MagicMock, mock_llm: RunPod):
+    """Test that shutdown(cancel=False) waits for the jobs instead of cancelling them."""
+    mock_llm.poll_interval = 0
+    mock_post.side_effect = _job_post
+    mock_get.side_effect = _job_status
+    mock_llm._submit_job(mock_llm._build_payload("a"))
+
+    mock_llm.shutdown(cancel=False, timeout=5)
+
+    assert mock_get.call_count == 1
+    assert mock_post.call_count == 1
+    assert mock_llm.in_flight_jobs == []
+
+# --- Test response cache ---
+
+@patch("httpx.Client.get")
+@patch("httpx.Client.post")
+def test_generate_uses_response_cache(mock_post: MagicMock, mock_get: MagicMock, mock_llm: RunPod):
+    """Test that cached prompts are answered without submitting a job."""
+    mock_llm.poll_interval = 0
+    mock_llm.response_cache = InMemoryResponseCache()
+    mock_post.side_effect = _job_post
+    mock_get.side_effect = _job_status
+
+    mock_llm.generate(["a", "b"])
+    result = mock_llm.generate(["b", "c"])
+
+    assert [g[0].text for g in result.generations] == ["out-b", "out-c"]
+    assert mock_post.call_count == 3
+
+@pytest.mark.asyncio
+@patch("httpx.AsyncClient.post")
+async def test_acall_uses_response_cache(mock_post: MagicMock, mock_llm: RunPod):
+    """Test that a cached prompt is answered without a request, also after a parameter change misses."""
+    mock_llm.response_cache = InMemoryResponseCache()
+    async def mock_post_async(*args, **kwargs):
+        return json_response({"id": "job", "status": "COMPLETED", "output": "Cached"})
+    mock_post.side_effect = mock_post_async
+
+    assert await mock_llm._acall("Test prompt") == "Cached"
+    assert await mock_llm._acall("Test prompt") == "Cached"
+    assert mock_post.call_count == 1
+
+    mock_llm.temperature = 0.9
+    await mock_llm._acall("Test prompt")
+    assert mock_post.call_count == 2
+
+# --- Test request coalescing ---
+
+@pytest.mark.asyncio
+@patch("httpx.AsyncClient.get")
+@patch("httpx.AsyncClient.post")
+async def test_agenerate_coalesces_identical_prompts(mock_post: MagicMock, mock_get: MagicMock, mock_llm: RunPod):
+    """Test that identical concurrent prompts share one job."""
+    mock_llm.poll_interval = 0
+    mock_llm.coalesce_requests = True
+    async def mock_post_async(*args, **kwargs):
+        # Yield like real network I/O, so that the prompts are in flight together
+        await asyncio.sleep(0)
+        return _job_post(*args, **kwargs)
+    async def mock_get_async(*args, **kwargs):
+        return _job_status(*args, **kwargs)
+    mock_post.side_effect = mock_post_async
+    mock_get.side_effect = mock_get_async
+
+    result = await mock_llm.agenerate(["x", "x", "y"])
+
+    assert [g[0].text for g in result.generations] == ["out-x", "out-x", "out-y"]
+    assert mock_post.call_count == 2
+
+@patch("httpx.Client.get")
+@patch("httpx.Client.post")
+def test_generate_coalesces_identical_prompts(mock_post: MagicMock, mock_get: MagicMock, mock_llm: RunPod):
+    """Test that duplicate prompts of a batch are submitted once."""
+    mock_llm.poll_interval = 0
+    mock_llm.coalesce_requests = True
+    mock_post.side_effect = _job_post
+    mock_get.side_effect = _job_status
+
+    result = mock_llm.generate(["a", "b", "a"])
+
+    assert [g[0].text for g in result.generations] == ["out-a", "out-b", "out-a"]
+    assert mock_post.call_count == 2
+    assert len(mock_llm._flights) == 0
+
+# --- Test payload logging ---
+
+@patch("httpx.Client.post")
+def test_payloads_are_not_logged_by_default(mock_post: MagicMock, mock_llm: RunPod, caplog):
+    """Test that outputs only reach the logs with log_payloads=True."""
+    mock_post.return_value = json_response(
+        {"id": "job", "status": "COMPLETED", "output": "secret output"}
+    )
+
+    with caplog.at_level("DEBUG", logger="langchain_runpod.llms"):
+        mock_llm.invoke("prompt")
+    assert "secret output" not in caplog.text
+
+    caplog.clear()
+    mock_llm.log_payloads = True
+    with caplog.at_level("DEBUG", logger="langchain_runpod.llms"):
+        mock_llm.invoke("prompt")
+    assert "secret output" in caplog.text
@@ -0,0 +1,44 @@
+"""Unit tests for the payload logging helpers."""
+
+import logging
+
+from langchain_runpod.logs import HIDDEN_PAYLOAD, loggable
+
+
+class _CountingRepr:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def __repr__(self) -> str:
+        self.calls += 1
+        return "counted"
+
+
+def test_short_payloads_are_logged_verbatim() -> None:
+    assert str(loggable("hello")) == "hello"
+    assert str(loggable({"output": "hi"})) == "{'output': 'hi'}"
+
+
+def test_long_payloads_are_truncated() -> None:
+    text = str(loggable("x" * 30, limit=10))
+    assert text == "xxxxxxxxxx... [20 more characters]"
+
+    text = str(loggable({"output": ["token"] * 1000}, limit=50))
+    assert len(text) < 100
+
+
+def test_payloads_are_hidden_unless_enabled() -> None:
+    assert loggable("secret prompt", enabled=False) == HIDDEN_PAYLOAD
+
+
+def test_payloads_are_only_formatted_when_emitted(caplog) -> None:
+    value = _CountingRepr()
+    logger = logging.getLogger("langchain_runpod.test_logs")
+
+    with caplog.at_level(logging.WARNING, logger=logger.name):
+        logger.debug("Payload: %s", loggable(value))
+        assert value.calls == 0
+
+        logger.warning("Payload: %s", loggable(value))
+        assert value.calls > 0
+        assert "Payload: counted" in caplog.text
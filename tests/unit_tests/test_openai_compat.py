@@ -0,0 +1,237 @@
+"""Tests for the OpenAI-compatible API mode, against a local stand-in worker."""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+from langchain_runpod.chat_models import ChatRunPod
+from langchain_runpod.llms import RunPod, RunPodAPIError
+from langchain_runpod.openai_compat import choices_by_prompt, iter_sse_events
+
+# The stand-in worker listens on localhost
+pytestmark = pytest.mark.enable_socket
+
+USAGE = {"prompt_tokens": 5, "completion_tokens": 2, "total_tokens": 7}
+
+
+class _StandInWorker(BaseHTTPRequestHandler):
+    """Answers like the OpenAI-compatible route of a RunPod vLLM worker."""
+
+    requests: List[Dict[str, Any]] = []
+
+    def log_message(self, *args: Any) -> None:
+        pass
+
+    def do_POST(self) -> None:
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.requests.append({"path": self.path, "body": body, "headers": dict(self.headers)})
+        if self.headers.get("Authorization") != "Bearer test-key":
+            return self._send_json({"error": {"message": "Unauthorized"}}, status=401)
+        if self.path == "/ep/openai/v1/completions":
+            texts = self._completion_texts(body)
+            if body.get("stream"):
+                return self._send_events(
+                    [{"choices": [{"index": 0, "text": token, "finish_reason": None}]} for token in ["Hel", "lo"]]
+                    + [{"choices": [{"index": 0, "text": "", "finish_reason": "stop"}]}]
+                )
+            return self._send_json(
+                {
+                    "model": body["model"],
+                    "choices": [
+                        {"index": index, "text": text, "finish_reason": "stop"}
+                        for index, text in reversed(list(enumerate(texts)))
+                    ],
+                    "usage": USAGE,
+                }
+            )
+        if self.path == "/ep/openai/v1/chat/completions":
+            if body.get("stream"):
+                return self._send_events(
+                    [{"choices": [{"index": 0, "delta": {"role": "assistant", "content": ""}}]}]
+                    + [{"choices": [{"index": 0, "delta": {"content": token}}]} for token in ["Hi", " there"]]
+                    + [{"model": body["model"], "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}]
+                )
+            last = body["messages"][-1]["content"]
+            if last == "weather?":
+                message = {
+                    "role": "assistant",
+                    "content": None,
+                    "tool_calls": [
+                        {
+                            "id": "call_1",
+                            "type": "function",
+                            "function": {"name": "get_weather", "arguments": '{"city": "Paris"}'},
+                        }
+                    ],
+                }
+                choices = [{"index": 0, "message": message, "finish_reason": "tool_calls"}]
+            else:
+                choices = [
+                    {
+                        "index": index,
+                        "message": {"role": "assistant", "content": f"{last} #{index}"},
+                        "finish_reason": "stop",
+                    }
+                    for index in range(body.get("n", 1))
+                ]
+            return self._send_json({"model": body["model"], "choices": choices, "usage": USAGE})
+        self._send_json({"error": {"message": "Not found"}}, status=404)
+
+    @staticmethod
+    def _completion_texts(body: Dict[str, Any]) -> List[str]:
+        prompts = body["prompt"] if isinstance(body["prompt"], list) else [body["prompt"]]
+        return [f"{prompt} #{i}" for prompt in prompts for i in range(body.get("n", 1))]
+
+    def _send_json(self, data: Dict[str, Any], status: int = 200) -> None:
+        content = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def _send_events(self, events: List[Dict[str, Any]]) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        for event in [*events, {"choices": [], "usage": USAGE}]:
+            self.wfile.write(f"data: {json.dumps(event)}\n\n".encode())
+            self.wfile.flush()
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.close_connection = True
+
+
+@pytest.fixture(scope="module")
+def api_base() -> Iterator[str]:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StandInWorker)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def requests() -> List[Dict[str, Any]]:
+    _StandInWorker.requests.clear()
+    return _StandInWorker.requests
+
+
+def _llm(api_base: str, **kwargs: Any) -> RunPod:
+    settings: Dict[str, Any] = {"api_key": "test-key", "temperature": 0.5, **kwargs}
+    return RunPod(
+        endpoint_id="ep", api_base=api_base, api_mode="openai", model_name="served-model", **settings
+    )
+
+
+def _chat(api_base: str, **kwargs: Any) -> ChatRunPod:
+    settings: Dict[str, Any] = {"api_key": "test-key", **kwargs}
+    return ChatRunPod(
+        endpoint_id="ep", api_base=api_base, api_mode="openai", model_name="served-model", **settings
+    )
+
+
+# --- Helpers ---
+
+def test_iter_sse_events() -> None:
+    lines = ['data: {"a": 1}', "", ": comment", 'data: {"b": 2}', "", "data: [DONE]", "", 'data: {"c": 3}']
+    assert list(iter_sse_events(lines)) == [{"a": 1}, {"b": 2}]
+
+    with pytest.raises(ValueError, match="overloaded"):
+        list(iter_sse_events(['data: {"error": {"message": "overloaded"}}', ""]))
+
+
+def test_choices_by_prompt() -> None:
+    response = {"choices": [{"index": i, "text": str(i)} for i in [3, 0, 2, 1]]}
+    grouped = choices_by_prompt(response, prompt_count=2, n=2)
+    assert [[choice["text"] for choice in choices] for choices in grouped] == [["0", "1"], ["2", "3"]]
+
+
+# --- RunPod ---
+
+def test_llm_generate_batches_prompts_with_choices(api_base: str, requests) -> None:
+    llm = _llm(api_base, n=2)
+
+    result = llm.generate(["a", "b"])
+
+    assert [[g.text for g in gens] for gens in result.generations] == [["a #0", "a #1"], ["b #0", "b #1"]]
+    assert result.llm_output["token_usage"] == USAGE
+    assert len(requests) == 1
+    assert requests[0]["body"] == {
+        "model": "served-model",
+        "prompt": ["a", "b"],
+        "temperature": 0.5,
+        "n": 2,
+    }
+
+
+def test_llm_invoke_and_stream(api_base: str) -> None:
+    llm = _llm(api_base)
+    assert llm.invoke("hi") == "hi #0"
+
+    chunks = list(llm._stream("hi"))
+    assert "".join(chunk.text for chunk in chunks) == "Hello"
+    assert chunks[-2].generation_info == {"finish_reason": "stop"}
+    assert chunks[-1].generation_info == {"usage": USAGE}
+
+
+async def test_llm_async(api_base: str, requests) -> None:
+    llm = _llm(api_base)
+    assert await llm.ainvoke("hi") == "hi #0"
+    assert "".join([chunk async for chunk in llm.astream("hi")]) == "Hello"
+    assert requests[-1]["body"]["stream_options"] == {"include_usage": True}
+
+
+def test_llm_http_error(api_base: str) -> None:
+    llm = _llm(api_base, api_key="wrong-key")
+    with pytest.raises(RunPodAPIError, match="401"):
+        llm.invoke("hi")
+    with pytest.raises(RunPodAPIError, match="401"):
+        list(llm.stream("hi"))
+
+
+# --- ChatRunPod ---
+
+def test_chat_generate_with_choices_and_usage(api_base: str, requests) -> None:
+    chat = _chat(api_base, n=2)
+
+    result = chat.generate([[HumanMessage(content="hey")]])
+
+    generations = result.generations[0]
+    assert [g.message.content for g in generations] == ["hey #0", "hey #1"]
+    assert generations[0].message.usage_metadata == {
+        "input_tokens": 5,
+        "output_tokens": 2,
+        "total_tokens": 7,
+    }
+    assert generations[0].message.response_metadata["finish_reason"] == "stop"
+    assert requests[0]["body"]["messages"] == [{"role": "user", "content": "hey"}]
+
+
+def test_chat_tool_calls(api_base: str) -> None:
+    message = _chat(api_base).invoke("weather?")
+    assert message.tool_calls == [
+        {"name": "get_weather", "args": {"city": "Paris"}, "id": "call_1", "type": "tool_call"}
+    ]
+
+
+def test_chat_stream(api_base: str) -> None:
+    chunks = list(_chat(api_base).stream("hey"))
+
+    assert "".join(str(chunk.content) for chunk in chunks) == "Hi there"
+    merged = chunks[0]
+    for chunk in chunks[1:]:
+        merged += chunk
+    assert merged.usage_metadata["total_tokens"] == 7
+    assert merged.response_metadata["finish_reason"] == "stop"
+
+
+async def test_chat_async(api_base: str) -> None:
+    chat = _chat(api_base)
+    assert (await chat.ainvoke("hey")).content == "hey #0"
+    chunks = [chunk async for chunk in chat.astream("hey")]
+    assert "".join(str(chunk.content) for chunk in chunks) == "Hi there"
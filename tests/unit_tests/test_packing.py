@@ -0,0 +1,40 @@
+"""Unit tests for packing several prompts into one RunPod job."""
+
+from langchain_runpod.packing import group_payloads, pack_payloads, split_output
+
+
+def _payload(prompt, **params) -> dict:
+    return {"input": {"prompt": prompt, **params}}
+
+
+def test_group_payloads_by_parameters():
+    payloads = [
+        _payload("a", temperature=0.1),
+        _payload("b", temperature=0.9),
+        _payload("c", temperature=0.1),
+        _payload("d", temperature=0.9),
+        _payload("e", temperature=0.5),
+        None,
+    ]
+    assert group_payloads(payloads, max_size=8) == [[0, 2], [1, 3]]
+
+
+def test_group_payloads_max_size():
+    payloads = [_payload(str(i)) for i in range(5)]
+    assert group_payloads(payloads, max_size=2) == [[0, 1], [2, 3]]
+
+
+def test_group_payloads_skips_unpackable():
+    payloads = [{"input": {"messages": []}}, {"input": {"messages": []}}]
+    assert group_payloads(payloads, max_size=8) == []
+
+
+def test_pack_payloads():
+    packed = pack_payloads([_payload("a", top_k=3), _payload("b", top_k=3)])
+    assert packed == {"input": {"prompt": ["a", "b"], "top_k": 3}}
+
+
+def test_split_output():
+    assert split_output(["x", "y"], 2) == ["x", "y"]
+    assert split_output("xy", 2) is None
+    assert split_output(["xy"], 2) is None
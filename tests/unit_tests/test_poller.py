@@ -0,0 +1,216 @@
+"""Unit tests for the shared job poller."""
+
+import asyncio
+from collections import Counter
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from langchain_runpod import ChatRunPod, FixedPollingStrategy, RunPod
+from langchain_runpod.clients import HTTPClientConfig
+from langchain_runpod.exceptions import RunPodAPIError
+from langchain_runpod.poller import JobPoller, get_job_poller
+
+from tests.unit_tests.helpers import json_response
+
+CONFIG = HTTPClientConfig(api_base="https://api.runpod.ai/v2", auth_digest="test")
+
+
+@pytest.mark.asyncio
+@patch("httpx.AsyncClient.get")
+async def test_poller_bounds_concurrency(mock_get: MagicMock):
+    checks: Counter = Counter()
+    in_flight = 0
+    max_in_flight = 0
+
+    async def mock_get_async(url, **kwargs):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.001)
+        in_flight -= 1
+        job_id = url.rsplit("/", 1)[-1]
+        checks[job_id] += 1
+        status = "COMPLETED" if checks[job_id] >= 2 else "IN_PROGRESS"
+        return json_response({"id": job_id, "status": status, "output": job_id})
+
+    mock_get.side_effect = mock_get_async
+    poller = JobPoller(CONFIG, "endpoint", "key", max_concurrency=4)
+    strategy = FixedPollingStrategy(interval=0.001)
+
+    results = await asyncio.gather(
+        *(poller.wait(f"job-{i}", strategy, max_attempts=5) for i in range(200))
+    )
+
+    assert [r["output"] for r in results] == [f"job-{i}" for i in range(200)]
+    assert max_in_flight <= 4
+    assert sum(checks.values()) == 400
+    assert poller.pending == 0
+
+
+@pytest.mark.asyncio
+@patch("httpx.AsyncClient.get")
+async def test_poller_fatal_error(mock_get: MagicMock):
+    async def mock_get_async(url, **kwargs):
+        return json_response({}, status_code=404)
+
+    mock_get.side_effect = mock_get_async
+    poller = JobPoller(CONFIG, "endpoint", "key")
+
+    with pytest.raises(RunPodAPIError, match="Fatal HTTP error 404"):
+        await poller.wait("job", FixedPollingStrategy(0), max_attempts=3)
+
+
+@pytest.mark.asyncio
+@patch("httpx.AsyncClient.get")
+async def test_poller_timeout(mock_get: MagicMock):
+    async def mock_get_async(url, **kwargs):
+        return json_response({"status": "IN_QUEUE"})
+
+    mock_get.side_effect = mock_get_async
+    poller = JobPoller(CONFIG, "endpoint", "key")
+
+    with pytest.raises(TimeoutError):
+        await poller.wait("job", FixedPollingStrategy(0), max_attempts=3)
+    assert mock_get.call_count == 3
+
+
+@pytest.mark.asyncio
+@patch("httpx.AsyncClient.get")
+async def test_poller_stops_polling_abandoned_jobs(mock_get: MagicMock):
+    async def mock_get_async(url, **kwargs):
+        return json_response({"status": "IN_QUEUE"})
+
+    mock_get.side_effect = mock_get_async
+    poller = JobPoller(CONFIG, "endpoint", "key")
+    strategy = FixedPollingStrategy(interval=0.001)
+
+    waiters = [asyncio.ensure_future(poller.wait("job", strategy, max_attempts=1000)) for _ in range(2)]
+    await asyncio.sleep(0.01)
+    waiters[0].cancel()
+    await asyncio.sleep(0.01)
+    assert poller.pending == 1
+
+    waiters[1].cancel()
+    await asyncio.gather(*waiters, return_exceptions=True)
+    assert poller.pending == 0
+    polls = mock_get.call_count
+    await asyncio.sleep(0.02)
+    assert mock_get.call_count == polls
+
+
+@pytest.mark.asyncio
+async def test_get_job_poller_is_shared_per_endpoint():
+    assert get_job_poller(CONFIG, "a", "key") is get_job_poller(CONFIG, "a", "key")
+    assert get_job_poller(CONFIG, "a", "key") is not get_job_poller(CONFIG, "b", "key")
+
+
+@pytest.mark.asyncio
+@patch("httpx.AsyncClient.get")
+@patch("httpx.AsyncClient.post")
+async def test_acall_uses_shared_poller(mock_post: MagicMock, mock_get: MagicMock):
+    llm = RunPod(
+        endpoint_id="test-endpoint",
+        api_key="test-key",
+        shared_poller=True,
+        polling_strategy=FixedPollingStrategy(0),
+    )
+
+    async def mock_post_async(*args, **kwargs):
+        return json_response({"id": "job", "status": "IN_QUEUE"})
+
+    async def mock_get_async(url, **kwargs):
+        return json_response({"id": "job", "status": "COMPLETED", "output": "Done"})
+
+    mock_post.side_effect = mock_post_async
+    mock_get.side_effect = mock_get_async
+
+    assert await llm._acall("Test prompt") == "Done"
+    assert llm._get_job_poller().pending == 0
+
+
+@pytest.mark.asyncio
+@patch("httpx.AsyncClient.get")
+@patch("httpx.AsyncClient.post")
+async def test_agenerate_polls_directly_without_shared_poller(
+    mock_post: MagicMock, mock_get: MagicMock
+):
+    llm = RunPod(
+        endpoint_id="test-endpoint",
+        api_key="test-key",
+        polling_strategy=FixedPollingStrategy(0),
+    )
+
+    async def mock_post_async(*args, **kwargs):
+        return json_response({"id": "job", "status": "IN_QUEUE"})
+
+    async def mock_get_async(url, **kwargs):
+        return json_response({"id": "job", "status": "COMPLETED", "output": "Done"})
+
+    mock_post.side_effect = mock_post_async
+    mock_get.side_effect = mock_get_async
+
+    with patch("langchain_runpod.poller.JobPoller", wraps=JobPoller) as poller_cls:
+        result = await llm.agenerate(["one", "two"])
+
+    assert [generations[0].text for generations in result.generations] == ["Done", "Done"]
+    poller_cls.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("httpx.AsyncClient.get")
+@patch("httpx.AsyncClient.post")
+async def test_own_http_client_polls_directly(mock_post: MagicMock, mock_get: MagicMock):
+    chat = ChatRunPod(
+        endpoint_id="test-endpoint",
+        api_key="test-key",
+        shared_poller=True,
+        share_http_client=False,
+        polling_strategy=FixedPollingStrategy(0),
+    )
+
+    async def mock_post_async(*args, **kwargs):
+        return json_response({"id": "job", "status": "IN_QUEUE"})
+
+    async def mock_get_async(url, **kwargs):
+        return json_response({"id": "job", "status": "COMPLETED", "output": "Done"})
+
+    mock_post.side_effect = mock_post_async
+    mock_get.side_effect = mock_get_async
+
+    with patch("langchain_runpod.poller.JobPoller", wraps=JobPoller) as poller_cls:
+        message = await chat.ainvoke("Hi")
+
+    assert message.content == "Done"
+    poller_cls.assert_not_called()
+    await chat.aclose()
+
+
+@pytest.mark.asyncio
+@patch("httpx.AsyncClient.get")
+@patch("httpx.AsyncClient.post")
+async def test_shared_poller_reports_retries(mock_post: MagicMock, mock_get: MagicMock):
+    chat = ChatRunPod(
+        endpoint_id="test-endpoint",
+        api_key="test-key",
+        shared_poller=True,
+        polling_strategy=FixedPollingStrategy(0),
+    )
+    statuses = [
+        json_response(status_code=503),
+        json_response({"id": "job", "status": "COMPLETED", "output": "Done"}),
+    ]
+
+    async def mock_post_async(*args, **kwargs):
+        return json_response({"id": "job", "status": "IN_QUEUE"})
+
+    async def mock_get_async(url, **kwargs):
+        return statuses.pop(0)
+
+    mock_post.side_effect = mock_post_async
+    mock_get.side_effect = mock_get_async
+
+    message = await chat.ainvoke("Hi")
+
+    assert message.content == "Done"
+    assert message.response_metadata["retries"] == 1
@@ -0,0 +1,76 @@
+"""Unit tests for the RunPod polling strategies."""
+
+import json
+from unittest.mock import MagicMock, patch
+
+import httpx
+import pytest
+
+from langchain_runpod import AdaptivePollingStrategy, FixedPollingStrategy, RunPod
+
+
+def test_fixed_strategy():
+    strategy = FixedPollingStrategy(interval=2.0, initial_delay=0.5)
+    assert strategy.get_delay(0, 0.0) == 0.5
+    assert strategy.get_delay(1, 0.5) == 2.0
+    assert strategy.get_delay(10, 20.0) == 2.0
+
+
+def test_adaptive_strategy_backoff_and_cap():
+    strategy = AdaptivePollingStrategy(
+        initial_interval=0.1, multiplier=2.0, max_interval=1.0, jitter=0
+    )
+    delays = [strategy.get_delay(attempt, 0.0) for attempt in range(6)]
+    assert delays == pytest.approx([0.1, 0.2, 0.4, 0.8, 1.0, 1.0])
+
+
+def test_adaptive_strategy_jitter_bounds():
+    strategy = AdaptivePollingStrategy(initial_interval=1.0, max_interval=1.0, jitter=0.2)
+    for _ in range(50):
+        assert 0.8 <= strategy.get_delay(0, 0.0) <= 1.2
+
+
+def test_adaptive_strategy_uses_timing_hints():
+    strategy = AdaptivePollingStrategy(
+        initial_interval=0.1, max_interval=10.0, jitter=0, smoothing=1.0
+    )
+    strategy.observe({"status": "COMPLETED", "delayTime": 1000, "executionTime": 4000})
+
+    # Queued job: predicted completion is queue + execution estimate
+    assert strategy.get_delay(0, 0.0, {"status": "IN_QUEUE"}) == pytest.approx(5.0)
+    # Running job that left the queue after 2s, 3s after submission
+    running = {"status": "IN_PROGRESS", "delayTime": 2000}
+    assert strategy.get_delay(1, 3.0, running) == pytest.approx(3.0)
+    # Overdue jobs fall back to the backoff schedule
+    assert strategy.get_delay(1, 30.0, running) == pytest.approx(0.2)
+
+
+def test_adaptive_strategy_validates_bounds():
+    with pytest.raises(ValueError):
+        AdaptivePollingStrategy(initial_interval=2.0, max_interval=1.0)
+
+
+@patch("time.sleep")
+@patch("httpx.Client.get")
+@patch("httpx.Client.post")
+def test_model_uses_polling_strategy(mock_post: MagicMock, mock_get: MagicMock, mock_sleep: MagicMock):
+    """Test that RunPod sleeps according to the configured strategy."""
+    llm = RunPod(
+        endpoint_id="test-endpoint",
+        api_key="test-key",
+        polling_strategy=FixedPollingStrategy(interval=0.25, initial_delay=0.05),
+    )
+    queued = MagicMock(spec=httpx.Response)
+    queued.status_code = 200
+    queued.content = json.dumps({"id": "job", "status": "IN_QUEUE"}).encode()
+    in_progress = MagicMock(spec=httpx.Response)
+    in_progress.status_code = 200
+    in_progress.content = json.dumps({"id": "job", "status": "IN_PROGRESS"}).encode()
+    completed = MagicMock(spec=httpx.Response)
+    completed.status_code = 200
+    completed.content = json.dumps({"id": "job", "status": "COMPLETED", "output": "Done"}).encode()
+    mock_post.return_value = queued
+    mock_get.side_effect = [in_progress, completed]
+
+    assert llm._call("Test prompt") == "Done"
+    assert [c[0][0] for c in mock_sleep.call_args_list] == [0.05, 0.25]
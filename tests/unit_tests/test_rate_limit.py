@@ -0,0 +1,88 @@
+"""Unit tests for the per-endpoint rate limiter."""
+
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from langchain_runpod.llms import RunPod
+from langchain_runpod.rate_limit import RateLimiter, get_rate_limiter, parse_retry_after
+
+from tests.unit_tests.helpers import json_response
+
+
+def test_token_bucket_spaces_requests():
+    limiter = RateLimiter(rate=10, burst=1)
+    waits = [limiter._reserve() for _ in range(3)]
+    assert waits[0] == 0
+    assert waits[1] == pytest.approx(0.1, abs=0.01)
+    assert waits[2] == pytest.approx(0.2, abs=0.01)
+
+
+def test_burst_allows_back_to_back_requests():
+    limiter = RateLimiter(rate=2, burst=3)
+    assert [limiter._reserve() for _ in range(3)] == [0, 0, 0]
+    assert limiter._reserve() > 0
+
+
+def test_rate_limited_cuts_rate_and_honours_retry_after():
+    limiter = RateLimiter(rate=10)
+    limiter.on_rate_limited(retry_after=2.0)
+    assert limiter.current_rate == 5
+    assert limiter._reserve() >= 1.9
+
+
+def test_rate_recovers_after_successes():
+    limiter = RateLimiter(rate=10, recovery=0.5)
+    limiter.on_rate_limited()
+    limiter.on_rate_limited()
+    assert limiter.current_rate == 2.5
+    for _ in range(5):
+        limiter.on_success()
+    assert limiter.current_rate == 10
+
+
+def test_unlimited_limiter_slows_down_on_429():
+    limiter = RateLimiter(recovery=1.0)
+    for _ in range(8):
+        limiter._reserve()
+    limiter.on_rate_limited()
+    assert limiter.current_rate == 4
+    limiter.on_success()
+    # Back to the rate that triggered the 429, so limiting is lifted again
+    assert limiter.current_rate is None
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+    retry_at = datetime.now(timezone.utc) + timedelta(seconds=30)
+    assert parse_retry_after(format_datetime(retry_at, usegmt=True)) == pytest.approx(30, abs=2)
+
+
+def test_limiter_is_shared_per_endpoint():
+    first = get_rate_limiter("https://api.example", "shared-endpoint")
+    assert get_rate_limiter("https://api.example", "shared-endpoint") is first
+    assert get_rate_limiter("https://api.example", "other-endpoint") is not first
+    # An explicit rate replaces a limiter that was created without one
+    limited = get_rate_limiter("https://api.example", "shared-endpoint", rate=3)
+    assert limited.max_rate == 3
+    assert get_rate_limiter("https://api.example", "shared-endpoint") is limited
+
+
+@patch("time.sleep")
+@patch("httpx.Client.post")
+def test_call_retries_after_429(mock_post: MagicMock, mock_sleep: MagicMock):
+    """Test that a 429 submission is retried after Retry-After and slows the endpoint."""
+    llm = RunPod(endpoint_id="rate-limited-endpoint", api_key="test-key")
+    mock_post.side_effect = [
+        json_response(status_code=429, headers={"Retry-After": "2"}),
+        json_response({"id": "job", "status": "COMPLETED", "output": "Done"}),
+    ]
+
+    assert llm._call("Test prompt") == "Done"
+    assert mock_post.call_count == 2
+    assert mock_sleep.call_args[0][0] >= 1.9
+    assert llm.endpoint_rate_limiter.current_rate is not None
@@ -0,0 +1,110 @@
+"""Unit tests for retrying transient RunPod API failures."""
+
+from unittest.mock import MagicMock, patch
+
+import httpx
+import pytest
+from langchain_core.messages import HumanMessage
+
+from langchain_runpod.chat_models import ChatRunPod
+from langchain_runpod.llms import RunPod
+from langchain_runpod.rate_limit import RateLimiter
+from langchain_runpod.retry import RetryPolicy, send_with_retries, track_retries
+
+from tests.unit_tests.helpers import json_response
+
+
+def test_backoff_is_bounded_and_jittered():
+    policy = RetryPolicy(initial_backoff=1.0, max_backoff=3.0)
+    for retry in range(6):
+        assert 0 <= policy.get_delay(retry) <= min(2**retry, 3.0)
+
+
+def test_retryable_classification():
+    policy = RetryPolicy()
+    assert policy.should_retry_status(503)
+    assert not policy.should_retry_status(400)
+    assert not policy.should_retry_status(429)
+    assert policy.should_retry_status(504, idempotent=True)
+    # A gateway timeout on a submission may come after the job was created
+    assert not policy.should_retry_status(504, idempotent=False)
+    assert not policy.should_retry_status(408, idempotent=False)
+    assert policy.should_retry_status(503, idempotent=False)
+    read_timeout = httpx.ReadTimeout("timed out")
+    assert policy.should_retry_error(read_timeout, idempotent=True)
+    # A submission that timed out may already have created a job
+    assert not policy.should_retry_error(read_timeout, idempotent=False)
+    assert policy.should_retry_error(httpx.ConnectError("reset"), idempotent=False)
+    for error in (httpx.ReadError("reset"), httpx.RemoteProtocolError("closed")):
+        assert policy.should_retry_error(error, idempotent=True)
+        assert not policy.should_retry_error(error, idempotent=False)
+    assert not policy.should_retry_error(ValueError("bad"), idempotent=True)
+
+
+@patch("time.sleep")
+def test_send_retries_transient_status(mock_sleep: MagicMock):
+    send = MagicMock(side_effect=[json_response(status_code=503), json_response(status_code=502), json_response(status_code=200)])
+    with track_retries() as retries:
+        response = send_with_retries(send, RateLimiter(), RetryPolicy(max_retries=2))
+    assert response.status_code == 200
+    assert retries.count == 2
+    assert mock_sleep.call_count == 2
+
+
+@patch("time.sleep")
+def test_send_does_not_resend_timed_out_submissions(mock_sleep: MagicMock):
+    send = MagicMock(side_effect=[json_response(status_code=504), json_response(status_code=200)])
+    response = send_with_retries(send, RateLimiter(), RetryPolicy(), idempotent=False)
+    assert response.status_code == 504
+    assert send.call_count == 1
+
+
+@patch("time.sleep")
+def test_send_gives_up_after_max_retries(mock_sleep: MagicMock):
+    send = MagicMock(side_effect=httpx.ConnectError("reset"))
+    with pytest.raises(httpx.ConnectError):
+        send_with_retries(send, RateLimiter(), RetryPolicy(max_retries=2))
+    assert send.call_count == 3
+
+
+@patch("time.sleep")
+def test_retry_budget_limits_retries(mock_sleep: MagicMock):
+    policy = RetryPolicy(max_retries=5, budget_reserve=2, budget_ratio=0.0)
+    send = MagicMock(return_value=json_response(status_code=503))
+    response = send_with_retries(send, RateLimiter(), policy)
+    assert response.status_code == 503
+    # Two retries from the reserve, then the budget is exhausted
+    assert send.call_count == 3
+    assert policy.budget < 1
+
+
+@patch("time.sleep")
+@patch("httpx.Client.post")
+def test_chat_generate_reports_retries(mock_post: MagicMock, mock_sleep: MagicMock):
+    """Test that a transient 503 on submission is retried and reported."""
+    chat = ChatRunPod(endpoint_id="retry-endpoint", api_key="test-key")
+    mock_post.side_effect = [
+        json_response(status_code=503),
+        json_response({"id": "job", "status": "COMPLETED", "output": "Done"}),
+    ]
+
+    result = chat.invoke([HumanMessage(content="Hi")])
+
+    assert result.content == "Done"
+    assert result.response_metadata["retries"] == 1
+
+
+@patch("time.sleep")
+@patch("httpx.Client.post")
+def test_llm_generate_reports_retries(mock_post: MagicMock, mock_sleep: MagicMock):
+    """Test that RunPod.generate reports the retries of each job."""
+    llm = RunPod(endpoint_id="retry-endpoint", api_key="test-key", max_retries=1)
+    mock_post.side_effect = [
+        httpx.ConnectError("connection reset"),
+        json_response({"id": "job", "status": "COMPLETED", "output": "Done"}),
+    ]
+
+    result = llm.generate(["Hi"])
+
+    assert result.generations[0][0].text == "Done"
+    assert result.generations[0][0].generation_info["retries"] == 1
@@ -0,0 +1,487 @@
+"""Custom unit tests for the ChatRunPod chat model."""
+
+import asyncio
+import json
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+
+from langchain_runpod.cache import InMemoryResponseCache
+from langchain_runpod.chat_models import ChatRunPod
+from langchain_runpod.extractors import OutputExtractorRegistry
+
+from tests.unit_tests.helpers import json_response
+
+
+@pytest.fixture
+def chat() -> ChatRunPod:
+    """Fixture for a ChatRunPod instance with mock credentials."""
+    return ChatRunPod(
+        endpoint_id="test-endpoint",
+        api_key="test-key",
+        stream_poll_interval=0,
+    )
+
+
+def _stream_response(status: str, outputs: list) -> MagicMock:
+    return json_response(
+        {"status": status, "stream": [{"output": output} for output in outputs]}
+    )
+
+
+# --- Test streaming ---
+
+@patch("httpx.Client.get")
+@patch("httpx.Client.post")
+def test_stream_native(mock_post: MagicMock, mock_get: MagicMock, chat: ChatRunPod):
+    """Test that /stream batches are yielded as they arrive with real usage."""
+    mock_post.return_value = json_response({"id": "job-1", "status": "IN_QUEUE"})
+    mock_get.side_effect = [
+        _stream_response(
+            "IN_PROGRESS",
+            [{"choices": [{"tokens": ["Hello"]}], "usage": {"input": 5, "output": 1}}],
+        ),
+        _stream_response("IN_PROGRESS", []),
+        _stream_response(
+            "COMPLETED",
+            [{"choices": [{"tokens": [" there"]}], "usage": {"input": 5, "output": 2}}],
+        ),
+    ]
+
+    chunks = list(chat._stream([HumanMessage(content="Hi")]))
+
+    assert [c.message.content for c in chunks] == ["Hello", " there", ""]
+    assert all(c.message.usage_metadata is None for c in chunks[:-1])
+    assert chunks[-1].message.usage_metadata == {
+        "input_tokens": 5,
+        "output_tokens": 2,
+        "total_tokens": 7,
+    }
+    assert mock_get.call_args_list[0][0][0] == (
+        f"{chat.api_base}/{chat.endpoint_id}/stream/job-1"
+    )
+
+
+@patch("httpx.Client.post")
+def test_stream_disabled(mock_post: MagicMock, chat: ChatRunPod):
+    """Test that disable_streaming returns the whole response as one chunk."""
+    chat.disable_streaming = True
+    mock_post.return_value = json_response(
+        {"id": "job-1", "status": "COMPLETED", "output": "Full answer"}
+    )
+
+    chunks = list(chat._stream([HumanMessage(content="Hi")]))
+
+    assert len(chunks) == 1
+    assert chunks[0].message.content == "Full answer"
+
+
+@patch("httpx.Client.get")
+@patch("httpx.Client.post")
+def test_stream_job_failed(mock_post: MagicMock, mock_get: MagicMock, chat: ChatRunPod):
+    """Test that a failed job raises instead of yielding an error chunk."""
+    mock_post.return_value = json_response({"id": "job-1", "status": "IN_QUEUE"})
+    mock_get.return_value = json_response(
+        {"status": "FAILED", "error": "Pod terminated"}
+    )
+
+    with pytest.raises(ValueError, match="Pod terminated"):
+        list(chat._stream([HumanMessage(content="Hi")]))
+
+
+@pytest.mark.asyncio
+@patch("httpx.AsyncClient.get")
+@patch("httpx.AsyncClient.post")
+async def test_astream_native(mock_post: MagicMock, mock_get: MagicMock, chat: ChatRunPod):
+    """Test asynchronous streaming from the /stream endpoint."""
+    responses = [
+        _stream_response("IN_PROGRESS", ["Async "]),
+        _stream_response("COMPLETED", ["stream"]),
+    ]
+
+    async def mock_post_async(*args, **kwargs):
+        return json_response({"id": "job-1", "status": "IN_QUEUE"})
+
+    async def mock_get_async(*args, **kwargs):
+        return responses.pop(0)
+
+    mock_post.side_effect = mock_post_async
+    mock_get.side_effect = mock_get_async
+
+    chunks = [c async for c in chat._astream([HumanMessage(content="Hi")])]
+
+    assert "".join(str(c.message.content) for c in chunks) == "Async stream"
+    assert chunks[-1].message.response_metadata["status"] == "COMPLETED"
+
+
+# --- Test /runsync ---
+
+@patch("httpx.Client.get")
+@patch("httpx.Client.post")
+def test_generate_runsync_completed(mock_post: MagicMock, mock_get: MagicMock, chat: ChatRunPod):
+    """Test that a completed /runsync response returns without polling."""
+    chat.use_runsync = True
+    mock_post.return_value = json_response(
+        {"id": "job-1", "status": "COMPLETED", "output": "Fast"}
+    )
+
+    result = chat._generate([HumanMessage(content="Hi")])
+
+    assert result.generations[0].message.content == "Fast"
+    assert mock_post.call_args[0][0] == f"{chat.api_base}/{chat.endpoint_id}/runsync"
+    mock_get.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("httpx.AsyncClient.get")
+@patch("httpx.AsyncClient.post")
+async def test_agenerate_runsync_falls_back_to_polling(
+    mock_post: MagicMock, mock_get: MagicMock, chat: ChatRunPod
+):
+    """Test that a job outliving the sync window is polled via /status."""
+    chat.use_runsync = True
+    chat.poll_interval = 0
+
+    async def mock_post_async(*args, **kwargs):
+        return json_response({"id": "job-1", "status": "IN_PROGRESS"})
+
+    async def mock_get_async(*args, **kwargs):
+        return json_response({"id": "job-1", "status": "COMPLETED", "output": "Slow"})
+
+    mock_post.side_effect = mock_post_async
+    mock_get.side_effect = mock_get_async
+
+    result = await chat._agenerate([HumanMessage(content="Hi")])
+
+    assert result.generations[0].message.content == "Slow"
+    assert mock_get.call_args[0][0] == f"{chat.api_base}/{chat.endpoint_id}/status/job-1"
+
+
+# --- Test packed batches ---
+
+def _packed_post(*args, **kwargs) -> MagicMock:
+    """Answer a packed job with one output per prompt, and single jobs directly."""
+    prompt = json.loads(kwargs["content"])["input"]["prompt"]
+    if isinstance(prompt, list):
+        return json_response(
+            {"id": "packed", "status": "COMPLETED", "output": [f"re: {p}" for p in prompt]}
+        )
+    return json_response({"id": "single", "status": "COMPLETED", "output": f"single: {prompt}"})
+
+
+@patch("httpx.Client.post")
+def test_batch_packs_conversations(mock_post: MagicMock, chat: ChatRunPod):
+    """Test that batch() sends compatible conversations as one packed job."""
+    chat.pack_batches = True
+    mock_post.side_effect = _packed_post
+
+    results = chat.batch(["one", "two", "three"])
+
+    assert [r.content for r in results] == ["re: User: one", "re: User: two", "re: User: three"]
+    assert mock_post.call_count == 1
+    assert json.loads(mock_post.call_args[1]["content"])["input"]["prompt"] == [
+        "User: one",
+        "User: two",
+        "User: three",
+    ]
+
+
+@patch("httpx.Client.post")
+def test_batch_packing_respects_max_batch_size(mock_post: MagicMock, chat: ChatRunPod):
+    """Test that packed jobs hold at most max_batch_size conversations."""
+    chat.pack_batches = True
+    chat.max_batch_size = 2
+    mock_post.side_effect = _packed_post
+
+    results = chat.batch(["a", "b", "c", "d", "e"])
+
+    assert [r.content for r in results] == [
+        "re: User: a",
+        "re: User: b",
+        "re: User: c",
+        "re: User: d",
+        "single: User: e",
+    ]
+    assert mock_post.call_count == 3
+
+
+@patch("httpx.Client.post")
+def test_batch_falls_back_on_non_list_output(mock_post: MagicMock, chat: ChatRunPod):
+    """Test that a worker without list support gets one job per conversation."""
+    chat.pack_batches = True
+    mock_post.side_effect = lambda *args, **kwargs: json_response(
+        {"id": "job", "status": "COMPLETED", "output": "not a list"}
+    )
+
+    results = chat.batch(["one", "two"])
+
+    assert [r.content for r in results] == ["not a list", "not a list"]
+    # One packed attempt, then one job per conversation
+    assert mock_post.call_count == 3
+    chat.batch(["three", "four"])
+    assert mock_post.call_count == 5
+
+
+@patch("httpx.Client.post")
+def test_packed_results_stay_with_their_batch(mock_post: MagicMock, chat: ChatRunPod):
+    """Test that a concurrent invoke with an identical input can't take a batch's result."""
+    chat.pack_batches = True
+    mock_post.side_effect = _packed_post
+    concurrent = []
+    batch = BaseChatModel.batch
+
+    def batch_with_concurrent_invoke(self, *args, **kwargs):
+        thread = threading.Thread(target=lambda: concurrent.append(chat.invoke("one")))
+        thread.start()
+        thread.join()
+        return batch(self, *args, **kwargs)
+
+    with patch.object(BaseChatModel, "batch", batch_with_concurrent_invoke):
+        results = chat.batch(["one", "two"])
+
+    assert [r.content for r in results] == ["re: User: one", "re: User: two"]
+    assert concurrent[0].content == "single: User: one"
+    assert mock_post.call_count == 2
+
+
+@pytest.mark.asyncio
+@patch("httpx.AsyncClient.post")
+async def test_abatch_packs_conversations(mock_post: MagicMock, chat: ChatRunPod):
+    """Test that abatch() sends compatible conversations as one packed job."""
+    chat.pack_batches = True
+    async def mock_post_async(*args, **kwargs):
+        return _packed_post(*args, **kwargs)
+    mock_post.side_effect = mock_post_async
+
+    results = await chat.abatch(["one", "two"])
+
+    assert [r.content for r in results] == ["re: User: one", "re: User: two"]
+    assert mock_post.call_count == 1
+
+
+# --- Test micro-batching ---
+
+@pytest.mark.asyncio
+@patch("httpx.AsyncClient.post")
+async def test_micro_batch_packs_concurrent_ainvoke(mock_post: MagicMock, chat: ChatRunPod):
+    """Test that concurrent ainvoke calls are sent as one packed job."""
+    chat.micro_batch = True
+    async def mock_post_async(*args, **kwargs):
+        return _packed_post(*args, **kwargs)
+    mock_post.side_effect = mock_post_async
+
+    results = await asyncio.gather(*(chat.ainvoke(p) for p in ["one", "two", "three"]))
+
+    assert [r.content for r in results] == ["re: User: one", "re: User: two", "re: User: three"]
+    assert mock_post.call_count == 1
+
+
+@pytest.mark.asyncio
+@patch("httpx.AsyncClient.post")
+async def test_micro_batch_separates_parameters(mock_post: MagicMock, chat: ChatRunPod):
+    """Test that calls with different parameters are not packed together."""
+    chat.micro_batch = True
+    async def mock_post_async(*args, **kwargs):
+        return _packed_post(*args, **kwargs)
+    mock_post.side_effect = mock_post_async
+
+    results = await asyncio.gather(
+        chat.ainvoke("one"),
+        chat.ainvoke("two"),
+        chat.ainvoke("three", seed=1),
+    )
+
+    assert [r.content for r in results] == ["re: User: one", "re: User: two", "single: User: three"]
+    assert mock_post.call_count == 2
+
+
+# --- Test cancellation ---
+@patch("httpx.Client.get")
+@patch("httpx.Client.post")
+def test_stream_closed_early_cancels_job(mock_post: MagicMock, mock_get: MagicMock, chat: ChatRunPod):
+    """Test that abandoning a stream before the job finished cancels the job."""
+    mock_post.return_value = json_response({"id": "job-1", "status": "IN_QUEUE"})
+    mock_get.return_value = _stream_response("IN_PROGRESS", ["Hello"])
+
+    stream = chat._stream([HumanMessage(content="Hi")])
+    assert next(stream).message.content == "Hello"
+    stream.close()
+
+    assert mock_post.call_args[0][0] == f"{chat.api_base}/{chat.endpoint_id}/cancel/job-1"
+    assert chat.in_flight_jobs == []
+
+
+@patch("httpx.AsyncClient.get")
+@patch("httpx.AsyncClient.post")
+async def test_astream_error_cancels_job(mock_post: MagicMock, mock_get: MagicMock, chat: ChatRunPod):
+    """Test that a failing /stream request cancels the job it was streaming."""
+    async def post(url, **kwargs):
+        if url.endswith("/run"):
+            return json_response({"id": "job-1", "status": "IN_QUEUE"})
+        return json_response({"status": "CANCELLED"})
+
+    async def get(url, **kwargs):
+        return json_response({"error": "forbidden"}, status_code=403)
+
+    mock_post.side_effect = post
+    mock_get.side_effect = get
+
+    with pytest.raises(ValueError, match="while streaming RunPod job job-1"):
+        async for _ in chat._astream([HumanMessage(content="Hi")]):
+            pass
+
+    assert mock_post.call_args[0][0] == f"{chat.api_base}/{chat.endpoint_id}/cancel/job-1"
+    assert chat.in_flight_jobs == []
+
+
+@patch("httpx.Client.get")
+@patch("httpx.Client.post")
+def test_polling_timeout_cancels_job(mock_post: MagicMock, mock_get: MagicMock, chat: ChatRunPod):
+    """Test that a job is cancelled once polling gives up on it."""
+    chat.poll_interval = 0
+    chat.max_polling_attempts = 2
+    mock_post.return_value = json_response({"id": "job-1", "status": "IN_QUEUE"})
+    mock_get.return_value = json_response({"id": "job-1", "status": "IN_QUEUE"})
+
+    with pytest.raises(ValueError, match="Max polling attempts"):
+        chat.invoke("Hi")
+
+    assert mock_post.call_args[0][0].endswith("/cancel/job-1")
+
+
+# --- Test response cache ---
+@patch("httpx.Client.post")
+def test_invoke_uses_response_cache(mock_post: MagicMock, chat: ChatRunPod):
+    """Test that a repeated conversation is answered from the cache."""
+    chat.response_cache = InMemoryResponseCache()
+    mock_post.return_value = json_response({"id": "job-1", "status": "COMPLETED", "output": "Hello"})
+
+    assert chat.invoke("Hi").content == "Hello"
+    assert chat.invoke("Hi").content == "Hello"
+    assert mock_post.call_count == 1
+
+
+@patch("httpx.Client.post")
+def test_batch_packing_skips_cached_conversations(mock_post: MagicMock, chat: ChatRunPod):
+    """Test that packed results are cached and cached inputs are not packed again."""
+    chat.pack_batches = True
+    chat.response_cache = InMemoryResponseCache()
+    mock_post.side_effect = _packed_post
+
+    chat.batch(["a", "b"])
+    assert [m.content for m in chat.batch(["a", "b"])] == ["re: User: a", "re: User: b"]
+    assert mock_post.call_count == 1
+
+
+def test_identifying_params_include_sampling_params() -> None:
+    """Test that differently configured models get different LLM cache keys."""
+    cold = ChatRunPod(endpoint_id="test-endpoint", api_key="test-key", temperature=0.1)
+    hot = ChatRunPod(endpoint_id="test-endpoint", api_key="test-key", temperature=0.9)
+
+    assert cold._identifying_params["temperature"] == 0.1
+    assert cold._get_llm_string() != hot._get_llm_string()
+
+
+# --- Test request coalescing ---
+@pytest.mark.asyncio
+@patch("httpx.AsyncClient.get")
+@patch("httpx.AsyncClient.post")
+async def test_concurrent_identical_calls_share_one_job(
+    mock_post: MagicMock, mock_get: MagicMock, chat: ChatRunPod
+):
+    """Test that identical concurrent ainvoke calls share one job and its error."""
+    chat.poll_interval = 0
+    chat.coalesce_requests = True
+    async def mock_post_async(*args, **kwargs):
+        return json_response({"id": "job-1", "status": "IN_QUEUE"})
+    async def mock_get_async(*args, **kwargs):
+        return json_response({"id": "job-1", "status": "COMPLETED", "output": "Shared"})
+    mock_post.side_effect = mock_post_async
+    mock_get.side_effect = mock_get_async
+
+    results = await asyncio.gather(*(chat.ainvoke("Hi") for _ in range(3)))
+
+    assert [r.content for r in results] == ["Shared"] * 3
+    assert mock_post.call_count == 1
+
+    async def mock_get_failed(*args, **kwargs):
+        return json_response({"id": "job-1", "status": "FAILED", "error": "OOM"})
+    mock_get.side_effect = mock_get_failed
+    outcomes = await asyncio.gather(
+        *(chat.ainvoke("Hi") for _ in range(2)), return_exceptions=True
+    )
+    assert all("OOM" in str(outcome) for outcome in outcomes)
+    assert mock_post.call_count == 2
+
+
+# --- Test output extractors ---
+def test_custom_output_extractor(chat: ChatRunPod):
+    """Test that a custom registry recognizes worker-specific output shapes."""
+    chat.output_extractors = OutputExtractorRegistry()
+    chat.output_extractors.register(
+        "answer", lambda output: output.get("answer") if isinstance(output, dict) else None
+    )
+
+    message = chat._process_response(
+        {"status": "COMPLETED", "output": {"answer": "42", "usage": {"input": 3, "output": 1}}}
+    )
+
+    assert message.content == "42"
+    assert message.usage_metadata["total_tokens"] == 4
+    assert chat.output_extractors.learned(
+        (chat.api_base, chat.endpoint_id, "output")
+    ) == "answer"
+
+
+# --- Test chat templates ---
+
+def test_chat_template_renders_prompt() -> None:
+    """Test that the selected chat template formats the prompt."""
+    chat = ChatRunPod(endpoint_id="test", api_key="test", chat_template="chatml")
+    payload = chat._build_payload([HumanMessage(content="Hi")])
+    assert payload["input"]["prompt"] == (
+        "<|im_start|>user\nHi<|im_end|>\n<|im_start|>assistant\n"
+    )
+
+    with pytest.raises(ValueError, match="Unknown chat template"):
+        ChatRunPod(endpoint_id="test", api_key="test", chat_template="nope")
+
+
+# --- Test messages payload mode ---
+
+@patch("httpx.Client.post")
+def test_messages_payload_mode(mock_post: MagicMock) -> None:
+    """Test that messages mode sends structured messages, tool calls included."""
+    chat = ChatRunPod(
+        endpoint_id="test", api_key="test", payload_mode="messages", temperature=0.2
+    )
+    mock_post.return_value = json_response(
+        {"id": "job", "status": "COMPLETED", "output": "It is 42."}
+    )
+    messages = [
+        SystemMessage(content="Be brief."),
+        HumanMessage(
+            content=[
+                {"type": "text", "text": "What is this?"},
+                {"type": "image_url", "image_url": {"url": "https://example.com/a.png"}},
+            ]
+        ),
+        AIMessage(content="", tool_calls=[{"name": "lookup", "args": {"q": "a"}, "id": "c1"}]),
+        ToolMessage(content="42", tool_call_id="c1"),
+    ]
+
+    result = chat.invoke(messages)
+
+    assert result.content == "It is 42."
+    sent = json.loads(mock_post.call_args[1]["content"])["input"]
+    assert "prompt" not in sent
+    assert sent["temperature"] == 0.2
+    assert [message["role"] for message in sent["messages"]] == [
+        "system", "user", "assistant", "tool"
+    ]
+    assert sent["messages"][1]["content"][1]["type"] == "image_url"
+    assert sent["messages"][2]["tool_calls"][0]["function"]["name"] == "lookup"
+    assert sent["messages"][3]["tool_call_id"] == "c1"
@@ -0,0 +1,101 @@
+"""Unit tests for the coalescing of identical concurrent calls."""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from langchain_runpod.singleflight import SingleFlight
+
+
+def test_do_shares_one_call_between_threads() -> None:
+    flights = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def call() -> str:
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "result"
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        leader = executor.submit(flights.do, "key", call)
+        started.wait(5)
+        waiters = [executor.submit(flights.do, "key", call) for _ in range(3)]
+        time.sleep(0.05)
+        release.set()
+        results = [future.result() for future in [leader, *waiters]]
+
+    assert results == ["result"] * 4
+    assert len(calls) == 1
+    assert len(flights) == 0
+
+
+@pytest.mark.asyncio
+async def test_ado_shares_result_and_errors() -> None:
+    flights = SingleFlight()
+    calls = 0
+
+    async def call() -> str:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "result"
+
+    results = await asyncio.gather(*(flights.ado("key", call) for _ in range(5)))
+    assert results == ["result"] * 5
+    assert calls == 1
+
+    async def failing() -> str:
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    outcomes = await asyncio.gather(
+        *(flights.ado("key", failing) for _ in range(3)), return_exceptions=True
+    )
+    assert [str(outcome) for outcome in outcomes] == ["boom"] * 3
+
+
+@pytest.mark.asyncio
+async def test_waiter_takes_over_when_leader_is_cancelled() -> None:
+    flights = SingleFlight()
+    started = asyncio.Event()
+
+    async def slow() -> str:
+        started.set()
+        await asyncio.sleep(10)
+        return "slow"
+
+    async def fast() -> str:
+        return "fast"
+
+    leader = asyncio.create_task(flights.ado("key", slow))
+    await started.wait()
+    waiter = asyncio.create_task(flights.ado("key", fast))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    assert await waiter == "fast"
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_cancel_call() -> None:
+    flights = SingleFlight()
+
+    async def call() -> str:
+        await asyncio.sleep(0.02)
+        return "result"
+
+    leader = asyncio.create_task(flights.ado("key", call))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(flights.ado("key", call))
+    await asyncio.sleep(0)
+    waiter.cancel()
+
+    assert await leader == "result"